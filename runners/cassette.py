@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Record / replay cassettes for the LIVE sensor and BRMS traffic.
+
+A cassette is a JSONL file, one http_cassette_entry_v0_1 per call:
+  key, method, url, request (JSON body or null), response (JSON) or error, latency_ms
+
+Hooked calls: runner_eligibility.fetch_json (wE/wF), originate._fetch_sensor_json_live (wC/wB),
+originate.fetch_brms_flags, sensor_bulk.post_batch and decision_async.http_json.
+
+Modes (--cassette PATH --cassette-mode MODE, or DECISION_CASSETTE / DECISION_CASSETTE_MODE;
+the flags are exported, so child runners record / replay into the same file):
+  record        the real call goes out; its response or error and latency are appended
+                (flock: concurrent processes share one cassette)
+  replay        answered from the cassette at once, no network
+  replay-timed  the same, after sleeping the recorded latency
+
+The key is method + path + sorted query (+ a digest of the JSON body): the host is left out,
+so a replay needs no service at any --sensor-base-url / --brms-url. Repeated keys replay in
+recorded order (the last one again once they run out). A recorded error replays as the same
+kind of exception (HTTP status kept), so fallbacks and retries take the same branches; a key
+missing from the cassette raises CassetteMiss (a sensor fallback, reason "cassettemiss").
+
+Usage:
+  python3 runners/decision_async.py ... --sensor-mode LIVE --cassette /tmp/edge.cassette.jsonl --cassette-mode record
+  python3 runners/decision_async.py ... --sensor-mode LIVE --cassette /tmp/edge.cassette.jsonl
+  python3 runners/cassette.py stats --cassette /tmp/edge.cassette.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+CASSETTE_ENV = "DECISION_CASSETTE"
+CASSETTE_MODE_ENV = "DECISION_CASSETTE_MODE"
+MODES = ("record", "replay", "replay-timed")
+ENTRY_SCHEMA = "http_cassette_entry_v0_1"
+
+
+class CassetteMiss(LookupError):
+    """Replay of a call that was never recorded."""
+
+
+class ReplayedError(RuntimeError):
+    """A recorded error with no closer stdlib type."""
+
+
+def call_key(method: str, url: str, payload: Any = None) -> str:
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method.upper()} {parts.path}" + (f"?{query}" if query else "")
+    if payload is not None:
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+        key += f" #{digest[:16]}"
+    return key
+
+
+def _error_record(exc: BaseException) -> Dict[str, Any]:
+    code = getattr(exc, "code", None)
+    if not isinstance(code, int):
+        code = getattr(getattr(exc, "response", None), "status_code", None)  # requests.HTTPError
+    return {"type": type(exc).__name__, "code": code if isinstance(code, int) else None, "message": str(exc)}
+
+
+def _rebuild_error(url: str, err: Dict[str, Any]) -> BaseException:
+    kind, msg = str(err.get("type") or ""), str(err.get("message") or "")
+    if isinstance(err.get("code"), int):
+        return urllib.error.HTTPError(url, err["code"], msg, None, None)  # type: ignore[arg-type]
+    if "Timeout" in kind or kind == "timeout":
+        return TimeoutError(msg)
+    if "Connection" in kind or kind == "URLError":
+        return ConnectionError(msg)
+    if kind in ("ValueError", "JSONDecodeError", "TypeError", "KeyError"):
+        return ValueError(msg)
+    return ReplayedError(f"{kind}: {msg}")
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay") -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected one of {', '.join(MODES)})")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._missed: set = set()
+        if mode != "record":
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Cassette not found: {path}")
+            for entry in load_entries(path):
+                self._entries.setdefault(entry["key"], []).append(entry)
+
+    # --- record -----------------------------------------------------------------
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(line)
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _record(self, key: str, method: str, url: str, payload: Any, out: Any, exc: Optional[BaseException], latency_ms: float) -> None:
+        entry: Dict[str, Any] = {
+            "meta_schema_version": ENTRY_SCHEMA,
+            "key": key,
+            "method": method.upper(),
+            "url": url,
+            "request": payload,
+            "latency_ms": round(latency_ms, 3),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if exc is not None:
+            entry["error"] = _error_record(exc)
+        else:
+            entry["response"] = out
+        self._append(entry)
+
+    # --- replay -----------------------------------------------------------------
+
+    def _next(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                if key not in self._missed:
+                    self._missed.add(key)
+                    print(f"[CASSETTE] miss: {key} ({self.path})", file=sys.stderr)
+                raise CassetteMiss(f"not in cassette: {key}")
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return entries[min(i, len(entries) - 1)]
+
+    def _answer(self, url: str, entry: Dict[str, Any]) -> Any:
+        if "error" in entry:
+            raise _rebuild_error(url, entry["error"])
+        return copy.deepcopy(entry.get("response"))
+
+    # --- calls ------------------------------------------------------------------
+
+    def call(self, method: str, url: str, fn: Callable[[], Any], payload: Any = None) -> Any:
+        key = call_key(method, url, payload)
+        if self.mode == "record":
+            ts = time.perf_counter()
+            try:
+                out = fn()
+            except Exception as e:
+                self._record(key, method, url, payload, None, e, (time.perf_counter() - ts) * 1000.0)
+                raise
+            self._record(key, method, url, payload, out, None, (time.perf_counter() - ts) * 1000.0)
+            return out
+        entry = self._next(key)
+        if self.mode == "replay-timed":
+            time.sleep(float(entry.get("latency_ms") or 0.0) / 1000.0)
+        return self._answer(url, entry)
+
+    async def acall(self, method: str, url: str, fn: Callable[[], Awaitable[Any]], payload: Any = None) -> Any:
+        import asyncio
+
+        key = call_key(method, url, payload)
+        if self.mode == "record":
+            ts = time.perf_counter()
+            try:
+                out = await fn()
+            except Exception as e:
+                self._record(key, method, url, payload, None, e, (time.perf_counter() - ts) * 1000.0)
+                raise
+            self._record(key, method, url, payload, out, None, (time.perf_counter() - ts) * 1000.0)
+            return out
+        entry = self._next(key)
+        if self.mode == "replay-timed":
+            await asyncio.sleep(float(entry.get("latency_ms") or 0.0) / 1000.0)
+        return self._answer(url, entry)
+
+
+_UNSET = object()
+_active: Any = _UNSET
+
+
+def configure(path: Optional[str], mode: str = "replay") -> Optional[Cassette]:
+    """Use this cassette in this process and export it to child runners (None: from the env)."""
+    global _active
+    if path:
+        os.environ[CASSETTE_ENV] = path
+        os.environ[CASSETTE_MODE_ENV] = mode
+    path = os.environ.get(CASSETTE_ENV)
+    _active = Cassette(path, os.environ.get(CASSETTE_MODE_ENV) or "replay") if path else None
+    return _active
+
+
+def active() -> Optional[Cassette]:
+    """The process cassette: the configured one, else the one a parent exported (read once)."""
+    if _active is _UNSET:
+        return configure(None)
+    return _active
+
+
+def call(method: str, url: str, fn: Callable[[], Any], payload: Any = None) -> Any:
+    """fn() through the active cassette (plain fn() when none is configured)."""
+    c = active()
+    return fn() if c is None else c.call(method, url, fn, payload)
+
+
+async def acall(method: str, url: str, fn: Callable[[], Awaitable[Any]], payload: Any = None) -> Any:
+    c = active()
+    return await fn() if c is None else await c.acall(method, url, fn, payload)
+
+
+def add_cassette_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--cassette", default=None, help=f"Record / replay LIVE sensor + BRMS calls in this JSONL file; also ${CASSETTE_ENV}")
+    ap.add_argument("--cassette-mode", choices=MODES, default="replay", help="record | replay (instant) | replay-timed (recorded latency)")
+
+
+def configure_from_args(args: argparse.Namespace) -> Optional[Cassette]:
+    return configure(args.cassette, args.cassette_mode)
+
+
+# --- Reading cassettes back -------------------------------------------------------
+
+def load_entries(path: str) -> List[Dict[str, Any]]:
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entries.append(json.loads(line))
+    return entries
+
+
+def _pct(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(int(round(p / 100.0 * (len(values) - 1))), len(values) - 1)], 3)
+
+
+def cassette_stats(path: str) -> Dict[str, Any]:
+    entries = load_entries(path)
+    by_endpoint: Dict[str, Dict[str, Any]] = {}
+    for e in entries:
+        ep = f"{e.get('method')} {urllib.parse.urlsplit(str(e.get('url'))).path}"
+        s = by_endpoint.setdefault(ep, {"calls": 0, "errors": 0, "latency_ms": []})
+        s["calls"] += 1
+        s["errors"] += 1 if "error" in e else 0
+        s["latency_ms"].append(float(e.get("latency_ms") or 0.0))
+    for s in by_endpoint.values():
+        lat = s.pop("latency_ms")
+        s.update({"p50_ms": _pct(lat, 50), "p99_ms": _pct(lat, 99), "total_ms": round(sum(lat), 3)})
+    return {
+        "cassette": path,
+        "entries": len(entries),
+        "keys": len({e.get("key") for e in entries}),
+        "recorded_ms": round(sum(float(e.get("latency_ms") or 0.0) for e in entries), 3),
+        "by_endpoint": by_endpoint,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Inspect a sensor / BRMS cassette")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    st = sub.add_parser("stats", help="Calls, errors and recorded latency per endpoint")
+    st.add_argument("--cassette", required=True)
+    args = ap.parse_args()
+    if args.cmd == "stats":
+        print(json.dumps(cassette_stats(args.cassette), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
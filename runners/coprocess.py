@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Persistent co-process mode for the runners: JSONL over stdin/stdout.
+
+A runner started with --serve-stdio loads its model / alias once, then answers one
+request per stdin line with one record per stdout line, until stdin closes:
+
+  runner_t2.py / runner_t3.py / runner_t4.py
+      in:  {"client_id": "100001", "request_id": "r-1", "seed": 42}
+      out: risk_decision_t2_v0_1 | risk_decision_t3_v0_1 | risk_decision_t4_v0_1
+  runner_eligibility.py
+      in:  {"intake": {application_intake_v0_1}}   (a bare intake line works too)
+      out: eligibility_agent_status_v0_1
+  originate.py
+      in:  {"client_id": "100001", "request_id": "r-1", "seed": 42[, "fraud_signals": {...}]}
+      out: decision_pack_v0_1
+
+A request may carry "traceparent" (tracing.py): the runner's spans join that trace.
+A request that fails answers with a coprocess_error_v0_1 record instead and the runner
+keeps serving. Anything else the runner would print goes to stderr (stdout carries the
+protocol only).
+
+CoprocessPool is the client side: `originate.py --serve-stdio --coprocess` keeps one pool
+per sub-agent instead of starting an interpreter per call. A co-process that dies or times out is
+killed and replaced on the next request.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import select
+import subprocess
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import profiling
+import tracing
+
+ERROR_SCHEMA_VERSION = "coprocess_error_v0_1"
+DEFAULT_TIMEOUT_S = 30.0
+
+
+class CoprocessError(RuntimeError):
+    """A co-process answered with an error record, died, or did not answer in time."""
+
+
+def _request_id(req: Any) -> Optional[str]:
+    if not isinstance(req, dict):
+        return None
+    intake = req.get("intake") if isinstance(req.get("intake"), dict) else req
+    return req.get("request_id") or intake.get("meta_request_id")
+
+
+def serve_stdio(handle: Callable[[Dict[str, Any]], Dict[str, Any]], *, component: str) -> int:
+    """Answer JSONL requests on stdin with handle(request), one line each, until EOF."""
+    # The protocol gets a private copy of fd 1; fd 1 itself (Python prints, native library
+    # output) now goes to stderr, so nothing stray can corrupt the record stream.
+    sys.stdout.flush()
+    out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        req: Any = None
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("Expected one JSON object per line")
+            record = handle(req)
+        except Exception as e:
+            record = {
+                "meta_schema_version": ERROR_SCHEMA_VERSION,
+                "meta_component": component,
+                "meta_request_id": _request_id(req),
+                "error_type": type(e).__name__,
+                "error": str(e),
+            }
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        tracing.flush()
+    return 0
+
+
+def serve_scorer(score: Callable[..., Dict[str, Any]], *, component: str, feature_store: Optional[str], prof: Any = None) -> int:
+    """serve_stdio for a T2/T3/T4 runner: score(client_id=, request_id=, seed=, feature_store=) per line."""
+
+    def handle(req: Dict[str, Any]) -> Dict[str, Any]:
+        if not str(req.get("client_id") or "").strip():
+            raise ValueError("Request requires client_id")
+        rid = req.get("request_id")
+        with profiling.stage(prof, "score"), tracing.span(f"{component}.score", traceparent=req.get("traceparent"), attributes={"decision.request_id": rid}):
+            return score(client_id=str(req["client_id"]), request_id=rid, seed=int(req.get("seed", 42)), feature_store=feature_store)
+
+    return serve_stdio(handle, component=component)
+
+
+class Coprocess:
+    """One --serve-stdio child; request() is not thread-safe (the pool hands it to one caller)."""
+
+    def __init__(self, cmd: List[str], env: Optional[Dict[str, str]] = None) -> None:
+        self.cmd = cmd
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+        self.requests = 0
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def request(self, obj: Dict[str, Any], timeout_s: float = DEFAULT_TIMEOUT_S) -> Dict[str, Any]:
+        assert self.proc.stdin is not None and self.proc.stdout is not None
+        try:
+            self.proc.stdin.write((json.dumps(obj) + "\n").encode("utf-8"))
+            self.proc.stdin.flush()
+        except BrokenPipeError as e:
+            raise CoprocessError(f"{self.cmd[1]} exited (code {self.proc.poll()})") from e
+        # One request -> exactly one line, so nothing is ever left in the read buffer.
+        ready, _, _ = select.select([self.proc.stdout], [], [], timeout_s)
+        if not ready:
+            self.kill()
+            raise CoprocessError(f"{self.cmd[1]} did not answer within {timeout_s:.1f}s")
+        line = self.proc.stdout.readline()
+        if not line:
+            raise CoprocessError(f"{self.cmd[1]} exited (code {self.proc.wait()})")
+        self.requests += 1
+        out = json.loads(line)
+        if out.get("meta_schema_version") == ERROR_SCHEMA_VERSION:
+            raise CoprocessError(f"{self.cmd[1]}: {out.get('error_type')}: {out.get('error')}")
+        return out
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        if self.proc.stdin is not None and not self.proc.stdin.closed:
+            try:
+                self.proc.stdin.close()  # EOF: the serve loop returns
+            except BrokenPipeError:
+                pass
+        try:
+            self.proc.wait(timeout=timeout_s)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+    def kill(self) -> None:
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+
+class CoprocessPool:
+    """
+    Up to `size` co-processes of one command, started on first use. A caller checks
+    one out for its request; a co-process that failed (other than an error record) is
+    discarded and the next request starts a fresh one.
+    """
+
+    def __init__(self, cmd: List[str], *, size: int = 1, timeout_s: float = DEFAULT_TIMEOUT_S, env: Optional[Dict[str, str]] = None) -> None:
+        self.cmd = cmd
+        self.size = max(int(size), 1)
+        self.timeout_s = float(timeout_s)
+        self.env = env
+        self._idle: "queue.LifoQueue[Coprocess]" = queue.LifoQueue()
+        self._all: List[Coprocess] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.started = 0
+        self.replaced = 0
+        self.served = 0
+        atexit.register(self.close)
+
+    def _checkout(self) -> Coprocess:
+        self._slots.acquire()
+        try:
+            cp = self._idle.get_nowait()
+            if cp.alive():
+                return cp
+            with self._lock:
+                self._all.remove(cp)
+                self.replaced += 1
+        except queue.Empty:
+            pass
+        try:
+            cp = Coprocess(self.cmd, env=self.env)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.append(cp)
+            self.started += 1
+        return cp
+
+    def request(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        cp = self._checkout()
+        healthy = True
+        try:
+            out = cp.request(obj, self.timeout_s)
+            with self._lock:
+                self.served += 1
+            return out
+        except CoprocessError:
+            healthy = cp.alive()  # an error record leaves the co-process usable
+            raise
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if healthy:
+                self._idle.put(cp)
+            else:
+                cp.kill()
+                with self._lock:
+                    if cp in self._all:
+                        self._all.remove(cp)
+                    self.replaced += 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runner": self.cmd[1],
+                "size": self.size,
+                "alive": sum(1 for cp in self._all if cp.alive()),
+                "started": self.started,
+                "replaced": self.replaced,
+                "served": self.served,
+                "pids": [cp.proc.pid for cp in self._all],
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            procs, self._all = self._all, []
+        for cp in procs:
+            cp.close()
+
+
+def child_env() -> Dict[str, str]:
+    """Environment for long-lived co-processes: no TRACEPARENT (each request carries its own)."""
+    env = dict(os.environ)
+    env.pop(tracing.TRACEPARENT_ENV, None)
+    return env
+
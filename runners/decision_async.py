@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+asyncio decision pipeline: the same chain as DecisionEngine (intake -> eligibility ->
+ORIGINATE -> policy decider -> reporter), with the waiting done on the event loop.
+
+  - sensor calls (wE/wF, wC/wB) and the BRMS bridge go out concurrently over a small
+    stdlib asyncio HTTP client (no aiohttp needed); the BRMS call starts together with
+    scoring, since its payload does not depend on the scores
+  - T2/T3/T4 scoring runs in a thread pool, the three models concurrently (xgboost
+    releases the GIL while predicting); with micro-batching on, rows still go through
+    the engine's batchers
+  - rules, fraud thresholds, assembly and the policy decider are the sync code itself:
+    the fetched payloads are handed to the sync resolvers (`fetched=`), so the pack is
+    the one DecisionEngine.decide builds (checked with --compare-sync)
+
+Library use (one loop, any number of concurrent decisions):
+
+  engine = AsyncDecisionEngine(decision_engine.engine_from_args(args))
+  pack = await engine.decide(row)
+  pack, report = await engine.decide_and_report(row)
+
+Threaded callers (decision_service.py --async-engine) call start() once and then
+decide_idempotent_threadsafe(row) from any thread.
+
+Usage:
+  python3 runners/decision_async.py --runtime-manifest /tmp/runtime_manifest.json \
+      --requests-jsonl testing/requests/eval_requests_dev_v0_1.jsonl --concurrency 16 --compare-sync
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import copy
+import functools
+import json
+import ssl
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
+from contract_validate import (
+    validate_required,
+    REQUIRED_FINAL_DECISION_V0_1,
+    REQUIRED_T2_V0_1,
+    REQUIRED_T3_V0_1,
+    REQUIRED_T4_V0_1,
+)
+import cassette
+import decision_engine
+import metrics_registry
+import originate
+import runner_eligibility
+import runner_reporter
+import runner_t2
+import runner_t3
+import runner_t4
+import runner_workflow_eligibility
+import sensor_hedge
+import tracing
+from sensor_bulk import prefetched_sensor
+
+BRMS_TIMEOUT_S = 10.0  # same as originate.fetch_brms_flags
+IDEMPOTENCY_POLL_S = 0.02
+VOLATILE_KEYS = {"meta_generated_at", "meta_latency_ms", "latency_ms", "generated_at", "meta_as_of_ts", "hedge_sent", "hedge_won"}
+
+Fetched = Tuple[Any, float]  # (payload or the exception it raised, latency_ms)
+
+
+# --- Minimal asyncio HTTP/1.1 client (JSON in / JSON out) ---------------------------
+
+async def _http(method: str, url: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, str, Dict[str, str], bytes]:
+    parts = urllib.parse.urlsplit(url)
+    https = parts.scheme == "https"
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, parts.port or (443 if https else 80), ssl=ssl.create_default_context() if https else None
+    )
+    try:
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        head = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", "Connection: close", "Accept: application/json"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        if body or method != "GET":
+            head.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+        _, status, reason = (status_line.split(" ", 2) + [""])[:3]
+        resp_headers: Dict[str, str] = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            k, _, v = line.partition(":")
+            resp_headers[k.strip().lower()] = v.strip()
+        raw = await reader.read()  # Connection: close -> body ends at EOF
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, ssl.SSLError):
+            pass
+    if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+        raw = _dechunk(raw)
+    return int(status), reason, resp_headers, raw
+
+
+def _dechunk(raw: bytes) -> bytes:
+    out = bytearray()
+    while raw:
+        size_line, _, raw = raw.partition(b"\r\n")
+        size = int(size_line.split(b";", 1)[0] or b"0", 16)
+        if size == 0:
+            break
+        out += raw[:size]
+        raw = raw[size + 2:]
+    return bytes(out)
+
+
+async def http_json(
+    method: str,
+    url: str,
+    *,
+    payload: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout_s: float,
+) -> Any:
+    """
+    One JSON request. Errors match the sync clients' so fallbacks and metrics labels
+    agree: urllib.error.HTTPError for >= 400, TimeoutError, ConnectionError.
+    Goes through the active cassette (cassette.py) when one is configured.
+    """
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    hdrs = dict(headers or {})
+    if payload is not None:
+        hdrs["Content-Type"] = "application/json"
+
+    async def send() -> Any:
+        status, reason, _, raw = await asyncio.wait_for(_http(method, url, body, hdrs), timeout=timeout_s)
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, reason, None, None)  # type: ignore[arg-type]
+        return json.loads(raw.decode("utf-8"))
+
+    return await cassette.acall(method, url, send, payload)
+
+
+# --- Engine -------------------------------------------------------------------------
+
+class AsyncDecisionEngine:
+    """Async front of a loaded DecisionEngine (models, aliases, BRMS / sensor settings are its)."""
+
+    def __init__(self, engine: decision_engine.DecisionEngine, *, executor_workers: int = 4) -> None:
+        self.engine = engine
+        self.executor_workers = max(int(executor_workers), 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="decision_async")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def _in_executor(self, fn: Callable[..., Any], *args: Any, **kw: Any) -> Any:
+        """fn on the thread pool, inside the caller's context (its open span stays the parent)."""
+        ctx = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(ctx.run, fn, *args, **kw))
+
+    async def _get_json(self, url: str, timeout_s: float, hedge_stats: Optional[Dict[str, int]] = None) -> Fetched:
+        path = urllib.parse.urlsplit(url).path
+        ts = time.perf_counter()
+        try:
+            with tracing.span(f"GET {path}", kind="CLIENT", attributes={"http.method": "GET", "url.path": path}):
+                data = await sensor_hedge.acall(
+                    "GET", url, lambda: http_json("GET", url, headers=tracing.inject({}), timeout_s=timeout_s), hedge_stats
+                )
+            if not isinstance(data, dict):
+                raise ValueError("Expected dict JSON response")
+            return data, (time.perf_counter() - ts) * 1000.0
+        except Exception as e:
+            return e, (time.perf_counter() - ts) * 1000.0
+
+    async def _fetch_all(
+        self, urls: Dict[Any, str], timeout_s: float, hedges: Optional[Dict[Any, Dict[str, int]]] = None
+    ) -> Dict[Any, Fetched]:
+        """hedges: filled with {key: hedge stats} of each call (sensor_hedge.py)."""
+        stats: Dict[Any, Dict[str, int]] = {k: {} for k in urls}
+        results = await asyncio.gather(*(self._get_json(u, timeout_s, stats[k]) for k, u in urls.items()))
+        if hedges is not None:
+            hedges.update(stats)
+        return dict(zip(urls, results))
+
+    # --- stages -------------------------------------------------------------------
+
+    async def intake(self, row: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+        return self.engine.intake(row, request_id)  # pure (alias already loaded): no I/O to await
+
+    async def eligibility(self, intake: Dict[str, Any]) -> Dict[str, Any]:
+        e = self.engine
+        t0 = time.time()
+        fetched = None
+        if e.sensor_mode.upper() == "LIVE":
+            urls = runner_eligibility.sensor_urls(intake, e.sensor_base_url, e.sensor_prefetch)
+            by_sensor = await self._fetch_all(urls, max(float(e.sensor_timeout_ms) / 1000.0, 0.1))
+            fetched = {urls[s]: r for s, r in by_sensor.items()}
+        # The rules are instant; the pool only matters for the rare market_snapshot retry.
+        return await self._in_executor(
+            runner_eligibility.run_eligibility,
+            intake,
+            e.elig_alias,
+            sensor_mode=e.sensor_mode,
+            sensor_base_url=e.sensor_base_url,
+            sensor_timeout_ms=e.sensor_timeout_ms,
+            sensor_prefetch=e.sensor_prefetch,
+            t0=t0,
+            fetched=fetched,
+        )
+
+    async def fraud_signals(self, *, client_id: str, request_id: str, seed: int) -> Dict[str, Any]:
+        opts = self.engine.fraud_opts
+        with tracing.span("fraud_signals", attributes={"fraud_signals.mode": opts.get("mode")}):
+            fetched, hedges = None, {}
+            if str(opts["mode"]).upper() == "LIVE":
+                base = str(opts["sensor_base_url"]).rstrip("/")
+                urls = {
+                    sensor: f"{base}{endpoint}?{urllib.parse.urlencode(params)}"
+                    for sensor, (endpoint, params) in originate.fraud_sensor_requests(client_id, request_id, seed).items()
+                    if prefetched_sensor(opts.get("sensor_prefetch"), request_id, sensor, client_id=client_id) is None
+                }
+                fetched = await self._fetch_all(urls, max(float(opts["sensor_timeout_ms"]) / 1000.0, 0.1), hedges)
+            return originate.resolve_fraud_signals(
+                client_id=client_id, request_id=request_id, seed=seed, fetched=fetched, hedge_stats=hedges, **opts
+            )
+
+    async def brms_flags(self, *, client_id: str, request_id: str) -> Optional[Dict[str, Any]]:
+        """Live BRMS flags, None when the bridge is unavailable or off-contract (fail-open)."""
+        e = self.engine
+        if e.brms_url is None:
+            return copy.deepcopy(e.brms_stub_flags)
+        t0, t_brms = time.time(), time.perf_counter()
+        try:
+            with tracing.span("POST brms_bridge", kind="CLIENT", attributes={"http.method": "POST", "url.full": e.brms_url}):
+                out = await http_json(
+                    "POST",
+                    e.brms_url,
+                    payload=originate.brms_request_payload(request_id, client_id),
+                    headers=tracing.inject({}),
+                    timeout_s=BRMS_TIMEOUT_S,
+                )
+            if isinstance(out, dict) and "meta_latency_ms" not in out:
+                out["meta_latency_ms"] = int((time.time() - t0) * 1000)
+            return await self._in_executor(originate.accept_brms_flags, out, t_brms)
+        except Exception:
+            return None
+
+    async def _score(self, name: str, fn: Callable[[], Dict[str, Any]], required: Any) -> Dict[str, Any]:
+        with tracing.span(name):
+            out = await self._in_executor(fn)
+        validate_required(out, required, where=f"decision_async:{name}")
+        return out
+
+    async def originate(self, *, client_id: str, request_id: str, seed: int) -> Dict[str, Any]:
+        """ORIGINATE pack: T2/T3/T4, wC/wB and BRMS all in flight together."""
+        e = self.engine
+        t0 = time.time()
+        kw = {"client_id": client_id, "request_id": request_id, "seed": seed, "feature_store": e.feature_store}
+        t2, t3, t4, fraud, brms = await asyncio.gather(
+            self._score("t2_default", lambda: runner_t2.strict_payload(e.score_model("t2_default", runner_t2, e.t2, kw)), REQUIRED_T2_V0_1),
+            self._score("t3_fraud", lambda: e.score_model("t3_fraud", runner_t3, e.t3, kw), REQUIRED_T3_V0_1),
+            self._score("t4_payoff", lambda: e.score_model("t4_payoff", runner_t4, e.t4, kw), REQUIRED_T4_V0_1),
+            self.fraud_signals(client_id=client_id, request_id=request_id, seed=seed),
+            self.brms_flags(client_id=client_id, request_id=request_id),
+        )
+        with tracing.span("assemble_pack"):
+            pack = originate.assemble_pack(
+                client_id=client_id,
+                request_id=request_id,
+                seed=seed,
+                t2=t2,
+                t3=t3,
+                t4=t4,
+                manifest=e.manifest,
+                latency_ms=int((time.time() - t0) * 1000),
+                brms_flags=brms,
+                brms_stub_used=e.brms_stub_flags is not None,
+                brms_url=None,
+                fraud_signals=fraud,
+                fraud_opts=e.fraud_opts,
+                brms_live=e.brms_url is not None,
+            )
+        validate_required(pack["decisions"]["final_decision"], REQUIRED_FINAL_DECISION_V0_1, where="decision_async:final_decision")
+        return pack
+
+    # --- requests -----------------------------------------------------------------
+
+    async def decide(self, row: Dict[str, Any], *, traceparent: Optional[str] = None) -> Dict[str, Any]:
+        """One request row -> decision_pack_v0_1 (early cut or full chain)."""
+        return (await self.decide_idempotent(row, traceparent=traceparent))[0]
+
+    async def decide_idempotent(self, row: Dict[str, Any], *, traceparent: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """(pack, replayed), as DecisionEngine.decide_idempotent. traceparent: parent span from another thread."""
+        with tracing.span("decide", traceparent=traceparent, attributes={"decision.request_id": row.get("request_id")}) as sp:
+            pack, replayed = await self._decide_idempotent(row)
+            sp.set_attribute("decision.idempotent_replay", replayed)
+            sp.set_attribute("decision.final_outcome", (pack.get("decisions", {}).get("final_decision") or {}).get("final_outcome"))
+            return pack, replayed
+
+    async def _decide_idempotent(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        store = self.engine.idempotency
+        if store is None or not row.get("request_id"):
+            pack = await self._decide(row)
+            metrics_registry.observe_pack(pack)
+            return pack, False
+        request_id = str(row["request_id"])
+        phash = self.engine.idempotency_hash(row)
+        # Duplicates of an in-flight request poll here, not in an executor thread the owner needs.
+        t_claim = time.monotonic()
+        while True:
+            state, stored = await self._in_executor(store.try_claim, request_id, phash)
+            if state != "pending":
+                break
+            if time.monotonic() - t_claim >= store.wait_s:
+                raise store.pending_error(request_id, time.monotonic() - t_claim)
+            await asyncio.sleep(IDEMPOTENCY_POLL_S)
+        if stored is not None:
+            metrics_registry.counter("decision_idempotent_replays_total", "Resent request_ids answered from the idempotency store").inc()
+            return copy.deepcopy(stored), True
+        try:
+            pack = await self._decide(row)
+        except BaseException:
+            # Synchronous: must also run when the task is cancelled.
+            store.release(request_id, phash)
+            raise
+        metrics_registry.observe_pack(pack)
+        await self._in_executor(store.put, request_id, phash, pack)
+        return copy.deepcopy(pack), False
+
+    async def _decide(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.time()
+        if not str(row.get("client_id", "")).strip():
+            raise ValueError("Request row requires client_id")
+        client_id = str(row["client_id"])
+        request_id = str(row.get("request_id") or uuid.uuid4())
+        with tracing.span("intake"):
+            intake = await self.intake(row, request_id)
+        with tracing.span("eligibility"):
+            eligibility = await self.eligibility(intake)
+
+        if str(eligibility.get("eligibility_status", "")).upper() in runner_workflow_eligibility.EARLY_CUT_STATUSES:
+            return runner_workflow_eligibility.early_cut_pack(
+                request_id=request_id,
+                client_id=client_id,
+                intake=intake,
+                eligibility=eligibility,
+                manifest=self.engine.manifest,
+                t0=t0,
+            )
+        with tracing.span("originate"):
+            pack = await self.originate(client_id=client_id, request_id=request_id, seed=int(row.get("seed", 42)))
+        pack["decisions"]["workflow_intake"] = intake
+        pack["decisions"]["eligibility"] = eligibility
+        return pack
+
+    def report(self, pack: Dict[str, Any]) -> Dict[str, Any]:
+        """reporter_output_v0_1 for a finished pack (runner_reporter.py, in process)."""
+        t0 = time.time()
+        out = runner_reporter.build_report(pack, 0)
+        out["meta_latency_ms"] = int((time.time() - t0) * 1000)
+        runner_reporter.validate_output(out)
+        return out
+
+    async def decide_and_report(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        pack = await self.decide(row)
+        return pack, self.report(pack)
+
+    # --- threaded callers -----------------------------------------------------------
+
+    def start(self) -> None:
+        """Run an event loop on a daemon thread (call after fork: threads do not survive it)."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="decision_async_loop", daemon=True)
+        self._thread.start()
+
+    def run_threadsafe(self, coro: Awaitable[Any]) -> Any:
+        if self._loop is None:
+            raise RuntimeError("AsyncDecisionEngine.start() was not called")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()  # type: ignore[arg-type]
+
+    def decide_idempotent_threadsafe(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """decide_idempotent from a non-loop thread; the caller's open span stays the parent."""
+        return self.run_threadsafe(self.decide_idempotent(row, traceparent=tracing.current_traceparent()))
+
+    def close(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout=2.0)
+            self._loop = None
+        self._executor.shutdown(wait=False)
+
+
+def strip_volatile(obj: Any) -> Any:
+    """Pack without timestamps / latencies (the parts that differ between two runs)."""
+    if isinstance(obj, dict):
+        return {k: strip_volatile(v) for k, v in obj.items() if k not in VOLATILE_KEYS}
+    if isinstance(obj, list):
+        return [strip_volatile(v) for v in obj]
+    return obj
+
+
+async def run_rows(engine: AsyncDecisionEngine, rows: List[Dict[str, Any]], concurrency: int) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(pack, report) per row, in row order, at most `concurrency` decisions in flight."""
+    sem = asyncio.Semaphore(max(int(concurrency), 1))
+
+    async def one(row: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        async with sem:
+            return await engine.decide_and_report(row)
+
+    return list(await asyncio.gather(*(one(r) for r in rows)))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="asyncio decision pipeline (decision_pack_v0_1 per request row)")
+    decision_engine.add_engine_args(ap)
+    ap.add_argument("--requests-jsonl", required=True)
+    ap.add_argument("--max-rows", type=int, default=None)
+    ap.add_argument("--concurrency", type=int, default=16, help="Decisions in flight on the loop")
+    ap.add_argument("--executor-workers", type=int, default=4, help="Scoring threads")
+    ap.add_argument("--out-jsonl", default=None, help="Optional packs output (one per line, row order)")
+    ap.add_argument("--reports-jsonl", default=None, help="Optional reporter_output_v0_1 per row")
+    ap.add_argument("--compare-sync", action="store_true", help="Also run DecisionEngine.decide per row; exit 1 on any pack difference")
+    args = ap.parse_args()
+    if args.compare_sync and (args.idempotency or args.idempotency_db):
+        ap.error("--compare-sync needs a run without an idempotency store (replays would compare a pack with itself)")
+    tracing.configure("decision_async", args.trace_out)
+    cassette.configure_from_args(args)
+    sensor_hedge.configure_from_args(args)
+
+    engine = AsyncDecisionEngine(decision_engine.engine_from_args(args), executor_workers=args.executor_workers)
+    rows = []
+    with open(args.requests_jsonl, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    if args.max_rows is not None:
+        rows = rows[: args.max_rows]
+
+    t0 = time.time()
+    results = asyncio.run(run_rows(engine, rows, args.concurrency))
+    wall_ms = int((time.time() - t0) * 1000)
+
+    outcomes: Dict[str, int] = {}
+    for pack, _ in results:
+        outcome = pack["decisions"]["final_decision"]["final_outcome"]
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    if args.out_jsonl:
+        with open(args.out_jsonl, "w", encoding="utf-8") as f:
+            for pack, _ in results:
+                f.write(json.dumps(pack) + "\n")
+    if args.reports_jsonl:
+        with open(args.reports_jsonl, "w", encoding="utf-8") as f:
+            for _, report in results:
+                f.write(json.dumps(report) + "\n")
+
+    summary: Dict[str, Any] = {
+        "engine": engine.engine.describe(),
+        "rows": len(rows),
+        "concurrency": args.concurrency,
+        "executor_workers": engine.executor_workers,
+        "final_outcome_counts": outcomes,
+        "wall_ms": wall_ms,
+        "throughput_rps": round(len(rows) / (wall_ms / 1000.0), 3) if wall_ms > 0 else None,
+    }
+    if sensor_hedge.active() is not None:
+        summary["sensor_hedge"] = sensor_hedge.active().describe()
+    mismatches: List[str] = []
+    if args.compare_sync:
+        t_sync = time.time()
+        for row, (pack, _) in zip(rows, results):
+            if strip_volatile(engine.engine.decide(row)) != strip_volatile(pack):
+                mismatches.append(str(row.get("request_id")))
+        summary["sync_wall_ms"] = int((time.time() - t_sync) * 1000)
+        summary["sync_parity"] = {"compared": len(rows), "mismatches": mismatches}
+    engine.close()
+
+    print(json.dumps(summary, indent=2))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+In-process decision engine: WORK-FLOW -> Eligibility -> ORIGINATE (T2/T3/T4 + wC/wB + BRMS)
+with the runtime manifest, boosters and threshold indexes loaded once.
+
+`DecisionEngine.decide(row)` returns the same decision_pack_v0_1 as
+`runner_workflow_eligibility.py` for the same request, without child interpreters.
+Rows use the eval_requests_v0_1 shape (request_id, client_id, seed, channel, as_of_ts
+and the optional intake overrides).
+
+Loading is the expensive part (xgboost boosters); decision_service.py builds one engine
+in the parent and forks workers that share it copy-on-write.
+
+Usage (one-off, same flags as the orchestrator):
+  python3 runners/decision_engine.py --runtime-manifest /tmp/runtime_manifest.json \
+      --requests-jsonl testing/requests/eval_requests_dev_v0_1.jsonl --max-rows 5
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
+from contract_validate import (
+    validate_required,
+    REQUIRED_BRMS_FLAGS_V0_1,
+    REQUIRED_FINAL_DECISION_V0_1,
+    REQUIRED_T2_V0_1,
+    REQUIRED_T3_V0_1,
+    REQUIRED_T4_V0_1,
+)
+import cassette
+import originate
+import runner_eligibility
+import runner_t2
+import runner_t3
+import runner_t4
+import runner_workflow
+import runner_workflow_eligibility
+import idempotency_store
+import metrics_registry
+import runtime_manifest
+import sensor_hedge
+import tracing
+from micro_batcher import MicroBatcher
+
+INTAKE_OVERRIDE_KEYS = (
+    "as_of_ts",
+    "age",
+    "employment_status",
+    "declared_income_monthly",
+    "is_existing_customer",
+    "declared_dti",
+    "declared_credit_score",
+    "requested_amount",
+    "term_months",
+    "product_type",
+)
+
+
+CAPACITY_SHED_FAIL_OPEN = "CAPACITY_SHED_FAIL_OPEN"
+
+
+def capacity_shed_pack(row: Dict[str, Any], reason: str, manifest: Dict[str, Any], queued_ms: int) -> Dict[str, Any]:
+    """
+    decision_pack_v0_1 for a request shed by admission control (decision_service):
+    nothing was scored, so the outcome fails open to REVIEW like a missing BRMS does.
+    reason: QUEUE_FULL | QUEUE_TIMEOUT.
+    """
+    request_id = str(row.get("request_id") or uuid.uuid4())
+    client_id = str(row.get("client_id") or "unknown")
+    policy_snapshot = manifest["brms_policy_snapshot"]
+    final_decision = {
+        "meta_schema_version": "final_decision_v0_1",
+        "meta_generated_at": runner_workflow_eligibility.utc_now_iso(),
+        "meta_request_id": request_id,
+        "meta_client_id": client_id,
+        "meta_latency_ms": queued_ms,
+        "policy_id": str(policy_snapshot.get("policy_id", "P1")),
+        "policy_version": str(policy_snapshot.get("policy_version", "1.0")),
+        "validation_mode": "capacity_shed",
+        "final_outcome": "REVIEW",
+        "final_reason_code": CAPACITY_SHED_FAIL_OPEN,
+        "dominant_signals": [f"admission_control:{reason.lower()}"],
+        "required_docs": [],
+        "warnings": [CAPACITY_SHED_FAIL_OPEN, reason],
+        "overrides_applied": [],
+        "a_summary": None,
+        "b_summary": None,
+    }
+    validate_required(final_decision, REQUIRED_FINAL_DECISION_V0_1, where="decision_engine:capacity_shed")
+    return {
+        "meta_schema_version": "decision_pack_v0_1",
+        "meta_generated_at": final_decision["meta_generated_at"],
+        "meta_request_id": request_id,
+        "meta_client_id": client_id,
+        "meta_latency_ms": queued_ms,
+        "meta_brms_policy_snapshot": policy_snapshot,
+        "meta_runtime_manifest_hash": manifest["manifest_hash"],
+        "decisions": {"final_decision": final_decision},
+    }
+
+
+def decision_inputs(row: Dict[str, Any]) -> Dict[str, Any]:
+    """The row fields that determine the pack (idempotency payload hash)."""
+    out = {"client_id": str(row.get("client_id", "")), "seed": int(row.get("seed", 42)), "channel": str(row.get("channel") or "web")}
+    out.update({k: row.get(k) for k in INTAKE_OVERRIDE_KEYS})
+    return out
+
+
+class DecisionEngine:
+    """Read-only after __init__ (safe to share across forked workers), apart from the per-process batchers."""
+
+    def __init__(
+        self,
+        manifest: Dict[str, Any],
+        *,
+        feature_store: Optional[str] = None,
+        sensor_mode: str = "STUB",
+        sensor_base_url: str = "http://127.0.0.1:9000",
+        sensor_timeout_ms: int = 1200,
+        fraud_signals_mode: str = "STUB",
+        fraud_signals_stub: Optional[str] = "tools/smoke/fixtures/fraud_signals_stub.json",
+        sensor_prefetch: Optional[Dict[str, Any]] = None,
+        brms_stub: Optional[str] = runner_workflow_eligibility.DEFAULT_BRMS_STUB,
+        brms_url: str = "http://localhost:8090/bridge/brms_flags",
+        no_brms: bool = False,
+        idempotency: Optional[idempotency_store.IdempotencyStore] = None,
+    ) -> None:
+        t0 = time.time()
+        self.manifest = manifest
+        self.wf_alias = runtime_manifest.alias_payload(manifest, "workflow")
+        self.elig_alias = runtime_manifest.alias_payload(manifest, "eligibility")
+
+        models = manifest["models"]
+        t2m, t3m, t4m = models["t2_default"], models["t3_fraud"], models["t4_payoff"]
+        self.t2 = runner_t2.load_agent(t2m["model_file"], t2m["operating_pick_file"], t2m["default_operating_point"])
+        self.t3 = runner_t3.load_agent(t3m["model_file"], t3m["thresholds_file"])
+        self.t4 = runner_t4.load_agent(t4m["model_file"], t4m["thresholds_file"], t4m["feature_list_file"])
+
+        self.feature_store = feature_store
+        if feature_store:
+            # Map the store before workers fork so its pages are shared too.
+            import feature_store as _fs
+            _fs.open_store(feature_store)
+
+        self.sensor_mode = sensor_mode
+        self.sensor_base_url = sensor_base_url
+        self.sensor_timeout_ms = int(sensor_timeout_ms)
+        self.sensor_prefetch = sensor_prefetch
+        self.fraud_opts = {
+            "mode": fraud_signals_mode,
+            "stub_path": fraud_signals_stub,
+            "sensor_base_url": sensor_base_url,
+            "sensor_timeout_ms": int(sensor_timeout_ms),
+            "device_high_thr": 0.80,
+            "tx_high_thr": 0.80,
+            "double_high_action": "REVIEW",
+            "sensor_prefetch": sensor_prefetch,
+        }
+
+        # Same precedence as the orchestrator: --no-brms > --brms-stub > --brms-url.
+        self.brms_stub_flags: Optional[Dict[str, Any]] = None
+        self.brms_url: Optional[str] = None
+        if not no_brms and brms_stub:
+            self.brms_stub_flags = json.loads(Path(brms_stub).read_text(encoding="utf-8"))
+            validate_required(self.brms_stub_flags, REQUIRED_BRMS_FLAGS_V0_1, where="decision_engine:brms_stub")
+        elif not no_brms:
+            self.brms_url = brms_url
+
+        # Resent request_ids replay the stored pack (see idempotency_store.py); the engine
+        # configuration is part of the inputs, like the orchestrator's flags.
+        self.idempotency = idempotency
+        self.idempotency_context = idempotency_store.decision_context(
+            sensor_mode=sensor_mode,
+            fraud_signals_mode=fraud_signals_mode,
+            no_brms=no_brms,
+            brms_stub=brms_stub,
+            brms_url=brms_url,
+            feature_store=feature_store,
+            manifest_hash=manifest.get("manifest_hash"),
+        )
+
+        # Micro-batching is per process (threads do not survive fork): see enable_micro_batching.
+        self.batchers: Dict[str, MicroBatcher] = {}
+
+        self.load_ms = int((time.time() - t0) * 1000)
+
+    def enable_micro_batching(self, *, max_batch: int = 32, max_wait_ms: float = 2.0) -> None:
+        """
+        Route T2/T3/T4 predictions through one MicroBatcher per model.
+        Only pays off with concurrent decide() calls (threaded service workers);
+        each batcher's target follows the requests about to score on that model (score_model).
+        """
+        for name, runner, agent in (("t2_default", runner_t2, self.t2), ("t3_fraud", runner_t3, self.t3), ("t4_payoff", runner_t4, self.t4)):
+            self.batchers[name] = MicroBatcher(
+                name,
+                lambda X, r=runner, a=agent: r.predict_batch(a, X),
+                max_batch=max_batch,
+                max_wait_ms=max_wait_ms,
+            )
+
+    def batcher_stats(self) -> Dict[str, Any]:
+        return {name: b.stats() for name, b in self.batchers.items()}
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "manifest_hash": self.manifest["manifest_hash"],
+            "load_ms": self.load_ms,
+            "t2_model_file": str(self.t2["model_path"]),
+            "t3_model_file": self.t3["model_file"],
+            "t4_model_file": str(self.t4["model_path"]),
+            "feature_store": self.feature_store,
+            "idempotency": self.idempotency.stats() if self.idempotency else None,
+        }
+
+    def intake(self, row: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+        overrides = {k: row.get(k) for k in INTAKE_OVERRIDE_KEYS}
+        return runner_workflow.build_intake(
+            self.wf_alias,
+            client_id=str(row["client_id"]),
+            request_id=request_id,
+            channel=str(row.get("channel") or "web"),
+            seed=int(row.get("seed", 42)),
+            **overrides,
+        )
+
+    def eligibility(self, intake: Dict[str, Any]) -> Dict[str, Any]:
+        return runner_eligibility.run_eligibility(
+            intake,
+            self.elig_alias,
+            sensor_mode=self.sensor_mode,
+            sensor_base_url=self.sensor_base_url,
+            sensor_timeout_ms=self.sensor_timeout_ms,
+            sensor_prefetch=self.sensor_prefetch,
+        )
+
+    def score_model(self, name: str, runner: Any, agent: Dict[str, Any], kw: Dict[str, Any]) -> Dict[str, Any]:
+        """runner.score(agent, **kw), through the model's batcher when micro-batching is on."""
+        batcher = self.batchers.get(name)
+        if batcher is None:
+            return runner.score(agent, **kw)
+        with batcher.incoming() as predict:
+            return runner.score(agent, predict=predict, **kw)
+
+    def originate(self, *, client_id: str, request_id: str, seed: int) -> Dict[str, Any]:
+        """ORIGINATE pack (T2/T3/T4 in process), as originate.py would print it."""
+        t0 = time.time()
+        kw = {"client_id": client_id, "request_id": request_id, "seed": seed, "feature_store": self.feature_store}
+        with tracing.span("t2_default"):
+            t2 = runner_t2.strict_payload(self.score_model("t2_default", runner_t2, self.t2, kw))
+        validate_required(t2, REQUIRED_T2_V0_1, where="decision_engine:t2_default")
+        with tracing.span("t3_fraud"):
+            t3 = self.score_model("t3_fraud", runner_t3, self.t3, kw)
+        validate_required(t3, REQUIRED_T3_V0_1, where="decision_engine:t3_fraud")
+        with tracing.span("t4_payoff"):
+            t4 = self.score_model("t4_payoff", runner_t4, self.t4, kw)
+        validate_required(t4, REQUIRED_T4_V0_1, where="decision_engine:t4_payoff")
+        with tracing.span("assemble_pack"):
+            pack = originate.assemble_pack(
+                client_id=client_id,
+                request_id=request_id,
+                seed=seed,
+                t2=t2,
+                t3=t3,
+                t4=t4,
+                manifest=self.manifest,
+                latency_ms=int((time.time() - t0) * 1000),
+                brms_flags=copy.deepcopy(self.brms_stub_flags),
+                brms_stub_used=self.brms_stub_flags is not None,
+                brms_url=self.brms_url,
+                fraud_signals=None,
+                fraud_opts=self.fraud_opts,
+            )
+        validate_required(pack["decisions"]["final_decision"], REQUIRED_FINAL_DECISION_V0_1, where="decision_engine:final_decision")
+        return pack
+
+    def idempotency_hash(self, row: Dict[str, Any]) -> str:
+        return idempotency_store.payload_hash({**decision_inputs(row), **self.idempotency_context})
+
+    def decide(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """One request row -> decision_pack_v0_1 (early cut or full chain)."""
+        return self.decide_idempotent(row)[0]
+
+    def decide_idempotent(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        (pack, replayed). With an idempotency store, a resent request_id with the same
+        inputs returns the stored pack (replayed=True); different inputs raise
+        IdempotencyConflict; a duplicate of an in-flight request waits for it or raises
+        IdempotencyPending. Rows without request_id are never cached.
+        """
+        with tracing.span("decide", attributes={"decision.request_id": row.get("request_id")}) as sp:
+            pack, replayed = self._decide_idempotent(row)
+            sp.set_attribute("decision.idempotent_replay", replayed)
+            sp.set_attribute("decision.final_outcome", (pack.get("decisions", {}).get("final_decision") or {}).get("final_outcome"))
+            return pack, replayed
+
+    def _decide_idempotent(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        if self.idempotency is None or not row.get("request_id"):
+            pack = self._decide(row)
+            metrics_registry.observe_pack(pack)
+            return pack, False
+        request_id = str(row["request_id"])
+        phash = self.idempotency_hash(row)
+        stored = self.idempotency.claim(request_id, phash)
+        if stored is not None:
+            metrics_registry.counter("decision_idempotent_replays_total", "Resent request_ids answered from the idempotency store").inc()
+            return copy.deepcopy(stored), True
+        try:
+            pack = self._decide(row)
+        except BaseException:
+            self.idempotency.release(request_id, phash)
+            raise
+        metrics_registry.observe_pack(pack)
+        self.idempotency.put(request_id, phash, pack)
+        return copy.deepcopy(pack), False
+
+    def _decide(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.time()
+        if not str(row.get("client_id", "")).strip():
+            raise ValueError("Request row requires client_id")
+        client_id = str(row["client_id"])
+        request_id = str(row.get("request_id") or uuid.uuid4())
+        with tracing.span("intake"):
+            intake = self.intake(row, request_id)
+        with tracing.span("eligibility"):
+            eligibility = self.eligibility(intake)
+
+        if str(eligibility.get("eligibility_status", "")).upper() in runner_workflow_eligibility.EARLY_CUT_STATUSES:
+            return runner_workflow_eligibility.early_cut_pack(
+                request_id=request_id,
+                client_id=client_id,
+                intake=intake,
+                eligibility=eligibility,
+                manifest=self.manifest,
+                t0=t0,
+            )
+        with tracing.span("originate"):
+            pack = self.originate(client_id=client_id, request_id=request_id, seed=int(row.get("seed", 42)))
+        pack["decisions"]["workflow_intake"] = intake
+        pack["decisions"]["eligibility"] = eligibility
+        return pack
+
+
+def add_engine_args(ap: argparse.ArgumentParser) -> None:
+    """Engine flags shared by the CLIs that host a DecisionEngine."""
+    ap.add_argument("--runtime-manifest", default=None, help="runtime_manifest_v0_1 file (built from the aliases when omitted)")
+    ap.add_argument("--alias-dir", default=None, help="Canonical alias directory when building the manifest")
+    ap.add_argument("--feature-store", default=None)
+    ap.add_argument("--sensor-mode", choices=["STUB", "LIVE"], default="STUB")
+    ap.add_argument("--sensor-base-url", default="http://127.0.0.1:9000")
+    ap.add_argument("--sensor-timeout-ms", type=int, default=1200)
+    ap.add_argument("--fraud-signals-mode", choices=["STUB", "LIVE"], default="STUB")
+    ap.add_argument("--sensor-prefetch-json", default=None)
+    ap.add_argument("--brms-url", default="http://localhost:8090/bridge/brms_flags")
+    ap.add_argument("--brms-stub", default=runner_workflow_eligibility.DEFAULT_BRMS_STUB)
+    ap.add_argument("--no-brms", action="store_true")
+    idempotency_store.add_idempotency_args(ap)
+    tracing.add_trace_args(ap)
+    cassette.add_cassette_args(ap)
+    sensor_hedge.add_hedge_args(ap)
+
+
+def engine_from_args(args: argparse.Namespace) -> DecisionEngine:
+    manifest = runtime_manifest.get_manifest(args.runtime_manifest, alias_dir=args.alias_dir)
+    return DecisionEngine(
+        manifest,
+        feature_store=args.feature_store,
+        sensor_mode=args.sensor_mode,
+        sensor_base_url=args.sensor_base_url,
+        sensor_timeout_ms=args.sensor_timeout_ms,
+        fraud_signals_mode=args.fraud_signals_mode,
+        sensor_prefetch=runner_eligibility.load_prefetch(args.sensor_prefetch_json),
+        brms_stub=args.brms_stub,
+        brms_url=args.brms_url,
+        no_brms=args.no_brms,
+        idempotency=idempotency_store.store_from_args(args),
+    )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="In-process decision engine (decision_pack_v0_1 per request row)")
+    add_engine_args(ap)
+    ap.add_argument("--requests-jsonl", required=True)
+    ap.add_argument("--max-rows", type=int, default=None)
+    ap.add_argument("--out-jsonl", default=None, help="Optional packs output (one per line)")
+    args = ap.parse_args()
+    tracing.configure("decision_engine", args.trace_out)
+    cassette.configure_from_args(args)
+    sensor_hedge.configure_from_args(args)
+
+    engine = engine_from_args(args)
+    rows = []
+    with open(args.requests_jsonl, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    if args.max_rows is not None:
+        rows = rows[: args.max_rows]
+
+    t0 = time.time()
+    outcomes: Dict[str, int] = {}
+    out_f = open(args.out_jsonl, "w", encoding="utf-8") if args.out_jsonl else None
+    try:
+        for row in rows:
+            pack = engine.decide(row)
+            outcome = pack["decisions"]["final_decision"]["final_outcome"]
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            if out_f:
+                out_f.write(json.dumps(pack) + "\n")
+    finally:
+        if out_f:
+            out_f.close()
+    wall_ms = int((time.time() - t0) * 1000)
+
+    print(json.dumps({
+        "engine": engine.describe(),
+        "rows": len(rows),
+        "final_outcome_counts": outcomes,
+        "wall_ms": wall_ms,
+        "throughput_rps": round(len(rows) / (wall_ms / 1000.0), 3) if wall_ms > 0 else None,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
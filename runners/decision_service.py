@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+"""
+Pre-fork decision service (stdlib HTTP).
+
+The parent builds one DecisionEngine (runtime manifest, T2/T3/T4 boosters, threshold
+indexes, feature store mmap), freezes the GC and forks N workers that accept on the
+same listening socket. Model pages stay shared copy-on-write; each worker only pays
+for what it dirties.
+
+  POST /decide   request row (eval_requests_v0_1 shape) -> decision_pack_v0_1
+                 (--idempotency / --idempotency-db: a resent request_id replays the stored
+                 pack with header Idempotent-Replay: true; other inputs -> 409 IDEMPOTENCY_CONFLICT;
+                 a duplicate still in flight after --idempotency-wait-s -> 409 IDEMPOTENCY_PENDING)
+  GET  /health   worker pid, requests served, manifest hash
+  GET  /memory   per-process unique (private) vs shared memory from /proc/<pid>/smaps_rollup
+  GET  /batcher  micro-batch histograms of the worker that answers (batch size, queue wait)
+  GET  /admission queue depth / shed counts for the pool + the answering worker's detail
+  GET  /metrics  Prometheus text: stage / sensor latency histograms, fallbacks, BRMS,
+                 model load, outcomes, admission + micro-batch, merged over all workers
+
+Workers are recycled (exit + respawn by the parent) after --max-requests requests
+(+ random jitter so they don't all restart together) or when their RSS exceeds
+--max-rss-mb. --no-preload loads the engine in every worker instead (baseline to
+compare the memory report against).
+
+--threads N serves up to N requests concurrently per worker; with --micro-batch-max-rows Y
+(and --micro-batch-max-wait-ms X) their T2/T3/T4 predictions are grouped into one predict
+per model (micro_batcher.py). Idle traffic is scored immediately; under load the batcher
+waits up to X ms for rows still being built for that model.
+
+Admission control (--max-concurrency N): at most N decisions run per worker, at most
+--admission-queue Q wait for a slot, each for at most its budget (--queue-budget-ms,
+or the X-Queue-Budget-Ms request header). A request that finds the queue full or runs
+out of budget is shed at once with a contract-valid pack: final_outcome REVIEW,
+final_reason_code CAPACITY_SHED_FAIL_OPEN (header X-Capacity-Shed: QUEUE_FULL|QUEUE_TIMEOUT).
+
+--async-engine runs the decisions on an asyncio loop per worker (decision_async.py): sensor
+and BRMS calls of all in-flight requests overlap on the loop and T2/T3/T4 score concurrently
+on --async-executor-workers threads; handler threads only wait for their result.
+
+Metrics (metrics_registry.py): every process records into its own registry and writes a
+snapshot to --metrics-dir (default: a temp dir) every --metrics-dump-interval-s and on
+exit; /metrics merges them, so counters survive worker recycling.
+
+Usage:
+  python3 runners/decision_service.py --runtime-manifest /tmp/runtime_manifest.json \
+      --port 8700 --workers 4 --max-requests 5000 --max-rss-mb 1024 \
+      --threads 8 --micro-batch-max-rows 32 --micro-batch-max-wait-ms 2
+  curl -s -XPOST localhost:8700/decide -d @row.json
+  curl -s localhost:8700/memory
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import mmap
+import os
+import random
+import shutil
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
+import cassette
+import decision_async
+import decision_engine
+import idempotency_store
+import metrics_registry
+import sensor_hedge
+import tracing
+from micro_batcher import QUEUE_WAIT_MS_BUCKETS
+
+SCHEMA_VERSION = "decision_service_memory_v0_1"
+
+EXIT_MAX_REQUESTS = 10
+EXIT_MAX_RSS = 11
+EXIT_REASONS = {EXIT_MAX_REQUESTS: "max_requests", EXIT_MAX_RSS: "max_rss"}
+
+SHED_QUEUE_FULL = "QUEUE_FULL"
+SHED_QUEUE_TIMEOUT = "QUEUE_TIMEOUT"
+SHED_SPARE_THREADS = 4  # handler threads beyond concurrency + queue: they only answer sheds
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+
+def _eprint(msg: str) -> None:
+    print(msg, file=sys.stderr, flush=True)
+
+
+class SlotTable:
+    """
+    Per-worker counters in an anonymous shared mapping (created before fork, so the
+    parent and every worker see the same pages): pid, requests, recycles, started_at_ms,
+    shed, queue_depth.
+    """
+
+    FIELDS = ("pid", "requests", "recycles", "started_at_ms", "shed", "queue_depth")
+    _SIZE = 8 * len(FIELDS)
+
+    def __init__(self, n_slots: int) -> None:
+        self.n_slots = n_slots
+        self._mm = mmap.mmap(-1, max(self._SIZE * n_slots, 1))
+
+    def get(self, slot: int) -> Dict[str, int]:
+        values = struct.unpack_from("q" * len(self.FIELDS), self._mm, slot * self._SIZE)
+        return dict(zip(self.FIELDS, values), slot=slot)
+
+    def set(self, slot: int, **kw: int) -> None:
+        # One 8-byte store per field: the parent and a worker never overwrite each other's fields.
+        for name, value in kw.items():
+            struct.pack_into("q", self._mm, slot * self._SIZE + 8 * self.FIELDS.index(name), int(value))
+
+    def rows(self) -> List[Dict[str, int]]:
+        return [self.get(i) for i in range(self.n_slots)]
+
+
+def read_smaps_rollup(pid: int) -> Optional[Dict[str, int]]:
+    """kB counters from /proc/<pid>/smaps_rollup (None when unavailable, e.g. non-Linux)."""
+    try:
+        text = Path(f"/proc/{pid}/smaps_rollup").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    out: Dict[str, int] = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].rstrip(":") in _SMAPS_FIELDS:
+            out[parts[0].rstrip(":")] = int(parts[1])
+    return out
+
+
+def process_memory(pid: int) -> Optional[Dict[str, int]]:
+    r = read_smaps_rollup(pid)
+    if r is None:
+        return None
+    return {
+        "rss_kb": r.get("Rss", 0),
+        "pss_kb": r.get("Pss", 0),
+        "unique_kb": r.get("Private_Clean", 0) + r.get("Private_Dirty", 0),
+        "shared_kb": r.get("Shared_Clean", 0) + r.get("Shared_Dirty", 0),
+    }
+
+
+def memory_report(parent_pid: int, table: SlotTable, preload: bool) -> Dict[str, Any]:
+    """
+    unique_kb: pages only this process maps (what each extra worker really costs).
+    shared_kb: pages mapped by other processes too (the copy-on-write model pages).
+    Sum of PSS is the honest total for the whole pool.
+    """
+    parent = process_memory(parent_pid)
+    workers = []
+    for row in table.rows():
+        if row["pid"] <= 0:
+            continue
+        mem = process_memory(row["pid"])
+        if mem is not None:
+            workers.append(dict(row, **mem))
+    if parent is None:
+        return {"schema_version": SCHEMA_VERSION, "status": "UNAVAILABLE", "detail": "/proc/<pid>/smaps_rollup not readable"}
+    procs = [parent] + workers
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "status": "OK",
+        "preload": preload,
+        "parent": dict(parent, pid=parent_pid),
+        "workers": workers,
+        "totals": {
+            "rss_kb": sum(p["rss_kb"] for p in procs),
+            "pss_kb": sum(p["pss_kb"] for p in procs),
+            "unique_kb": sum(p["unique_kb"] for p in procs),
+            "worker_unique_kb_avg": int(sum(w["unique_kb"] for w in workers) / len(workers)) if workers else 0,
+            "worker_shared_kb_avg": int(sum(w["shared_kb"] for w in workers) / len(workers)) if workers else 0,
+        },
+    }
+
+
+def _rss_mb() -> float:
+    mem = read_smaps_rollup(os.getpid())
+    if mem is not None:
+        return mem.get("Rss", 0) / 1024.0
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+class AdmissionController:
+    """
+    Bounded admission for one worker: max_concurrency decisions run, max_queue wait
+    (each up to its budget), anything else is shed immediately.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, budget_ms: float, on_change: Optional[Any] = None) -> None:
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self.budget_ms = float(budget_ms)
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = {SHED_QUEUE_FULL: 0, SHED_QUEUE_TIMEOUT: 0}
+        self._cond = threading.Condition()
+        self._on_change = on_change or (lambda ctl: None)
+        self._m_wait = metrics_registry.histogram("decision_admission_queue_wait_ms", "Wait for an admission slot (ms)", (), QUEUE_WAIT_MS_BUCKETS)
+        self._m_shed = metrics_registry.counter("decision_admission_shed_total", "Requests shed by admission control", ("reason",))
+        self._m_depth = metrics_registry.gauge("decision_admission_queue_depth", "Requests waiting for an admission slot")
+
+    def admit(self, budget_ms: Optional[float] = None) -> Optional[str]:
+        """None when admitted (call release() afterwards), else the shed reason."""
+        budget_s = (self.budget_ms if budget_ms is None else float(budget_ms)) / 1000.0
+        t0 = time.perf_counter()
+        with self._cond:
+            if self.running >= self.max_concurrency or self.waiting:
+                if self.waiting >= self.max_queue:
+                    return self._shed(SHED_QUEUE_FULL)
+                self.waiting += 1
+                self._changed()
+                deadline = t0 + budget_s
+                try:
+                    while self.running >= self.max_concurrency:
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0:
+                            return self._shed(SHED_QUEUE_TIMEOUT)
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+                    self._changed()
+            self.running += 1
+            self.admitted += 1
+        wait_ms = (time.perf_counter() - t0) * 1000.0
+        self._m_wait.observe(wait_ms)
+        return None
+
+    def _changed(self) -> None:
+        self._m_depth.set(self.waiting)
+        self._on_change(self)
+
+    def _shed(self, reason: str) -> str:
+        self.shed[reason] += 1
+        self._m_shed.inc(reason=reason)
+        self._changed()
+        return reason
+
+    def release(self) -> None:
+        with self._cond:
+            self.running -= 1
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            shed_total = sum(self.shed.values())
+            seen = self.admitted + shed_total
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "budget_ms": self.budget_ms,
+                "in_flight": self.running,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+                "shed_rate": round(shed_total / seen, 6) if seen else 0.0,
+                "queue_wait_ms": self._m_wait.histogram_series(),
+            }
+
+
+def admission_report(table: SlotTable, ctl: Optional[AdmissionController], slot: int) -> Dict[str, Any]:
+    rows = [r for r in table.rows() if r["pid"] > 0]
+    served = sum(r["requests"] for r in rows)
+    shed = sum(r["shed"] for r in rows)
+    return {
+        "enabled": ctl is not None,
+        "pool": {
+            "queue_depth": sum(r["queue_depth"] for r in rows),
+            "shed": shed,
+            "served": served,
+            # current worker generations only (counters restart when a worker is recycled)
+            "shed_rate": round(shed / (served + shed), 6) if served + shed else 0.0,
+            "workers": [{"slot": r["slot"], "pid": r["pid"], "queue_depth": r["queue_depth"], "shed": r["shed"]} for r in rows],
+        },
+        "worker": dict(ctl.stats(), slot=slot, pid=os.getpid()) if ctl is not None else None,
+    }
+
+
+class _SharedSocketServer(HTTPServer):
+    """HTTPServer on an already-listening socket inherited from the parent."""
+
+    def __init__(self, sock: socket.socket, handler: type, gate: Optional[threading.BoundedSemaphore] = None) -> None:
+        super().__init__(sock.getsockname()[:2], handler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = sock
+        # gate: one permit per handler thread (--threads > 1); None = serve inline.
+        self.gate = gate
+        self.accepted = False
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.accepted = True
+        if self.gate is None:
+            super().process_request(request, client_address)
+            return
+        threading.Thread(target=self._process_threaded, args=(request, client_address), daemon=True).start()
+
+    def _process_threaded(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.gate.release()
+
+    def get_request(self) -> Any:
+        # Listening socket is non-blocking (workers race for each connection); the
+        # accepted connection is served in blocking mode with the handler timeout.
+        conn, addr = self.socket.accept()
+        conn.setblocking(True)
+        return conn, addr
+
+    def server_close(self) -> None:
+        # The listening socket belongs to the pool, not to this worker.
+        pass
+
+
+def make_handler(worker: "Worker") -> type:
+    class DecisionHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"  # one request per connection: a busy worker never pins a client
+        server_version = "DecisionService/0.1"
+        timeout = 30  # a stalled client cannot pin a worker (or a handler thread) forever
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            pass
+
+        def send_json(self, status: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> None:
+            self.sent_status = status
+            body = json.dumps(obj).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+            path = self.path.split("?", 1)[0]
+            if path == "/health":
+                self.send_json(200, worker.health())
+            elif path == "/memory":
+                self.send_json(200, memory_report(worker.parent_pid, worker.table, worker.preload))
+            elif path == "/batcher":
+                self.send_json(200, worker.batcher_report())
+            elif path == "/admission":
+                self.send_json(200, admission_report(worker.table, worker.admission, worker.slot))
+            elif path == "/metrics":
+                body = worker.metrics_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_json(404, {"detail": f"unknown path {path}"})
+
+        def do_POST(self) -> None:  # noqa: N802
+            path = self.path.split("?", 1)[0]
+            # Server span, child of the caller's traceparent header when it sent one.
+            with tracing.span(f"POST {path}", kind="SERVER", traceparent=self.headers.get(tracing.TRACEPARENT_HEADER),
+                              attributes={"http.method": "POST", "url.path": path, "worker.slot": worker.slot}) as sp:
+                self.sent_status = 0
+                self.post(path, sp)
+                sp.set_attribute("http.response.status_code", self.sent_status)
+
+        def post(self, path: str, sp: Any) -> None:
+            if path != "/decide":
+                self.send_json(404, {"detail": f"unknown path {path}"})
+                return
+            try:
+                n = int(self.headers.get("Content-Length") or 0)
+                row = json.loads(self.rfile.read(n).decode("utf-8")) if n > 0 else None
+                if not isinstance(row, dict):
+                    raise ValueError("Expected a JSON object request row")
+            except ValueError as e:
+                self.send_json(400, {"detail": str(e)})
+                return
+            ctl = worker.admission
+            if ctl is not None:
+                t_queue = time.perf_counter()
+                try:
+                    budget = self.headers.get("X-Queue-Budget-Ms")
+                    shed = ctl.admit(float(budget) if budget else None)
+                except ValueError:
+                    shed = ctl.admit()
+                if shed is not None:
+                    queued_ms = int((time.perf_counter() - t_queue) * 1000)
+                    pack = decision_engine.capacity_shed_pack(row, shed, worker.engine.manifest, queued_ms)
+                    metrics_registry.observe_pack(pack)
+                    sp.set_attribute("decision.capacity_shed", shed)
+                    self.send_json(200, pack, {"X-Capacity-Shed": shed})
+                    return
+            try:
+                pack, replayed = worker.decide_idempotent(row)
+            except idempotency_store.IdempotencyConflict as e:
+                self.send_json(409, {"detail": str(e), "code": e.code})
+                return
+            except idempotency_store.IdempotencyPending as e:
+                self.send_json(409, {"detail": str(e), "code": e.code}, {"Retry-After": "1"})
+                return
+            except (ValueError, KeyError) as e:
+                self.send_json(400, {"detail": str(e)})
+                return
+            except Exception as e:
+                self.send_json(500, {"detail": f"{type(e).__name__}: {e}"})
+                return
+            finally:
+                if ctl is not None:
+                    ctl.release()
+                worker.count_served()
+            self.send_json(200, pack, {"Idempotent-Replay": "true"} if replayed else None)
+
+    return DecisionHandler
+
+
+class Worker:
+    def __init__(self, slot: int, table: SlotTable, engine: Optional[decision_engine.DecisionEngine], args: argparse.Namespace) -> None:
+        self.slot = slot
+        self.table = table
+        self.parent_pid = os.getppid()
+        self.metrics_dir = args.metrics_dir
+        tracing.configure("decision_service", args.trace_out)
+        # Inherited parent counts (preload model load) stay in the parent's own snapshot.
+        metrics_registry.REGISTRY.reset()
+        metrics_registry.enable_dump_dir(self.metrics_dir, interval_s=args.metrics_dump_interval_s or None)
+        self.preload = engine is not None
+        self.engine = engine if engine is not None else decision_engine.engine_from_args(args)
+        self.served = 0
+        self._served_lock = threading.Lock()
+        self.stop = False
+        self.threads = max(int(args.threads), 1)
+        self.admission: Optional[AdmissionController] = None
+        if args.max_concurrency:
+            self.admission = AdmissionController(
+                args.max_concurrency,
+                args.admission_queue,
+                args.queue_budget_ms,
+                on_change=lambda ctl: self.table.set(self.slot, queue_depth=ctl.waiting, shed=sum(ctl.shed.values())),
+            )
+            # Enough handler threads to hold the queue and still answer sheds at once.
+            self.threads = max(self.threads, args.max_concurrency + args.admission_queue + SHED_SPARE_THREADS)
+        if args.micro_batch_max_rows:
+            # Collector threads are started here, after fork (threads do not survive it).
+            self.engine.enable_micro_batching(max_batch=args.micro_batch_max_rows, max_wait_ms=args.micro_batch_max_wait_ms)
+        self.async_engine: Optional[decision_async.AsyncDecisionEngine] = None
+        if args.async_engine:
+            self.async_engine = decision_async.AsyncDecisionEngine(self.engine, executor_workers=args.async_executor_workers)
+            self.async_engine.start()
+        jitter = random.randint(0, max(int(args.max_requests_jitter), 0)) if args.max_requests else 0
+        self.max_requests = int(args.max_requests) + jitter if args.max_requests else 0
+        self.max_rss_mb = float(args.max_rss_mb or 0)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "slot": self.slot,
+            "requests_served": self.served,
+            "max_requests": self.max_requests,
+            "preload": self.preload,
+            "threads": self.threads,
+            "micro_batch": bool(self.engine.batchers),
+            "async_engine": self.async_engine is not None,
+            "idempotency": self.engine.idempotency.stats() if self.engine.idempotency else None,
+            "admission": self.admission.stats() if self.admission else None,
+            "manifest_hash": self.engine.manifest["manifest_hash"],
+        }
+
+    def decide_idempotent(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        if self.async_engine is not None:
+            return self.async_engine.decide_idempotent_threadsafe(row)
+        return self.engine.decide_idempotent(row)
+
+    def batcher_report(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "slot": self.slot, "enabled": bool(self.engine.batchers), "batchers": self.engine.batcher_stats()}
+
+    def metrics_text(self) -> str:
+        metrics_registry.dump_snapshot(self.metrics_dir)
+        live = [r["pid"] for r in self.table.rows() if r["pid"] > 0] + [self.parent_pid]
+        return metrics_registry.render(metrics_registry.merge_snapshots(metrics_registry.load_snapshots(self.metrics_dir), live))
+
+    def count_served(self) -> None:
+        with self._served_lock:
+            self.served += 1
+            self.table.set(self.slot, requests=self.served)
+
+    def recycle_code(self) -> int:
+        if self.max_requests and self.served >= self.max_requests:
+            return EXIT_MAX_REQUESTS
+        if self.max_rss_mb and _rss_mb() > self.max_rss_mb:
+            return EXIT_MAX_RSS
+        return 0
+
+    def run(self, sock: socket.socket) -> int:
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "stop", True))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        self.table.set(self.slot, pid=os.getpid(), requests=0, shed=0, queue_depth=0)
+        gate = threading.BoundedSemaphore(self.threads) if self.threads > 1 else None
+        server = _SharedSocketServer(sock, make_handler(self), gate)
+        server.timeout = 0.5
+        code = 0
+        while not self.stop:
+            if gate is not None:
+                gate.acquire()  # a free handler thread before taking another connection
+            server.accepted = False
+            server.handle_request()
+            if not server.accepted:
+                if gate is not None:
+                    gate.release()
+                if os.getppid() != self.parent_pid:
+                    break  # parent gone
+                continue
+            code = self.recycle_code()
+            if code:
+                break
+        if gate is not None:
+            for _ in range(self.threads):
+                gate.acquire()  # let in-flight requests finish before exiting
+        if self.async_engine is not None:
+            self.async_engine.close()
+        metrics_registry.dump_snapshot(self.metrics_dir)  # os._exit skips atexit
+        return code
+
+
+class Pool:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.table = SlotTable(args.workers)
+        self.engine: Optional[decision_engine.DecisionEngine] = None
+        self.children: Dict[int, int] = {}  # pid -> slot
+        self.shutting_down = False
+        self.own_metrics_dir = not args.metrics_dir
+        if self.own_metrics_dir:
+            args.metrics_dir = tempfile.mkdtemp(prefix="decision_metrics_")
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((args.host, args.port))
+        self.sock.listen(args.backlog)
+
+    def spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                self.sock.setblocking(False)
+                code = Worker(slot, self.table, self.engine, self.args).run(self.sock)
+            except Exception as e:
+                _eprint(f"[DECISION_SERVICE] worker slot={slot} crashed: {type(e).__name__}: {e}")
+            finally:
+                os._exit(code)
+        self.children[pid] = slot
+        self.table.set(slot, pid=pid, requests=0, started_at_ms=int(time.time() * 1000))
+
+    def stop(self, *_: Any) -> None:
+        self.shutting_down = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        a = self.args
+        if not a.no_preload:
+            self.engine = decision_engine.engine_from_args(a)
+            # Move everything allocated so far out of the collector's reach: GC passes in
+            # the workers would otherwise touch (and un-share) every tracked object.
+            gc.collect()
+            gc.freeze()
+        metrics_registry.dump_snapshot(a.metrics_dir)
+        desc = self.engine.describe() if self.engine else {"load_ms": None}
+        print(
+            f"[DECISION_SERVICE] listening on http://{a.host}:{self.sock.getsockname()[1]} "
+            f"workers={a.workers} preload={not a.no_preload} load_ms={desc['load_ms']} "
+            f"max_requests={a.max_requests} max_rss_mb={a.max_rss_mb} threads={a.threads} "
+            f"micro_batch_max_rows={a.micro_batch_max_rows}",
+            flush=True,
+        )
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for slot in range(a.workers):
+            self.spawn(slot)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            slot = self.children.pop(pid, None)
+            if slot is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self.shutting_down:
+                continue
+            reason = EXIT_REASONS.get(code, f"exit_{code}")
+            row = self.table.get(slot)
+            self.table.set(slot, pid=0, recycles=row["recycles"] + 1)
+            _eprint(f"[DECISION_SERVICE] worker slot={slot} pid={pid} recycled ({reason}) after {row['requests']} requests")
+            self.spawn(slot)
+        self.sock.close()
+        if self.own_metrics_dir:
+            shutil.rmtree(a.metrics_dir, ignore_errors=True)
+        return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Pre-fork decision service (shared copy-on-write models)")
+    decision_engine.add_engine_args(ap)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8700)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--backlog", type=int, default=128)
+    ap.add_argument("--max-requests", type=int, default=0, help="Recycle a worker after N requests (0 = never)")
+    ap.add_argument("--max-requests-jitter", type=int, default=0, help="Random extra requests per worker generation")
+    ap.add_argument("--max-rss-mb", type=float, default=0, help="Recycle a worker whose RSS exceeds this (0 = off)")
+    ap.add_argument("--no-preload", action="store_true", help="Load the engine in each worker (no sharing; baseline)")
+    ap.add_argument("--threads", type=int, default=1, help="Concurrent requests per worker (handler threads)")
+    ap.add_argument("--max-concurrency", type=int, default=0, help="Admission control: decisions running per worker (0 = off)")
+    ap.add_argument("--admission-queue", type=int, default=16, help="Requests allowed to wait for a slot per worker")
+    ap.add_argument("--queue-budget-ms", type=float, default=250.0, help="Longest wait for a slot before shedding (header X-Queue-Budget-Ms overrides)")
+    ap.add_argument("--micro-batch-max-rows", type=int, default=0, help="Micro-batch T2/T3/T4 predictions up to Y rows (0 = off)")
+    ap.add_argument("--micro-batch-max-wait-ms", type=float, default=2.0, help="Longest a row waits for its batch to fill (X ms)")
+    ap.add_argument("--async-engine", action="store_true", help="Decide on an asyncio loop per worker (decision_async.py)")
+    ap.add_argument("--async-executor-workers", type=int, default=4, help="With --async-engine: scoring threads per worker")
+    ap.add_argument("--metrics-dir", default=None, help="Per-process metrics snapshots (default: temp dir removed on exit)")
+    ap.add_argument("--metrics-dump-interval-s", type=float, default=5.0, help="Snapshot period per worker: how far /metrics may lag the other workers (0 = on exit only)")
+    args = ap.parse_args()
+    if args.workers < 1:
+        raise ValueError("--workers must be >= 1")
+    cassette.configure_from_args(args)  # exported: workers record / replay into the same file
+    sensor_hedge.configure_from_args(args)  # each worker hedges on its own latency window + budget
+    return Pool(args).run()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Columnar Eligibility evaluator (bulk pre-screening).
+
+Same rules and parameters as `runner_eligibility.evaluate_rules`, applied to whole
+columns at once:
+  - is_existing_customer / customer_id  -> EA_KYC_NOT_EXISTING_CUSTOMER (reject)
+  - age < MIN_AGE                       -> EA_AGE_UNDER_MIN (reject)
+  - income_monthly < MIN_INCOME         -> EA_INCOME_BELOW_MIN (reject)
+  - dyn_bureau_employment_verified      -> EA_BUREAU_EMPLOYMENT_UNVERIFIED (review)
+  - dyn_market_stress_score_7d > THR    -> EA_MACRO_STRESS_REVIEW (review)
+
+Columns may be lists, numpy arrays or DataFrame-like objects (anything indexable
+by column name). numpy is used when installed; otherwise a pure-Python path with
+identical results is used.
+
+CLI (screen a request dataset and optionally check parity with the scalar rules):
+  python3 runners/eligibility_columnar.py \
+      --requests-jsonl testing/requests/eval_requests_edge_v0_1.jsonl \
+      --canonical-alias block_a_gov/artifacts/eligibility_canonical.json --check-parity
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
+import runner_eligibility
+import runner_workflow
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+COLUMNS = (
+    "is_existing_customer",
+    "customer_id",
+    "age",
+    "income_monthly",
+    "dyn_bureau_employment_verified",
+    "dyn_market_stress_score_7d",
+)
+
+# Reason bits (order within each group matches evaluate_rules)
+BIT_KYC = 1
+BIT_AGE = 2
+BIT_INCOME = 4
+BIT_BUREAU = 8
+BIT_MACRO = 16
+REJECT_MASK = BIT_KYC | BIT_AGE | BIT_INCOME
+REJECT_REASONS = (
+    (BIT_KYC, "EA_KYC_NOT_EXISTING_CUSTOMER"),
+    (BIT_AGE, "EA_AGE_UNDER_MIN"),
+    (BIT_INCOME, "EA_INCOME_BELOW_MIN"),
+)
+REVIEW_REASONS = (
+    (BIT_BUREAU, "EA_BUREAU_EMPLOYMENT_UNVERIFIED"),
+    (BIT_MACRO, "EA_MACRO_STRESS_REVIEW"),
+)
+
+STATUS_APPROVED = 0
+STATUS_REVIEW_REQUIRED = 1
+STATUS_REJECTED = 2
+STATUS_NAMES = ("APPROVED", "REVIEW_REQUIRED", "REJECTED")
+
+
+def _decode(mask: int) -> Tuple[int, Tuple[str, ...]]:
+    if mask & REJECT_MASK:
+        return STATUS_REJECTED, tuple(name for bit, name in REJECT_REASONS if mask & bit)
+    if mask:
+        return STATUS_REVIEW_REQUIRED, tuple(name for bit, name in REVIEW_REASONS if mask & bit)
+    return STATUS_APPROVED, ()
+
+
+# All 32 masks decode to a fixed (status, reasons) pair: build the lookup once.
+_DECODE_LUT = [_decode(m) for m in range(32)]
+
+
+def _params(alias: Dict[str, Any]) -> Tuple[int, float, float]:
+    params = alias.get("parameters", {})
+    return (
+        int(params.get("MIN_AGE", 18)),
+        float(params.get("MIN_INCOME", 1200)),
+        float(params.get("MACRO_STRESS_REVIEW_THR", 0.85)),
+    )
+
+
+def _column(columns: Mapping[str, Any], name: str, n: int, default: Any) -> Sequence[Any]:
+    try:
+        col = columns[name]
+    except (KeyError, IndexError):
+        return [default] * n
+    return col if col is not None else [default] * n
+
+
+def _existing_ok(is_existing: Any, customer_id: Any) -> bool:
+    # Mirrors runner_eligibility._existing_customer_ok
+    if isinstance(is_existing, bool):
+        return is_existing
+    return bool(str(customer_id or "").strip())
+
+
+def _num_rows(columns: Mapping[str, Any]) -> int:
+    for name in ("age", "income_monthly", "dyn_market_stress_score_7d", "is_existing_customer"):
+        try:
+            return len(columns[name])
+        except (KeyError, IndexError, TypeError):
+            continue
+    raise ValueError("columns must include at least one of age/income_monthly/dyn_market_stress_score_7d/is_existing_customer")
+
+
+def _masks_python(columns: Mapping[str, Any], alias: Dict[str, Any]) -> List[int]:
+    min_age, min_income, macro_thr = _params(alias)
+    n = _num_rows(columns)
+    is_existing = _column(columns, "is_existing_customer", n, None)
+    customer_id = _column(columns, "customer_id", n, "")
+    age = _column(columns, "age", n, 0)
+    income = _column(columns, "income_monthly", n, 0.0)
+    bureau = _column(columns, "dyn_bureau_employment_verified", n, None)
+    macro = _column(columns, "dyn_market_stress_score_7d", n, 0.0)
+
+    out: List[int] = []
+    for i in range(n):
+        m = 0
+        if not _existing_ok(is_existing[i], customer_id[i]):
+            m |= BIT_KYC
+        if int(age[i]) < min_age:
+            m |= BIT_AGE
+        if float(income[i]) < min_income:
+            m |= BIT_INCOME
+        if not bool(bureau[i]):
+            m |= BIT_BUREAU
+        if float(macro[i]) > macro_thr:
+            m |= BIT_MACRO
+        out.append(m)
+    return out
+
+
+def _masks_numpy(columns: Mapping[str, Any], alias: Dict[str, Any]):
+    min_age, min_income, macro_thr = _params(alias)
+    n = _num_rows(columns)
+
+    is_existing = np.asarray(_column(columns, "is_existing_customer", n, None))
+    if is_existing.dtype.kind == "b":
+        existing_ok = is_existing
+    else:
+        customer_id = _column(columns, "customer_id", n, "")
+        existing_ok = np.fromiter((_existing_ok(e, c) for e, c in zip(is_existing.tolist(), customer_id)), dtype=bool, count=n)
+
+    bureau = np.asarray(_column(columns, "dyn_bureau_employment_verified", n, None))
+    verified = bureau if bureau.dtype.kind == "b" else np.fromiter((bool(x) for x in bureau.tolist()), dtype=bool, count=n)
+
+    # int() truncates toward zero: np.trunc keeps the same comparison semantics for floats.
+    age = np.trunc(np.asarray(_column(columns, "age", n, 0), dtype=np.float64))
+    income = np.asarray(_column(columns, "income_monthly", n, 0.0), dtype=np.float64)
+    macro = np.asarray(_column(columns, "dyn_market_stress_score_7d", n, 0.0), dtype=np.float64)
+
+    mask = np.zeros(n, dtype=np.uint8)
+    mask |= np.where(existing_ok, 0, BIT_KYC).astype(np.uint8)
+    mask |= np.where(age < min_age, BIT_AGE, 0).astype(np.uint8)
+    mask |= np.where(income < min_income, BIT_INCOME, 0).astype(np.uint8)
+    mask |= np.where(verified, 0, BIT_BUREAU).astype(np.uint8)
+    mask |= np.where(macro > macro_thr, BIT_MACRO, 0).astype(np.uint8)
+    return mask
+
+
+def evaluate_rules_mask(columns: Mapping[str, Any], alias: Dict[str, Any]) -> Tuple[Any, Any]:
+    """
+    Fully columnar form: returns (status_code, reason_mask).
+    status_code uses STATUS_* (index into STATUS_NAMES); reason_mask uses BIT_*.
+    numpy arrays when numpy is installed, lists otherwise.
+    """
+    if np is not None:
+        mask = _masks_numpy(columns, alias)
+        status = np.where(
+            (mask & REJECT_MASK) != 0,
+            STATUS_REJECTED,
+            np.where(mask != 0, STATUS_REVIEW_REQUIRED, STATUS_APPROVED),
+        ).astype(np.uint8)
+        return status, mask
+    mask = _masks_python(columns, alias)
+    return [_DECODE_LUT[m][0] for m in mask], mask
+
+
+def evaluate_rules_columnar(columns: Mapping[str, Any], alias: Dict[str, Any]) -> Tuple[List[str], List[List[str]]]:
+    """
+    Column-wise equivalent of runner_eligibility.evaluate_rules:
+    returns (eligibility_status per row, eligibility_reasons per row).
+    """
+    _status, mask = evaluate_rules_mask(columns, alias)
+    codes = mask.tolist() if np is not None else mask
+    statuses = [STATUS_NAMES[_DECODE_LUT[m][0]] for m in codes]
+    reasons = [list(_DECODE_LUT[m][1]) for m in codes]
+    return statuses, reasons
+
+
+def columns_from_intakes(intakes: Iterable[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Project application_intake_v0_1 payloads onto the evaluator columns."""
+    cols: Dict[str, List[Any]] = {k: [] for k in COLUMNS}
+    for intake in intakes:
+        a = intake.get("applicant", {}) or {}
+        ds = intake.get("dynamic_sensors_for_eligibility", {}) or {}
+        cols["is_existing_customer"].append(a.get("is_existing_customer"))
+        cols["customer_id"].append(a.get("customer_id"))
+        cols["age"].append(a.get("age", 0))
+        cols["income_monthly"].append(a.get("income_monthly", 0.0))
+        cols["dyn_bureau_employment_verified"].append(ds.get("dyn_bureau_employment_verified"))
+        cols["dyn_market_stress_score_7d"].append(ds.get("dyn_market_stress_score_7d", 0.0))
+    return cols
+
+
+def intake_from_request_row(alias: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
+    """eval_requests_v0_1 row -> application_intake_v0_1 (same overrides as the batch driver)."""
+    return runner_workflow.build_intake(
+        alias,
+        client_id=str(row["client_id"]),
+        request_id=str(row["request_id"]),
+        channel=str(row.get("channel", "web")),
+        seed=int(row["seed"]),
+        as_of_ts=row.get("as_of_ts"),
+        age=row.get("age"),
+        employment_status=row.get("employment_status"),
+        declared_income_monthly=row.get("declared_income_monthly"),
+        is_existing_customer=row.get("is_existing_customer"),
+        declared_dti=row.get("declared_dti"),
+        declared_credit_score=row.get("declared_credit_score"),
+        requested_amount=row.get("requested_amount"),
+        term_months=row.get("term_months"),
+        product_type=row.get("product_type"),
+    )
+
+
+def _load_jsonl(path: str) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Columnar Eligibility evaluator (bulk pre-screening)")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--requests-jsonl", default=None, help="eval_requests_v0_1 rows (intakes are built in process)")
+    src.add_argument("--intakes-jsonl", default=None, help="application_intake_v0_1 payloads, one per line")
+    ap.add_argument("--canonical-alias", default=runner_eligibility.DEFAULT_CANONICAL_ALIAS)
+    ap.add_argument("--sensor-prefetch-json", default=None, help="sensor_prefetch_v0_1 (runners/sensor_bulk.py): apply LIVE wE/wF before screening")
+    ap.add_argument("--sensor-base-url", default="http://127.0.0.1:9000", help="Per-row fetch for rows missing from the prefetch")
+    ap.add_argument("--sensor-timeout-ms", type=int, default=1200)
+    ap.add_argument("--out", default=None, help="Optional JSONL output (request_id, eligibility_status, eligibility_reasons)")
+    ap.add_argument("--check-parity", action="store_true", help="Compare every row with the scalar evaluate_rules; exit 3 on mismatch")
+    args = ap.parse_args()
+
+    alias = runner_eligibility.load_json(args.canonical_alias)
+    if args.requests_jsonl:
+        intakes = [intake_from_request_row(alias, r) for r in _load_jsonl(args.requests_jsonl)]
+    else:
+        intakes = _load_jsonl(args.intakes_jsonl)
+
+    prefetch = runner_eligibility.load_prefetch(args.sensor_prefetch_json)
+    if prefetch is not None:
+        # Same per-row semantics as the LIVE runner: prefetched -> used, failed -> fallback, absent -> GET.
+        sensor_modes: Dict[str, int] = {}
+        for i, intake in enumerate(intakes):
+            ds, mode_used = runner_eligibility.resolve_dynamic_sensors(
+                intake=intake,
+                alias=alias,
+                sensor_mode="LIVE",
+                sensor_base_url=args.sensor_base_url,
+                sensor_timeout_ms=args.sensor_timeout_ms,
+                sensor_prefetch=prefetch,
+            )
+            intakes[i] = dict(intake, dynamic_sensors_for_eligibility=ds)
+            sensor_modes[mode_used] = sensor_modes.get(mode_used, 0) + 1
+
+    cols = columns_from_intakes(intakes)
+    t0 = time.perf_counter()
+    statuses, reasons = evaluate_rules_columnar(cols, alias)
+    elapsed_s = time.perf_counter() - t0
+
+    mismatches = []
+    if args.check_parity:
+        for i, intake in enumerate(intakes):
+            exp_status, exp_reasons = runner_eligibility.evaluate_rules(intake, alias)
+            if (exp_status, exp_reasons) != (statuses[i], reasons[i]):
+                mismatches.append({
+                    "row_index": i,
+                    "request_id": intake.get("meta_request_id"),
+                    "scalar": [exp_status, exp_reasons],
+                    "columnar": [statuses[i], reasons[i]],
+                })
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for intake, st, rs in zip(intakes, statuses, reasons):
+                f.write(json.dumps({"request_id": intake.get("meta_request_id"), "eligibility_status": st, "eligibility_reasons": rs}) + "\n")
+
+    counts: Dict[str, int] = {}
+    for st in statuses:
+        counts[st] = counts.get(st, 0) + 1
+    summary = {
+        "schema_version": "eligibility_columnar_run_v0_1",
+        "backend": "numpy" if np is not None else "python",
+        "rows": len(intakes),
+        "eligibility_status_counts": counts,
+        "elapsed_ms": round(elapsed_s * 1000.0, 3),
+        "rows_per_sec": round(len(intakes) / elapsed_s, 1) if elapsed_s > 0 else None,
+    }
+    if prefetch is not None:
+        summary["sensor_mode_counts"] = sensor_modes
+    if args.check_parity:
+        summary["parity_mismatches"] = len(mismatches)
+        summary["parity_mismatch_examples"] = mismatches[:5]
+    print(json.dumps(summary, indent=2))
+    return 3 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Local feature store (memory-mapped, columnar float32, keyed by client_id).
+
+Replaces the seeded `rng.normal` PoC vectors in T2/T3/T4 once real features exist,
+without a database round trip per model per request.
+
+File layout (single file, little-endian):
+  [0:8]    magic b"CDEFS001"
+  [8:12]   uint32 header length
+  [12:..]  header JSON (feature_store_v0_1: n_rows, n_features, feature_names, key_width, offsets)
+  keys     n_rows x key_width bytes, sorted (null-padded UTF-8 client_id)   -> np.searchsorted index
+  matrix   n_rows x n_features float32, row-major                          -> one row is one contiguous slice
+Sections start on 64-byte boundaries.
+
+Gathering:
+  - one row, store column order == model order -> zero-copy view into the mmap
+  - N rows (or reordered columns) -> one fancy-index gather into a fresh float32 array
+  - model features absent from the store are NaN (XGBoost "missing")
+  - client_ids absent from the store are reported as misses (runners fall back to the PoC row)
+
+CLI:
+  python3 runners/feature_store.py build --csv features.csv --key-column client_id \
+      [--feature-list-file t4_feature_list.json] --out features.fstore
+  python3 runners/feature_store.py info --store features.fstore
+  python3 runners/feature_store.py get --store features.fstore --client-id 100001 [--feature-list-file ...]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import struct
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SCHEMA_VERSION = "feature_store_v0_1"
+MAGIC = b"CDEFS001"
+ALIGN = 64
+
+_OPEN_STORES: Dict[str, "FeatureStore"] = {}
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def load_feature_list(path: str) -> List[str]:
+    """Same formats as runner_t4.load_feature_names: list or {"features": [...]}."""
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(payload, list):
+        return [str(x) for x in payload]
+    if isinstance(payload, dict) and isinstance(payload.get("features"), list):
+        return [str(x) for x in payload["features"]]
+    raise ValueError("Unsupported feature list format (expected list or {'features':[...]}).")
+
+
+def write_store(
+    path: str,
+    client_ids: Sequence[Any],
+    matrix: Any,
+    feature_names: Sequence[str],
+    *,
+    source: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Write a store file; rows are sorted by client_id. Duplicate client_ids are rejected."""
+    X = np.asarray(matrix, dtype=np.float32)
+    keys = [str(c).strip().encode("utf-8") for c in client_ids]
+    if X.ndim != 2 or X.shape[0] != len(keys) or X.shape[1] != len(feature_names):
+        raise ValueError(f"matrix shape {X.shape} does not match {len(keys)} keys x {len(feature_names)} features")
+    if len(set(keys)) != len(keys):
+        raise ValueError("Duplicate client_id in feature rows")
+    if any((not k) or k.endswith(b"\x00") for k in keys):
+        raise ValueError("client_id must be non-empty and must not end with NUL")
+
+    key_width = max([len(k) for k in keys] or [1])
+    key_arr = np.array(keys, dtype=f"S{key_width}")
+    order = np.argsort(key_arr, kind="stable")
+    key_arr = key_arr[order]
+    X = np.ascontiguousarray(X[order])
+
+    header: Dict[str, Any] = {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": utc_now_iso(),
+        "source": source,
+        "n_rows": int(X.shape[0]),
+        "n_features": int(X.shape[1]),
+        "feature_names": [str(f) for f in feature_names],
+        "key_width": int(key_width),
+        "dtype": "float32",
+        "keys_offset": 0,
+        "matrix_offset": 0,
+    }
+    # Offsets depend on the header size, which depends on the offsets' digits: settle in two passes.
+    for _ in range(2):
+        hdr = json.dumps(header).encode("utf-8")
+        keys_offset = _align(len(MAGIC) + 4 + len(hdr))
+        matrix_offset = _align(keys_offset + key_arr.nbytes)
+        header["keys_offset"] = keys_offset
+        header["matrix_offset"] = matrix_offset
+    hdr = json.dumps(header).encode("utf-8")
+    if _align(len(MAGIC) + 4 + len(hdr)) != header["keys_offset"]:
+        raise RuntimeError("feature store header layout did not settle")
+
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(hdr)))
+        f.write(hdr)
+        f.write(b"\x00" * (header["keys_offset"] - f.tell()))
+        f.write(key_arr.tobytes())
+        f.write(b"\x00" * (header["matrix_offset"] - f.tell()))
+        f.write(X.astype("<f4", copy=False).tobytes())
+    tmp.replace(p)
+    return header
+
+
+class FeatureStore:
+    """Read-only view over a feature store file (keys + matrix are np.memmap)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a feature store file: {path}")
+            (hdr_len,) = struct.unpack("<I", f.read(4))
+            self.header: Dict[str, Any] = json.loads(f.read(hdr_len).decode("utf-8"))
+        if self.header.get("schema_version") != SCHEMA_VERSION:
+            raise ValueError(f"Expected schema_version={SCHEMA_VERSION} in {path}")
+
+        self.n_rows = int(self.header["n_rows"])
+        self.n_features = int(self.header["n_features"])
+        self.key_width = int(self.header["key_width"])
+        self.feature_names: List[str] = list(self.header["feature_names"])
+        self._feature_pos = {name: i for i, name in enumerate(self.feature_names)}
+        self._col_cache: Dict[Tuple[str, ...], Optional[np.ndarray]] = {}
+        self._last_cols: Tuple[Any, Optional[np.ndarray]] = (None, None)
+
+        if self.n_rows:
+            self.keys = np.memmap(self.path, dtype=f"S{self.key_width}", mode="r", offset=int(self.header["keys_offset"]), shape=(self.n_rows,))
+            self.matrix = np.memmap(self.path, dtype="<f4", mode="r", offset=int(self.header["matrix_offset"]), shape=(self.n_rows, self.n_features))
+        else:
+            self.keys = np.empty((0,), dtype=f"S{self.key_width}")
+            self.matrix = np.empty((0, self.n_features), dtype=np.float32)
+
+    def lookup(self, client_ids: Iterable[Any]) -> np.ndarray:
+        """Row index per client_id (-1 when absent)."""
+        raw = [str(c).strip().encode("utf-8") for c in client_ids]
+        if not raw:
+            return np.empty((0,), dtype=np.int64)
+        if not self.n_rows:
+            return np.full(len(raw), -1, dtype=np.int64)
+        too_long = np.array([len(k) > self.key_width for k in raw], dtype=bool)
+        q = np.array([k[: self.key_width] for k in raw], dtype=f"S{self.key_width}")
+        pos = np.searchsorted(self.keys, q)
+        pos_c = np.minimum(pos, self.n_rows - 1)
+        hit = (pos < self.n_rows) & (self.keys[pos_c] == q) & ~too_long
+        return np.where(hit, pos_c, -1).astype(np.int64)
+
+    def column_index(self, feature_names: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        """Store column per model feature (-1 when absent); None when orders already match."""
+        if feature_names is None:
+            return None
+        # Runners pass the same feature list object on every call: skip rebuilding the key.
+        if self._last_cols[0] is feature_names:
+            return self._last_cols[1]
+        key = tuple(str(f) for f in feature_names)
+        if key not in self._col_cache:
+            if list(key) == self.feature_names:
+                self._col_cache[key] = None
+            else:
+                self._col_cache[key] = np.array([self._feature_pos.get(f, -1) for f in key], dtype=np.int64)
+        self._last_cols = (feature_names, self._col_cache[key])
+        return self._col_cache[key]
+
+    def gather(self, client_ids: Sequence[Any], feature_names: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        (X, info): X is float32 (len(client_ids), len(feature_names or store features)),
+        rows/columns not in the store are NaN. info carries hits/misses/missing_features/zero_copy.
+        """
+        idx = self.lookup(client_ids)
+        cols = self.column_index(feature_names)
+        n_out = self.n_features if cols is None else len(cols)
+        hit_rows = idx >= 0
+        hits = int(hit_rows.sum())
+        info: Dict[str, Any] = {
+            "path": self.path,
+            "hits": hits,
+            "misses": int(len(idx) - hits),
+            "missing_features": 0 if cols is None else int((cols < 0).sum()),
+            "zero_copy": False,
+        }
+
+        if len(idx) == 1 and hits == 1 and cols is None:
+            i = int(idx[0])
+            info["zero_copy"] = True
+            return self.matrix[i:i + 1], info
+
+        X = np.full((len(idx), n_out), np.nan, dtype=np.float32)
+        if hits:
+            src_rows = idx[hit_rows]
+            if cols is None:
+                X[hit_rows] = self.matrix[src_rows]
+            else:
+                present = cols >= 0
+                if present.any():
+                    X[np.ix_(hit_rows, present)] = self.matrix[np.ix_(src_rows, cols[present])]
+        return X, info
+
+
+def open_store(path: str) -> FeatureStore:
+    """Process-wide cached FeatureStore (one mmap per file)."""
+    key = str(Path(path).resolve())
+    store = _OPEN_STORES.get(key)
+    if store is None:
+        store = FeatureStore(path)
+        _OPEN_STORES[key] = store
+    return store
+
+
+def store_row(
+    store_path: Optional[str],
+    client_id: Any,
+    feature_names: Sequence[str],
+) -> Tuple[Optional[np.ndarray], Optional[Dict[str, Any]]]:
+    """
+    Runner helper: (X[1, n], info) on a hit, (None, info) on a miss, (None, None) without a store.
+    """
+    if not store_path:
+        return None, None
+    X, info = open_store(store_path).gather([client_id], feature_names)
+    info = {k: info[k] for k in ("path", "hits", "misses", "missing_features")}
+    return (X if info["hits"] else None), info
+
+
+def _to_float(v: Any) -> float:
+    if v is None:
+        return math.nan
+    s = str(v).strip()
+    if not s:
+        return math.nan
+    try:
+        return float(s)
+    except ValueError:
+        return math.nan
+
+
+def _read_rows(args: argparse.Namespace) -> Tuple[List[str], List[Dict[str, Any]]]:
+    if args.csv:
+        with open(args.csv, "r", encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            cols = list(reader.fieldnames or [])
+        return cols, rows
+    rows = []
+    with open(args.jsonl, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    cols: List[str] = []
+    for r in rows:
+        for k in r.keys():
+            if k not in cols:
+                cols.append(k)
+    return cols, rows
+
+
+def cmd_build(args: argparse.Namespace) -> int:
+    cols, rows = _read_rows(args)
+    if args.key_column not in cols:
+        raise ValueError(f"Key column '{args.key_column}' not found")
+    if args.feature_list_file:
+        feature_names = load_feature_list(args.feature_list_file)
+    else:
+        feature_names = [c for c in cols if c != args.key_column]
+    X = np.array([[_to_float(r.get(f)) for f in feature_names] for r in rows], dtype=np.float32).reshape(len(rows), len(feature_names))
+    header = write_store(
+        args.out,
+        [r[args.key_column] for r in rows],
+        X,
+        feature_names,
+        source=args.csv or args.jsonl,
+    )
+    absent = [f for f in feature_names if f not in cols]
+    print(json.dumps({
+        "out": args.out,
+        "n_rows": header["n_rows"],
+        "n_features": header["n_features"],
+        "features_absent_in_source": len(absent),
+    }, indent=2))
+    return 0
+
+
+def cmd_info(args: argparse.Namespace) -> int:
+    h = dict(FeatureStore(args.store).header)
+    names = h.pop("feature_names")
+    h["feature_names_head"] = names[:10]
+    print(json.dumps(h, indent=2))
+    return 0
+
+
+def cmd_get(args: argparse.Namespace) -> int:
+    store = FeatureStore(args.store)
+    names = load_feature_list(args.feature_list_file) if args.feature_list_file else store.feature_names
+    X, info = store.gather(args.client_id, names)
+    out = {"info": info, "rows": {}}
+    for cid, row in zip(args.client_id, X):
+        out["rows"][cid] = {n: (None if math.isnan(v) else float(v)) for n, v in zip(names, row.tolist())}
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Memory-mapped feature store (build / info / get)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Build a store from CSV/JSONL rows keyed by client_id")
+    src = b.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv", default=None)
+    src.add_argument("--jsonl", default=None)
+    b.add_argument("--key-column", default="client_id")
+    b.add_argument("--feature-list-file", default=None, help="Column order = this model feature list (zero-copy single-row gathers)")
+    b.add_argument("--out", required=True)
+
+    i = sub.add_parser("info", help="Print the store header")
+    i.add_argument("--store", required=True)
+
+    g = sub.add_parser("get", help="Gather rows for client ids")
+    g.add_argument("--store", required=True)
+    g.add_argument("--client-id", action="append", required=True)
+    g.add_argument("--feature-list-file", default=None)
+
+    args = ap.parse_args()
+    if args.cmd == "build":
+        return cmd_build(args)
+    if args.cmd == "info":
+        return cmd_info(args)
+    return cmd_get(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Idempotency store for decision packs, keyed by request_id + hash of the decision inputs.
+
+A resend of the same meta_request_id with the same inputs gets the stored
+decision_pack_v0_1 back (no second run of sensors / T2-T4 / BRMS). The same id with
+different inputs raises IdempotencyConflict (code IDEMPOTENCY_CONFLICT).
+
+The first caller claims the id (a pending entry: SQLite row without a pack, or an
+in-process reservation) before deciding. A concurrent duplicate waits up to
+--idempotency-wait-s for that pack, then gets IdempotencyPending (IDEMPOTENCY_PENDING);
+it never runs the chain a second time. A pending entry older than the pending TTL
+(owner crashed) is taken over by the next claim.
+
+Backends:
+  - in-memory LRU (per process; --idempotency-max-entries)
+  - optional SQLite file shared by every process that opens it (forked service
+    workers, CLI runs of the orchestrator): --idempotency-db
+Entries older than the retention window (--idempotency-retention-s) are ignored and purged.
+
+Usage (inspection):
+  python3 runners/idempotency_store.py --db /tmp/idem.sqlite stats
+  python3 runners/idempotency_store.py --db /tmp/idem.sqlite purge
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+IDEMPOTENCY_CONFLICT = "IDEMPOTENCY_CONFLICT"
+IDEMPOTENCY_PENDING = "IDEMPOTENCY_PENDING"
+DEFAULT_RETENTION_S = 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_WAIT_S = 10.0
+DEFAULT_PENDING_TTL_S = 60.0
+_POLL_S = 0.02
+
+# pack_json is NULL while the claiming caller is still deciding.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decision_idempotency (
+    request_id   TEXT PRIMARY KEY,
+    payload_hash TEXT NOT NULL,
+    stored_at    REAL NOT NULL,
+    pack_json    TEXT
+)
+"""
+
+
+class IdempotencyConflict(ValueError):
+    """Same request_id already decided with different inputs."""
+
+    code = IDEMPOTENCY_CONFLICT
+
+    def __init__(self, request_id: str, stored_hash: str, payload_hash: str) -> None:
+        super().__init__(
+            f"{IDEMPOTENCY_CONFLICT}: request_id={request_id} was decided with inputs "
+            f"{stored_hash[:12]}, resent with {payload_hash[:12]}"
+        )
+        self.request_id = request_id
+        self.stored_hash = stored_hash
+        self.payload_hash = payload_hash
+
+
+class IdempotencyPending(RuntimeError):
+    """Same request_id (same inputs) still being decided by another caller."""
+
+    code = IDEMPOTENCY_PENDING
+
+    def __init__(self, request_id: str, waited_s: float) -> None:
+        super().__init__(f"{IDEMPOTENCY_PENDING}: request_id={request_id} still being decided after {waited_s:.1f}s")
+        self.request_id = request_id
+
+
+def _norm(v: Any) -> Any:
+    # CLI flags arrive as strings / floats, service rows as JSON types: hash them alike.
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, (int, float)):
+        return float(v)
+    if isinstance(v, str) and v.strip().lower() in ("true", "false"):
+        return v.strip().lower() == "true"
+    return v
+
+
+def payload_hash(inputs: Dict[str, Any]) -> str:
+    """sha256 of the decision inputs (None values dropped, numbers/bools normalized)."""
+    canon = {k: _norm(v) for k, v in inputs.items() if v is not None}
+    blob = json.dumps(canon, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def decision_context(
+    *,
+    sensor_mode: str,
+    fraud_signals_mode: str,
+    no_brms: bool,
+    brms_stub: Optional[str],
+    brms_url: Optional[str],
+    feature_store: Optional[str],
+    manifest_hash: Optional[str],
+) -> Dict[str, Any]:
+    """Run configuration that changes the pack; hashed together with the row inputs."""
+    if no_brms:
+        brms = "none"
+    elif brms_stub:
+        brms = f"stub:{brms_stub}"
+    else:
+        brms = f"url:{brms_url}"
+    return {
+        "sensor_mode": sensor_mode,
+        "fraud_signals_mode": fraud_signals_mode,
+        "brms": brms,
+        "feature_store": feature_store,
+        "manifest_hash": manifest_hash,
+    }
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        retention_s: float = DEFAULT_RETENTION_S,
+        db_path: Optional[str] = None,
+        wait_s: float = DEFAULT_WAIT_S,
+        pending_ttl_s: float = DEFAULT_PENDING_TTL_S,
+    ) -> None:
+        self.max_entries = max(int(max_entries), 0)
+        self.retention_s = float(retention_s)
+        self.db_path = db_path
+        self.wait_s = max(float(wait_s), 0.0)
+        self.pending_ttl_s = float(pending_ttl_s)
+        self._lru: "OrderedDict[str, Tuple[str, float, Dict[str, Any]]]" = OrderedDict()
+        # Claims of this process when there is no SQLite file: request_id -> (payload_hash, claimed_at).
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        self.counts = {"hit": 0, "miss": 0, "conflict": 0, "expired": 0, "stored": 0, "waited": 0, "pending": 0}
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path:
+            return None
+        # One connection per process: a connection inherited across fork must not be reused.
+        if self._db is None or self._db_pid != os.getpid():
+            db = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(_SCHEMA)
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.retention_s > 0 and now - stored_at > self.retention_s
+
+    def _lru_entry(self, request_id: str, now: float) -> Optional[Tuple[str, float, Dict[str, Any]]]:
+        entry = self._lru.get(request_id)
+        if entry is None:
+            return None
+        if self._expired(entry[1], now):
+            self._lru.pop(request_id, None)
+            if self.db_path is None:
+                self.counts["expired"] += 1
+            return None
+        self._lru.move_to_end(request_id)
+        return entry
+
+    def _remember(self, request_id: str, phash: str, now: float, pack: Dict[str, Any]) -> None:
+        if self.max_entries:
+            self._lru[request_id] = (phash, now, pack)
+            self._lru.move_to_end(request_id)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get(self, request_id: str, phash: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Stored pack for a true duplicate, None on miss or pending; IdempotencyConflict on a different payload."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._lru_entry(request_id, now)
+            if entry is None:
+                db = self._conn()
+                row = db.execute(
+                    "SELECT payload_hash, stored_at, pack_json FROM decision_idempotency WHERE request_id = ? AND pack_json IS NOT NULL",
+                    (request_id,),
+                ).fetchone() if db is not None else None
+                if row is not None:
+                    entry = (row[0], float(row[1]), json.loads(row[2]))
+            if entry is None:
+                self.counts["miss"] += 1
+                return None
+            stored_hash, stored_at, pack = entry
+            if self._expired(stored_at, now):
+                self.counts["expired"] += 1
+                self.counts["miss"] += 1
+                return None
+            if stored_hash != phash:
+                self.counts["conflict"] += 1
+                raise IdempotencyConflict(request_id, stored_hash, phash)
+            self.counts["hit"] += 1
+            return pack
+
+    def claim(self, request_id: str, phash: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        None when this caller now owns request_id (it must put() the pack, or release() on
+        failure); the stored pack for a true duplicate; IdempotencyConflict on a different
+        payload. While another caller holds the claim, wait up to wait_s, then IdempotencyPending.
+        """
+        t_start = time.monotonic()
+        with self._lock:
+            waited = False
+            while True:
+                state, pack = self._claim_once(request_id, phash, time.time() if now is None else now)
+                if state != "pending":
+                    self.counts["waited"] += int(waited and state == "done")
+                    return pack
+                left = self.wait_s - (time.monotonic() - t_start)
+                if left <= 0:
+                    self.counts["pending"] += 1
+                    raise IdempotencyPending(request_id, time.monotonic() - t_start)
+                waited = True
+                # put()/release() in this process notify; other processes are polled.
+                self._cond.wait(min(left, _POLL_S) if self.db_path else left)
+
+    def try_claim(self, request_id: str, phash: str, now: Optional[float] = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """claim() without waiting: ("owner", None), ("done", pack) or ("pending", None); for event-loop callers."""
+        with self._lock:
+            return self._claim_once(request_id, phash, time.time() if now is None else now)
+
+    def pending_error(self, request_id: str, waited_s: float) -> IdempotencyPending:
+        """IdempotencyPending for a caller that polled try_claim() past wait_s (counted in stats)."""
+        with self._lock:
+            self.counts["pending"] += 1
+        return IdempotencyPending(request_id, waited_s)
+
+    def _claim_once(self, request_id: str, phash: str, now: float) -> Tuple[str, Optional[Dict[str, Any]]]:
+        while True:
+            state, pack = self._try_claim(request_id, phash, now)
+            if state == "owner":
+                self.counts["miss"] += 1
+            elif state == "done":
+                self.counts["hit"] += 1
+            if state != "retry":
+                return state, pack
+
+    def _try_claim(self, request_id: str, phash: str, now: float) -> Tuple[str, Any]:
+        """One claim attempt under the lock: ("owner" | "done" | "pending" | "retry", pack)."""
+        entry = self._lru_entry(request_id, now)
+        if entry is not None:
+            if entry[0] != phash:
+                self.counts["conflict"] += 1
+                raise IdempotencyConflict(request_id, entry[0], phash)
+            return "done", entry[2]
+        db = self._conn()
+        if db is None:
+            pend = self._pending.get(request_id)
+            if pend is None or now - pend[1] > self.pending_ttl_s:
+                self._pending[request_id] = (phash, now)
+                return "owner", None
+            if pend[0] != phash:
+                self.counts["conflict"] += 1
+                raise IdempotencyConflict(request_id, pend[0], phash)
+            return "pending", None
+
+        if db.execute(
+            "INSERT OR IGNORE INTO decision_idempotency (request_id, payload_hash, stored_at, pack_json) VALUES (?, ?, ?, NULL)",
+            (request_id, phash, now),
+        ).rowcount == 1:
+            return "owner", None
+        row = db.execute(
+            "SELECT payload_hash, stored_at, pack_json FROM decision_idempotency WHERE request_id = ?", (request_id,)
+        ).fetchone()
+        if row is None:
+            return "retry", None  # released / purged in between
+        stored_hash, stored_at, pack_json = row[0], float(row[1]), row[2]
+        expired = self._expired(stored_at, now) if pack_json is not None else now - stored_at > self.pending_ttl_s
+        if expired:
+            # Past retention, or a claim whose owner never finished: take it over (first taker wins).
+            taken = db.execute(
+                "UPDATE decision_idempotency SET payload_hash = ?, stored_at = ?, pack_json = NULL WHERE request_id = ? AND stored_at = ?",
+                (phash, now, request_id, row[1]),
+            ).rowcount == 1
+            if taken:
+                self.counts["expired"] += 1
+            return ("owner" if taken else "retry"), None
+        if stored_hash != phash:
+            self.counts["conflict"] += 1
+            raise IdempotencyConflict(request_id, stored_hash, phash)
+        if pack_json is None:
+            return "pending", None
+        pack = json.loads(pack_json)
+        self._remember(request_id, phash, stored_at, pack)
+        return "done", pack
+
+    def put(self, request_id: str, phash: str, pack: Dict[str, Any], now: Optional[float] = None) -> None:
+        """Store the pack (fills this caller's claim); IdempotencyConflict if the id holds other inputs."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._lru_entry(request_id, now)
+            if entry is not None and entry[0] != phash:
+                raise IdempotencyConflict(request_id, entry[0], phash)
+            db = self._conn()
+            if db is not None:
+                pack_json = json.dumps(pack)
+                filled = db.execute(
+                    "UPDATE decision_idempotency SET stored_at = ?, pack_json = ? WHERE request_id = ? AND payload_hash = ? AND pack_json IS NULL",
+                    (now, pack_json, request_id, phash),
+                ).rowcount
+                if not filled:
+                    try:
+                        db.execute(
+                            "INSERT INTO decision_idempotency (request_id, payload_hash, stored_at, pack_json) VALUES (?, ?, ?, ?)",
+                            (request_id, phash, now, pack_json),
+                        )
+                    except sqlite3.IntegrityError:
+                        row = db.execute("SELECT payload_hash FROM decision_idempotency WHERE request_id = ?", (request_id,)).fetchone()
+                        if row is not None and row[0] != phash:
+                            raise IdempotencyConflict(request_id, row[0], phash)
+                        # Already decided with the same inputs: the first pack stays.
+            self._pending.pop(request_id, None)
+            self._remember(request_id, phash, now, pack)
+            self.counts["stored"] += 1
+            self._cond.notify_all()
+        if self.counts["stored"] % 1000 == 0:
+            self.purge(now)
+
+    def release(self, request_id: str, phash: str) -> None:
+        """Drop this caller's claim without a pack (the decision failed); the next resend runs again."""
+        with self._lock:
+            pend = self._pending.get(request_id)
+            if pend is not None and pend[0] == phash:
+                del self._pending[request_id]
+            db = self._conn()
+            if db is not None:
+                db.execute(
+                    "DELETE FROM decision_idempotency WHERE request_id = ? AND payload_hash = ? AND pack_json IS NULL",
+                    (request_id, phash),
+                )
+            self._cond.notify_all()
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Drop entries past the retention window; returns how many disk rows went."""
+        now = time.time() if now is None else now
+        if self.retention_s <= 0:
+            return 0
+        cutoff = now - self.retention_s
+        with self._lock:
+            for rid in [rid for rid, (_, at, _) in self._lru.items() if at < cutoff]:
+                del self._lru[rid]
+            db = self._conn()
+            if db is None:
+                return 0
+            return db.execute("DELETE FROM decision_idempotency WHERE stored_at < ?", (cutoff,)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.counts, memory_entries=len(self._lru), retention_s=self.retention_s)
+            db = self._conn()
+            if db is not None:
+                out["db_path"] = self.db_path
+                out["db_entries"] = db.execute("SELECT COUNT(*) FROM decision_idempotency WHERE pack_json IS NOT NULL").fetchone()[0]
+                out["db_pending"] = db.execute("SELECT COUNT(*) FROM decision_idempotency WHERE pack_json IS NULL").fetchone()[0]
+            return out
+
+
+def add_idempotency_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--idempotency", action="store_true", help="Replay stored packs for resent request_ids (in-memory LRU)")
+    ap.add_argument("--idempotency-db", default=None, help="SQLite file backing the idempotency store (implies --idempotency)")
+    ap.add_argument("--idempotency-max-entries", type=int, default=DEFAULT_MAX_ENTRIES)
+    ap.add_argument("--idempotency-retention-s", type=float, default=DEFAULT_RETENTION_S, help="Retention window (0 = keep forever)")
+    ap.add_argument("--idempotency-wait-s", type=float, default=DEFAULT_WAIT_S, help="How long a duplicate waits for an in-flight decision")
+
+
+def store_from_args(args: argparse.Namespace) -> Optional[IdempotencyStore]:
+    if not (args.idempotency or args.idempotency_db):
+        return None
+    return IdempotencyStore(
+        max_entries=args.idempotency_max_entries,
+        retention_s=args.idempotency_retention_s,
+        db_path=args.idempotency_db,
+        wait_s=args.idempotency_wait_s,
+    )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Inspect / purge a SQLite idempotency store")
+    ap.add_argument("--db", required=True)
+    ap.add_argument("--retention-s", type=float, default=DEFAULT_RETENTION_S)
+    ap.add_argument("cmd", choices=["stats", "purge"])
+    args = ap.parse_args()
+    store = IdempotencyStore(max_entries=0, retention_s=args.retention_s, db_path=args.db)
+    if args.cmd == "purge":
+        print(json.dumps({"purged": store.purge()}))
+    else:
+        print(json.dumps(store.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Process-local metrics (counters / gauges / histograms) in Prometheus text format.
+
+Recording is a dict lookup + a locked add, cheap enough to stay on in production.
+Metrics used across the chain:
+
+  decision_stage_latency_ms{stage}              histogram  meta_latency_ms of each pack stage
+  decision_sensor_latency_ms{sensor,fetch}      histogram  wE/wF (Eligibility), wC/wB (ORIGINATE)
+  decision_sensor_fallback_total{sensor,reason} counter    LIVE->STUB fallbacks
+  decision_sensor_hedge_total{sensor,result}    counter    hedged GETs: won | lost | no_budget (sensor_hedge.py)
+  decision_brms_total{result}                   counter    ok | unavailable | stub | skipped
+  decision_brms_latency_ms                      histogram  BRMS bridge round trip
+  decision_model_load_ms{model}                 histogram  T2/T3/T4 booster + thresholds load
+  decision_final_outcome_total{final_outcome}   counter
+  decision_final_reason_total{final_reason_code} counter
+
+Multi-process: every process keeps its own registry. With DECISION_METRICS_DIR set (or
+enable_dump_dir()), each one writes a snapshot <dir>/metrics_<pid>.json at exit (and
+periodically when asked); `merge` sums the snapshots into one exposition. The decision
+service does this for its workers; the CLI batch path sets the variable for every child.
+
+Usage:
+  DECISION_METRICS_DIR=/tmp/m python3 runners/runner_workflow_eligibility.py ...
+  python3 runners/metrics_registry.py merge --dir /tmp/m --out /tmp/m/metrics.prom
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import bisect
+import json
+import os
+import socket
+import threading
+import time
+import urllib.error
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_MS_BUCKETS = (1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0)
+METRICS_DIR_ENV = "DECISION_METRICS_DIR"
+SNAPSHOT_SCHEMA = "metrics_snapshot_v0_1"
+
+
+class _Child:
+    __slots__ = ("value", "counts", "sum", "count")
+
+    def __init__(self, n_buckets: int = 0) -> None:
+        self.value = 0.0
+        self.counts = [0] * (n_buckets + 1) if n_buckets else None
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metric:
+    def __init__(self, name: str, kind: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()) -> None:
+        self.name = name
+        self.kind = kind  # counter | gauge | histogram
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(float(b) for b in buckets) if kind == "histogram" else ()
+        self._series: Dict[Tuple[str, ...], _Child] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels: Dict[str, Any]) -> _Child:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        child = self._series.get(key)
+        if child is None:
+            with self._lock:
+                child = self._series.setdefault(key, _Child(len(self.buckets)))
+        return child
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        child = self._child(labels)
+        with self._lock:
+            child.value += amount
+
+    def set(self, value: float, **labels: Any) -> None:
+        child = self._child(labels)
+        with self._lock:
+            child.value = float(value)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        child = self._child(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            child.counts[i] += 1
+            child.sum += value
+            child.count += 1
+
+    def histogram_series(self, **labels: Any) -> Dict[str, Any]:
+        """One histogram series as {buckets, counts, sum, count} (zeros until observed): the /batcher and /admission view."""
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            c = self._series.get(key) or _Child(len(self.buckets))
+            return {
+                "buckets": [_num(b) for b in self.buckets] + ["+Inf"],
+                "counts": list(c.counts),
+                "sum": round(c.sum, 6),
+                "count": c.count,
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            series = []
+            for key, c in self._series.items():
+                if self.kind == "histogram":
+                    series.append({"labels": list(key), "counts": list(c.counts), "sum": c.sum, "count": c.count})
+                else:
+                    series.append({"labels": list(key), "value": c.value})
+        return {"kind": self.kind, "help": self.help, "labelnames": list(self.labelnames), "buckets": list(self.buckets), "series": series}
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, kind: str, help_text: str, labelnames: Sequence[str], buckets: Sequence[float] = ()) -> Metric:
+        m = self._metrics.get(name)
+        if m is None:
+            with self._lock:
+                m = self._metrics.setdefault(name, Metric(name, kind, help_text, labelnames, buckets))
+        if m.kind != kind or m.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered as {m.kind}{list(m.labelnames)}")
+        return m
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Metric:
+        return self._get(name, "counter", help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Metric:
+        return self._get(name, "gauge", help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_MS_BUCKETS) -> Metric:
+        return self._get(name, "histogram", help_text, labelnames, buckets)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "schema_version": SNAPSHOT_SCHEMA,
+            "pid": os.getpid(),
+            "written_at": time.time(),
+            "metrics": {name: m.snapshot() for name, m in sorted(self._metrics.items())},
+        }
+
+    def render(self) -> str:
+        return render(self.snapshot())
+
+    def reset(self) -> None:
+        """Zero every series (a forked child must not re-report its parent's counts)."""
+        for m in list(self._metrics.values()):
+            with m._lock:
+                m._series.clear()
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Metric:
+    return REGISTRY.counter(name, help_text, labelnames)
+
+
+def gauge(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Metric:
+    return REGISTRY.gauge(name, help_text, labelnames)
+
+
+def histogram(name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_MS_BUCKETS) -> Metric:
+    return REGISTRY.histogram(name, help_text, labelnames, buckets)
+
+
+# --- Exposition -------------------------------------------------------------------
+
+def _esc(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_esc(str(v))}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(x: float) -> str:
+    return str(int(x)) if float(x).is_integer() else repr(float(x))
+
+
+def render(snapshot: Dict[str, Any]) -> str:
+    """Prometheus text exposition (format 0.0.4) of a snapshot or merged snapshot."""
+    lines: List[str] = []
+    for name, m in snapshot["metrics"].items():
+        lines.append(f"# HELP {name} {m['help']}")
+        lines.append(f"# TYPE {name} {m['kind']}")
+        for s in m["series"]:
+            if m["kind"] == "histogram":
+                cum = 0
+                for le, c in zip(list(m["buckets"]) + ["+Inf"], s["counts"]):
+                    cum += c
+                    le_s = le if le == "+Inf" else _num(le)
+                    lines.append(f"{name}_bucket{_labels(m['labelnames'], s['labels'], ('le', le_s))} {cum}")
+                lines.append(f"{name}_sum{_labels(m['labelnames'], s['labels'])} {_num(s['sum'])}")
+                lines.append(f"{name}_count{_labels(m['labelnames'], s['labels'])} {s['count']}")
+            else:
+                lines.append(f"{name}{_labels(m['labelnames'], s['labels'])} {_num(s['value'])}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Multi-process snapshots -----------------------------------------------------
+
+def dump_snapshot(metrics_dir: str, registry: Registry = REGISTRY) -> Path:
+    d = Path(metrics_dir)
+    d.mkdir(parents=True, exist_ok=True)
+    path = d / f"metrics_{os.getpid()}.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(registry.snapshot()), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+_dump_dir: Optional[str] = None
+
+
+def enable_dump_dir(metrics_dir: str, interval_s: Optional[float] = None) -> None:
+    """Write this process' snapshot at exit (and every interval_s seconds when given)."""
+    global _dump_dir
+    if _dump_dir is None:
+        atexit.register(lambda: _dump_dir and dump_snapshot(_dump_dir))
+    _dump_dir = metrics_dir
+    if interval_s:
+        def _loop() -> None:
+            while True:
+                time.sleep(interval_s)
+                try:
+                    dump_snapshot(metrics_dir)
+                except OSError:
+                    pass
+        threading.Thread(target=_loop, name="metrics_dump", daemon=True).start()
+
+
+def load_snapshots(metrics_dir: str) -> List[Dict[str, Any]]:
+    out = []
+    for p in sorted(Path(metrics_dir).glob("metrics_*.json")):
+        try:
+            out.append(json.loads(p.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue  # being rewritten / torn
+    return out
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Any]], live_pids: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+    """
+    Sum counters and histograms over every snapshot (exited processes included, so totals
+    survive worker recycling). Gauges are summed over live_pids only when given.
+    """
+    live = set(live_pids) if live_pids is not None else None
+    merged: Dict[str, Any] = {}
+    for snap in snapshots:
+        for name, m in snap.get("metrics", {}).items():
+            if m["kind"] == "gauge" and live is not None and snap.get("pid") not in live:
+                continue
+            tgt = merged.setdefault(name, dict(m, series=[]))
+            if tgt["kind"] != m["kind"] or tgt["buckets"] != m["buckets"]:
+                continue  # incompatible re-registration: keep the first
+            index = {tuple(s["labels"]): s for s in tgt["series"]}
+            for s in m["series"]:
+                cur = index.get(tuple(s["labels"]))
+                if cur is None:
+                    cur = json.loads(json.dumps(s))
+                    tgt["series"].append(cur)
+                    index[tuple(s["labels"])] = cur
+                elif m["kind"] == "histogram":
+                    cur["counts"] = [a + b for a, b in zip(cur["counts"], s["counts"])]
+                    cur["sum"] += s["sum"]
+                    cur["count"] += s["count"]
+                else:
+                    cur["value"] += s["value"]
+    return {"schema_version": SNAPSHOT_SCHEMA, "metrics": dict(sorted(merged.items()))}
+
+
+# --- Recording helpers shared by the runners ------------------------------------
+
+def fallback_reason(exc: BaseException) -> str:
+    """Low-cardinality label for a failed sensor / bridge call."""
+    if isinstance(exc, urllib.error.HTTPError):
+        return f"http_{exc.code}"
+    if isinstance(exc, (socket.timeout, TimeoutError)) or "timed out" in str(exc):
+        return "timeout"
+    if isinstance(exc, (urllib.error.URLError, ConnectionError)):
+        return "connection"
+    if isinstance(exc, (ValueError, TypeError, KeyError)):
+        return "invalid_payload"
+    return type(exc).__name__.lower()
+
+
+def observe_sensor(sensor: str, latency_ms: float, fetch: str = "SINGLE") -> None:
+    histogram("decision_sensor_latency_ms", "Sensor fetch latency (ms)", ("sensor", "fetch")).observe(latency_ms, sensor=sensor, fetch=fetch)
+
+
+def observe_sensor_fallback(sensor: str, exc: BaseException) -> None:
+    counter("decision_sensor_fallback_total", "LIVE sensor fallbacks to STUB values", ("sensor", "reason")).inc(
+        sensor=sensor, reason=fallback_reason(exc)
+    )
+
+
+def observe_sensor_hedge(sensor: str, result: str) -> None:
+    counter("decision_sensor_hedge_total", "Hedged sensor GETs (won | lost | no_budget)", ("sensor", "result")).inc(sensor=sensor, result=result)
+
+
+def observe_pack(pack: Dict[str, Any]) -> None:
+    """Stage latencies + outcome counters of one finished decision_pack_v0_1."""
+    stage_h = histogram("decision_stage_latency_ms", "Per-stage meta_latency_ms of decision packs", ("stage",))
+    decisions = pack.get("decisions") or {}
+    for stage, payload in decisions.items():
+        if isinstance(payload, dict) and isinstance(payload.get("meta_latency_ms"), (int, float)):
+            stage_h.observe(payload["meta_latency_ms"], stage=stage)
+    if isinstance(pack.get("meta_latency_ms"), (int, float)):
+        stage_h.observe(pack["meta_latency_ms"], stage="pack")
+    fd = decisions.get("final_decision") or {}
+    counter("decision_final_outcome_total", "Final decisions by final_outcome", ("final_outcome",)).inc(
+        final_outcome=fd.get("final_outcome", "UNKNOWN")
+    )
+    counter("decision_final_reason_total", "Final decisions by final_reason_code", ("final_reason_code",)).inc(
+        final_reason_code=fd.get("final_reason_code", "UNKNOWN")
+    )
+
+
+if os.environ.get(METRICS_DIR_ENV):
+    enable_dump_dir(os.environ[METRICS_DIR_ENV])
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Merge per-process metrics snapshots into Prometheus text")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("merge")
+    m.add_argument("--dir", required=True)
+    m.add_argument("--out", default=None)
+    args = ap.parse_args()
+
+    text = render(merge_snapshots(load_snapshots(args.dir)))
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        print(text, end="")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
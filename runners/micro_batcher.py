@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Adaptive micro-batcher for single-row model predictions.
+
+Concurrent requests submit one feature row each; a collector thread per model groups
+them and runs ONE predict per batch, then hands every caller its own score.
+
+Policy (adaptive, no fixed delay):
+  - target batch = min(max_batch, rows taken + rows queued + rows incoming), where a
+    row is incoming from just before its feature row is built until it is submitted
+    (incoming(): each model counts its own callers, not whole requests)
+  - idle traffic (nothing incoming) -> the row is predicted immediately, zero added wait
+  - under pressure (N incoming)     -> wait up to max_wait_ms for the rows on their way
+Rows already queued are always drained first, so a burst never waits for the timer.
+
+Exported per batcher: batch-size and queue-wait histograms, read back from metrics_registry (stats()).
+"""
+from __future__ import annotations
+
+import contextlib
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import metrics_registry
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUEUE_WAIT_MS_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0)
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        name: str,
+        predict_batch: Callable[[np.ndarray], np.ndarray],
+        *,
+        max_batch: int = 32,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+        self.name = name
+        self.predict_batch = predict_batch
+        self.max_batch = max(int(max_batch), 1)
+        self.max_wait_s = max(float(max_wait_ms), 0.0) / 1000.0
+        self._incoming = 0
+        self._incoming_lock = threading.Lock()  # also covers the put of an incoming row
+        self.batches = 0
+        self.errors = 0
+        self._m_size = metrics_registry.histogram("decision_micro_batch_size", "Rows per micro-batch predict", ("model",), BATCH_SIZE_BUCKETS)
+        self._m_wait = metrics_registry.histogram("decision_micro_batch_queue_wait_ms", "Row wait before its batch predict (ms)", ("model",), QUEUE_WAIT_MS_BUCKETS)
+        self._q: "queue.Queue[Optional[Tuple[np.ndarray, Future, float]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name=f"micro_batcher_{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, x: np.ndarray) -> Future:
+        """x: one feature row, shape (1, n_features). Future resolves to that row's score."""
+        fut: Future = Future()
+        self._q.put((x, fut, time.perf_counter()))
+        return fut
+
+    def predict(self, x: np.ndarray) -> float:
+        return self.submit(x).result()
+
+    @contextlib.contextmanager
+    def incoming(self) -> Iterator[Callable[[np.ndarray], float]]:
+        """
+        Count one caller as incoming (about to build its feature row) until its row is
+        submitted; yields that caller's predict hook. The batch target's demand signal.
+        """
+        with self._incoming_lock:
+            self._incoming += 1
+        pending = [True]
+
+        def predict(x: np.ndarray) -> float:
+            fut: Future = Future()
+            with self._incoming_lock:  # queued and no longer incoming in one step
+                self._q.put((x, fut, time.perf_counter()))
+                if pending[0]:
+                    pending[0] = False
+                    self._incoming -= 1
+            return fut.result()
+
+        try:
+            yield predict
+        finally:
+            with self._incoming_lock:
+                if pending[0]:
+                    pending[0] = False
+                    self._incoming -= 1
+
+    def _target(self, taken: int) -> int:
+        with self._incoming_lock:
+            return min(self.max_batch, taken + self._q.qsize() + self._incoming)
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._thread.join(timeout=2.0)
+
+    def _collect(self, first: Tuple[np.ndarray, Future, float]) -> Tuple[List[Tuple[np.ndarray, Future, float]], bool]:
+        batch = [first]
+        closed = False
+        # 1) drain what is already queued (burst: no timer needed)
+        while len(batch) < self.max_batch:
+            try:
+                item = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        # 2) wait only while more rows are known to be on their way
+        target = self._target(len(batch))
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < target:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._q.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                closed = True
+                break
+            batch.append(item)
+            target = self._target(len(batch))
+        return batch, closed
+
+    def _loop(self) -> None:
+        while True:
+            first = self._q.get()
+            if first is None:
+                return
+            batch, closed = self._collect(first)
+            start = time.perf_counter()
+            for _, _, enq in batch:
+                self._m_wait.observe((start - enq) * 1000.0, model=self.name)
+            self._m_size.observe(len(batch), model=self.name)
+            self.batches += 1
+            try:
+                X = np.vstack([x for x, _, _ in batch])
+                preds = self.predict_batch(X)
+                for i, (_, fut, _) in enumerate(batch):
+                    fut.set_result(float(preds[i]))
+            except Exception as e:
+                self.errors += 1
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            if closed:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "batches": self.batches,
+            "errors": self.errors,
+            "batch_size": self._m_size.histogram_series(model=self.name),
+            "queue_wait_ms": self._m_wait.histogram_series(model=self.name),
+        }
@@ -2,14 +2,26 @@
 # S1.4 — ORIGINATE (MVP) — orchestrate T2/T3/T4 -> decision_pack_v0_1
 
 import argparse
+import atexit
+import copy
 import json
+import os
 import subprocess
+import tempfile
 import time
 import sys
+import urllib.parse
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
+from sensor_bulk import load_prefetch, prefetched_sensor
+import cassette
+import metrics_registry
+import profiling
+import runtime_manifest
+import sensor_hedge
+import tracing
 from contract_validate import validate_required, REQUIRED_T2_V0_1, REQUIRED_T3_V0_1, REQUIRED_T4_V0_1, REQUIRED_BRMS_FLAGS_V0_1, REQUIRED_FINAL_DECISION_V0_1
 
 
@@ -17,26 +29,56 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def run_json(cmd: list) -> Dict[str, Any]:
-    out = subprocess.check_output(cmd, text=True)
+def run_json(cmd: list, stdin_obj: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    stdin_text = json.dumps(stdin_obj) if stdin_obj is not None else None
+    out = subprocess.check_output(cmd, text=True, input=stdin_text, env=tracing.child_env())
     return json.loads(out)
 
 def fetch_brms_flags(brms_url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     # Minimal HTTP client (MVP). Block B returns brms_flags_v0_1.
-    try:
-        import requests
-    except Exception as e:
-        raise RuntimeError("requests is required for BRMS bridge (pip install requests)") from e
+    def post() -> Any:
+        try:
+            import requests
+        except Exception as e:
+            raise RuntimeError("requests is required for BRMS bridge (pip install requests)") from e
+        r = requests.post(brms_url, json=payload, timeout=10, headers=tracing.inject({}))
+        r.raise_for_status()
+        return r.json()
+
     t0 = time.time()
-    r = requests.post(brms_url, json=payload, timeout=10)
-    r.raise_for_status()
-    out = r.json()
+    with tracing.span("POST brms_bridge", kind="CLIENT", attributes={"http.method": "POST", "url.full": brms_url}):
+        out = cassette.call("POST", brms_url, post, payload)
     # If BRMS does not include latency, add it here (non-breaking additive for our internal use).
     if isinstance(out, dict) and "meta_latency_ms" not in out:
         out["meta_latency_ms"] = int((time.time() - t0) * 1000)
     return out
 
 
+def brms_request_payload(request_id: str, client_id: str) -> Dict[str, Any]:
+    return {
+        "meta_request_id": request_id,
+        "meta_client_id": str(client_id),
+        "applicant": {"age": 30, "fico_credit_score": 700, "dti": 0.2, "employment_status": "EMPLOYED"},
+        "loan": {"loan_amount": 10000, "loan_term_months": 36},
+        "context": {"policy_id": "P1", "policy_version": "1.0", "validation_mode": "TEST"}
+    }
+
+
+def accept_brms_flags(brms_flags: Dict[str, Any], t_start: float) -> Dict[str, Any]:
+    """Validate live BRMS flags (raises when off-contract), record latency, keep the debug snapshot."""
+    validate_required(brms_flags, REQUIRED_BRMS_FLAGS_V0_1, where="originate:brms_live")# MARKER: BRMS_FLAGS_SNAPSHOT_V0_1
+    metrics_registry.histogram("decision_brms_latency_ms", "BRMS bridge round trip (ms)").observe((time.perf_counter() - t_start) * 1000.0)
+    # Persist BRMS flags snapshot for E2E debugging (best-effort)
+    try:
+        from pathlib import Path as _Path
+        import json as _json
+        _Path('tools/smoke/_logs').mkdir(parents=True, exist_ok=True)
+        _Path('tools/smoke/_logs/last_brms_flags.json').write_text(_json.dumps(brms_flags, indent=2, default=str), encoding='utf-8')
+    except Exception:
+        pass
+    return brms_flags
+
+
 def _default_fraud_signals_stub() -> Dict[str, Any]:
     return {
         "dyn_device_behavior_fraud_score_24h": 0.15,
@@ -95,14 +137,37 @@ def _safe_float(v: Any, default: float) -> float:
         return float(default)
 
 
-def _fetch_sensor_json_live(base_url: str, endpoint: str, params: Dict[str, Any], timeout_s: float) -> Dict[str, Any]:
-    try:
-        import requests
-    except Exception as e:
-        raise RuntimeError("requests is required for LIVE dynamic sensors") from e
-    r = requests.get(f"{base_url.rstrip('/')}{endpoint}", params=params, timeout=timeout_s)
-    r.raise_for_status()
-    out = r.json()
+def fraud_sensor_requests(client_id: str, request_id: str, seed: int) -> Dict[str, Any]:
+    """{sensor: (endpoint, query params)} of the LIVE wC / wB calls."""
+    return {
+        "device_behavior_score": (
+            "/sensor/device_behavior_score",
+            {"client_id": str(client_id), "lookback_hours": 24, "request_id": request_id, "seed": int(seed)},
+        ),
+        "transaction_anomaly_score": (
+            "/sensor/transaction_anomaly_score",
+            {"client_id": str(client_id), "lookback_days": 30, "request_id": request_id, "seed": int(seed)},
+        ),
+    }
+
+
+def _fetch_sensor_json_live(
+    base_url: str, endpoint: str, params: Dict[str, Any], timeout_s: float, hedge_stats: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    url = f"{base_url.rstrip('/')}{endpoint}"
+    full_url = f"{url}?{urllib.parse.urlencode(params)}"
+
+    def get() -> Any:
+        try:
+            import requests
+        except Exception as e:
+            raise RuntimeError("requests is required for LIVE dynamic sensors") from e
+        r = requests.get(url, params=params, timeout=timeout_s, headers=tracing.inject({}))
+        r.raise_for_status()
+        return r.json()
+
+    with tracing.span(f"GET {endpoint}", kind="CLIENT", attributes={"http.method": "GET", "url.path": endpoint}):
+        out = sensor_hedge.call("GET", full_url, lambda: cassette.call("GET", full_url, get), hedge_stats)
     if not isinstance(out, dict):
         raise ValueError("Expected JSON object from sensor endpoint")
     return out
@@ -120,7 +185,17 @@ def resolve_fraud_signals(
     device_high_thr: float,
     tx_high_thr: float,
     double_high_action: str,
+    sensor_prefetch: Optional[Dict[str, Any]] = None,
+    fetched: Optional[Dict[str, Any]] = None,
+    hedge_stats: Optional[Dict[str, Dict[str, int]]] = None,
 ) -> Dict[str, Any]:
+    """
+    wC + wB fraud signals (STUB, or LIVE with per-sensor fallback to the stub values).
+    fetched: {sensor: (payload or exception, latency_ms)} the caller already sent
+    (decision_async.py, see fraud_sensor_requests); those sensors are not fetched again.
+    hedge_stats: {sensor: {hedge_sent, hedge_won}} of those calls; with hedging on
+    (sensor_hedge.py) each LIVE sensor_trace entry carries them.
+    """
     d = _load_fraud_signals_stub(stub_path)
     out: Dict[str, Any] = {
         "meta_schema_version": "originate_dynamic_fraud_signals_v0_1",
@@ -135,20 +210,30 @@ def resolve_fraud_signals(
     live_fallback = False
     if mode.upper() == "LIVE":
         timeout_s = max(float(sensor_timeout_ms) / 1000.0, 0.1)
-
-        # wC device behavior
+        calls = fraud_sensor_requests(str(client_id), request_id, int(seed))
+        hedges: Dict[str, Dict[str, int]] = dict(hedge_stats or {})
+
+        def get(sensor: str) -> Any:
+            if fetched is not None and sensor in fetched:
+                got, ms = fetched[sensor]
+                if isinstance(got, BaseException):
+                    raise got
+                return got, ms
+            ts = time.perf_counter()
+            endpoint, params = calls[sensor]
+            hedges[sensor] = {}
+            out = _fetch_sensor_json_live(sensor_base_url, endpoint, params, timeout_s, hedge_stats=hedges[sensor])
+            return out, (time.perf_counter() - ts) * 1000.0
+
+        # wC device behavior (bulk-prefetched rows skip the HTTP call)
         try:
-            wc = _fetch_sensor_json_live(
-                sensor_base_url,
-                "/sensor/device_behavior_score",
-                {
-                    "client_id": str(client_id),
-                    "lookback_hours": 24,
-                    "request_id": request_id,
-                    "seed": int(seed),
-                },
-                timeout_s,
-            )
+            ts = time.perf_counter()
+            wc = prefetched_sensor(sensor_prefetch, request_id, "device_behavior_score", client_id=str(client_id))
+            wc_fetch, wc_ms = "BATCH", (time.perf_counter() - ts) * 1000.0
+            if wc is None:
+                wc_fetch = "SINGLE"
+                wc, wc_ms = get("device_behavior_score")
+            metrics_registry.observe_sensor("device_behavior_score", wc_ms, wc_fetch)
             out["dyn_device_behavior_fraud_score_24h"] = _safe_float(wc.get("device_behavior_fraud_score_24h"), out["dyn_device_behavior_fraud_score_24h"])
             out["sensor_trace"]["device_behavior"] = {
                 "mode": "LIVE",
@@ -157,26 +242,25 @@ def resolve_fraud_signals(
                 "latency_ms": int(_safe_float(wc.get("latency_ms"), 0)),
                 "lookback_hours": int(_safe_float(wc.get("lookback_hours"), 24)),
                 "as_of_ts": wc.get("generated_at"),
+                "fetch": wc_fetch,
+                **hedges.get("device_behavior_score", {}),
             }
-        except Exception:
+        except Exception as e:
+            metrics_registry.observe_sensor_fallback("device_behavior_score", e)
             live_fallback = True
             tr = out["sensor_trace"].get("device_behavior", {}) or {}
-            tr.update({"mode": "LIVE", "status": "FALLBACK"})
+            tr.update({"mode": "LIVE", "status": "FALLBACK", **hedges.get("device_behavior_score", {})})
             out["sensor_trace"]["device_behavior"] = tr
 
         # wB transaction anomaly
         try:
-            wb = _fetch_sensor_json_live(
-                sensor_base_url,
-                "/sensor/transaction_anomaly_score",
-                {
-                    "client_id": str(client_id),
-                    "lookback_days": 30,
-                    "request_id": request_id,
-                    "seed": int(seed),
-                },
-                timeout_s,
-            )
+            ts = time.perf_counter()
+            wb = prefetched_sensor(sensor_prefetch, request_id, "transaction_anomaly_score", client_id=str(client_id))
+            wb_fetch, wb_ms = "BATCH", (time.perf_counter() - ts) * 1000.0
+            if wb is None:
+                wb_fetch = "SINGLE"
+                wb, wb_ms = get("transaction_anomaly_score")
+            metrics_registry.observe_sensor("transaction_anomaly_score", wb_ms, wb_fetch)
             out["dyn_transaction_anomaly_score_30d"] = _safe_float(wb.get("transaction_anomaly_score_30d"), out["dyn_transaction_anomaly_score_30d"])
             out["sensor_trace"]["transaction_anomaly"] = {
                 "mode": "LIVE",
@@ -185,11 +269,14 @@ def resolve_fraud_signals(
                 "latency_ms": int(_safe_float(wb.get("latency_ms"), 0)),
                 "lookback_days": int(_safe_float(wb.get("lookback_days"), 30)),
                 "as_of_ts": wb.get("generated_at"),
+                "fetch": wb_fetch,
+                **hedges.get("transaction_anomaly_score", {}),
             }
-        except Exception:
+        except Exception as e:
+            metrics_registry.observe_sensor_fallback("transaction_anomaly_score", e)
             live_fallback = True
             tr = out["sensor_trace"].get("transaction_anomaly", {}) or {}
-            tr.update({"mode": "LIVE", "status": "FALLBACK"})
+            tr.update({"mode": "LIVE", "status": "FALLBACK", **hedges.get("transaction_anomaly_score", {})})
             out["sensor_trace"]["transaction_anomaly"] = tr
 
     device_high = out["dyn_device_behavior_fraud_score_24h"] >= float(device_high_thr)
@@ -221,34 +308,6 @@ def resolve_fraud_signals(
 
 
 
-def load_brms_policy_snapshot() -> Dict[str, Any]:
-    """
-    Stable policy snapshot (spec-first) loaded from canonical alias JSON.
-    This avoids coupling ORIGINATE to the bridge internals.
-    """
-    alias_path = Path("block_a_gov/artifacts/brms_policy_canonical.json")
-    if not alias_path.exists():
-        return {
-            "schema_version": "brms_policy_snapshot_v0_1",
-            "status": "MISSING_ALIAS",
-            "alias_path": str(alias_path),
-        }
-
-    d = json.loads(alias_path.read_text(encoding="utf-8"))
-    bridge = d.get("bridge", {}) or {}
-
-    return {
-        "schema_version": "brms_policy_snapshot_v0_1",
-        "status": "OK",
-        "alias_name": d.get("alias_name"),
-        "policy_id": d.get("policy_id"),
-        "policy_version": d.get("policy_version"),
-        "brms_flags_schema_version": d.get("brms_flags_schema_version"),
-        "bridge_base_url": bridge.get("base_url"),
-        "bridge_endpoint": bridge.get("endpoint"),
-    }
-
-
 def _a_summary_from_pack(pack: Dict[str, Any]) -> Dict[str, Any]:
     """
     Produce a minimal A summary for auditing.
@@ -472,46 +531,34 @@ def policy_decider_v0_1(
     }
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--client-id", required=True)
-    ap.add_argument("--seed", type=int, default=42)
-    ap.add_argument("--request-id", default=None)
-    ap.add_argument("--out", default=None, help="Optional path to write decision_pack json")
-    ap.add_argument("--brms-url", default="http://localhost:8082/bridge/brms_flags", help="BRMS flags endpoint (Block B -> ORIGINATE)")
-    ap.add_argument("--brms-stub", default=None, help="Path to brms_flags_v0_1 JSON (offline stub)")
-    ap.add_argument("--no-brms", action="store_true", help="Skip BRMS call (offline mode)")
-    ap.add_argument("--fraud-signals-mode", choices=["STUB", "LIVE"], default="STUB")
-    ap.add_argument("--fraud-signals-stub", default="tools/smoke/fixtures/fraud_signals_stub.json")
-    ap.add_argument("--fraud-signals-json", default=None, help="Optional pre-attached fraud signals JSON. If provided and valid, ORIGINATE consumes it instead of fetching.")
-    ap.add_argument("--fraud-sensor-base-url", default="http://127.0.0.1:9000")
-    ap.add_argument("--fraud-sensor-timeout-ms", type=int, default=1200)
-    ap.add_argument("--fraud-device-high-thr", type=float, default=0.80)
-    ap.add_argument("--fraud-transaction-high-thr", type=float, default=0.80)
-    ap.add_argument("--fraud-double-high-action", choices=["REVIEW", "BLOCK"], default="REVIEW")
-    args = ap.parse_args()
-    t0 = time.time()
-    request_id = args.request_id or str(uuid.uuid4())
-    brms_flags = None
-    if args.brms_stub:
-        brms_flags = json.loads(Path(args.brms_stub).read_text(encoding="utf-8"))
-        validate_required(brms_flags, REQUIRED_BRMS_FLAGS_V0_1, where="originate:brms_stub")
-        args.no_brms = True
-    # Sub-agents (local CLIs). Each runner reads its canonical alias by default.
-    t2 = run_json([sys.executable, "runners/runner_t2.py", "--client-id", str(args.client_id), "--seed", str(args.seed), "--request-id", request_id])
-    validate_required(t2, REQUIRED_T2_V0_1, where="originate:t2_default")
-    t3 = run_json([sys.executable, "runners/runner_t3.py", "--client-id", str(args.client_id), "--seed", str(args.seed), "--request-id", request_id])
-    validate_required(t3, REQUIRED_T3_V0_1, where="originate:t3_fraud")
-    t4 = run_json([sys.executable, "runners/runner_t4.py", "--client-id", str(args.client_id), "--seed", str(args.seed), "--request-id", request_id])
-    validate_required(t4, REQUIRED_T4_V0_1, where="originate:t4_payoff")
-
-    latency_ms = int((time.time() - t0) * 1000)
-
+def assemble_pack(
+    *,
+    client_id: str,
+    request_id: str,
+    seed: int,
+    t2: Dict[str, Any],
+    t3: Dict[str, Any],
+    t4: Dict[str, Any],
+    manifest: Dict[str, Any],
+    latency_ms: int,
+    brms_flags: Optional[Dict[str, Any]],
+    brms_stub_used: bool,
+    brms_url: Optional[str],
+    fraud_signals: Optional[Dict[str, Any]],
+    fraud_opts: Dict[str, Any],
+    brms_live: bool = False,
+) -> Dict[str, Any]:
+    """
+    decision_pack_v0_1 from the T2/T3/T4 payloads: fraud signals, BRMS flags, final decision.
+    Shared by the CLI (sub-agents as child processes) and decision_engine (in process).
+    brms_url=None skips the live BRMS call; fraud_signals (attached) skips wC/wB resolution.
+    brms_live=True: brms_flags is the result of a live call the caller made (None = unavailable).
+    """
     pack = {
         "meta_schema_version": "decision_pack_v0_1",
         "meta_generated_at": utc_now_iso(),
         "meta_request_id": request_id,
-        "meta_client_id": str(args.client_id),
+        "meta_client_id": str(client_id),
         "meta_latency_ms": latency_ms,
         "decisions": {
             "t2_default": t2,
@@ -520,66 +567,231 @@ def main() -> int:
         }
       }
 
-    # BRMS policy snapshot (stable indirection; loaded from canonical alias)
-    pack["meta_brms_policy_snapshot"] = load_brms_policy_snapshot()
+    # BRMS policy snapshot (stable indirection; resolved in the runtime manifest)
+    pack["meta_brms_policy_snapshot"] = manifest["brms_policy_snapshot"]
+    pack["meta_runtime_manifest_hash"] = manifest["manifest_hash"]
 
     # Dynamic fraud/operational signals (wC + wB): consume-if-present, else resolve.
-    attached_fraud_signals = _load_fraud_signals_attached(args.fraud_signals_json)
-    if attached_fraud_signals is not None:
-        pack["decisions"]["fraud_signals"] = attached_fraud_signals
+    if fraud_signals is not None:
+        pack["decisions"]["fraud_signals"] = fraud_signals
     else:
-        pack["decisions"]["fraud_signals"] = resolve_fraud_signals(
-            client_id=str(args.client_id),
-            request_id=request_id,
-            seed=int(args.seed),
-            mode=args.fraud_signals_mode,
-            stub_path=args.fraud_signals_stub,
-            sensor_base_url=args.fraud_sensor_base_url,
-            sensor_timeout_ms=int(args.fraud_sensor_timeout_ms),
-            device_high_thr=float(args.fraud_device_high_thr),
-            tx_high_thr=float(args.fraud_transaction_high_thr),
-            double_high_action=args.fraud_double_high_action,
-        )
+        with tracing.span("fraud_signals", attributes={"fraud_signals.mode": fraud_opts.get("mode")}):
+            pack["decisions"]["fraud_signals"] = resolve_fraud_signals(
+                client_id=str(client_id),
+                request_id=request_id,
+                seed=int(seed),
+                **fraud_opts,
+            )
 
     # Normalize stub meta to align with decision_pack meta_* (cara# hygiene)
-    if brms_flags is not None and args.brms_stub:
+    if brms_flags is not None and brms_stub_used:
         brms_flags["meta_request_id"] = pack["meta_request_id"]
         brms_flags["meta_generated_at"] = pack["meta_generated_at"]
 
 
     # BRMS bridge (online) — fail-open (MVP)
-    if (not args.no_brms) and args.brms_url:
+    brms_total = metrics_registry.counter("decision_brms_total", "BRMS flags source per decision", ("result",))
+    if brms_url:
+        t_brms = time.perf_counter()
         try:
-            brms_payload = {
-                "meta_request_id": request_id,
-                "meta_client_id": str(args.client_id),
-                "applicant": {"age": 30, "fico_credit_score": 700, "dti": 0.2, "employment_status": "EMPLOYED"},
-                "loan": {"loan_amount": 10000, "loan_term_months": 36},
-                "context": {"policy_id": "P1", "policy_version": "1.0", "validation_mode": "TEST"}
-            }
-            brms_flags = fetch_brms_flags(args.brms_url, brms_payload)
-            validate_required(brms_flags, REQUIRED_BRMS_FLAGS_V0_1, where="originate:brms_live")# MARKER: BRMS_FLAGS_SNAPSHOT_V0_1
-            # Persist BRMS flags snapshot for E2E debugging (best-effort)
-            try:
-                from pathlib import Path as _Path
-                import json as _json
-                _Path('tools/smoke/_logs').mkdir(parents=True, exist_ok=True)
-                _Path('tools/smoke/_logs/last_brms_flags.json').write_text(_json.dumps(brms_flags, indent=2, default=str), encoding='utf-8')
-            except Exception:
-                pass
+            brms_flags = accept_brms_flags(fetch_brms_flags(brms_url, brms_request_payload(request_id, client_id)), t_brms)
+            brms_total.inc(result="ok")
         except Exception as e:
             brms_flags = None
+            brms_total.inc(result="unavailable")
+    elif brms_live:
+        brms_total.inc(result="ok" if brms_flags is not None else "unavailable")
+    else:
+        brms_total.inc(result="stub" if brms_flags is not None else "skipped")
 
     if brms_flags is not None:
         pack["decisions"]["brms_flags"] = brms_flags
 
     # PolicyDecider v0.1 (pure) — emit final_decision_v0_1
 
-    pack["decisions"]["final_decision"] = policy_decider_v0_1(decision_pack=pack, brms_flags=brms_flags)
+    with tracing.span("policy_decider"):
+        pack["decisions"]["final_decision"] = policy_decider_v0_1(decision_pack=pack, brms_flags=brms_flags)
     pack["decisions"]["final_decision"]["meta_latency_ms"] = pack["meta_latency_ms"]
+    return pack
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--client-id", default=None, help="Required unless --serve-stdio")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--request-id", default=None)
+    ap.add_argument("--out", default=None, help="Optional path to write decision_pack json")
+    ap.add_argument("--brms-url", default="http://localhost:8082/bridge/brms_flags", help="BRMS flags endpoint (Block B -> ORIGINATE)")
+    ap.add_argument("--brms-stub", default=None, help="Path to brms_flags_v0_1 JSON (offline stub)")
+    ap.add_argument("--no-brms", action="store_true", help="Skip BRMS call (offline mode)")
+    ap.add_argument("--fraud-signals-mode", choices=["STUB", "LIVE"], default="STUB")
+    ap.add_argument("--fraud-signals-stub", default="tools/smoke/fixtures/fraud_signals_stub.json")
+    ap.add_argument("--fraud-signals-json", default=None, help="Optional pre-attached fraud signals JSON. If provided and valid, ORIGINATE consumes it instead of fetching.")
+    ap.add_argument("--fraud-sensor-base-url", default="http://127.0.0.1:9000")
+    ap.add_argument("--fraud-sensor-timeout-ms", type=int, default=1200)
+    ap.add_argument("--feature-store", default=None, help="Optional feature store file passed to T2/T3/T4 (runners/feature_store.py)")
+    ap.add_argument("--sensor-prefetch-json", default=None, help="sensor_prefetch_v0_1 from runners/sensor_bulk.py (LIVE wC/wB)")
+    ap.add_argument("--runtime-manifest", default=None, help="runtime_manifest_v0_1 file (or - for stdin); built from the canonical aliases when omitted")
+    ap.add_argument("--runtime-manifest-out", default=None, help="Optional path to write the runtime manifest used")
+    ap.add_argument("--fraud-device-high-thr", type=float, default=0.80)
+    ap.add_argument("--fraud-transaction-high-thr", type=float, default=0.80)
+    ap.add_argument("--fraud-double-high-action", choices=["REVIEW", "BLOCK"], default="REVIEW")
+    ap.add_argument(
+        "--coprocess",
+        action="store_true",
+        help="With --serve-stdio: T2/T3/T4 as pooled --serve-stdio co-processes (coprocess.py) instead of an interpreter per call",
+    )
+    ap.add_argument("--coprocess-timeout-s", type=float, default=None, help="Longest wait for one co-process answer (default 30)")
+    ap.add_argument(
+        "--serve-stdio",
+        action="store_true",
+        help="Stay alive: one {client_id, request_id, seed[, fraud_signals]} request per stdin line -> one decision_pack per stdout line "
+        "(with --coprocess the sub-agent pools are reused across requests)",
+    )
+    profiling.add_profile_args(ap)
+    tracing.add_trace_args(ap)
+    cassette.add_cassette_args(ap)
+    sensor_hedge.add_hedge_args(ap)
+    args = ap.parse_args()
+    if args.serve_stdio and args.runtime_manifest == "-":
+        ap.error("--serve-stdio reads requests from stdin: pass --runtime-manifest as a file")
+    if not args.serve_stdio and not args.client_id:
+        ap.error("--client-id is required (unless --serve-stdio)")
+    if args.coprocess and not args.serve_stdio:
+        # A one-shot run would start three pools to answer a single request.
+        ap.error("--coprocess needs --serve-stdio (the pools only pay off across requests)")
+    if args.sensor_hedge and not args.serve_stdio:
+        ap.error(sensor_hedge.ONE_SHOT_ERROR)
+    args.request_id = args.request_id or str(uuid.uuid4())
+    tracing.configure("originate", args.trace_out)
+    cassette.configure_from_args(args)
+    sensor_hedge.configure_from_args(args)
+    if args.serve_stdio:
+        return run_originate(args)  # one "originate" span per served request
+    with tracing.span("originate", attributes={"decision.request_id": args.request_id}):
+        return run_originate(args)
+
+
+SUB_AGENT_RUNNERS = {
+    "t2_default": "runners/runner_t2.py",
+    "t3_fraud": "runners/runner_t3.py",
+    "t4_payoff": "runners/runner_t4.py",
+}
+
+
+class SubAgents:
+    """
+    T2/T3/T4 calls: a child interpreter per call, or (--coprocess) one pooled
+    --serve-stdio co-process per sub-agent that loads its model once and stays alive.
+    """
+
+    def __init__(self, args: argparse.Namespace, manifest: Dict[str, Any]) -> None:
+        self.fs_args = ["--feature-store", args.feature_store] if args.feature_store else []
+        # Aliases resolved once; sub-agents get the same manifest (file path, else stdin).
+        if args.runtime_manifest and args.runtime_manifest != "-":
+            self.rm_args, self.rm_stdin = ["--runtime-manifest", args.runtime_manifest], None
+        else:
+            self.rm_args, self.rm_stdin = ["--runtime-manifest", "-"], manifest
+        self.pools: Optional[Dict[str, Any]] = None
+        if args.coprocess:
+            import coprocess
+
+            rm_args = self.rm_args
+            if self.rm_stdin is not None:
+                # A co-process's stdin carries requests: it gets the manifest as a file.
+                fd, path = tempfile.mkstemp(prefix="runtime_manifest_", suffix=".json")
+                os.close(fd)
+                runtime_manifest.write_manifest(manifest, path)
+                atexit.register(lambda: os.path.exists(path) and os.unlink(path))
+                rm_args = ["--runtime-manifest", path]
+            self.pools = {
+                name: coprocess.CoprocessPool(
+                    [sys.executable, runner, "--serve-stdio"] + self.fs_args + rm_args,
+                    timeout_s=args.coprocess_timeout_s or coprocess.DEFAULT_TIMEOUT_S,
+                    env=coprocess.child_env(),
+                )
+                for name, runner in SUB_AGENT_RUNNERS.items()
+            }
+
+    def call(self, name: str, *, client_id: str, seed: int, request_id: str) -> Dict[str, Any]:
+        if self.pools is not None:
+            req = {"client_id": client_id, "request_id": request_id, "seed": seed, "traceparent": tracing.current_traceparent()}
+            return self.pools[name].request(req)
+        cmd = [sys.executable, SUB_AGENT_RUNNERS[name], "--client-id", client_id, "--seed", str(seed), "--request-id", request_id]
+        return run_json(cmd + self.fs_args + self.rm_args, stdin_obj=self.rm_stdin)
+
+
+def run_originate(args: argparse.Namespace) -> int:
+    prof = profiling.profiler_from_args(args, "originate")
+    brms_stub_flags = None
+    if args.brms_stub:
+        brms_stub_flags = json.loads(Path(args.brms_stub).read_text(encoding="utf-8"))
+        validate_required(brms_stub_flags, REQUIRED_BRMS_FLAGS_V0_1, where="originate:brms_stub")
+        args.no_brms = True
+    with profiling.stage(prof, "manifest"):
+        manifest = runtime_manifest.get_manifest(args.runtime_manifest)
+    if args.runtime_manifest_out:
+        runtime_manifest.write_manifest(manifest, args.runtime_manifest_out)
+    agents = SubAgents(args, manifest)
+
+    fraud_opts = {
+        "mode": args.fraud_signals_mode,
+        "stub_path": args.fraud_signals_stub,
+        "sensor_base_url": args.fraud_sensor_base_url,
+        "sensor_timeout_ms": int(args.fraud_sensor_timeout_ms),
+        "device_high_thr": float(args.fraud_device_high_thr),
+        "tx_high_thr": float(args.fraud_transaction_high_thr),
+        "double_high_action": args.fraud_double_high_action,
+        "sensor_prefetch": load_prefetch(args.sensor_prefetch_json),
+    }
+
+    def originate_one(client_id: str, request_id: str, seed: int, fraud_signals: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        t0 = time.time()
+        kw = {"client_id": client_id, "seed": seed, "request_id": request_id}
+        with profiling.stage(prof, "t2_default"), tracing.span("t2_default"):
+            t2 = agents.call("t2_default", **kw)
+        validate_required(t2, REQUIRED_T2_V0_1, where="originate:t2_default")
+        with profiling.stage(prof, "t3_fraud"), tracing.span("t3_fraud"):
+            t3 = agents.call("t3_fraud", **kw)
+        validate_required(t3, REQUIRED_T3_V0_1, where="originate:t3_fraud")
+        with profiling.stage(prof, "t4_payoff"), tracing.span("t4_payoff"):
+            t4 = agents.call("t4_payoff", **kw)
+        validate_required(t4, REQUIRED_T4_V0_1, where="originate:t4_payoff")
+
+        latency_ms = int((time.time() - t0) * 1000)
+        with profiling.stage(prof, "assemble_pack"), tracing.span("assemble_pack"):
+            pack = assemble_pack(
+                client_id=client_id,
+                request_id=request_id,
+                seed=seed,
+                t2=t2,
+                t3=t3,
+                t4=t4,
+                manifest=manifest,
+                latency_ms=latency_ms,
+                brms_flags=copy.deepcopy(brms_stub_flags),
+                brms_stub_used=bool(args.brms_stub),
+                brms_url=None if args.no_brms else args.brms_url,
+                fraud_signals=fraud_signals,
+                fraud_opts=fraud_opts,
+            )
+        validate_required(pack["decisions"]["final_decision"], REQUIRED_FINAL_DECISION_V0_1, where="originate:final_decision")
+        return pack
+
+    if args.serve_stdio:
+        import coprocess
+
+        def handle(req: Dict[str, Any]) -> Dict[str, Any]:
+            if not str(req.get("client_id") or "").strip():
+                raise ValueError("Request requires client_id")
+            request_id = str(req.get("request_id") or uuid.uuid4())
+            with tracing.span("originate", traceparent=req.get("traceparent"), attributes={"decision.request_id": request_id}):
+                fs = req.get("fraud_signals") if isinstance(req.get("fraud_signals"), dict) else None
+                return originate_one(str(req["client_id"]), request_id, int(req.get("seed", 42)), fs)
 
+        return coprocess.serve_stdio(handle, component="originate")
 
-    validate_required(pack["decisions"]["final_decision"], REQUIRED_FINAL_DECISION_V0_1, where="originate:final_decision")
+    pack = originate_one(str(args.client_id), args.request_id, int(args.seed), _load_fraud_signals_attached(args.fraud_signals_json))
     if args.out:
         with open(args.out, "w", encoding="utf-8") as f:
             f.write(json.dumps(pack, indent=2) + "\n")
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Compressed, indexed decision-pack archive: random access by request_id.
+
+An archive is a directory:
+
+  archive.json   {"schema_version": "pack_archive_v0_1", "codec": "gzip" | "zstd"}
+  blocks.dat     independently compressed blocks, back to back; a block is up to
+                 --block-packs packs as compact JSON lines (gzip blocks: the file is a
+                 valid multi-member gzip, `zcat blocks.dat` prints every pack)
+  index.jsonl    one [request_id, block_offset, block_length, offset, length] per pack:
+                 the block's byte range in blocks.dat and the pack's range in the block
+
+A get() reads and decompresses exactly one block. Writers only append: a block and its
+index lines go in under an exclusive flock on archive.lock, so concurrent batch workers
+(processes) can write one archive. A block whose index lines never made it (writer killed
+in between) is unreachable, not corrupt. A request_id archived again: the newest wins.
+A reader picks up index lines appended after it opened on the next miss.
+
+zstd needs the optional `zstandard` package; gzip is the default.
+
+Usage:
+  python3 runners/pack_archive.py add --archive RUN/packs.archive --packs-dir RUN/packs
+  python3 runners/pack_archive.py get --archive RUN/packs.archive --request-id dev-0001-1424af5a
+  python3 runners/pack_archive.py scan --archive RUN/packs.archive --where decisions.final_decision.final_outcome=REJECT
+  python3 runners/pack_archive.py stats --archive RUN/packs.archive
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SCHEMA_VERSION = "pack_archive_v0_1"
+CODECS = ("gzip", "zstd")
+DEFAULT_BLOCK_PACKS = 128
+
+# request_id -> (block_offset, block_length, offset, length)
+IndexEntry = Tuple[int, int, int, int]
+
+
+class PackArchiveError(RuntimeError):
+    """Unknown request_id, codec mismatch, or a codec that is not installed."""
+
+
+def _codec_funcs(codec: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    if codec == "gzip":
+        return (lambda b: gzip.compress(b, compresslevel=6, mtime=0)), gzip.decompress
+    if codec == "zstd":
+        try:
+            import zstandard  # optional dependency
+        except ImportError as e:
+            raise PackArchiveError("codec zstd needs the zstandard package (pip install zstandard)") from e
+        return zstandard.ZstdCompressor(level=9).compress, zstandard.ZstdDecompressor().decompress
+    raise PackArchiveError(f"Unknown codec {codec!r} (expected one of {CODECS})")
+
+
+def _open_meta(root: Path, codec: Optional[str]) -> str:
+    """Codec of the archive at root; creates the archive (codec or gzip) when missing."""
+    meta_path = root / "archive.json"
+    if not meta_path.exists():
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = root / f".archive.json.{os.getpid()}"
+        tmp.write_text(json.dumps({"schema_version": SCHEMA_VERSION, "codec": codec or "gzip"}) + "\n", encoding="utf-8")
+        try:
+            os.link(tmp, meta_path)  # first writer wins; a racing writer reads its meta below
+        except FileExistsError:
+            pass
+        finally:
+            tmp.unlink()
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("schema_version") != SCHEMA_VERSION:
+        raise PackArchiveError(f"{meta_path}: not a {SCHEMA_VERSION} archive")
+    if codec is not None and meta["codec"] != codec:
+        raise PackArchiveError(f"{root} is a {meta['codec']} archive (asked for {codec})")
+    return str(meta["codec"])
+
+
+class PackArchiveWriter:
+    """Buffers packs into blocks; each full block is appended (block + index lines) under the archive lock."""
+
+    def __init__(self, root: str, *, codec: Optional[str] = None, block_packs: int = DEFAULT_BLOCK_PACKS) -> None:
+        self.root = Path(root)
+        self.codec = _open_meta(self.root, codec)
+        self._compress = _codec_funcs(self.codec)[0]
+        self.block_packs = max(int(block_packs), 1)
+        self._pending: List[Tuple[str, bytes]] = []
+        self.packs_written = 0
+        self.blocks_written = 0
+        self.bytes_raw = 0
+        self.bytes_compressed = 0
+
+    def add(self, pack: Dict[str, Any]) -> None:
+        request_id = pack.get("meta_request_id")
+        if not isinstance(request_id, str) or not request_id:
+            raise ValueError("decision pack without meta_request_id cannot be archived")
+        line = (json.dumps(pack, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+        self._pending.append((request_id, line))
+        if len(self._pending) >= self.block_packs:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        raw = b"".join(line for _, line in pending)
+        block = self._compress(raw)
+        lock_fd = os.open(self.root / "archive.lock", os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            fd = os.open(self.root / "blocks.dat", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                block_offset = os.fstat(fd).st_size
+                os.write(fd, block)
+            finally:
+                os.close(fd)
+            entries, offset = [], 0
+            for request_id, line in pending:
+                entries.append(json.dumps([request_id, block_offset, len(block), offset, len(line)], ensure_ascii=False) + "\n")
+                offset += len(line)
+            fd = os.open(self.root / "index.jsonl", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, "".join(entries).encode("utf-8"))
+            finally:
+                os.close(fd)
+        finally:
+            os.close(lock_fd)  # releases the flock
+        self.packs_written += len(pending)
+        self.blocks_written += 1
+        self.bytes_raw += len(raw)
+        self.bytes_compressed += len(block)
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "PackArchiveWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class PackArchiveReader:
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        if not (self.root / "archive.json").exists():
+            raise PackArchiveError(f"{root}: no pack archive here")
+        self.codec = _open_meta(self.root, None)
+        self._decompress = _codec_funcs(self.codec)[1]
+        self.index: Dict[str, IndexEntry] = {}
+        self._index_pos = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Load index lines appended since the last call (a torn last line waits for the next one)."""
+        path = self.root / "index.jsonl"
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            f.seek(self._index_pos)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                request_id, block_offset, block_length, offset, length = json.loads(line)
+                self.index[request_id] = (block_offset, block_length, offset, length)
+                self._index_pos += len(line)
+
+    def _block(self, block_offset: int, block_length: int) -> bytes:
+        with open(self.root / "blocks.dat", "rb") as f:
+            f.seek(block_offset)
+            return self._decompress(f.read(block_length))
+
+    def get(self, request_id: str) -> Dict[str, Any]:
+        entry = self.index.get(request_id)
+        if entry is None:
+            self.refresh()
+            entry = self.index.get(request_id)
+        if entry is None:
+            raise PackArchiveError(f"request_id {request_id!r} not in {self.root}")
+        block_offset, block_length, offset, length = entry
+        return json.loads(self._block(block_offset, block_length)[offset:offset + length])
+
+    def get_many(self, request_ids: List[str]) -> Iterator[Dict[str, Any]]:
+        """Packs in the order asked; each block is decompressed once per consecutive run of its ids."""
+        cached: Tuple[Optional[Tuple[int, int]], bytes] = (None, b"")
+        for request_id in request_ids:
+            if request_id not in self.index:
+                self.refresh()
+            entry = self.index.get(request_id)
+            if entry is None:
+                raise PackArchiveError(f"request_id {request_id!r} not in {self.root}")
+            block_offset, block_length, offset, length = entry
+            if cached[0] != (block_offset, block_length):
+                cached = ((block_offset, block_length), self._block(block_offset, block_length))
+            yield json.loads(cached[1][offset:offset + length])
+
+    def scan(self) -> Iterator[Dict[str, Any]]:
+        """Every indexed pack in archive order (superseded copies of a request_id skipped)."""
+        self.refresh()
+        blocks: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for block_offset, block_length, offset, length in self.index.values():
+            blocks.setdefault((block_offset, block_length), []).append((offset, length))
+        for block_key in sorted(blocks):
+            data = self._block(*block_key)
+            for offset, length in sorted(blocks[block_key]):
+                yield json.loads(data[offset:offset + length])
+
+    def stats(self) -> Dict[str, Any]:
+        self.refresh()
+        blocks = {(e[0], e[1]) for e in self.index.values()}
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "archive": str(self.root),
+            "codec": self.codec,
+            "packs": len(self.index),
+            "blocks": len(blocks),
+            "blocks_bytes": (self.root / "blocks.dat").stat().st_size if (self.root / "blocks.dat").exists() else 0,
+            "index_bytes": self._index_pos,
+        }
+
+
+# --- CLI -------------------------------------------------------------------------
+
+def _get_path(obj: Any, dotted: str) -> Any:
+    for part in dotted.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(part)
+    return obj
+
+
+def _matches(pack: Dict[str, Any], where: List[Tuple[str, str]]) -> bool:
+    for path, expected in where:
+        v = _get_path(pack, path)
+        got = v if isinstance(v, str) else json.dumps(v)
+        if got != expected:
+            return False
+    return True
+
+
+def _iter_packs(packs_dir: Optional[str], packs_jsonl: Optional[str]) -> Iterator[Dict[str, Any]]:
+    if packs_dir:
+        for name in sorted(e.name for e in os.scandir(packs_dir) if e.name.endswith(".json") and e.is_file()):
+            with open(os.path.join(packs_dir, name), "r", encoding="utf-8") as f:
+                yield json.load(f)
+        return
+    f = sys.stdin if packs_jsonl == "-" else open(str(packs_jsonl), "r", encoding="utf-8")
+    try:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compressed, indexed decision-pack archive (pack_archive_v0_1)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    a = sub.add_parser("add", help="Append packs (directory of pack files or packs JSONL)")
+    a.add_argument("--archive", required=True)
+    a.add_argument("--packs-dir", default=None)
+    a.add_argument("--packs-jsonl", default=None, help="One pack per line (- for stdin)")
+    a.add_argument("--codec", choices=CODECS, default=None, help="New archive codec (default gzip); must match an existing archive")
+    a.add_argument("--block-packs", type=int, default=DEFAULT_BLOCK_PACKS)
+    g = sub.add_parser("get", help="Packs by request_id")
+    g.add_argument("--archive", required=True)
+    g.add_argument("--request-id", action="append", required=True, help="Repeatable; one id prints an indented pack, more print JSONL")
+    s = sub.add_parser("scan", help="Every pack (JSONL), optionally filtered")
+    s.add_argument("--archive", required=True)
+    s.add_argument("--where", action="append", default=[], help="dotted.path=value (repeatable, all must match)")
+    s.add_argument("--limit", type=int, default=None)
+    st = sub.add_parser("stats")
+    st.add_argument("--archive", required=True)
+    args = ap.parse_args()
+
+    try:
+        if args.cmd == "add":
+            if bool(args.packs_dir) == bool(args.packs_jsonl):
+                ap.error("add needs exactly one of --packs-dir / --packs-jsonl")
+            with PackArchiveWriter(args.archive, codec=args.codec, block_packs=args.block_packs) as w:
+                for pack in _iter_packs(args.packs_dir, args.packs_jsonl):
+                    w.add(pack)
+            print(json.dumps({
+                "archive": args.archive,
+                "codec": w.codec,
+                "packs_added": w.packs_written,
+                "blocks_added": w.blocks_written,
+                "bytes_raw": w.bytes_raw,
+                "bytes_compressed": w.bytes_compressed,
+                "ratio": round(w.bytes_compressed / w.bytes_raw, 4) if w.bytes_raw else None,
+            }, indent=2))
+            return 0
+
+        reader = PackArchiveReader(args.archive)
+        if args.cmd == "get":
+            packs = list(reader.get_many(args.request_id))
+            if len(packs) == 1:
+                print(json.dumps(packs[0], indent=2))
+            else:
+                for pack in packs:
+                    print(json.dumps(pack, ensure_ascii=False))
+            return 0
+        if args.cmd == "scan":
+            where = []
+            for w in args.where:
+                path, sep, value = w.partition("=")
+                if not sep:
+                    ap.error(f"--where expects path=value, got {w!r}")
+                where.append((path, value))
+            n = 0
+            for pack in reader.scan():
+                if args.limit is not None and n >= args.limit:
+                    break
+                if _matches(pack, where):
+                    sys.stdout.write(json.dumps(pack, ensure_ascii=False) + "\n")
+                    n += 1
+            return 0
+        print(json.dumps(reader.stats(), indent=2))
+        return 0
+    except PackArchiveError as e:
+        print(f"[pack_archive] {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
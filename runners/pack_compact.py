@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Compact decision-pack profile (storage / transfer at volume) with a lossless expander.
+
+A compact run file is JSONL. What every row of a run repeats is stored once, in a
+profile record written before the first row that uses it:
+
+  {"meta_schema_version": "decision_pack_profile_v0_1", "profile_ref": "<16 hex>", "profile": {...}}
+  {"meta_schema_version": "decision_pack_compact_v0_1", "profile_ref": "<16 hex>", "meta_request_id": ..., "decisions": {...}}
+
+A profile holds:
+  - pack-level shared fields: meta_schema_version, meta_brms_policy_snapshot, meta_runtime_manifest_hash
+  - per block, its static fields (schema version, model tag / file, operating point or
+    threshold mode, threshold, policy id / version)
+  - per block, which of meta_request_id / meta_client_id equal the pack's (dropped from the row)
+  - value references: final_decision.b_summary == brms_flags.gates (dropped from the row)
+Rows with the same shared metadata share one profile (ref = content hash), so an
+early-cut pack and a full pack of the same run give two profiles, not one per row.
+
+In the rows, a block's meta_generated_at becomes its offset from the pack's in
+microseconds (an int) when that round-trips to the exact same string; another string
+stays as is and a non-string value is wrapped in a one-item list.
+
+expand(compact(pack)) == pack as a JSON value (key order aside).
+
+Usage:
+  python3 runners/pack_compact.py compact --packs-jsonl packs.jsonl --out run.compact.jsonl [--verify]
+  python3 runners/pack_compact.py compact --packs-dir RUN/packs --out run.compact.jsonl
+  python3 runners/pack_compact.py expand --in run.compact.jsonl --out packs.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+COMPACT_SCHEMA_VERSION = "decision_pack_compact_v0_1"
+PROFILE_SCHEMA_VERSION = "decision_pack_profile_v0_1"
+
+PACK_SHARED_KEYS = ("meta_schema_version", "meta_brms_policy_snapshot", "meta_runtime_manifest_hash")
+BLOCK_STATIC_KEYS: Dict[str, Tuple[str, ...]] = {
+    "workflow_intake": ("meta_schema_version",),
+    "eligibility": ("meta_schema_version",),
+    "t2_default": ("meta_schema_version", "meta_model_tag", "meta_model_file", "meta_operating_point", "thr_default"),
+    "t3_fraud": ("meta_schema_version", "meta_model_tag", "meta_model_file", "meta_threshold_mode", "thr_fraud"),
+    "t4_payoff": ("meta_schema_version", "meta_model_tag", "meta_model_file", "meta_threshold_mode", "thr_payoff"),
+    "fraud_signals": ("meta_schema_version",),
+    "brms_flags": ("meta_schema_version", "meta_policy_id", "meta_policy_version", "meta_validation_mode"),
+    "final_decision": ("meta_schema_version", "policy_id", "policy_version"),
+}
+INHERIT_KEYS = ("meta_request_id", "meta_client_id")
+# (block, key) whose value is another block's field in the same pack.
+VALUE_REFS: Dict[Tuple[str, str], Tuple[str, str]] = {
+    ("final_decision", "b_summary"): ("brms_flags", "gates"),
+}
+_US = timedelta(microseconds=1)
+
+
+class PackCompactError(ValueError):
+    """A compact row that cannot be expanded (unknown profile, not a compact row)."""
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _ts_offset(value: Any, base: Optional[datetime]) -> Any:
+    """Offset in microseconds from base when it rebuilds exactly this string, else value ([value] if not a string)."""
+    if not isinstance(value, str):
+        return [value]
+    ts = _parse_ts(value)
+    if base is None or ts is None or ts.tzinfo is None or base.tzinfo is None:
+        return value
+    offset = (ts - base) // _US
+    return offset if (base + offset * _US).isoformat() == value else value
+
+
+def profile_ref(profile: Dict[str, Any]) -> str:
+    raw = json.dumps(profile, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def compact_pack(pack: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(profile, compact row) for one decision_pack_v0_1; the input is not modified."""
+    profile: Dict[str, Any] = {"pack": {}, "decisions": {}}
+    row: Dict[str, Any] = {"meta_schema_version": COMPACT_SCHEMA_VERSION, "profile_ref": None}
+    for k, v in pack.items():
+        if k in PACK_SHARED_KEYS:
+            profile["pack"][k] = v
+        elif k != "decisions":
+            row[k] = v
+
+    decisions = pack.get("decisions")
+    if not isinstance(decisions, dict):
+        if "decisions" in pack:
+            row["decisions"] = decisions
+        profile["pack"]["has_decisions"] = "decisions" in pack
+        row["profile_ref"] = profile_ref(profile)
+        return profile, row
+
+    base_ts = _parse_ts(pack.get("meta_generated_at"))
+    out_decisions: Dict[str, Any] = {}
+    for name, block in decisions.items():
+        if not isinstance(block, dict):
+            out_decisions[name] = block
+            continue
+        static = {k: block[k] for k in BLOCK_STATIC_KEYS.get(name, ()) if k in block}
+        inherit = [k for k in INHERIT_KEYS if k in block and k in pack and block[k] == pack[k]]
+        refs = {}
+        for (ref_block, key), (src_block, src_key) in VALUE_REFS.items():
+            src = decisions.get(src_block)
+            if ref_block == name and key in block and isinstance(src, dict) and src_key in src and src[src_key] == block[key]:
+                refs[key] = [src_block, src_key]
+        out: Dict[str, Any] = {}
+        for k, v in block.items():
+            if k in static or k in inherit or k in refs:
+                continue
+            out[k] = _ts_offset(v, base_ts) if k == "meta_generated_at" else v
+        out_decisions[name] = out
+        entry: Dict[str, Any] = {}
+        if static:
+            entry["static"] = static
+        if inherit:
+            entry["inherit"] = inherit
+        if refs:
+            entry["refs"] = refs
+        if entry:
+            profile["decisions"][name] = entry
+    row["decisions"] = out_decisions
+    row["profile_ref"] = profile_ref(profile)
+    return profile, row
+
+
+def expand_pack(row: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    """The decision_pack_v0_1 compact_pack() was given."""
+    if row.get("meta_schema_version") != COMPACT_SCHEMA_VERSION:
+        raise PackCompactError(f"Not a {COMPACT_SCHEMA_VERSION} row: {row.get('meta_schema_version')!r}")
+    shared = dict(profile.get("pack") or {})
+    has_decisions = shared.pop("has_decisions", True)
+    pack: Dict[str, Any] = copy.deepcopy(shared)
+    for k, v in row.items():
+        if k not in ("meta_schema_version", "profile_ref", "decisions"):
+            pack[k] = copy.deepcopy(v)
+
+    decisions = row.get("decisions")
+    if not isinstance(decisions, dict):
+        if has_decisions:
+            pack["decisions"] = copy.deepcopy(decisions)
+        return pack
+
+    base_ts = _parse_ts(pack.get("meta_generated_at"))
+    entries = profile.get("decisions") or {}
+    out: Dict[str, Any] = {}
+    for name, block in decisions.items():
+        if not isinstance(block, dict):
+            out[name] = copy.deepcopy(block)
+            continue
+        entry = entries.get(name) or {}
+        full = copy.deepcopy(entry.get("static") or {})
+        for k in entry.get("inherit") or ():
+            full[k] = pack[k]
+        for k, v in block.items():
+            if k == "meta_generated_at" and isinstance(v, int) and not isinstance(v, bool) and base_ts is not None:
+                full[k] = (base_ts + v * _US).isoformat()
+            elif k == "meta_generated_at" and isinstance(v, list):
+                full[k] = copy.deepcopy(v[0])
+            else:
+                full[k] = copy.deepcopy(v)
+        out[name] = full
+    for name, entry in entries.items():
+        for k, (src_block, src_key) in (entry.get("refs") or {}).items():
+            out[name][k] = copy.deepcopy(out[src_block][src_key])
+    pack["decisions"] = out
+    return pack
+
+
+class PackCompactor:
+    """Streaming compactor: records() yields the profile record the first time a ref is seen."""
+
+    def __init__(self) -> None:
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+
+    def records(self, pack: Dict[str, Any]) -> List[Dict[str, Any]]:
+        profile, row = compact_pack(pack)
+        ref = row["profile_ref"]
+        out: List[Dict[str, Any]] = []
+        if ref not in self.profiles:
+            self.profiles[ref] = profile
+            out.append({"meta_schema_version": PROFILE_SCHEMA_VERSION, "profile_ref": ref, "profile": profile})
+        out.append(row)
+        return out
+
+
+class PackExpander:
+    """Streaming expander: feed() every record of a compact run file in order."""
+
+    def __init__(self) -> None:
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+
+    def feed(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if record.get("meta_schema_version") == PROFILE_SCHEMA_VERSION:
+            self.profiles[str(record["profile_ref"])] = record["profile"]
+            return None
+        ref = record.get("profile_ref")
+        if ref not in self.profiles:
+            raise PackCompactError(f"Unknown profile_ref {ref!r} (profile records must precede their rows)")
+        return expand_pack(record, self.profiles[ref])
+
+
+# --- CLI -------------------------------------------------------------------------
+
+def _iter_packs(packs_dir: Optional[str], packs_jsonl: Optional[str]) -> Iterator[Dict[str, Any]]:
+    if packs_dir:
+        for name in sorted(e.name for e in os.scandir(packs_dir) if e.name.endswith(".json") and e.is_file()):
+            with open(os.path.join(packs_dir, name), "r", encoding="utf-8") as f:
+                yield json.load(f)
+        return
+    f = sys.stdin if packs_jsonl == "-" else open(str(packs_jsonl), "r", encoding="utf-8")
+    try:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _dumps(obj: Dict[str, Any]) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compact / expand decision packs (decision_pack_compact_v0_1)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("compact", help="decision_pack_v0_1 packs -> one compact run file")
+    c.add_argument("--packs-dir", default=None, help="Every *.json pack in this directory (name order)")
+    c.add_argument("--packs-jsonl", default=None, help="One pack per line (- for stdin)")
+    c.add_argument("--out", required=True)
+    c.add_argument("--verify", action="store_true", help="Expand every row again and compare with its pack (exit 1 on a difference)")
+    e = sub.add_parser("expand", help="Compact run file -> decision_pack_v0_1 per line")
+    e.add_argument("--in", dest="inp", required=True)
+    e.add_argument("--out", default="-", help="Packs JSONL (default stdout)")
+    args = ap.parse_args()
+
+    if args.cmd == "compact":
+        if bool(args.packs_dir) == bool(args.packs_jsonl):
+            ap.error("compact needs exactly one of --packs-dir / --packs-jsonl")
+        compactor = PackCompactor()
+        expander = PackExpander() if args.verify else None
+        packs = bytes_in = bytes_out = 0
+        mismatches: List[str] = []
+        with open(args.out, "w", encoding="utf-8") as f:
+            for pack in _iter_packs(args.packs_dir, args.packs_jsonl):
+                packs += 1
+                bytes_in += len(_dumps(pack).encode("utf-8")) + 1
+                for rec in compactor.records(pack):
+                    line = _dumps(rec)
+                    bytes_out += len(line.encode("utf-8")) + 1
+                    f.write(line + "\n")
+                    back = expander.feed(rec) if expander is not None else None
+                    if back is not None and back != pack:
+                        mismatches.append(str(pack.get("meta_request_id")))
+        summary: Dict[str, Any] = {
+            "schema_version": "pack_compact_summary_v0_1",
+            "out": args.out,
+            "packs": packs,
+            "profiles": len(compactor.profiles),
+            "bytes_in_jsonl": bytes_in,
+            "bytes_out": bytes_out,
+            "ratio": round(bytes_out / bytes_in, 4) if bytes_in else None,
+        }
+        if args.verify:
+            summary["verify"] = {"compared": packs, "mismatches": mismatches[:20], "mismatch_count": len(mismatches)}
+        print(json.dumps(summary, indent=2))
+        return 1 if mismatches else 0
+
+    expander = PackExpander()
+    src = open(args.inp, "r", encoding="utf-8")
+    dst = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        for line in src:
+            if line.strip():
+                pack = expander.feed(json.loads(line))
+                if pack is not None:
+                    dst.write(json.dumps(pack, ensure_ascii=False) + "\n")
+    finally:
+        src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
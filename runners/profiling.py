@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Per-stage cProfile (and optional tracemalloc) hooks for the runners.
+
+A run with --profile writes one pstats file per stage and process:
+
+  <profile-dir>/<component>.<stage>.<pid>.<n>.pstats
+  <profile-dir>/<component>.<stage>.<pid>.<n>.alloc.json   (--profile-memory: top allocations)
+
+The flags are exported as DECISION_PROFILE_DIR / DECISION_PROFILE_MEMORY, so child runners
+(originate.py -> runner_t2/t3/t4.py) profile their own stages into the same directory.
+A stage spent waiting on a child shows up as subprocess wait; the child's files hold the work.
+
+`merge` sums every file of a stage (all rows, all processes) into <out>/<component>.<stage>.pstats,
+a collapsed-stack file <out>/<component>.<stage>.collapsed (flamegraph.pl / speedscope input),
+the same two for the whole run (all.pstats / all.collapsed) and allocations.json.
+Collapsed stacks are rebuilt from the pstats caller graph: a function's own time is split over
+its callers in proportion to their cumulative time, so deep paths are approximate.
+
+Usage:
+  python3 runners/originate.py ... --profile --profile-dir /tmp/prof [--profile-memory]
+  python3 runners/profiling.py merge --dir /tmp/prof --out /tmp/prof/merged
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILE_DIR_ENV = "DECISION_PROFILE_DIR"
+PROFILE_MEMORY_ENV = "DECISION_PROFILE_MEMORY"
+DEFAULT_PROFILE_DIR = "tools/smoke/_logs/profile"
+ALLOC_TOP_N = 25
+COLLAPSED_MAX_DEPTH = 64
+COLLAPSED_MAX_PATHS = 20000  # caller splits stop below total / this (bounds the walk)
+
+# cProfile / pstats / tracemalloc are imported where used: a run without --profile
+# imports this module on every runner start and must not pay for them.
+
+
+def _alloc_exclude() -> List[Any]:
+    """The profiler's own bookkeeping is not the stage's allocation."""
+    import cProfile
+    import tracemalloc
+
+    return [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, contextlib.__file__),
+    ]
+
+
+class StageProfiler:
+    """One cProfile.Profile per stage; stages run one after the other (cProfile cannot nest)."""
+
+    def __init__(self, out_dir: str, component: str, *, memory: bool = False) -> None:
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.component = component
+        self.memory = memory
+        self.files: List[str] = []
+        self._active: Optional[str] = None
+        self._seq = 0
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        import cProfile
+        import tracemalloc
+
+        if self._active is not None:
+            yield  # nested: stays in the outer stage's profile
+            return
+        self._active = name
+        started_tracing = False
+        mem_before = None
+        alloc_exclude = _alloc_exclude() if self.memory else []
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                started_tracing = True
+            mem_before = tracemalloc.take_snapshot().filter_traces(alloc_exclude)
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            mem_after = tracemalloc.take_snapshot().filter_traces(alloc_exclude) if mem_before is not None else None
+            self._active = None
+            self._seq += 1
+            base = self.out_dir / f"{self.component}.{name}.{os.getpid()}.{self._seq}"
+            prof.dump_stats(str(base) + ".pstats")
+            self.files.append(str(base) + ".pstats")
+            if mem_after is not None:
+                diff = mem_after.compare_to(mem_before, "lineno")
+                top = [
+                    {"where": str(d.traceback[0]), "size_diff_kb": round(d.size_diff / 1024.0, 3), "count_diff": d.count_diff}
+                    for d in diff[:ALLOC_TOP_N]
+                ]
+                Path(str(base) + ".alloc.json").write_text(json.dumps(top, indent=2), encoding="utf-8")
+                if started_tracing:
+                    tracemalloc.stop()
+
+
+def from_env(component: str) -> Optional[StageProfiler]:
+    """Profiler for a child runner when a parent run exported DECISION_PROFILE_DIR."""
+    out_dir = os.environ.get(PROFILE_DIR_ENV)
+    if not out_dir:
+        return None
+    return StageProfiler(out_dir, component, memory=os.environ.get(PROFILE_MEMORY_ENV) == "1")
+
+
+def add_profile_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--profile", action="store_true", help="cProfile every stage (also in child runners) into --profile-dir")
+    ap.add_argument("--profile-dir", default=DEFAULT_PROFILE_DIR, help="Where per-stage .pstats files go")
+    ap.add_argument("--profile-memory", action="store_true", help="With --profile: tracemalloc top allocations per stage")
+
+
+def profiler_from_args(args: argparse.Namespace, component: str) -> Optional[StageProfiler]:
+    if not args.profile:
+        return from_env(component)
+    os.environ[PROFILE_DIR_ENV] = args.profile_dir
+    os.environ[PROFILE_MEMORY_ENV] = "1" if args.profile_memory else "0"
+    return StageProfiler(args.profile_dir, component, memory=args.profile_memory)
+
+
+def stage(prof: Optional[StageProfiler], name: str) -> Any:
+    """prof.stage(name), or a no-op context when profiling is off."""
+    return prof.stage(name) if prof is not None else contextlib.nullcontext()
+
+
+# --- Merge -----------------------------------------------------------------------
+
+_ADDR_RE = re.compile(r" at 0x[0-9a-f]+")
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return _ADDR_RE.sub("", name)  # builtins: "<built-in method ...>", minus the object address
+    return f"{Path(filename).name}:{name}:{line}"
+
+
+def collapsed_stacks(stats: Any) -> Dict[str, float]:
+    """Folded stacks ("root;...;leaf" -> microseconds of own time) from a pstats.Stats caller graph."""
+    raw = stats.stats  # type: ignore[attr-defined]
+    out: Dict[str, float] = defaultdict(float)
+    min_us = max(sum(v[2] for v in raw.values()) * 1e6 / COLLAPSED_MAX_PATHS, 1.0)
+
+    def walk(func: Tuple[str, int, str], weight: float, path: List[str], seen: frozenset) -> None:
+        callers = raw.get(func, (0, 0, 0.0, 0.0, {}))[4]
+        if not callers or len(path) >= COLLAPSED_MAX_DEPTH or func in seen or weight < min_us:
+            out[";".join(reversed(path))] += weight
+            return
+        total = sum(c[3] for c in callers.values())
+        for caller, c in callers.items():
+            share = c[3] / total if total > 0 else 1.0 / len(callers)
+            walk(caller, weight * share, path + [_label(caller)], seen | {func})
+
+    for func, (_, _, tt, _, _) in raw.items():
+        if tt > 0:
+            walk(func, tt * 1e6, [_label(func)], frozenset())
+    return out
+
+
+def write_collapsed(stats: Any, path: Path) -> None:
+    lines = [f"{stack} {int(round(us))}" for stack, us in sorted(collapsed_stacks(stats).items()) if us >= 0.5]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def merge_profiles(profile_dir: str, out_dir: str) -> Dict[str, Any]:
+    import pstats
+
+    src, out = Path(profile_dir), Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for p in sorted(src.glob("*.pstats")):
+        parts = p.name.split(".")
+        if len(parts) < 5:
+            continue  # already merged output
+        groups[".".join(parts[:-3])].append(str(p))
+
+    summary: Dict[str, Any] = {"schema_version": "profile_merge_v0_1", "profile_dir": str(src), "stages": {}}
+    every: List[str] = []
+    for key, files in sorted(groups.items()):
+        stats = pstats.Stats(*files)
+        stats.dump_stats(str(out / f"{key}.pstats"))
+        write_collapsed(stats, out / f"{key}.collapsed")
+        summary["stages"][key] = {"files": len(files), "total_tt_s": round(stats.total_tt, 6)}  # type: ignore[attr-defined]
+        every.extend(files)
+    if every:
+        stats = pstats.Stats(*every)
+        stats.dump_stats(str(out / "all.pstats"))
+        write_collapsed(stats, out / "all.collapsed")
+
+    allocs: Dict[str, Dict[str, float]] = defaultdict(lambda: {"size_diff_kb": 0.0, "count_diff": 0})
+    for p in src.glob("*.alloc.json"):
+        for a in json.loads(p.read_text(encoding="utf-8")):
+            allocs[a["where"]]["size_diff_kb"] += a["size_diff_kb"]
+            allocs[a["where"]]["count_diff"] += a["count_diff"]
+    if allocs:
+        top = sorted(({"where": k, **v} for k, v in allocs.items()), key=lambda a: -abs(a["size_diff_kb"]))[: 2 * ALLOC_TOP_N]
+        (out / "allocations.json").write_text(json.dumps(top, indent=2), encoding="utf-8")
+        summary["allocations_json"] = str(out / "allocations.json")
+
+    summary["files"] = len(every)
+    (out / "profile_summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Merge per-stage profiles into pstats + collapsed stacks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("merge")
+    m.add_argument("--dir", required=True)
+    m.add_argument("--out", required=True)
+    m.add_argument("--top", type=int, default=0, help="Also print the N hottest functions (cumulative) of the run")
+    args = ap.parse_args()
+
+    summary = merge_profiles(args.dir, args.out)
+    print(json.dumps(summary, indent=2))
+    if args.top and summary["files"]:
+        import pstats
+
+        pstats.Stats(str(Path(args.out) / "all.pstats")).sort_stats("cumulative").print_stats(args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,7 +8,14 @@ import urllib.parse
 import urllib.request
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import cassette
+import metrics_registry
+import runtime_manifest
+import sensor_hedge
+import tracing
+from sensor_bulk import load_prefetch, prefetched_sensor
 
 DEFAULT_CANONICAL_ALIAS = "/home/adien/loan_backbone_ml_BLOCK_A_AGENTS/block_a_gov/artifacts/eligibility_canonical.json"
 
@@ -105,22 +112,60 @@ def evaluate_rules(intake: Dict[str, Any], alias: Dict[str, Any]) -> Tuple[str,
 
 
 def fetch_json(url: str, timeout_s: float) -> Dict[str, Any]:
-    req = urllib.request.Request(url, method="GET")
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        body = resp.read().decode("utf-8")
-    data = json.loads(body)
+    path = urllib.parse.urlsplit(url).path
+
+    def get() -> Any:
+        req = urllib.request.Request(url, method="GET", headers=tracing.inject({}))
+        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    with tracing.span(f"GET {path}", kind="CLIENT", attributes={"http.method": "GET", "url.path": path}):
+        data = sensor_hedge.call("GET", url, lambda: cassette.call("GET", url, get))
     if not isinstance(data, dict):
         raise ValueError("Expected dict JSON response")
     return data
 
 
+def _bureau_url(base: str, client_id: str, request_id: str) -> str:
+    q = urllib.parse.urlencode({"client_id": client_id, "lookback_hours": 24, "request_id": request_id})
+    return f"{base}/sensor/bureau_spike_score?{q}"
+
+
+def _market_url(base: str, request_id: str, as_of: Any) -> str:
+    params = {"request_id": request_id}
+    if as_of:
+        params["as_of"] = str(as_of)
+    return f"{base}/sensor/market_snapshot?{urllib.parse.urlencode(params)}"
+
+
+def sensor_urls(intake: Dict[str, Any], sensor_base_url: str, sensor_prefetch: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """{sensor: GET url} that a LIVE resolve_dynamic_sensors would send (prefetched sensors excluded)."""
+    client_id = str(intake.get("meta_client_id", "")).strip()
+    request_id = str(intake.get("meta_request_id", "")).strip()
+    base = sensor_base_url.rstrip("/")
+    urls = {
+        "bureau_spike_score": _bureau_url(base, client_id, request_id),
+        "market_snapshot": _market_url(base, request_id, intake.get("meta_as_of_ts")),
+    }
+    return {s: u for s, u in urls.items() if sensor_prefetch is None or prefetched_sensor(sensor_prefetch, request_id, s, client_id=client_id) is None}
+
+
 def resolve_dynamic_sensors(
     intake: Dict[str, Any],
     alias: Dict[str, Any],
     sensor_mode: str,
     sensor_base_url: str,
     sensor_timeout_ms: int,
+    sensor_prefetch: Optional[Dict[str, Any]] = None,
+    fetched: Optional[Dict[str, Tuple[Any, float]]] = None,
 ) -> Tuple[Dict[str, Any], str]:
+    """
+    LIVE: wE (bureau spike) + wF (market snapshot), each with its own STUB fallback.
+    Rows present in sensor_prefetch (sensor_bulk.py) skip the HTTP call; a failed
+    prefetched item falls back exactly like a failed fetch.
+    fetched: {url: (payload or exception, latency_ms)} the caller already sent
+    (decision_async.py, see sensor_urls); those URLs are not fetched again.
+    """
     ds = dict(intake.get("dynamic_sensors_for_eligibility", {}) or {})
     mode_used = "STUB"
     if sensor_mode.upper() != "LIVE":
@@ -137,29 +182,41 @@ def resolve_dynamic_sensors(
 
     mode_used = "LIVE"
 
+    def get(url: str) -> Tuple[Dict[str, Any], float]:
+        if fetched is not None and url in fetched:
+            got, ms = fetched[url]
+            if isinstance(got, BaseException):
+                raise got
+            return got, ms
+        ts = time.perf_counter()
+        return fetch_json(url, timeout_s=timeout_s), (time.perf_counter() - ts) * 1000.0
+
     # wE -> derive employment verified from bureau spike score
     try:
-        q = urllib.parse.urlencode(
-            {
-                "client_id": client_id,
-                "lookback_hours": 24,
-                "request_id": request_id,
-            }
-        )
-        we = fetch_json(f"{base}/sensor/bureau_spike_score?{q}", timeout_s=timeout_s)
+        ts = time.perf_counter()
+        we = prefetched_sensor(sensor_prefetch, request_id, "bureau_spike_score", client_id=client_id)
+        we_fetch, we_ms = "BATCH", (time.perf_counter() - ts) * 1000.0
+        if we is None:
+            we_fetch = "SINGLE"
+            we, we_ms = get(_bureau_url(base, client_id, request_id))
+        metrics_registry.observe_sensor("bureau_spike_score", we_ms, we_fetch)
         bureau_score = float(we.get("bureau_spike_score_24h"))
         ds["dyn_bureau_employment_verified"] = bureau_score < bureau_unverified_thr
     except Exception as e:
         _eprint(f"[ELIGIBILITY][LIVE->STUB] wE fallback engaged: {e}")
+        metrics_registry.observe_sensor_fallback("bureau_spike_score", e)
         mode_used = "LIVE_FALLBACK"
 
     # wF -> market stress score
     try:
-        wf_params = {"request_id": request_id}
-        if as_of:
-            wf_params["as_of"] = str(as_of)
-        q = urllib.parse.urlencode(wf_params)
-        wf = fetch_json(f"{base}/sensor/market_snapshot?{q}", timeout_s=timeout_s)
+        # A prefetched snapshot already went through the retry-without-as_of rule.
+        ts = time.perf_counter()
+        wf = prefetched_sensor(sensor_prefetch, request_id, "market_snapshot", client_id=client_id)
+        wf_fetch, wf_ms = "BATCH", (time.perf_counter() - ts) * 1000.0
+        if wf is None:
+            wf_fetch = "SINGLE"
+            wf, wf_ms = get(_market_url(base, request_id, as_of))
+        metrics_registry.observe_sensor("market_snapshot", wf_ms, wf_fetch)
         ds["dyn_market_stress_score_7d"] = float(wf.get("market_stress_score_7d"))
     except Exception as e:
         # Common case: DS_Z returns 400 when provided as_of is not in snapshot range.
@@ -167,14 +224,14 @@ def resolve_dynamic_sensors(
         retried_ok = False
         if as_of and isinstance(e, urllib.error.HTTPError) and e.code == 400:
             try:
-                q = urllib.parse.urlencode({"request_id": request_id})
-                wf = fetch_json(f"{base}/sensor/market_snapshot?{q}", timeout_s=timeout_s)
+                wf, _ = get(_market_url(base, request_id, None))
                 ds["dyn_market_stress_score_7d"] = float(wf.get("market_stress_score_7d"))
                 retried_ok = True
             except Exception as e2:
                 _eprint(f"[ELIGIBILITY][LIVE->STUB] wF retry-without-as_of failed: {e2}")
         if not retried_ok:
             _eprint(f"[ELIGIBILITY][LIVE->STUB] wF fallback engaged: {e}")
+            metrics_registry.observe_sensor_fallback("market_snapshot", e)
             mode_used = "LIVE_FALLBACK"
 
     return ds, mode_used
@@ -218,33 +275,94 @@ def validate_output(payload: Dict[str, Any]) -> None:
         raise ValueError("meta_sensor_mode_used must be string")
 
 
+def run_eligibility(
+    intake: Dict[str, Any],
+    alias: Dict[str, Any],
+    *,
+    sensor_mode: str = "STUB",
+    sensor_base_url: str = "http://127.0.0.1:9000",
+    sensor_timeout_ms: int = 1200,
+    sensor_prefetch: Optional[Dict[str, Any]] = None,
+    t0: float | None = None,
+    fetched: Optional[Dict[str, Tuple[Any, float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate one intake in process -> validated eligibility_agent_status_v0_1.
+    The caller's intake is not mutated (resolved sensors go into a shallow copy).
+    """
+    t0 = time.time() if t0 is None else t0
+    validate_intake_min(intake)
+    resolved_ds, sensor_mode_used = resolve_dynamic_sensors(
+        intake=intake,
+        alias=alias,
+        sensor_mode=sensor_mode,
+        sensor_base_url=sensor_base_url,
+        sensor_timeout_ms=sensor_timeout_ms,
+        sensor_prefetch=sensor_prefetch,
+        fetched=fetched,
+    )
+    resolved = dict(intake)
+    resolved["dynamic_sensors_for_eligibility"] = resolved_ds
+    status, reasons = evaluate_rules(resolved, alias)
+
+    out = build_output(resolved, status, reasons, int((time.time() - t0) * 1000))
+    out["meta_sensor_mode_used"] = sensor_mode_used
+    validate_output(out)
+    return out
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="Eligibility Agent runner (STUB-first, LIVE optional)")
     ap.add_argument("--intake-json", default=None, help="Path to application_intake_v0_1 JSON")
     ap.add_argument("--canonical-alias", default=DEFAULT_CANONICAL_ALIAS)
+    ap.add_argument("--runtime-manifest", default=None, help="runtime_manifest_v0_1 file; its eligibility alias replaces --canonical-alias")
     ap.add_argument("--sensor-mode", choices=["STUB", "LIVE"], default="STUB")
     ap.add_argument("--sensor-base-url", default="http://127.0.0.1:9000")
     ap.add_argument("--sensor-timeout-ms", type=int, default=1200)
+    ap.add_argument("--sensor-prefetch-json", default=None, help="sensor_prefetch_v0_1 from runners/sensor_bulk.py (LIVE only)")
+    ap.add_argument(
+        "--serve-stdio",
+        action="store_true",
+        help="Co-process mode (coprocess.py): one {\"intake\": ...} request per stdin line -> one status per stdout line",
+    )
     args = ap.parse_args()
+    tracing.configure("runner_eligibility")
 
     t0 = time.time()
-    alias = load_json(args.canonical_alias)
+    if args.runtime_manifest:
+        alias = runtime_manifest.alias_payload(runtime_manifest.load_manifest(args.runtime_manifest), "eligibility")
+    else:
+        alias = load_json(args.canonical_alias)
+    if args.serve_stdio:
+        import coprocess  # one-shot runs do not pay for it
+
+        prefetch = load_prefetch(args.sensor_prefetch_json)
+
+        def handle(req: Dict[str, Any]) -> Dict[str, Any]:
+            intake = req["intake"] if isinstance(req.get("intake"), dict) else req
+            with tracing.span("eligibility", traceparent=req.get("traceparent"), attributes={"decision.request_id": intake.get("meta_request_id")}):
+                return run_eligibility(
+                    intake,
+                    alias,
+                    sensor_mode=args.sensor_mode,
+                    sensor_base_url=args.sensor_base_url,
+                    sensor_timeout_ms=args.sensor_timeout_ms,
+                    sensor_prefetch=prefetch,
+                )
+
+        return coprocess.serve_stdio(handle, component="runner_eligibility")
     intake = load_intake(args.intake_json)
 
-    validate_intake_min(intake)
-    resolved_ds, sensor_mode_used = resolve_dynamic_sensors(
-        intake=intake,
-        alias=alias,
-        sensor_mode=args.sensor_mode,
-        sensor_base_url=args.sensor_base_url,
-        sensor_timeout_ms=args.sensor_timeout_ms,
-    )
-    intake["dynamic_sensors_for_eligibility"] = resolved_ds
-    status, reasons = evaluate_rules(intake, alias)
-
-    out = build_output(intake, status, reasons, int((time.time() - t0) * 1000))
-    out["meta_sensor_mode_used"] = sensor_mode_used
-    validate_output(out)
+    with tracing.span("eligibility", attributes={"decision.request_id": intake.get("meta_request_id")}):
+        out = run_eligibility(
+            intake,
+            alias,
+            sensor_mode=args.sensor_mode,
+            sensor_base_url=args.sensor_base_url,
+            sensor_timeout_ms=args.sensor_timeout_ms,
+            sensor_prefetch=load_prefetch(args.sensor_prefetch_json),
+            t0=t0,
+        )
 
     print(json.dumps(out, indent=2))
     return 0
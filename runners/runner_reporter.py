@@ -1,11 +1,31 @@
 #!/usr/bin/env python3
+"""
+Reporter runner: decision_pack_v0_1 -> reporter_output_v0_1.
+
+One pack (file or stdin) per run, or bulk mode over a whole run directory / packs JSONL
+in one process (--workers N: a process pool over chunks of packs):
+
+  python3 runners/runner_reporter.py --decision-pack-json pack.json
+  python3 runners/runner_reporter.py --packs-dir RUN/packs --out-jsonl reports.jsonl [--out-dir RUN/reports] --workers 4
+  python3 runners/runner_reporter.py --packs-jsonl packs.jsonl --out-jsonl reports.jsonl
+
+Bulk mode keeps the input order, reports a pack that fails in the summary (the rest still
+run) and prints reporter_bulk_summary_v0_1 with the throughput; exit 3 if any pack failed.
+"""
 import argparse
 import json
+import os
 import sys
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+BULK_SUMMARY_SCHEMA_VERSION = "reporter_bulk_summary_v0_1"
+BULK_CHUNK_SIZE = 256
+BULK_MAX_ERRORS_LISTED = 20
 
 
 def utc_now_iso() -> str:
@@ -102,21 +122,168 @@ def validate_output(out: Dict[str, Any]) -> None:
         raise ValueError("meta_schema_version must be reporter_output_v0_1")
 
 
+def report_for_pack(pack: Dict[str, Any], t0: float) -> Dict[str, Any]:
+    decisions = _obj(pack.get("decisions"))
+    if not isinstance(decisions.get("final_decision"), dict):
+        raise ValueError("decision_pack must include decisions.final_decision")
+
+    out = build_report(pack, int((time.time() - t0) * 1000))
+    validate_output(out)
+    return out
+
+
+# --- Bulk mode -------------------------------------------------------------------
+
+# (source, raw pack JSON or None to read source as a file)
+PackItem = Tuple[str, Optional[str]]
+
+
+def iter_pack_items(packs_dir: Optional[str], packs_jsonl: Optional[str]) -> Iterator[PackItem]:
+    if packs_dir:
+        # Sorted names: the batch driver's NNNN_<request_id>.json keep row order.
+        names = sorted(e.name for e in os.scandir(packs_dir) if e.name.endswith(".json") and e.is_file())
+        for name in names:
+            yield os.path.join(packs_dir, name), None
+        return
+    f = sys.stdin if packs_jsonl == "-" else open(str(packs_jsonl), "r", encoding="utf-8")
+    try:
+        for n, line in enumerate(f, start=1):
+            if line.strip():
+                yield f"{packs_jsonl}:{n}", line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _safe_name(request_id: str) -> str:
+    return "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in request_id)
+
+
+def _report_chunk(items: List[PackItem], out_dir: Optional[str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """Reports for a chunk: (source, report JSON line or None, error or None) each, in order."""
+    done = []
+    for source, raw in items:
+        t0 = time.time()
+        try:
+            pack = json.loads(raw if raw is not None else Path(source).read_text(encoding="utf-8"))
+            out = report_for_pack(_obj(pack), t0)
+            if out_dir:
+                name = Path(source).name if raw is None else _safe_name(out["meta_request_id"]) + ".json"
+                Path(out_dir, name).write_text(json.dumps(out, indent=2) + "\n", encoding="utf-8")
+            done.append((source, json.dumps(out, ensure_ascii=False), None))
+        except Exception as e:
+            done.append((source, None, f"{type(e).__name__}: {e}"))
+    return done
+
+
+def _chunks(items: Iterator[PackItem], size: int) -> Iterator[List[PackItem]]:
+    chunk: List[PackItem] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _pooled(
+    pool: ProcessPoolExecutor, chunks: Iterator[List[PackItem]], out_dir: Optional[str], *, window: int
+) -> Iterator[List[Tuple[str, Optional[str], Optional[str]]]]:
+    """Chunk results in input order, at most `window` chunks in flight (memory stays flat)."""
+    pending: Deque["Future[List[Tuple[str, Optional[str], Optional[str]]]]"] = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(_report_chunk, chunk, out_dir))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run_bulk(
+    items: Iterator[PackItem],
+    *,
+    out_jsonl: Optional[str],
+    out_dir: Optional[str],
+    workers: int = 1,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    if out_dir:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+    t0 = time.time()
+    ok = 0
+    errors: List[Dict[str, str]] = []
+    error_count = 0
+    out = open(out_jsonl, "w", encoding="utf-8") if out_jsonl else None
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        chunks = _chunks(items, chunk_size)
+        if pool is not None:
+            results = _pooled(pool, chunks, out_dir, window=2 * workers)
+        else:
+            results = (_report_chunk(c, out_dir) for c in chunks)
+        for chunk in results:
+            for source, line, err in chunk:
+                if err is not None:
+                    error_count += 1
+                    if len(errors) < BULK_MAX_ERRORS_LISTED:
+                        errors.append({"source": source, "error": err})
+                    continue
+                ok += 1
+                if out is not None:
+                    out.write(line + "\n")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if out is not None:
+            out.close()
+    wall_ms = int((time.time() - t0) * 1000)
+    return {
+        "schema_version": BULK_SUMMARY_SCHEMA_VERSION,
+        "packs": ok + error_count,
+        "ok_count": ok,
+        "error_count": error_count,
+        "errors": errors,
+        "workers": workers,
+        "out_jsonl": out_jsonl,
+        "out_dir": out_dir,
+        "wall_ms": wall_ms,
+        "throughput_pps": round(ok / (wall_ms / 1000.0), 3) if wall_ms > 0 else None,
+    }
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="Reporter runner (STUB-first)")
     ap.add_argument("--decision-pack-json", default=None, help="Path to decision_pack_v0_1 JSON")
     ap.add_argument("--out", default=None, help="Optional path to write reporter output JSON")
+    ap.add_argument("--packs-dir", default=None, help="Bulk: every *.json decision pack in this directory")
+    ap.add_argument("--packs-jsonl", default=None, help="Bulk: one decision pack per line (- for stdin)")
+    ap.add_argument("--out-jsonl", default=None, help="Bulk: reporter_output_v0_1 per line, input order")
+    ap.add_argument("--out-dir", default=None, help="Bulk: also one report file per pack (pack file name, else <request_id>.json)")
+    ap.add_argument("--workers", type=int, default=1, help="Bulk: reporter processes (1 = in process)")
+    ap.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE, help="Bulk: packs per worker task")
     args = ap.parse_args()
 
-    t0 = time.time()
-    pack = load_pack(args.decision_pack_json)
+    if args.packs_dir or args.packs_jsonl:
+        if args.packs_dir and args.packs_jsonl:
+            ap.error("--packs-dir and --packs-jsonl are exclusive")
+        if args.decision_pack_json or args.out:
+            ap.error("--decision-pack-json / --out are single-pack options")
+        if not (args.out_jsonl or args.out_dir):
+            ap.error("bulk mode needs --out-jsonl and/or --out-dir")
+        summary = run_bulk(
+            iter_pack_items(args.packs_dir, args.packs_jsonl),
+            out_jsonl=args.out_jsonl,
+            out_dir=args.out_dir,
+            workers=max(int(args.workers), 1),
+            chunk_size=max(int(args.chunk_size), 1),
+        )
+        summary["source"] = args.packs_dir or args.packs_jsonl
+        print(json.dumps(summary, indent=2))
+        return 3 if summary["error_count"] else 0
 
-    decisions = _obj(pack.get("decisions"))
-    if not isinstance(decisions.get("final_decision"), dict):
-        raise ValueError("decision_pack must include decisions.final_decision")
-
-    out = build_report(pack, int((time.time() - t0) * 1000))
-    validate_output(out)
+    t0 = time.time()
+    out = report_for_pack(load_pack(args.decision_pack_json), t0)
 
     if args.out:
         with open(args.out, "w", encoding="utf-8") as f:
@@ -24,7 +24,7 @@ import json
 import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from pathlib import Path
 import sys
@@ -32,6 +32,12 @@ _THIS_DIR = Path(__file__).resolve().parent
 if str(_THIS_DIR) not in sys.path:
     sys.path.insert(0, str(_THIS_DIR))
 from contract_validate import validate_required, REQUIRED_T2_V0_1
+from feature_store import store_row
+import metrics_registry
+import profiling
+import runtime_manifest
+import tracing
+import threshold_index
 
 def load_json(p: Path):
     return json.loads(Path(p).read_text(encoding="utf-8"))
@@ -78,36 +84,25 @@ def infer_feature_dim(booster: xgb.Booster) -> int:
     return 100  # fallback for PoC; should be replaced by real feature vector mapping
 
 
-def select_op_block(op_pick: Dict[str, Any], op_name: str) -> Dict[str, Any]:
-    """
-    op_name: 'op_a' or 'op_b'
-    """
-    if op_name == "op_a":
-        key = "op_a_best_f1_under_flag"
-    elif op_name == "op_b":
-        key = "op_b_max_recall_under_flag"
-    else:
-        raise ValueError("Invalid op_name. Use op_a or op_b.")
-
-    block = op_pick.get("test", {}).get(key) or op_pick.get("valid", {}).get(key)
-    if not block:
-        raise ValueError(f"Operating pick block not found for {key} (valid/test).")
-    return {"key": key, "block": block}
+def model_feature_names(booster: xgb.Booster, n_features: int) -> list:
+    feature_names = getattr(booster, 'feature_names', None)
+    if not feature_names:
+        # Fallback: if model has no names, use f0..fN-1
+        feature_names = [f"f{i}" for i in range(n_features)]
+    return list(feature_names)
 
 
-def score_default_prob(booster: xgb.Booster, n_features: int, seed: int = 42) -> float:
+def score_default_prob(booster: xgb.Booster, n_features: int, seed: int = 42, x: Optional[np.ndarray] = None) -> float:
     """
     PoC scoring:
-    - We don't yet map EFV/static features to the model feature vector.
-    - We generate a deterministic pseudo-feature vector for smoke purposes.
-    Replace this with real feature mapping in S1.2+.
+    - x: feature row from the feature store (runners/feature_store.py) when available.
+    - Otherwise we generate a deterministic pseudo-feature vector for smoke purposes
+      (EFV/static features are not mapped to the model feature vector yet).
     """
-    rng = np.random.default_rng(seed)
-    x = rng.normal(loc=0.0, scale=1.0, size=(1, n_features)).astype(np.float32)
-    feature_names = getattr(booster, 'feature_names', None)
-    if not feature_names:
-        # Fallback: if model has no names, use f0..fN-1
-        feature_names = [f"f{i}" for i in range(x.shape[1])]
+    if x is None:
+        rng = np.random.default_rng(seed)
+        x = rng.normal(loc=0.0, scale=1.0, size=(1, n_features)).astype(np.float32)
+    feature_names = model_feature_names(booster, x.shape[1])
     dmat = xgb.DMatrix(x, feature_names=feature_names)
 
     pred = booster.predict(dmat)
@@ -115,83 +110,84 @@ def score_default_prob(booster: xgb.Booster, n_features: int, seed: int = 42) ->
     return float(pred[0])
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser(description="S1.1 RISK_T2 runner (Default)")
-    ap.add_argument("--client-id", required=True)
-    ap.add_argument("--request-id", default=None)
-    ap.add_argument("--seed", type=int, default=42)
+STRICT_FIELDS = [
+    "meta_schema_version",
+    "meta_generated_at",
+    "meta_request_id",
+    "meta_client_id",
+    "meta_model_tag",
+    "meta_model_file",
+    "meta_operating_point",
+    "meta_latency_ms",
+    "score_default_prob",
+    "thr_default",
+    "decision_default",
+    "decision_default_norm",
+]
 
-    ap.add_argument(
-        "--model-json",
-        default="/home/adien/loan_backbone_ml_T2_DEFAULT_V2_FULLBUNDLE/models/t2_default_xgb_v3a_microA.json",
-        help="Canonical XGBoost model (JSON) path",
-    )
-    ap.add_argument(
-        "--operating-pick",
-        default="/home/adien/loan_backbone_ml_T2_DEFAULT_V2_FULLBUNDLE/reports/t2_default_xgb_v3a_microA_operating_pick.json",
-        help="Operating pick JSON path (contains OP_A/OP_B thresholds and metrics)",
-    )
-    ap.add_argument(
-        "--canonical-alias",
-        default="/home/adien/loan_backbone_ml_BLOCK_A_AGENTS/block_a_gov/artifacts/t2_default_canonical.json",
-        help="Path to canonical alias JSON (swap-friendly). If provided, it supplies default model/feature/operating_pick paths."
-    )
-    ap.add_argument(
-        "--op",
-        choices=["op_a", "op_b"],
-        default="op_a",
-        help="Operating point selector (op_a recommended, op_b high recall)",
-    )
-    ap.add_argument(
-        "--out",
-        default=None,
-        help="Optional output file path (JSON). If omitted, prints to stdout.",
-    )
-
-    args = ap.parse_args()
-
-    # Canonical alias resolution (swap-friendly defaults)
-    alias_payload = None
-    try:
-        alias_path = Path(args.canonical_alias)
-        if alias_path.exists():
-            alias_payload = load_json(alias_path)
-    except Exception:
-        alias_payload = None
-
-    if isinstance(alias_payload, dict):
-        # Fill defaults ONLY if user did NOT override via CLI
-        if hasattr(args, "model_file") and args.model_file == ap.get_default("model_file"):
-            args.model_file = alias_payload.get("model", {}).get("model_file", args.model_file)
-        if hasattr(args, "feature_list_file") and args.feature_list_file == ap.get_default("feature_list_file"):
-            args.feature_list_file = alias_payload.get("model", {}).get("feature_list_file", args.feature_list_file)
-        if hasattr(args, "operating_pick") and args.operating_pick == ap.get_default("operating_pick"):
-            args.operating_pick = alias_payload.get("operating", {}).get("operating_pick_file", args.operating_pick)
-        op_default = alias_payload.get("operating", {}).get("default_operating_point")
-        if op_default:
-            for attr in ["op", "operating_point", "operating_point_id", "operating_point_name"]:
-                if hasattr(args, attr) and getattr(args, attr) == ap.get_default(attr):
-                    setattr(args, attr, op_default)
-
-
-    t0 = time.time()
-    model_path = Path(args.model_json)
-    op_path = Path(args.operating_pick)
 
+def load_agent(model_json: str, operating_pick: str, op: str = "op_a") -> Dict[str, Any]:
+    """
+    Everything T2 needs before scoring (booster, feature names, operating point block).
+    Loaded once per process by long-lived callers (decision_engine); read-only afterwards.
+    """
+    t0 = time.perf_counter()
+    model_path = Path(model_json)
     booster = load_booster(model_path)
     n_features = infer_feature_dim(booster)
-
-    op_pick = read_json(op_path)
+    # Compiled once per operating_pick content (threshold_index.t2_op_block).
+    op_idx = threshold_index.load_index(Path(operating_pick), "t2")
     # Normalize operating point naming (accept OP_A/OP_B as well as op_a/op_b)
-    if hasattr(args, "op") and args.op is not None:
-        args.op = _normalize_op_name(args.op)
+    op_sel = threshold_index.t2_op_block(op_idx, _normalize_op_name(op))
+    metrics_registry.histogram("decision_model_load_ms", "Model + thresholds load time (ms)", ("model",)).observe((time.perf_counter() - t0) * 1000.0, model="t2_default")
+    return {
+        "booster": booster,
+        "n_features": n_features,
+        "feature_names": model_feature_names(booster, n_features),
+        "model_path": model_path,
+        "model_tag": op_idx.get("tag") or model_path.stem,
+        "op_key": op_sel["key"],
+        "op_block": op_sel["block"],
+        "thr": float(op_sel["block"]["threshold"]),
+    }
 
-    op_sel = select_op_block(op_pick, args.op)
-    op_key = op_sel["key"]
-    op_block = op_sel["block"]
 
-    thr = float(op_block["threshold"])
-    prob = score_default_prob(booster, n_features=n_features, seed=args.seed)
+def feature_row(agent: Dict[str, Any], *, client_id: str, seed: int = 42, feature_store: Optional[str] = None):
+    """(x, fs_info): the (1, n_features) row score_default_prob would predict on."""
+    x, fs_info = store_row(feature_store, client_id, agent["feature_names"])
+    if x is None:
+        rng = np.random.default_rng(seed)
+        x = rng.normal(loc=0.0, scale=1.0, size=(1, agent["n_features"])).astype(np.float32)
+    return x, fs_info
+
+
+def predict_batch(agent: Dict[str, Any], X: np.ndarray) -> np.ndarray:
+    """One booster.predict over stacked rows (micro_batcher); row i == score_default_prob(row i)."""
+    return agent["booster"].predict(xgb.DMatrix(X, feature_names=agent["feature_names"]))
+
+
+def score(
+    agent: Dict[str, Any],
+    *,
+    client_id: str,
+    request_id: Optional[str],
+    seed: int = 42,
+    feature_store: Optional[str] = None,
+    t0: Optional[float] = None,
+    predict: Optional[Callable[[np.ndarray], float]] = None,
+) -> Dict[str, Any]:
+    """
+    One risk_decision_t2_v0_1 payload (full form, incl. op_ref) from a loaded agent.
+    predict: optional row -> prob hook (MicroBatcher.predict); direct booster call otherwise.
+    """
+    t0 = time.time() if t0 is None else t0
+    thr = agent["thr"]
+    op_block = agent["op_block"]
+    x, fs_info = feature_row(agent, client_id=client_id, seed=seed, feature_store=feature_store)
+    if predict is not None:
+        prob = predict(x)
+    else:
+        prob = score_default_prob(agent["booster"], n_features=agent["n_features"], seed=seed, x=x)
     decision = "HIGH_RISK" if prob >= thr else "LOW_RISK"
 
     # Normalized band for PolicyDecider (MVP)
@@ -207,11 +203,11 @@ def main() -> int:
     payload: Dict[str, Any] = {
         "meta_schema_version": "risk_decision_t2_v0_1",
         "meta_generated_at": utc_now_iso(),
-        "meta_request_id": args.request_id,
-        "meta_client_id": args.client_id,
-        "meta_model_tag": op_pick.get("tag", model_path.stem),
-        "meta_model_file": str(model_path),
-        "meta_operating_point": op_key,
+        "meta_request_id": request_id,
+        "meta_client_id": client_id,
+        "meta_model_tag": agent["model_tag"],
+        "meta_model_file": str(agent["model_path"]),
+        "meta_operating_point": agent["op_key"],
         "meta_latency_ms": latency_ms,
         "score_default_prob": prob,
         "thr_default": thr,
@@ -225,29 +221,98 @@ def main() -> int:
             "flag_rate": float(op_block.get("flag_rate")),
         },
     }
+    if fs_info is not None:
+        payload["meta_feature_store"] = fs_info
+    return payload
+
+
+def strict_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Spec compliance: exact v0.1 fields only (what ORIGINATE consumes)."""
+    fields = STRICT_FIELDS + (["meta_feature_store"] if "meta_feature_store" in payload else [])
+    return {k: payload.get(k) for k in fields}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="S1.1 RISK_T2 runner (Default)")
+    ap.add_argument("--client-id", default=None, help="Required unless --serve-stdio")
+    ap.add_argument("--request-id", default=None)
+    ap.add_argument("--seed", type=int, default=42)
+
+    ap.add_argument(
+        "--model-json",
+        default=runtime_manifest.T2_DEFAULT_MODEL_FILE,
+        help="Canonical XGBoost model (JSON) path",
+    )
+    ap.add_argument(
+        "--operating-pick",
+        default=runtime_manifest.T2_DEFAULT_OPERATING_PICK,
+        help="Operating pick JSON path (contains OP_A/OP_B thresholds and metrics)",
+    )
+    ap.add_argument(
+        "--canonical-alias",
+        default=runtime_manifest.default_alias_paths()["t2_default"],
+        help="Path to canonical alias JSON (swap-friendly). If provided, it supplies default model/feature/operating_pick paths."
+    )
+    ap.add_argument(
+        "--op",
+        choices=["op_a", "op_b"],
+        default="op_a",
+        help="Operating point selector (op_a recommended, op_b high recall)",
+    )
+    ap.add_argument(
+        "--feature-store",
+        default=None,
+        help="Optional feature store file (runners/feature_store.py); misses fall back to the PoC synthetic row",
+    )
+    ap.add_argument(
+        "--runtime-manifest",
+        default=None,
+        help="runtime_manifest_v0_1 file (or - for stdin); replaces --canonical-alias",
+    )
+    ap.add_argument(
+        "--out",
+        default=None,
+        help="Optional output file path (JSON). If omitted, prints to stdout.",
+    )
+    ap.add_argument("--serve-stdio", action="store_true", help="Co-process mode (coprocess.py): load once, then one JSON request per stdin line -> one payload per stdout line")
+
+    args = ap.parse_args()
+    if args.serve_stdio and args.runtime_manifest == "-":
+        ap.error("--serve-stdio reads requests from stdin: pass --runtime-manifest as a file")
+    if not args.serve_stdio and not args.client_id:
+        ap.error("--client-id is required (unless --serve-stdio)")
+
+    # Canonical alias resolution (swap-friendly defaults); merge rules shared via runtime_manifest.
+    if args.runtime_manifest:
+        resolved = runtime_manifest.get_manifest(args.runtime_manifest)["models"]["t2_default"]
+    else:
+        resolved = runtime_manifest.resolve_t2(runtime_manifest.read_alias(args.canonical_alias)["payload"])
+
+    # Fill defaults ONLY if user did NOT override via CLI
+    if args.model_json == ap.get_default("model_json"):
+        args.model_json = resolved["model_file"]
+    if args.operating_pick == ap.get_default("operating_pick"):
+        args.operating_pick = resolved["operating_pick_file"]
+    if args.op == ap.get_default("op"):
+        args.op = resolved["default_operating_point"]
+
+    prof = profiling.from_env("runner_t2")
+    tracing.configure("runner_t2")
+    t0 = time.time()
+    with profiling.stage(prof, "load_agent"), tracing.span("runner_t2.load_agent"):
+        agent = load_agent(args.model_json, args.operating_pick, args.op)
+    if args.serve_stdio:
+        import coprocess  # one-shot runs do not pay for it
+
+        return coprocess.serve_scorer(lambda **kw: strict_payload(score(agent, **kw)), component="runner_t2", feature_store=args.feature_store, prof=prof)
+    with profiling.stage(prof, "score"), tracing.span("runner_t2.score", attributes={"decision.request_id": args.request_id}):
+        payload = score(agent, client_id=args.client_id, request_id=args.request_id, seed=args.seed, feature_store=args.feature_store, t0=t0)
 
     if args.out:
         safe_write_json(Path(args.out), payload)
         print(f"[OK] Wrote: {args.out}")
     else:
-        # --- Spec compliance: emit exact v0.1 fields only ---
-        _STRICT_FIELDS = [
-          'meta_schema_version',
-          'meta_generated_at',
-          'meta_request_id',
-          'meta_client_id',
-          'meta_model_tag',
-          'meta_model_file',
-          'meta_operating_point',
-          'meta_latency_ms',
-          'score_default_prob',
-          'thr_default',
-          'decision_default',
-            'decision_default_norm',
-        ]
-        payload = {k: payload.get(k) for k in _STRICT_FIELDS}
-
-        print(json.dumps(payload, indent=2, ensure_ascii=False))
+        print(json.dumps(strict_payload(payload), indent=2, ensure_ascii=False))
 
     return 0
 
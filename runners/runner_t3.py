@@ -5,23 +5,29 @@ import argparse
 import json
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import os
 import sys
 sys.path.insert(0, os.path.dirname(__file__))
 from contract_validate import validate_required, REQUIRED_T3_V0_1
+from feature_store import store_row
+import metrics_registry
+import profiling
+import runtime_manifest
+import tracing
+import threshold_index
 
 from pathlib import Path
 import numpy as np
 import xgboost as xgb
 
 
-DEFAULT_MODEL_FILE = "/home/adien/loan_backbone_ml_T3_FRAUD/models/fraud_t3_ieee_xgb_bcd_best.json"
-DEFAULT_THRESHOLDS_ALIAS = "/home/adien/loan_backbone_ml_T3_FRAUD/reports/fraud_t3_ieee_bcd_best_thresholds.json"
+DEFAULT_MODEL_FILE = runtime_manifest.T3_DEFAULT_MODEL_FILE
+DEFAULT_THRESHOLDS_ALIAS = runtime_manifest.T3_DEFAULT_THRESHOLDS_FILE
+DEFAULT_CANONICAL_ALIAS = runtime_manifest.default_alias_paths()["t3_fraud"]
 
 
-DEFAULT_CANONICAL_ALIAS = "/home/adien/loan_backbone_ml_BLOCK_A_AGENTS/block_a_gov/artifacts/t3_fraud_canonical.json"
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -36,46 +42,12 @@ def load_canonical_alias(alias_path: str) -> Dict[str, str]:
     Read canonical alias JSON (gov-layer). Tolerate shape variations.
     Current expected shape:
       { "model": {"model_tag": "...", "model_file": "..."}, "thresholds": {"thresholds_file": "..."} }
+    Only the keys the alias actually names are returned (shape rules live in runtime_manifest).
     """
-    ap = Path(alias_path)
-    if not ap.exists():
+    entry = runtime_manifest.read_alias(alias_path)
+    if entry["status"] != "OK":
         return {}
-    try:
-        import json
-        d = json.loads(ap.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
-
-    if not isinstance(d, dict):
-        return {}
-
-    out: Dict[str, str] = {}
-
-    model = d.get("model") or {}
-    if isinstance(model, dict):
-        mt = model.get("model_tag")
-        mf = model.get("model_file")
-        if isinstance(mt, str) and mt:
-            out["model_tag"] = mt
-        if isinstance(mf, str) and mf:
-            out["model_file"] = mf
-
-    thr = d.get("thresholds") or {}
-    if isinstance(thr, dict):
-        tf = thr.get("thresholds_file") or thr.get("thresholds_alias") or thr.get("thresholds_path")
-        if isinstance(tf, str) and tf:
-            out["thresholds_file"] = tf
-
-    # Also tolerate flat keys (future-proof)
-    if isinstance(d.get("model_file"), str) and d.get("model_file"):
-        out.setdefault("model_file", d["model_file"])
-    if isinstance(d.get("model_tag"), str) and d.get("model_tag"):
-        out.setdefault("model_tag", d["model_tag"])
-    if isinstance(d.get("thresholds_file"), str) and d.get("thresholds_file"):
-        out.setdefault("thresholds_file", d["thresholds_file"])
-
-    return out
-
+    return runtime_manifest.resolve_t3(entry["payload"], fallbacks=False)
 
 
 def load_booster(model_file: str) -> xgb.Booster:
@@ -100,72 +72,70 @@ def make_synthetic_row(n_features: int, seed: int) -> np.ndarray:
     return rng.normal(loc=0.0, scale=1.0, size=(1, n_features)).astype(np.float32)
 
 
-def score_prob(booster: xgb.Booster, seed: int) -> float:
+def score_prob(booster: xgb.Booster, seed: int, X: Optional[np.ndarray] = None) -> float:
     feat_names, n_features = get_feature_names(booster)
-    X = make_synthetic_row(n_features=n_features, seed=seed)
+    if X is None:
+        X = make_synthetic_row(n_features=n_features, seed=seed)
     dmat = xgb.DMatrix(X, feature_names=feat_names)
     pred = booster.predict(dmat)
     # pred can be array([p]) or shape (1,); ensure float
     return float(pred[0])
 
 
-def pick_mode(thr_alias: Dict[str, Any], requested_mode: Optional[str]) -> str:
-    if requested_mode:
-        return requested_mode
-    # default recommended mode from alias
-    mode = thr_alias.get("recommended_default_mode")
-    if not isinstance(mode, str) or not mode:
-        raise ValueError("Threshold alias missing recommended_default_mode")
-    return mode
-
-
-def get_threshold(thr_alias: Dict[str, Any], mode: str) -> float:
-    if mode not in thr_alias:
-        raise ValueError(f"Mode '{mode}' not found in thresholds alias.")
-    thr = thr_alias[mode]
-    if thr is None:
-        raise ValueError(f"Mode '{mode}' exists but threshold is null (None).")
-    return float(thr)
-
-
 def decision_from_threshold(score: float, thr: float) -> str:
     # Fraud: higher score => higher fraud risk
     return "HIGH_FRAUD" if score >= thr else "LOW_FRAUD"
 
 
-def main() -> int:
-    p = argparse.ArgumentParser(description="T3 FRAUD runner (model + thresholds -> decision)")
-    p.add_argument("--client-id", required=True, help="Client identifier (string)")
-    p.add_argument("--request-id", default=None, help="Request identifier (string)")
-    p.add_argument("--seed", type=int, default=42, help="Deterministic seed (default: 42)")
-    p.add_argument("--canonical-alias", default=DEFAULT_CANONICAL_ALIAS, help="Path to canonical alias JSON (swap-friendly). If provided, it supplies default model/threshold paths.")
-    p.add_argument("--model-file", default=DEFAULT_MODEL_FILE, help="Path to XGBoost model (.json)")
-    p.add_argument("--thresholds-alias", default=DEFAULT_THRESHOLDS_ALIAS, help="Path to thresholds alias (.json)")
-    p.add_argument("--mode", default=None, help="Threshold mode key (defaults to alias recommended_default_mode)")
-    args = p.parse_args()
+def load_agent(model_file: str, thresholds_file: str, mode: Optional[str] = None) -> Dict[str, Any]:
+    """Booster + resolved threshold mode, loaded once by long-lived callers (decision_engine)."""
+    t0 = time.perf_counter()
+    # Compiled once per thresholds file content (threshold_index.t3_mode/t3_threshold).
+    thr_idx = threshold_index.load_index(thresholds_file, "t3")
+    mode = threshold_index.t3_mode(thr_idx, mode)
+    thr = threshold_index.t3_threshold(thr_idx, mode)
+    booster = load_booster(model_file)
+    metrics_registry.histogram("decision_model_load_ms", "Model + thresholds load time (ms)", ("model",)).observe((time.perf_counter() - t0) * 1000.0, model="t3_fraud")
+    return {
+        "booster": booster,
+        "feature_names": get_feature_names(booster)[0],
+        "model_file": model_file,
+        "mode": mode,
+        "thr": float(thr),
+    }
 
 
-    # Canonical alias resolution (swap-friendly defaults)
-    try:
-        alias = load_canonical_alias(args.canonical_alias)
-        # Only override if user did not explicitly override defaults
-        if alias.get("model_file") and args.model_file == DEFAULT_MODEL_FILE:
-            args.model_file = alias["model_file"]
-        if alias.get("thresholds_file") and args.thresholds_alias == DEFAULT_THRESHOLDS_ALIAS:
-            args.thresholds_alias = alias["thresholds_file"]
-        alias_model_tag = alias.get("model_tag")
-    except Exception:
-        alias_model_tag = None
+def feature_row(agent: Dict[str, Any], *, client_id: str, seed: int = 42, feature_store: Optional[str] = None):
+    """(X, fs_info): the (1, n_features) row score_prob would predict on."""
+    X_row, fs_info = store_row(feature_store, client_id, agent["feature_names"])
+    if X_row is None:
+        X_row = make_synthetic_row(n_features=len(agent["feature_names"]), seed=seed)
+    return X_row, fs_info
 
 
-    t0 = time.time()
+def predict_batch(agent: Dict[str, Any], X: np.ndarray) -> np.ndarray:
+    """One booster.predict over stacked rows (micro_batcher); row i == score_prob(row i)."""
+    return agent["booster"].predict(xgb.DMatrix(X, feature_names=agent["feature_names"]))
 
-    thr_alias = load_json(args.thresholds_alias)
-    mode = pick_mode(thr_alias, args.mode)
-    thr = get_threshold(thr_alias, mode)
 
-    booster = load_booster(args.model_file)
-    prob = score_prob(booster, seed=args.seed)
+def score(
+    agent: Dict[str, Any],
+    *,
+    client_id: str,
+    request_id: Optional[str],
+    seed: int = 42,
+    feature_store: Optional[str] = None,
+    t0: Optional[float] = None,
+    predict: Optional[Callable[[np.ndarray], float]] = None,
+) -> Dict[str, Any]:
+    """
+    One validated risk_decision_t3_v0_1 payload from a loaded agent.
+    predict: optional row -> prob hook (MicroBatcher.predict); direct booster call otherwise.
+    """
+    t0 = time.time() if t0 is None else t0
+    thr = agent["thr"]
+    X_row, fs_info = feature_row(agent, client_id=client_id, seed=seed, feature_store=feature_store)
+    prob = predict(X_row) if predict is not None else score_prob(agent["booster"], seed=seed, X=X_row)
     dec = decision_from_threshold(prob, thr)
 
     # PolicyDecider signal (normalized fraud band)
@@ -180,20 +150,71 @@ def main() -> int:
     payload: Dict[str, Any] = {
         "meta_schema_version": "risk_decision_t3_v0_1",
         "meta_generated_at": utc_now_iso(),
-        "meta_request_id": args.request_id,
-        "meta_client_id": str(args.client_id),
+        "meta_request_id": request_id,
+        "meta_client_id": str(client_id),
         "meta_model_tag": "fraud_t3_ieee_xgb_bcd_best",
-        "meta_model_file": args.model_file,
-        "meta_threshold_mode": mode,
+        "meta_model_file": agent["model_file"],
+        "meta_threshold_mode": agent["mode"],
         "meta_latency_ms": latency_ms,
         "score_fraud_prob": float(prob),
         "thr_fraud": float(thr),
         "decision_fraud": dec,
         "decision_fraud_norm": decision_fraud_norm,
     }
+    if fs_info is not None:
+        payload["meta_feature_store"] = fs_info
 
     # Minimal contract validation (v0.1)
     validate_required(payload, REQUIRED_T3_V0_1)
+    return payload
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="T3 FRAUD runner (model + thresholds -> decision)")
+    p.add_argument("--client-id", default=None, help="Client identifier (string); required unless --serve-stdio")
+    p.add_argument("--request-id", default=None, help="Request identifier (string)")
+    p.add_argument("--seed", type=int, default=42, help="Deterministic seed (default: 42)")
+    p.add_argument("--canonical-alias", default=DEFAULT_CANONICAL_ALIAS, help="Path to canonical alias JSON (swap-friendly). If provided, it supplies default model/threshold paths.")
+    p.add_argument("--model-file", default=DEFAULT_MODEL_FILE, help="Path to XGBoost model (.json)")
+    p.add_argument("--thresholds-alias", default=DEFAULT_THRESHOLDS_ALIAS, help="Path to thresholds alias (.json)")
+    p.add_argument("--mode", default=None, help="Threshold mode key (defaults to alias recommended_default_mode)")
+    p.add_argument("--feature-store", default=None, help="Optional feature store file; misses fall back to the synthetic row")
+    p.add_argument("--runtime-manifest", default=None, help="runtime_manifest_v0_1 file (or - for stdin); replaces --canonical-alias")
+    p.add_argument("--serve-stdio", action="store_true", help="Co-process mode (coprocess.py): load once, then one JSON request per stdin line -> one payload per stdout line")
+    args = p.parse_args()
+    if args.serve_stdio and args.runtime_manifest == "-":
+        p.error("--serve-stdio reads requests from stdin: pass --runtime-manifest as a file")
+    if not args.serve_stdio and not args.client_id:
+        p.error("--client-id is required (unless --serve-stdio)")
+
+
+    # Canonical alias resolution (swap-friendly defaults)
+    try:
+        if args.runtime_manifest:
+            alias = runtime_manifest.get_manifest(args.runtime_manifest)["models"]["t3_fraud"]
+        else:
+            alias = load_canonical_alias(args.canonical_alias)
+        # Only override if user did not explicitly override defaults
+        if alias.get("model_file") and args.model_file == DEFAULT_MODEL_FILE:
+            args.model_file = alias["model_file"]
+        if alias.get("thresholds_file") and args.thresholds_alias == DEFAULT_THRESHOLDS_ALIAS:
+            args.thresholds_alias = alias["thresholds_file"]
+        alias_model_tag = alias.get("model_tag")
+    except Exception:
+        alias_model_tag = None
+
+
+    prof = profiling.from_env("runner_t3")
+    tracing.configure("runner_t3")
+    t0 = time.time()
+    with profiling.stage(prof, "load_agent"), tracing.span("runner_t3.load_agent"):
+        agent = load_agent(args.model_file, args.thresholds_alias, args.mode)
+    if args.serve_stdio:
+        import coprocess  # one-shot runs do not pay for it
+
+        return coprocess.serve_scorer(lambda **kw: score(agent, **kw), component="runner_t3", feature_store=args.feature_store, prof=prof)
+    with profiling.stage(prof, "score"), tracing.span("runner_t3.score", attributes={"decision.request_id": args.request_id}):
+        payload = score(agent, client_id=args.client_id, request_id=args.request_id, seed=args.seed, feature_store=args.feature_store, t0=t0)
 
     print(json.dumps(payload, indent=2, sort_keys=False))
     return 0
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import argparse, json, time
 from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
 
 from pathlib import Path
 import sys
@@ -8,6 +9,12 @@ _THIS_DIR = Path(__file__).resolve().parent
 if str(_THIS_DIR) not in sys.path:
     sys.path.insert(0, str(_THIS_DIR))
 from contract_validate import validate_required, REQUIRED_T4_V0_1
+from feature_store import store_row
+import metrics_registry
+import profiling
+import runtime_manifest
+import tracing
+import threshold_index
 from pathlib import Path
 
 import numpy as np
@@ -27,92 +34,6 @@ def load_json(p: Path):
     return json.loads(p.read_text(encoding="utf-8"))
 
 
-def collect_thr_candidates(obj) -> dict:
-    """
-    Recursively collect threshold modes like 'thr_valid_*'.
-
-    Supports:
-      - numeric: thr_valid_*: 0.36
-      - dict payload: thr_valid_*: {"threshold": 0.36, ...}
-
-    Returns: {mode_key: threshold_float}
-    """
-    out = {}
-
-    def walk(x):
-        if isinstance(x, dict):
-            for k, v in x.items():
-                if isinstance(k, str) and k.startswith("thr_valid_"):
-                    # Case A: direct numeric
-                    if isinstance(v, (int, float)):
-                        out[k] = float(v)
-                    # Case B: dict containing "threshold"
-                    elif isinstance(v, dict) and isinstance(v.get("threshold"), (int, float)):
-                        out[k] = float(v["threshold"])
-                walk(v)
-        elif isinstance(x, list):
-            for v in x:
-                walk(v)
-
-    walk(obj)
-    return out
-
-
-def infer_mode(thr_payload: dict) -> str:
-    # preferred ordering (same spirit as T2/T3):
-    preferred = [
-        "thr_valid_best_f1",
-        "thr_valid_recall_ge_0_90",
-        "thr_valid_recall_ge_0_95",
-        "thr_valid_precision_ge_0_70",
-    ]
-
-    # Prefer panel_valid if present (this is where thresholds are defined)
-    base = thr_payload.get("panel_valid")
-    if not isinstance(base, dict):
-        base = thr_payload
-
-    cand = collect_thr_candidates(base)
-
-    # 1) explicit recommended key if present AND exists in candidates
-    m = thr_payload.get("recommended_default_mode")
-    if isinstance(m, str) and m.strip() and m.strip() in cand:
-        return m.strip()
-
-    # 2) pick from preferred list
-    for k in preferred:
-        if k in cand:
-            return k
-
-    # 3) last resort: deterministic first available
-    if cand:
-        return sorted(cand.keys())[0]
-
-    raise KeyError("No thr_valid_* thresholds found (numeric or dict-with-'threshold') in thresholds JSON.")
-
-
-def resolve_thr(thr_payload: dict, mode: str) -> float:
-    # Prefer panel_valid if present
-    base = thr_payload.get("panel_valid")
-    if not isinstance(base, dict):
-        base = thr_payload
-
-    # Fast path: direct numeric or dict with "threshold"
-    if isinstance(base, dict) and mode in base:
-        v = base.get(mode)
-        if isinstance(v, (int, float)):
-            return float(v)
-        if isinstance(v, dict) and isinstance(v.get("threshold"), (int, float)):
-            return float(v["threshold"])
-
-    # Recursive candidates
-    cand = collect_thr_candidates(base)
-    if mode in cand:
-        return float(cand[mode])
-
-    raise KeyError(f"Threshold mode not found: {mode}. Available: {sorted(cand.keys())[:30]}")
-
-
 def load_feature_names(p: Path):
     payload = load_json(p)
     if isinstance(payload, list):
@@ -146,70 +67,75 @@ def predict_prob(kind, model, X, feature_names):
     raise TypeError("Model has no usable predict method.")
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--client-id", required=True)
-    ap.add_argument("--request-id", default=None)
-    ap.add_argument("--seed", type=int, default=42)
-    ap.add_argument("--mode", default=None, help="e.g. thr_valid_best_f1 / thr_valid_recall_ge_0_90 ...")
-    ap.add_argument("--override-thr", type=float, default=None, help="TEST ONLY: override threshold value")
-    ap.add_argument(
-        "--model-file",
-        default="/home/adien/loan_backbone_ml_T4_PAYOFF/models/t4_payoff_xgb_v1_guarded.json",
-    )
-    ap.add_argument(
-        "--thresholds-file",
-        default="/home/adien/loan_backbone_ml_T4_PAYOFF/reports/t4_payoff_xgb_v1_guarded_thresholds.json",
-    )
-    ap.add_argument(
-        "--feature-list-file",
-        default="/home/adien/loan_backbone_ml_T4_PAYOFF/reports/t4_payoff_xgb_v1_guarded_feature_list.json",
-    )
-    ap.add_argument(
-        "--canonical-alias",
-        default="/home/adien/loan_backbone_ml_BLOCK_A_AGENTS/block_a_gov/artifacts/t4_payoff_canonical.json",
-        help="Path to canonical alias JSON (swap-friendly). If provided, it supplies default model/threshold/feature paths."
-    )
-    args = ap.parse_args()
-
-    # Canonical alias resolution (swap-friendly defaults)
-    alias_payload = None
-    try:
-        alias_path = Path(args.canonical_alias)
-        if alias_path.exists():
-            alias_payload = load_json(alias_path)
-    except Exception:
-        alias_payload = None
-
-    if isinstance(alias_payload, dict):
-        # Only fill defaults if user did NOT explicitly override via CLI
-        if args.model_file == ap.get_default("model_file"):
-            args.model_file = alias_payload.get("model", {}).get("model_file", args.model_file)
-        if args.thresholds_file == ap.get_default("thresholds_file"):
-            args.thresholds_file = alias_payload.get("thresholds", {}).get("thresholds_file", args.thresholds_file)
-        if args.feature_list_file == ap.get_default("feature_list_file"):
-            args.feature_list_file = alias_payload.get("model", {}).get("feature_list_file", args.feature_list_file)
+def load_agent(
+    model_file: str,
+    thresholds_file: str,
+    feature_list_file: str,
+    mode: Optional[str] = None,
+    override_thr: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Model + feature list + resolved threshold, loaded once by long-lived callers (decision_engine)."""
+    t0 = time.perf_counter()
+    model_path = Path(model_file)
+    # Compiled once per thresholds file content (threshold_index.t4_mode/t4_threshold).
+    thr_idx = threshold_index.load_index(Path(thresholds_file), "t4")
+    mode = mode or threshold_index.t4_mode(thr_idx)
+    thr = threshold_index.t4_threshold(thr_idx, mode)
+    if override_thr is not None:
+        thr = float(override_thr)
+    feature_names = load_feature_names(Path(feature_list_file))
+    kind, model = load_model(model_path)
+    metrics_registry.histogram("decision_model_load_ms", "Model + thresholds load time (ms)", ("model",)).observe((time.perf_counter() - t0) * 1000.0, model="t4_payoff")
+    return {
+        "kind": kind,
+        "model": model,
+        "feature_names": feature_names,
+        "model_path": model_path,
+        "mode": mode,
+        "thr": float(thr),
+    }
 
-    t0 = time.time()
-    model_path = Path(args.model_file)
-    thr_path = Path(args.thresholds_file)
-    feat_path = Path(args.feature_list_file)
 
-    thr_payload = load_json(thr_path)
-    mode = args.mode or infer_mode(thr_payload)
-    thr = resolve_thr(thr_payload, mode)
+def feature_row(agent: Dict[str, Any], *, client_id: str, seed: int = 42, feature_store: Optional[str] = None):
+    """(X, fs_info): the (1, n_features) row predict_prob would see."""
+    X, fs_info = store_row(feature_store, client_id, agent["feature_names"])
+    if X is None:
+        rng = np.random.default_rng(seed)
+        X = rng.normal(0, 1, size=(1, len(agent["feature_names"]))).astype(np.float32)
+    return X, fs_info
 
 
-    if args.override_thr is not None:
-        thr = float(args.override_thr)
-    feature_names = load_feature_names(feat_path)
-    n = len(feature_names)
+def predict_batch(agent: Dict[str, Any], X: np.ndarray) -> np.ndarray:
+    """One predict over stacked rows (micro_batcher); row i == predict_prob(row i)."""
+    model = agent["model"]
+    if agent["kind"] != "booster" and hasattr(model, "predict_proba"):
+        return model.predict_proba(X)[:, 1]
+    if hasattr(model, "predict"):
+        return model.predict(xgb.DMatrix(X, feature_names=agent["feature_names"]))
+    raise TypeError("Model has no usable predict method.")
 
-    rng = np.random.default_rng(args.seed)
-    X = rng.normal(0, 1, size=(1, n)).astype(np.float32)
 
-    kind, model = load_model(model_path)
-    prob = predict_prob(kind, model, X, feature_names)
+def score(
+    agent: Dict[str, Any],
+    *,
+    client_id: str,
+    request_id: Optional[str],
+    seed: int = 42,
+    feature_store: Optional[str] = None,
+    t0: Optional[float] = None,
+    predict: Optional[Callable[[np.ndarray], float]] = None,
+) -> Dict[str, Any]:
+    """
+    One risk_decision_t4_v0_1 payload from a loaded agent.
+    predict: optional row -> prob hook (MicroBatcher.predict); direct model call otherwise.
+    """
+    t0 = time.time() if t0 is None else t0
+    thr = agent["thr"]
+    X, fs_info = feature_row(agent, client_id=client_id, seed=seed, feature_store=feature_store)
+    if predict is not None:
+        prob = predict(X)
+    else:
+        prob = predict_prob(agent["kind"], agent["model"], X, agent["feature_names"])
 
     # NOTE: payoff = positive class => HIGH_PAYOFF if prob >= thr
     decision = "HIGH_PAYOFF" if prob >= thr else "LOW_PAYOFF"
@@ -227,17 +153,80 @@ def main():
     out = {
         "meta_schema_version": "risk_decision_t4_v0_1",
         "meta_generated_at": utc_now_iso(),
-        "meta_request_id": args.request_id,
-        "meta_client_id": str(args.client_id),
-        "meta_model_tag": model_path.stem,
-        "meta_model_file": str(model_path),
-        "meta_threshold_mode": mode,
+        "meta_request_id": request_id,
+        "meta_client_id": str(client_id),
+        "meta_model_tag": agent["model_path"].stem,
+        "meta_model_file": str(agent["model_path"]),
+        "meta_threshold_mode": agent["mode"],
         "meta_latency_ms": latency_ms,
         "score_payoff_prob": float(prob),
         "thr_payoff": float(thr),
         "decision_payoff": decision,
         "decision_payoff_norm": decision_norm,
     }
+    if fs_info is not None:
+        out["meta_feature_store"] = fs_info
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--client-id", default=None, help="Required unless --serve-stdio")
+    ap.add_argument("--request-id", default=None)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--mode", default=None, help="e.g. thr_valid_best_f1 / thr_valid_recall_ge_0_90 ...")
+    ap.add_argument("--override-thr", type=float, default=None, help="TEST ONLY: override threshold value")
+    ap.add_argument(
+        "--model-file",
+        default=runtime_manifest.T4_DEFAULT_MODEL_FILE,
+    )
+    ap.add_argument(
+        "--thresholds-file",
+        default=runtime_manifest.T4_DEFAULT_THRESHOLDS_FILE,
+    )
+    ap.add_argument(
+        "--feature-list-file",
+        default=runtime_manifest.T4_DEFAULT_FEATURE_LIST_FILE,
+    )
+    ap.add_argument(
+        "--canonical-alias",
+        default=runtime_manifest.default_alias_paths()["t4_payoff"],
+        help="Path to canonical alias JSON (swap-friendly). If provided, it supplies default model/threshold/feature paths."
+    )
+    ap.add_argument("--feature-store", default=None, help="Optional feature store file; misses fall back to the synthetic row")
+    ap.add_argument("--runtime-manifest", default=None, help="runtime_manifest_v0_1 file (or - for stdin); replaces --canonical-alias")
+    ap.add_argument("--serve-stdio", action="store_true", help="Co-process mode (coprocess.py): load once, then one JSON request per stdin line -> one payload per stdout line")
+    args = ap.parse_args()
+    if args.serve_stdio and args.runtime_manifest == "-":
+        ap.error("--serve-stdio reads requests from stdin: pass --runtime-manifest as a file")
+    if not args.serve_stdio and not args.client_id:
+        ap.error("--client-id is required (unless --serve-stdio)")
+
+    # Canonical alias resolution (swap-friendly defaults); merge rules shared via runtime_manifest.
+    if args.runtime_manifest:
+        resolved = runtime_manifest.get_manifest(args.runtime_manifest)["models"]["t4_payoff"]
+    else:
+        resolved = runtime_manifest.resolve_t4(runtime_manifest.read_alias(args.canonical_alias)["payload"])
+
+    # Only fill defaults if user did NOT explicitly override via CLI
+    if args.model_file == ap.get_default("model_file"):
+        args.model_file = resolved["model_file"]
+    if args.thresholds_file == ap.get_default("thresholds_file"):
+        args.thresholds_file = resolved["thresholds_file"]
+    if args.feature_list_file == ap.get_default("feature_list_file"):
+        args.feature_list_file = resolved["feature_list_file"]
+
+    prof = profiling.from_env("runner_t4")
+    tracing.configure("runner_t4")
+    t0 = time.time()
+    with profiling.stage(prof, "load_agent"), tracing.span("runner_t4.load_agent"):
+        agent = load_agent(args.model_file, args.thresholds_file, args.feature_list_file, args.mode, args.override_thr)
+    if args.serve_stdio:
+        import coprocess  # one-shot runs do not pay for it
+
+        return coprocess.serve_scorer(lambda **kw: score(agent, **kw), component="runner_t4", feature_store=args.feature_store, prof=prof)
+    with profiling.stage(prof, "score"), tracing.span("runner_t4.score", attributes={"decision.request_id": args.request_id}):
+        out = score(agent, client_id=args.client_id, request_id=args.request_id, seed=args.seed, feature_store=args.feature_store, t0=t0)
     print(json.dumps(out, indent=2))
     return 0
 
@@ -6,7 +6,9 @@ import time
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+import runtime_manifest
 
 DEFAULT_CANONICAL_ALIAS = "/home/adien/loan_backbone_ml_BLOCK_A_AGENTS/block_a_gov/artifacts/eligibility_canonical.json"
 
@@ -74,61 +76,61 @@ def validate_intake(payload: Dict[str, Any]) -> None:
             raise ValueError(f"Missing dynamic_sensors_for_eligibility.{k}")
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser(description="WORK-FLOW runner (STUB) -> application_intake_v0_1")
-    ap.add_argument("--client-id", required=True)
-    ap.add_argument("--request-id", default=None)
-    ap.add_argument("--application-id", default=None)
-    ap.add_argument("--channel", default="web")
-    ap.add_argument("--seed", type=int, default=42)
-    ap.add_argument("--canonical-alias", default=DEFAULT_CANONICAL_ALIAS)
-    ap.add_argument("--as-of-ts", default=None)
-    # Optional intake overrides (used by batch replay datasets)
-    ap.add_argument("--age", type=int, default=None)
-    ap.add_argument("--employment-status", choices=["EMPLOYED", "SELF_EMPLOYED", "OTHER"], default=None)
-    ap.add_argument("--declared-income-monthly", type=float, default=None)
-    ap.add_argument("--is-existing-customer", default=None)
-    ap.add_argument("--declared-dti", type=float, default=None)
-    ap.add_argument("--declared-credit-score", type=float, default=None)
-    ap.add_argument("--requested-amount", type=float, default=None)
-    ap.add_argument("--term-months", type=int, default=None)
-    ap.add_argument("--product-type", default=None)
-    args = ap.parse_args()
-
+def build_intake(
+    alias: Dict[str, Any],
+    *,
+    client_id: str,
+    request_id: Optional[str] = None,
+    application_id: Optional[str] = None,
+    channel: str = "web",
+    seed: int = 42,
+    as_of_ts: Optional[str] = None,
+    age: Optional[int] = None,
+    employment_status: Optional[str] = None,
+    declared_income_monthly: Optional[float] = None,
+    is_existing_customer: Any = None,
+    declared_dti: Optional[float] = None,
+    declared_credit_score: Optional[float] = None,
+    requested_amount: Optional[float] = None,
+    term_months: Optional[int] = None,
+    product_type: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Build a validated application_intake_v0_1 payload (STUB generator + optional overrides).
+    Pure with respect to I/O: callers pass the already-loaded canonical alias.
+    """
     t0 = time.time()
-    alias = load_alias(args.canonical_alias)
-
-    request_id = args.request_id or str(uuid.uuid4())
-    application_id = args.application_id or f"app-{request_id[:8]}"
-    as_of_ts = args.as_of_ts or utc_now_iso()
+    request_id = request_id or str(uuid.uuid4())
+    application_id = application_id or f"app-{request_id[:8]}"
+    as_of_ts = as_of_ts or utc_now_iso()
 
-    seeded = args.seed + sum(ord(c) for c in str(args.client_id))
+    seeded = seed + sum(ord(c) for c in str(client_id))
     rng = random.Random(seeded)
 
     is_existing = _as_bool(alias.get("policy", {}).get("only_existing_customers"), True)
-    if args.is_existing_customer is not None:
-        is_existing = _as_bool(args.is_existing_customer, is_existing)
-
-    employment_status = args.employment_status or ["EMPLOYED", "SELF_EMPLOYED", "OTHER"][rng.randint(0, 2)]
-    age = int(args.age) if args.age is not None else 21 + rng.randint(0, 35)
-    income_monthly = float(args.declared_income_monthly) if args.declared_income_monthly is not None else float(1200 + rng.randint(0, 5000))
-    declared_dti = float(args.declared_dti) if args.declared_dti is not None else round(0.1 + rng.random() * 0.6, 4)
-    declared_credit_score = float(args.declared_credit_score) if args.declared_credit_score is not None else None
-    loan_amount = float(args.requested_amount) if args.requested_amount is not None else float(2000 + rng.randint(0, 30000))
-    loan_term_months = int(args.term_months) if args.term_months is not None else [12, 24, 36, 48, 60][rng.randint(0, 4)]
-    product_type = str(args.product_type) if args.product_type is not None else "consumer_loan"
+    if is_existing_customer is not None:
+        is_existing = _as_bool(is_existing_customer, is_existing)
+
+    employment_status = employment_status or ["EMPLOYED", "SELF_EMPLOYED", "OTHER"][rng.randint(0, 2)]
+    age = int(age) if age is not None else 21 + rng.randint(0, 35)
+    income_monthly = float(declared_income_monthly) if declared_income_monthly is not None else float(1200 + rng.randint(0, 5000))
+    declared_dti = float(declared_dti) if declared_dti is not None else round(0.1 + rng.random() * 0.6, 4)
+    declared_credit_score = float(declared_credit_score) if declared_credit_score is not None else None
+    loan_amount = float(requested_amount) if requested_amount is not None else float(2000 + rng.randint(0, 30000))
+    loan_term_months = int(term_months) if term_months is not None else [12, 24, 36, 48, 60][rng.randint(0, 4)]
+    product_type = str(product_type) if product_type is not None else "consumer_loan"
 
     payload = {
         "meta_schema_version": "application_intake_v0_1",
         "meta_generated_at": utc_now_iso(),
         "meta_request_id": request_id,
-        "meta_client_id": str(args.client_id),
+        "meta_client_id": str(client_id),
         "meta_application_id": application_id,
-        "meta_channel": str(args.channel),
+        "meta_channel": str(channel),
         "meta_as_of_ts": as_of_ts,
         "meta_latency_ms": 0,
         "applicant": {
-            "customer_id": f"cust-{args.client_id}",
+            "customer_id": f"cust-{client_id}",
             "is_existing_customer": is_existing,
             "age": age,
             "income_monthly": income_monthly,
@@ -151,6 +153,55 @@ def main() -> int:
 
     payload["meta_latency_ms"] = int((time.time() - t0) * 1000)
     validate_intake(payload)
+    return payload
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="WORK-FLOW runner (STUB) -> application_intake_v0_1")
+    ap.add_argument("--client-id", required=True)
+    ap.add_argument("--request-id", default=None)
+    ap.add_argument("--application-id", default=None)
+    ap.add_argument("--channel", default="web")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--canonical-alias", default=DEFAULT_CANONICAL_ALIAS)
+    ap.add_argument("--runtime-manifest", default=None, help="runtime_manifest_v0_1 file; its workflow alias replaces --canonical-alias")
+    ap.add_argument("--as-of-ts", default=None)
+    # Optional intake overrides (used by batch replay datasets)
+    ap.add_argument("--age", type=int, default=None)
+    ap.add_argument("--employment-status", choices=["EMPLOYED", "SELF_EMPLOYED", "OTHER"], default=None)
+    ap.add_argument("--declared-income-monthly", type=float, default=None)
+    ap.add_argument("--is-existing-customer", default=None)
+    ap.add_argument("--declared-dti", type=float, default=None)
+    ap.add_argument("--declared-credit-score", type=float, default=None)
+    ap.add_argument("--requested-amount", type=float, default=None)
+    ap.add_argument("--term-months", type=int, default=None)
+    ap.add_argument("--product-type", default=None)
+    args = ap.parse_args()
+
+    t0 = time.time()
+    if args.runtime_manifest:
+        alias = runtime_manifest.alias_payload(runtime_manifest.load_manifest(args.runtime_manifest), "workflow")
+    else:
+        alias = load_alias(args.canonical_alias)
+    payload = build_intake(
+        alias,
+        client_id=args.client_id,
+        request_id=args.request_id,
+        application_id=args.application_id,
+        channel=args.channel,
+        seed=args.seed,
+        as_of_ts=args.as_of_ts,
+        age=args.age,
+        employment_status=args.employment_status,
+        declared_income_monthly=args.declared_income_monthly,
+        is_existing_customer=args.is_existing_customer,
+        declared_dti=args.declared_dti,
+        declared_credit_score=args.declared_credit_score,
+        requested_amount=args.requested_amount,
+        term_months=args.term_months,
+        product_type=args.product_type,
+    )
+    payload["meta_latency_ms"] = int((time.time() - t0) * 1000)
     print(json.dumps(payload, indent=2))
     return 0
 
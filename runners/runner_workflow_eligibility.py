@@ -1,53 +1,93 @@
 #!/usr/bin/env python3
 import argparse
 import json
-import os
 import subprocess
 import sys
-import tempfile
+import threading
 import time
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
 from contract_validate import validate_required, REQUIRED_FINAL_DECISION_V0_1
+import cassette
+import idempotency_store
+import metrics_registry
+import profiling
+import runner_eligibility
+import runner_workflow
+import runtime_manifest
+import sensor_hedge
+import tracing
 
 DEFAULT_BRMS_STUB = "tools/smoke/fixtures/brms_all_pass.json"
-DEFAULT_BRMS_POLICY_ALIAS = "block_a_gov/artifacts/brms_policy_canonical.json"
+EARLY_CUT_STATUSES = {"REJECTED", "REVIEW_REQUIRED"}
 
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def run_json(cmd: List[str]) -> Dict[str, Any]:
-    p = subprocess.run(cmd, check=True, capture_output=True, text=True)
+def run_json(cmd: List[str], stdin_obj: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    stdin_text = json.dumps(stdin_obj) if stdin_obj is not None else None
+    p = subprocess.run(cmd, check=True, capture_output=True, text=True, input=stdin_text, env=tracing.child_env())
     return json.loads(p.stdout)
 
 
-def load_brms_policy_snapshot(path: str = DEFAULT_BRMS_POLICY_ALIAS) -> Dict[str, Any]:
-    p = Path(path)
-    if not p.exists():
-        return {
-            "status": "MISSING_ALIAS",
-            "alias_name": "brms_policy_canonical",
-            "policy_id": "P1",
-            "policy_version": "1.0",
-            "bridge_base_url": "http://localhost:8090",
-            "bridge_endpoint": "/bridge/brms_flags",
-        }
-    a = json.loads(p.read_text(encoding="utf-8"))
-    return {
-        "schema_version": "brms_policy_snapshot_v0_1",
-        "status": "OK",
-        "alias_name": a.get("alias_name", "brms_policy_canonical"),
-        "policy_id": a.get("policy_id", "P1"),
-        "policy_version": a.get("policy_version", "1.0"),
-        "brms_flags_schema_version": a.get("brms_flags_schema_version", "brms_flags_v0_1"),
-        "bridge_base_url": (a.get("bridge") or {}).get("base_url", "http://localhost:8090"),
-        "bridge_endpoint": (a.get("bridge") or {}).get("endpoint", "/bridge/brms_flags"),
-    }
+class SpeculativeOriginate:
+    """
+    ORIGINATE child started before eligibility returns (--speculative-originate).
+    Its inputs (client, seed, request id, manifest) do not depend on eligibility, so a hit
+    yields the very pack the sequential path would; an early cut kills it.
+    """
+
+    def __init__(self, cmd: List[str], stdin_obj: Optional[Dict[str, Any]] = None) -> None:
+        self.t0 = time.time()
+        self.done_at: Optional[float] = None
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if stdin_obj is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=tracing.child_env(),
+        )
+        self._out: Dict[str, str] = {}
+        stdin_text = json.dumps(stdin_obj) if stdin_obj is not None else None
+        self._thread = threading.Thread(target=self._communicate, args=(stdin_text,), daemon=True)
+        self._thread.start()
+
+    def _communicate(self, stdin_text: Optional[str]) -> None:
+        out, err = self.proc.communicate(stdin_text)
+        self.done_at = time.time()
+        self._out = {"stdout": out or "", "stderr": err or ""}
+
+    def result(self) -> Dict[str, Any]:
+        """Same contract as run_json: parsed stdout, CalledProcessError on non-zero exit."""
+        self._thread.join()
+        if self.proc.returncode != 0:
+            raise subprocess.CalledProcessError(self.proc.returncode, self.proc.args, output=self._out["stdout"], stderr=self._out["stderr"])
+        return json.loads(self._out["stdout"])
+
+    def cancel(self) -> bool:
+        """Kill the child if still running; True when it had already finished (all work wasted)."""
+        finished = self.proc.poll() is not None
+        if not finished:
+            self.proc.kill()
+        self._thread.join()
+        return finished
+
+    def elapsed_ms(self) -> int:
+        return int(((self.done_at or time.time()) - self.t0) * 1000)
+
+
+def append_speculation_record(path: str, record: Dict[str, Any]) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
 
 
 def reason_to_signal(reason: str) -> str:
@@ -97,6 +137,43 @@ def make_early_final_decision(
     return out
 
 
+def early_cut_pack(
+    *,
+    request_id: str,
+    client_id: str,
+    intake: Dict[str, Any],
+    eligibility: Dict[str, Any],
+    manifest: Dict[str, Any],
+    t0: float,
+) -> Dict[str, Any]:
+    """decision_pack_v0_1 for REJECTED / REVIEW_REQUIRED eligibility (ORIGINATE is skipped)."""
+    policy_snapshot = manifest["brms_policy_snapshot"]
+    latency_ms = int((time.time() - t0) * 1000)
+    final_decision = make_early_final_decision(
+        request_id=request_id,
+        client_id=client_id,
+        policy_id=str(policy_snapshot.get("policy_id", "P1")),
+        policy_version=str(policy_snapshot.get("policy_version", "1.0")),
+        eligibility_status=str(eligibility.get("eligibility_status", "")).upper(),
+        reasons=list(eligibility.get("eligibility_reasons") or []),
+        latency_ms=latency_ms,
+    )
+    return {
+        "meta_schema_version": "decision_pack_v0_1",
+        "meta_generated_at": utc_now_iso(),
+        "meta_request_id": request_id,
+        "meta_client_id": client_id,
+        "meta_latency_ms": latency_ms,
+        "meta_brms_policy_snapshot": policy_snapshot,
+        "meta_runtime_manifest_hash": manifest["manifest_hash"],
+        "decisions": {
+            "workflow_intake": intake,
+            "eligibility": eligibility,
+            "final_decision": final_decision,
+        },
+    }
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="WORK-FLOW + Eligibility mini-orchestrator (STUB-first)")
     ap.add_argument("--client-id", required=True)
@@ -108,6 +185,8 @@ def main() -> int:
     ap.add_argument("--sensor-mode", choices=["STUB", "LIVE"], default="STUB")
     ap.add_argument("--sensor-base-url", default="http://127.0.0.1:9000")
     ap.add_argument("--sensor-timeout-ms", type=int, default=1200)
+    ap.add_argument("--fraud-signals-mode", choices=["STUB", "LIVE"], default="STUB", help="ORIGINATE wC/wB mode (uses --sensor-base-url)")
+    ap.add_argument("--sensor-prefetch-json", default=None, help="sensor_prefetch_v0_1 from runners/sensor_bulk.py (Eligibility + ORIGINATE)")
     # Optional intake overrides forwarded to runner_workflow.py
     ap.add_argument("--as-of-ts", default=None)
     ap.add_argument("--age", type=int, default=None)
@@ -122,126 +201,265 @@ def main() -> int:
     ap.add_argument("--brms-url", default="http://localhost:8090/bridge/brms_flags")
     ap.add_argument("--brms-stub", default=DEFAULT_BRMS_STUB)
     ap.add_argument("--no-brms", action="store_true")
+    ap.add_argument("--feature-store", default=None, help="Feature store file forwarded to ORIGINATE (T2/T3/T4)")
+    ap.add_argument("--runtime-manifest", default=None, help="Serialized runtime_manifest_v0_1 (built from the aliases when omitted)")
+    ap.add_argument("--runtime-manifest-out", default=None, help="Optional path to write the runtime manifest used")
     ap.add_argument("--out", default=None)
+    ap.add_argument(
+        "--speculative-originate",
+        action="store_true",
+        help="Start ORIGINATE as soon as the intake exists (parallel to Eligibility); killed on early cut. "
+        "LIVE wB/wC/BRMS calls are then also made for early-cut requests",
+    )
+    ap.add_argument("--speculation-log", default=None, help="Append one speculation_v0_1 record (hit, wasted ms) per run")
+    ap.add_argument("--idempotency-db", default=None, help="SQLite idempotency store: a resent --request-id replays its stored pack")
+    ap.add_argument("--idempotency-retention-s", type=float, default=idempotency_store.DEFAULT_RETENTION_S)
+    ap.add_argument("--idempotency-wait-s", type=float, default=idempotency_store.DEFAULT_WAIT_S, help="How long a resend waits for an in-flight run of the same id")
+    ap.add_argument(
+        "--isolate-subprocess",
+        action="store_true",
+        help="Run WORK-FLOW and Eligibility as child interpreters (intake passed over stdin) instead of in process",
+    )
+    profiling.add_profile_args(ap)
+    tracing.add_trace_args(ap)
+    cassette.add_cassette_args(ap)
+    ap.add_argument("--sensor-hedge", action="store_true", help=argparse.SUPPRESS)  # refused: one-shot (sensor_hedge.py)
     args = ap.parse_args()
+    if args.sensor_hedge:
+        ap.error(sensor_hedge.ONE_SHOT_ERROR)
+    tracing.configure("workflow", args.trace_out)
+    cassette.configure_from_args(args)
+    request_id = args.request_id or str(uuid.uuid4())
+    with tracing.span("workflow_eligibility", attributes={"decision.request_id": request_id, "decision.channel": args.channel}) as root:
+        return run_workflow(args, request_id, root)
+
 
+def run_workflow(args: argparse.Namespace, request_id: str, root: Any) -> int:
+    prof = profiling.profiler_from_args(args, "workflow")
     t0 = time.time()
-    request_id = args.request_id or str(uuid.uuid4())
 
-    # 1) WORK-FLOW intake
-    wf_cmd = [
+    # Every alias read once; WORK-FLOW, Eligibility and ORIGINATE share it.
+    with profiling.stage(prof, "manifest"):
+        manifest = runtime_manifest.get_manifest(
+            args.runtime_manifest,
+            {"workflow": args.workflow_canonical_alias, "eligibility": args.eligibility_canonical_alias},
+        )
+    if args.runtime_manifest_out:
+        runtime_manifest.write_manifest(manifest, args.runtime_manifest_out)
+
+    intake_overrides = {
+        "as_of_ts": args.as_of_ts,
+        "age": args.age,
+        "employment_status": args.employment_status,
+        "declared_income_monthly": args.declared_income_monthly,
+        "is_existing_customer": args.is_existing_customer,
+        "declared_dti": args.declared_dti,
+        "declared_credit_score": args.declared_credit_score,
+        "requested_amount": args.requested_amount,
+        "term_months": args.term_months,
+        "product_type": args.product_type,
+    }
+
+    # Idempotency: same request_id + same inputs -> stored pack, nothing re-runs. A miss
+    # claims the id; a concurrent resend waits for this run's pack.
+    idem: Optional[idempotency_store.IdempotencyStore] = None
+    idem_hash = ""
+    if args.idempotency_db and args.request_id:
+        idem = idempotency_store.IdempotencyStore(
+            max_entries=0,
+            retention_s=args.idempotency_retention_s,
+            db_path=args.idempotency_db,
+            wait_s=args.idempotency_wait_s,
+        )
+        context = idempotency_store.decision_context(
+            sensor_mode=args.sensor_mode,
+            fraud_signals_mode=args.fraud_signals_mode,
+            no_brms=args.no_brms,
+            brms_stub=args.brms_stub,
+            brms_url=args.brms_url,
+            feature_store=args.feature_store,
+            manifest_hash=manifest["manifest_hash"],
+        )
+        idem_hash = idempotency_store.payload_hash(
+            {"client_id": str(args.client_id), "seed": args.seed, "channel": args.channel, **intake_overrides, **context}
+        )
+        try:
+            stored = idem.claim(request_id, idem_hash)
+        except (idempotency_store.IdempotencyConflict, idempotency_store.IdempotencyPending) as e:
+            raise SystemExit(str(e))
+        if stored is not None:
+            metrics_registry.counter("decision_idempotent_replays_total", "Resent request_ids answered from the idempotency store").inc()
+            root.set_attribute("decision.idempotent_replay", True)
+            if args.out:
+                with open(args.out, "w", encoding="utf-8") as f:
+                    f.write(json.dumps(stored, indent=2) + "\n")
+            print(json.dumps(stored, indent=2))
+            return 0
+
+    # ORIGINATE inputs are known up front (nothing from Eligibility goes in).
+    orig_cmd = [
         sys.executable,
-        "runners/runner_workflow.py",
+        "runners/originate.py",
         "--client-id",
         str(args.client_id),
         "--seed",
         str(args.seed),
         "--request-id",
         request_id,
-        "--channel",
-        args.channel,
-        "--canonical-alias",
-        args.workflow_canonical_alias,
+        "--fraud-signals-mode",
+        args.fraud_signals_mode,
+        "--fraud-sensor-base-url",
+        args.sensor_base_url,
+        "--fraud-sensor-timeout-ms",
+        str(args.sensor_timeout_ms),
     ]
-    if args.as_of_ts:
-        wf_cmd.extend(["--as-of-ts", args.as_of_ts])
-    if args.age is not None:
-        wf_cmd.extend(["--age", str(args.age)])
-    if args.employment_status:
-        wf_cmd.extend(["--employment-status", args.employment_status])
-    if args.declared_income_monthly is not None:
-        wf_cmd.extend(["--declared-income-monthly", str(args.declared_income_monthly)])
-    if args.is_existing_customer is not None:
-        wf_cmd.extend(["--is-existing-customer", str(args.is_existing_customer)])
-    if args.declared_dti is not None:
-        wf_cmd.extend(["--declared-dti", str(args.declared_dti)])
-    if args.declared_credit_score is not None:
-        wf_cmd.extend(["--declared-credit-score", str(args.declared_credit_score)])
-    if args.requested_amount is not None:
-        wf_cmd.extend(["--requested-amount", str(args.requested_amount)])
-    if args.term_months is not None:
-        wf_cmd.extend(["--term-months", str(args.term_months)])
-    if args.product_type:
-        wf_cmd.extend(["--product-type", str(args.product_type)])
-    intake = run_json(wf_cmd)
-
-    # 2) Eligibility using the generated intake
-    with tempfile.NamedTemporaryFile(mode="w", suffix="_intake.json", delete=False, encoding="utf-8") as tf:
-        json.dump(intake, tf)
-        intake_path = tf.name
-    try:
-        elig_cmd = [
-            sys.executable,
-            "runners/runner_eligibility.py",
-            "--intake-json",
-            intake_path,
-            "--canonical-alias",
-            args.eligibility_canonical_alias,
-            "--sensor-mode",
-            args.sensor_mode,
-            "--sensor-base-url",
-            args.sensor_base_url,
-            "--sensor-timeout-ms",
-            str(args.sensor_timeout_ms),
-        ]
-        eligibility = run_json(elig_cmd)
-    finally:
-        try:
-            os.unlink(intake_path)
-        except OSError:
-            pass
-
-    policy_snapshot = load_brms_policy_snapshot()
-
-    # 3) Branch by eligibility decision
-    elig_status = str(eligibility.get("eligibility_status", "")).upper()
-    elig_reasons = eligibility.get("eligibility_reasons") or []
-
-    if elig_status in {"REJECTED", "REVIEW_REQUIRED"}:
-        latency_ms = int((time.time() - t0) * 1000)
-        final_decision = make_early_final_decision(
-            request_id=request_id,
-            client_id=str(args.client_id),
-            policy_id=str(policy_snapshot.get("policy_id", "P1")),
-            policy_version=str(policy_snapshot.get("policy_version", "1.0")),
-            eligibility_status=elig_status,
-            reasons=list(elig_reasons),
-            latency_ms=latency_ms,
-        )
-        pack = {
-            "meta_schema_version": "decision_pack_v0_1",
-            "meta_generated_at": utc_now_iso(),
-            "meta_request_id": request_id,
-            "meta_client_id": str(args.client_id),
-            "meta_latency_ms": latency_ms,
-            "meta_brms_policy_snapshot": policy_snapshot,
-            "decisions": {
-                "workflow_intake": intake,
-                "eligibility": eligibility,
-                "final_decision": final_decision,
-            },
-        }
+    if args.sensor_prefetch_json:
+        orig_cmd.extend(["--sensor-prefetch-json", args.sensor_prefetch_json])
+    if args.feature_store:
+        orig_cmd.extend(["--feature-store", args.feature_store])
+    if args.no_brms:
+        orig_cmd.append("--no-brms")
+    elif args.brms_stub:
+        orig_cmd.extend(["--brms-stub", args.brms_stub])
+    else:
+        orig_cmd.extend(["--brms-url", args.brms_url])
+    orig_stdin: Optional[Dict[str, Any]] = None
+    if args.runtime_manifest and args.runtime_manifest != "-":
+        orig_cmd.extend(["--runtime-manifest", args.runtime_manifest])
     else:
-        orig_cmd = [
-            sys.executable,
-            "runners/originate.py",
-            "--client-id",
-            str(args.client_id),
-            "--seed",
-            str(args.seed),
-            "--request-id",
-            request_id,
-        ]
-        if args.no_brms:
-            orig_cmd.append("--no-brms")
-        elif args.brms_stub:
-            orig_cmd.extend(["--brms-stub", args.brms_stub])
+        orig_cmd.extend(["--runtime-manifest", "-"])
+        orig_stdin = manifest
+
+    spec: Optional[SpeculativeOriginate] = None
+    spec_record: Dict[str, Any] = {}
+
+    try:
+        if args.isolate_subprocess:
+            # 1) WORK-FLOW intake (child interpreter)
+            wf_cmd = [
+                sys.executable,
+                "runners/runner_workflow.py",
+                "--client-id",
+                str(args.client_id),
+                "--seed",
+                str(args.seed),
+                "--request-id",
+                request_id,
+                "--channel",
+                args.channel,
+                "--canonical-alias",
+                args.workflow_canonical_alias,
+            ]
+            if args.runtime_manifest and args.runtime_manifest != "-":
+                wf_cmd.extend(["--runtime-manifest", args.runtime_manifest])
+            for k, v in intake_overrides.items():
+                if v is not None:
+                    wf_cmd.extend([f"--{k.replace('_', '-')}", str(v)])
+            with profiling.stage(prof, "intake"), tracing.span("intake"):
+                intake = run_json(wf_cmd)
+            if args.speculative_originate:
+                spec = SpeculativeOriginate(orig_cmd, orig_stdin)
+
+            # 2) Eligibility (child interpreter); intake goes over stdin, no temp file
+            elig_cmd = [
+                sys.executable,
+                "runners/runner_eligibility.py",
+                "--canonical-alias",
+                args.eligibility_canonical_alias,
+                "--sensor-mode",
+                args.sensor_mode,
+                "--sensor-base-url",
+                args.sensor_base_url,
+                "--sensor-timeout-ms",
+                str(args.sensor_timeout_ms),
+            ]
+            if args.runtime_manifest and args.runtime_manifest != "-":
+                elig_cmd.extend(["--runtime-manifest", args.runtime_manifest])
+            if args.sensor_prefetch_json:
+                elig_cmd.extend(["--sensor-prefetch-json", args.sensor_prefetch_json])
+            with profiling.stage(prof, "eligibility"), tracing.span("eligibility"):
+                eligibility = run_json(elig_cmd, stdin_obj=intake)
+        else:
+            # 1) WORK-FLOW intake (in process)
+            with profiling.stage(prof, "intake"), tracing.span("intake"):
+                wf_alias = runtime_manifest.alias_payload(manifest, "workflow")
+                intake = runner_workflow.build_intake(
+                    wf_alias,
+                    client_id=str(args.client_id),
+                    request_id=request_id,
+                    channel=args.channel,
+                    seed=args.seed,
+                    **intake_overrides,
+                )
+            if args.speculative_originate:
+                spec = SpeculativeOriginate(orig_cmd, orig_stdin)
+
+            # 2) Eligibility (in process, intake passed by reference)
+            with profiling.stage(prof, "eligibility"), tracing.span("eligibility"):
+                elig_alias = runtime_manifest.alias_payload(manifest, "eligibility")
+                eligibility = runner_eligibility.run_eligibility(
+                    intake,
+                    elig_alias,
+                    sensor_mode=args.sensor_mode,
+                    sensor_base_url=args.sensor_base_url,
+                    sensor_timeout_ms=args.sensor_timeout_ms,
+                    sensor_prefetch=runner_eligibility.load_prefetch(args.sensor_prefetch_json),
+                )
+
+        # 3) Branch by eligibility decision
+        t_elig_done = time.time()
+        elig_status = str(eligibility.get("eligibility_status", "")).upper()
+        root.set_attribute("decision.eligibility_status", elig_status)
+        if spec is not None:
+            spec_record.update({
+                "meta_schema_version": "speculation_v0_1",
+                "meta_request_id": request_id,
+                "eligibility_status": elig_status,
+                "hit": False,
+                "eligibility_ms": int((t_elig_done - spec.t0) * 1000),
+            })
+        if elig_status in EARLY_CUT_STATUSES:
+            if spec is not None:
+                spec_record["originate_finished"] = spec.cancel()
+                spec_record["wasted_ms"] = spec.elapsed_ms()
+            pack = early_cut_pack(
+                request_id=request_id,
+                client_id=str(args.client_id),
+                intake=intake,
+                eligibility=eligibility,
+                manifest=manifest,
+                t0=t0,
+            )
         else:
-            orig_cmd.extend(["--brms-url", args.brms_url])
+            # ORIGINATE's own stages (and T2/T3/T4) are profiled in the child; this is the wait.
+            with profiling.stage(prof, "originate"), tracing.span("originate.wait" if spec is not None else "originate"):
+                if spec is not None:
+                    pack = spec.result()
+                    spec_record["hit"] = True
+                    spec_record["originate_ms"] = spec.elapsed_ms()
+                    spec_record["wait_ms"] = int((time.time() - t_elig_done) * 1000)
+                else:
+                    pack = run_json(orig_cmd, stdin_obj=orig_stdin)
+            pack.setdefault("decisions", {})["workflow_intake"] = intake
+            pack.setdefault("decisions", {})["eligibility"] = eligibility
+    except BaseException:
+        # No pack: free the claimed id so a resend runs again instead of waiting.
+        if idem is not None:
+            idem.release(request_id, idem_hash)
+        raise
+    finally:
+        # Eligibility / sensor / prefetch errors: the speculative child was neither consumed
+        # nor cancelled and must not outlive this run.
+        if spec is not None and spec.proc.returncode is None:
+            spec.cancel()
+
+    if idem is not None:
+        idem.put(request_id, idem_hash, pack)
+    metrics_registry.observe_pack(pack)
+    root.set_attribute("decision.final_outcome", (pack.get("decisions", {}).get("final_decision") or {}).get("final_outcome"))
 
-        pack = run_json(orig_cmd)
-        pack.setdefault("decisions", {})["workflow_intake"] = intake
-        pack.setdefault("decisions", {})["eligibility"] = eligibility
+    if spec is not None and args.speculation_log:
+        append_speculation_record(args.speculation_log, spec_record)
 
     if args.out:
         with open(args.out, "w", encoding="utf-8") as f:
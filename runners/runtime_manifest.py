@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Runtime manifest (runtime_manifest_v0_1): every canonical alias resolved once.
+
+One document per process (or per batch run, when serialized) that holds:
+  - aliases          workflow / eligibility / t2_default / t3_fraud / t4_payoff / brms_policy
+                     (path, status, sha256, payload)
+  - models           resolved model / thresholds / feature-list / operating-pick paths per risk agent
+                     (same alias-merging rules the runners apply on their own)
+  - brms_policy_snapshot   the single policy snapshot implementation (meta_brms_policy_snapshot)
+  - content_hashes   sha256 of every referenced file (null when missing)
+  - manifest_hash    sha256 over all of the above -> meta_runtime_manifest_hash on every pack
+
+Stages take it via --runtime-manifest PATH (or "-" = JSON on stdin); without it they
+build one for themselves, as before.
+
+CLI:
+  python3 runners/runtime_manifest.py build --alias-dir block_a_gov/artifacts --out /tmp/runtime_manifest.json
+  python3 runners/runtime_manifest.py verify --manifest /tmp/runtime_manifest.json
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+SCHEMA_VERSION = "runtime_manifest_v0_1"
+
+DEFAULT_ALIAS_DIR = "/home/adien/loan_backbone_ml_BLOCK_A_AGENTS/block_a_gov/artifacts"
+ALIAS_FILES = {
+    "workflow": "eligibility_canonical.json",
+    "eligibility": "eligibility_canonical.json",
+    "t2_default": "t2_default_canonical.json",
+    "t3_fraud": "t3_fraud_canonical.json",
+    "t4_payoff": "t4_payoff_canonical.json",
+}
+DEFAULT_BRMS_POLICY_ALIAS = "block_a_gov/artifacts/brms_policy_canonical.json"
+
+# Runner fallbacks when an alias does not name a file.
+T2_DEFAULT_MODEL_FILE = "/home/adien/loan_backbone_ml_T2_DEFAULT_V2_FULLBUNDLE/models/t2_default_xgb_v3a_microA.json"
+T2_DEFAULT_OPERATING_PICK = "/home/adien/loan_backbone_ml_T2_DEFAULT_V2_FULLBUNDLE/reports/t2_default_xgb_v3a_microA_operating_pick.json"
+T3_DEFAULT_MODEL_FILE = "/home/adien/loan_backbone_ml_T3_FRAUD/models/fraud_t3_ieee_xgb_bcd_best.json"
+T3_DEFAULT_THRESHOLDS_FILE = "/home/adien/loan_backbone_ml_T3_FRAUD/reports/fraud_t3_ieee_bcd_best_thresholds.json"
+T4_DEFAULT_MODEL_FILE = "/home/adien/loan_backbone_ml_T4_PAYOFF/models/t4_payoff_xgb_v1_guarded.json"
+T4_DEFAULT_THRESHOLDS_FILE = "/home/adien/loan_backbone_ml_T4_PAYOFF/reports/t4_payoff_xgb_v1_guarded_thresholds.json"
+T4_DEFAULT_FEATURE_LIST_FILE = "/home/adien/loan_backbone_ml_T4_PAYOFF/reports/t4_payoff_xgb_v1_guarded_feature_list.json"
+
+_SHA_BY_STAT: Dict[Tuple[str, int, int], str] = {}
+_PROCESS_MANIFESTS: Dict[Any, Dict[str, Any]] = {}
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def file_sha256(path: Optional[str]) -> Optional[str]:
+    """sha256 of a file (None if missing); memoized per process on (path, mtime, size)."""
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    sha = _SHA_BY_STAT.get(key)
+    if sha is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        sha = h.hexdigest()
+        _SHA_BY_STAT[key] = sha
+    return sha
+
+
+def default_alias_paths(alias_dir: Optional[str] = None) -> Dict[str, str]:
+    base = alias_dir or DEFAULT_ALIAS_DIR
+    out = {name: str(Path(base) / fname) for name, fname in ALIAS_FILES.items()}
+    out["brms_policy"] = str(Path(alias_dir) / Path(DEFAULT_BRMS_POLICY_ALIAS).name) if alias_dir else DEFAULT_BRMS_POLICY_ALIAS
+    return out
+
+
+def read_alias(path: str) -> Dict[str, Any]:
+    p = Path(path)
+    if not p.exists():
+        return {"path": path, "status": "MISSING", "sha256": None, "payload": None}
+    raw = p.read_bytes()
+    try:
+        payload = json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        return {"path": path, "status": "INVALID", "sha256": hashlib.sha256(raw).hexdigest(), "payload": None, "error": str(e)}
+    return {"path": path, "status": "OK", "sha256": hashlib.sha256(raw).hexdigest(), "payload": payload}
+
+
+def resolve_t2(alias: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    a = alias if isinstance(alias, dict) else {}
+    model = a.get("model", {}) or {}
+    operating = a.get("operating", {}) or {}
+    return {
+        "model_tag": model.get("model_tag"),
+        "model_file": model.get("model_file") or T2_DEFAULT_MODEL_FILE,
+        "feature_list_file": model.get("feature_list_file"),
+        "operating_pick_file": operating.get("operating_pick_file") or T2_DEFAULT_OPERATING_PICK,
+        "default_operating_point": operating.get("default_operating_point") or "op_a",
+    }
+
+
+def resolve_t3(alias: Optional[Dict[str, Any]], *, fallbacks: bool = True) -> Dict[str, Any]:
+    """Nested shape first, then flat keys; fallbacks=False keeps only what the alias names."""
+    d = alias if isinstance(alias, dict) else {}
+    out: Dict[str, Any] = {"model_tag": None, "model_file": None, "thresholds_file": None}
+    model = d.get("model") or {}
+    if isinstance(model, dict):
+        if isinstance(model.get("model_tag"), str) and model.get("model_tag"):
+            out["model_tag"] = model["model_tag"]
+        if isinstance(model.get("model_file"), str) and model.get("model_file"):
+            out["model_file"] = model["model_file"]
+    thr = d.get("thresholds") or {}
+    if isinstance(thr, dict):
+        tf = thr.get("thresholds_file") or thr.get("thresholds_alias") or thr.get("thresholds_path")
+        if isinstance(tf, str) and tf:
+            out["thresholds_file"] = tf
+    for k in ("model_file", "model_tag", "thresholds_file"):
+        if not out[k] and isinstance(d.get(k), str) and d.get(k):
+            out[k] = d[k]
+    if not fallbacks:
+        return {k: v for k, v in out.items() if v}
+    out["model_file"] = out["model_file"] or T3_DEFAULT_MODEL_FILE
+    out["thresholds_file"] = out["thresholds_file"] or T3_DEFAULT_THRESHOLDS_FILE
+    return out
+
+
+def resolve_t4(alias: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    a = alias if isinstance(alias, dict) else {}
+    model = a.get("model", {}) or {}
+    thr = a.get("thresholds", {}) or {}
+    return {
+        "model_tag": model.get("model_tag"),
+        "model_file": model.get("model_file") or T4_DEFAULT_MODEL_FILE,
+        "thresholds_file": thr.get("thresholds_file") or T4_DEFAULT_THRESHOLDS_FILE,
+        "feature_list_file": model.get("feature_list_file") or T4_DEFAULT_FEATURE_LIST_FILE,
+    }
+
+
+def brms_policy_snapshot(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stable policy snapshot (spec-first) from the brms_policy canonical alias.
+    Missing alias -> MISSING_ALIAS with the P1/1.0 defaults the early-cut path relies on.
+    """
+    if entry.get("status") != "OK" or not isinstance(entry.get("payload"), dict):
+        return {
+            "schema_version": "brms_policy_snapshot_v0_1",
+            "status": "MISSING_ALIAS",
+            "alias_path": entry.get("path"),
+            "alias_name": "brms_policy_canonical",
+            "policy_id": "P1",
+            "policy_version": "1.0",
+            "bridge_base_url": "http://localhost:8090",
+            "bridge_endpoint": "/bridge/brms_flags",
+        }
+    d = entry["payload"]
+    bridge = d.get("bridge", {}) or {}
+    return {
+        "schema_version": "brms_policy_snapshot_v0_1",
+        "status": "OK",
+        "alias_name": d.get("alias_name", "brms_policy_canonical"),
+        "policy_id": d.get("policy_id", "P1"),
+        "policy_version": d.get("policy_version", "1.0"),
+        "brms_flags_schema_version": d.get("brms_flags_schema_version", "brms_flags_v0_1"),
+        "bridge_base_url": bridge.get("base_url", "http://localhost:8090"),
+        "bridge_endpoint": bridge.get("endpoint", "/bridge/brms_flags"),
+    }
+
+
+def _hash_body(manifest: Dict[str, Any]) -> str:
+    body = {
+        "aliases": {k: {"path": v.get("path"), "status": v.get("status"), "sha256": v.get("sha256")} for k, v in manifest["aliases"].items()},
+        "models": manifest["models"],
+        "brms_policy_snapshot": manifest["brms_policy_snapshot"],
+        "content_hashes": manifest["content_hashes"],
+    }
+    return hashlib.sha256(json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def build_manifest(alias_paths: Optional[Dict[str, str]] = None, *, alias_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Read every alias once, resolve model/threshold paths, hash all referenced files."""
+    paths = default_alias_paths(alias_dir)
+    paths.update({k: v for k, v in (alias_paths or {}).items() if v})
+
+    aliases: Dict[str, Dict[str, Any]] = {}
+    by_path: Dict[str, Dict[str, Any]] = {}
+    for name, path in paths.items():
+        # workflow and eligibility usually share one file: read it once.
+        if path not in by_path:
+            by_path[path] = read_alias(path)
+        aliases[name] = by_path[path]
+
+    models = {
+        "t2_default": resolve_t2(aliases["t2_default"]["payload"]),
+        "t3_fraud": resolve_t3(aliases["t3_fraud"]["payload"]),
+        "t4_payoff": resolve_t4(aliases["t4_payoff"]["payload"]),
+    }
+
+    content_hashes: Dict[str, Optional[str]] = {}
+    for entry in aliases.values():
+        content_hashes[entry["path"]] = entry["sha256"]
+    for m in models.values():
+        for k, v in m.items():
+            if k.endswith("_file") and v:
+                content_hashes[v] = file_sha256(v)
+
+    manifest: Dict[str, Any] = {
+        "schema_version": SCHEMA_VERSION,
+        "built_at": utc_now_iso(),
+        "aliases": aliases,
+        "models": models,
+        "brms_policy_snapshot": brms_policy_snapshot(aliases["brms_policy"]),
+        "content_hashes": content_hashes,
+    }
+    manifest["manifest_hash"] = _hash_body(manifest)
+    return manifest
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """Serialized manifest from a file, or from stdin when path is "-"."""
+    if path == "-":
+        raw = sys.stdin.read().strip()
+        if not raw:
+            raise ValueError("Missing runtime manifest JSON on stdin (--runtime-manifest -)")
+        m = json.loads(raw)
+    else:
+        p = Path(path)
+        if not p.exists():
+            raise FileNotFoundError(f"Runtime manifest not found: {path}")
+        m = json.loads(p.read_text(encoding="utf-8"))
+    if not isinstance(m, dict) or m.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"Expected schema_version={SCHEMA_VERSION} in runtime manifest")
+    if m.get("manifest_hash") != _hash_body(m):
+        raise ValueError("Runtime manifest hash does not match its content")
+    return m
+
+
+def get_manifest(path: Optional[str] = None, alias_paths: Optional[Dict[str, str]] = None, *, alias_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Process-wide manifest: loaded (path) or built (aliases) once, then reused."""
+    key = (path, tuple(sorted((alias_paths or {}).items())), alias_dir)
+    m = _PROCESS_MANIFESTS.get(key)
+    if m is None:
+        m = load_manifest(path) if path else build_manifest(alias_paths, alias_dir=alias_dir)
+        _PROCESS_MANIFESTS[key] = m
+    return m
+
+
+def write_manifest(manifest: Dict[str, Any], path: str) -> None:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    tmp.replace(p)
+
+
+def alias_payload(manifest: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Alias JSON from the manifest; same error as runner_workflow.load_alias when absent."""
+    entry = (manifest.get("aliases") or {}).get(name) or {}
+    if entry.get("status") != "OK":
+        raise FileNotFoundError(f"Canonical alias not found: {entry.get('path')}")
+    return entry["payload"]
+
+
+def verify_manifest(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild from the same alias paths and report drifted files."""
+    fresh = build_manifest({k: v.get("path") for k, v in manifest["aliases"].items()})
+    drift = sorted(
+        p for p in set(manifest["content_hashes"]) | set(fresh["content_hashes"])
+        if manifest["content_hashes"].get(p) != fresh["content_hashes"].get(p)
+    )
+    return {
+        "ok": fresh["manifest_hash"] == manifest["manifest_hash"],
+        "manifest_hash": manifest["manifest_hash"],
+        "current_hash": fresh["manifest_hash"],
+        "drifted_files": drift,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Runtime manifest (all canonical aliases resolved once)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Resolve aliases + hashes and write/print the manifest")
+    b.add_argument("--alias-dir", default=None, help=f"Directory with the canonical aliases (default: {DEFAULT_ALIAS_DIR})")
+    for name in list(ALIAS_FILES) + ["brms_policy"]:
+        b.add_argument(f"--{name.replace('_', '-')}-alias", default=None)
+    b.add_argument("--out", default=None)
+
+    v = sub.add_parser("verify", help="Check a serialized manifest against the files on disk")
+    v.add_argument("--manifest", required=True)
+
+    args = ap.parse_args()
+    if args.cmd == "build":
+        overrides = {name: getattr(args, f"{name}_alias") for name in list(ALIAS_FILES) + ["brms_policy"]}
+        manifest = build_manifest(overrides, alias_dir=args.alias_dir)
+        if args.out:
+            write_manifest(manifest, args.out)
+            missing = sorted(k for k, e in manifest["aliases"].items() if e["status"] != "OK")
+            print(json.dumps({"out": args.out, "manifest_hash": manifest["manifest_hash"], "aliases_not_ok": missing}, indent=2))
+        else:
+            print(json.dumps(manifest, indent=2))
+        return 0
+
+    report = verify_manifest(load_manifest(args.manifest))
+    print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 3
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
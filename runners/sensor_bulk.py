@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Bulk DS_Z sensor client (batch / backfill runs).
+
+Instead of one GET per sensor per row, rows are grouped per sensor, chunked and sent
+as `POST /sensor/batch` calls in parallel:
+
+  request:  {"sensor": "bureau_spike_score", "items": [{"client_id": ..., "request_id": ..., ...}, ...]}
+  response: {"sensor": ..., "results": [{"ok": true, "data": {...GET payload...}}
+                                        | {"ok": false, "status": 503, "detail": "..."}, ...]}
+
+Results are written to a prefetch file (sensor_prefetch_v0_1) keyed by request_id.
+The per-row resolvers (`runner_eligibility.resolve_dynamic_sensors` wE/wF and
+`originate.resolve_fraud_signals` wC/wB) consult it first:
+  - item OK           -> payload used as if fetched individually
+  - item failed       -> same FALLBACK as a failed single fetch
+  - item not present  -> normal per-row GET (e.g. the whole chunk failed)
+
+market_snapshot keeps the single-call rule: a 400 for an as_of is retried once
+without as_of (here: as a second batch of just those items).
+
+Usage:
+  python3 runners/sensor_bulk.py --requests-jsonl testing/requests/eval_requests_dev_v0_1.jsonl \
+      --sensor-base-url http://127.0.0.1:9000 --out /tmp/sensor_prefetch.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cassette
+import tracing
+
+SCHEMA_VERSION = "sensor_prefetch_v0_1"
+BATCH_ENDPOINT = "/sensor/batch"
+
+ELIGIBILITY_SENSORS = ("bureau_spike_score", "market_snapshot")
+ORIGINATE_SENSORS = ("device_behavior_score", "transaction_anomaly_score")
+ALL_SENSORS = ELIGIBILITY_SENSORS + ORIGINATE_SENSORS
+
+
+class SensorPrefetchError(RuntimeError):
+    """A prefetched sensor item failed upstream (treated like a failed single fetch)."""
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def sensor_item(sensor: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Query params for one row; identical to what the per-row resolvers send."""
+    client_id = str(row.get("client_id", "")).strip()
+    request_id = str(row.get("request_id", "")).strip()
+    if sensor == "bureau_spike_score":
+        return {"client_id": client_id, "lookback_hours": 24, "request_id": request_id}
+    if sensor == "market_snapshot":
+        item: Dict[str, Any] = {"request_id": request_id}
+        if row.get("as_of_ts"):
+            item["as_of"] = str(row["as_of_ts"])
+        return item
+    if sensor == "device_behavior_score":
+        return {"client_id": client_id, "lookback_hours": 24, "request_id": request_id, "seed": int(row.get("seed", 42))}
+    if sensor == "transaction_anomaly_score":
+        return {"client_id": client_id, "lookback_days": 30, "request_id": request_id, "seed": int(row.get("seed", 42))}
+    raise ValueError(f"Unknown sensor: {sensor}")
+
+
+def post_batch(base_url: str, sensor: str, items: List[Dict[str, Any]], timeout_s: float) -> List[Dict[str, Any]]:
+    payload = {"sensor": sensor, "items": items}
+    url = f"{base_url.rstrip('/')}{BATCH_ENDPOINT}"
+
+    def post() -> Any:
+        req = urllib.request.Request(
+            url,
+            data=json.dumps(payload).encode("utf-8"),
+            method="POST",
+            headers=tracing.inject({"Content-Type": "application/json"}),
+        )
+        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    with tracing.span(f"POST {BATCH_ENDPOINT}", kind="CLIENT", attributes={"sensor": sensor, "sensor.batch_size": len(items)}):
+        data = cassette.call("POST", url, post, payload)
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list) or len(results) != len(items):
+        raise ValueError(f"Malformed batch response for {sensor}: expected {len(items)} results")
+    return results
+
+
+def _chunks(seq: List[Any], size: int) -> List[List[Any]]:
+    size = max(int(size), 1)
+    return [seq[i:i + size] for i in range(0, len(seq), size)]
+
+
+def bulk_fetch(
+    rows: List[Dict[str, Any]],
+    *,
+    sensor_base_url: str,
+    sensors: Tuple[str, ...] = ALL_SENSORS,
+    chunk_size: int = 200,
+    workers: int = 4,
+    timeout_ms: int = 10000,
+) -> Dict[str, Any]:
+    """
+    Fetch every (row, sensor) pair through /sensor/batch -> sensor_prefetch_v0_1 document.
+    Rows need request_id/client_id (+ seed, as_of_ts when present), e.g. eval_requests_v0_1.
+    """
+    t0 = time.time()
+    timeout_s = max(float(timeout_ms) / 1000.0, 0.1)
+    entries: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        rid = str(row.get("request_id", "")).strip()
+        if rid:
+            entries[rid] = {"client_id": str(row.get("client_id", "")).strip(), "sensors": {}}
+    keyed_rows = [r for r in rows if str(r.get("request_id", "")).strip() in entries]
+
+    stats: Dict[str, Dict[str, int]] = {s: {"ok": 0, "error": 0, "missing": 0, "calls": 0, "as_of_retry": 0} for s in sensors}
+
+    def run_chunk(task: Tuple[str, List[Dict[str, Any]]]) -> Tuple[str, List[Dict[str, Any]], Optional[List[Dict[str, Any]]], Optional[str]]:
+        sensor, chunk = task
+        items = [sensor_item(sensor, r) for r in chunk]
+        try:
+            return sensor, items, post_batch(sensor_base_url, sensor, items, timeout_s), None
+        except Exception as e:
+            return sensor, items, None, str(e)
+
+    def execute(tasks: List[Tuple[str, List[Dict[str, Any]]]]) -> List[Tuple[str, List[Dict[str, Any]], Optional[List[Dict[str, Any]]], Optional[str]]]:
+        if not tasks:
+            return []
+        # Imported here: runners load this module for load_prefetch() on every start.
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max(int(workers), 1)) as pool:
+            return list(pool.map(run_chunk, tasks))
+
+    tasks = [(s, chunk) for s in sensors for chunk in _chunks(keyed_rows, chunk_size)]
+    retry_rows: List[Dict[str, Any]] = []
+    for sensor, items, results, err in execute(tasks):
+        stats[sensor]["calls"] += 1
+        if results is None:
+            # Whole chunk lost: leave entries absent so rows fetch individually.
+            _eprint(f"[SENSOR_BULK] {sensor} chunk of {len(items)} failed, rows keep per-row fetch: {err}")
+            stats[sensor]["missing"] += len(items)
+            continue
+        for item, res in zip(items, results):
+            rid = item["request_id"]
+            if res.get("ok"):
+                entries[rid]["sensors"][sensor] = {"status": "OK", "payload": res.get("data") or {}}
+                stats[sensor]["ok"] += 1
+            elif sensor == "market_snapshot" and "as_of" in item and int(res.get("status") or 0) == 400:
+                retry_rows.append({"request_id": rid})
+            else:
+                entries[rid]["sensors"][sensor] = {"status": "ERROR", "http_status": res.get("status"), "detail": res.get("detail")}
+                stats[sensor]["error"] += 1
+
+    # market_snapshot: retry once without as_of, like the single-call path.
+    for sensor, items, results, err in execute([("market_snapshot", chunk) for chunk in _chunks(retry_rows, chunk_size)]):
+        stats[sensor]["calls"] += 1
+        stats[sensor]["as_of_retry"] += len(items)
+        for i, item in enumerate(items):
+            rid = item["request_id"]
+            res = results[i] if results is not None else {"ok": False, "status": None, "detail": err}
+            if res.get("ok"):
+                entries[rid]["sensors"][sensor] = {"status": "OK", "payload": res.get("data") or {}, "as_of_retry": True}
+                stats[sensor]["ok"] += 1
+            else:
+                entries[rid]["sensors"][sensor] = {"status": "ERROR", "http_status": res.get("status"), "detail": res.get("detail"), "as_of_retry": True}
+                stats[sensor]["error"] += 1
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at": utc_now_iso(),
+        "sensor_base_url": sensor_base_url,
+        "chunk_size": int(chunk_size),
+        "workers": int(workers),
+        "elapsed_ms": int((time.time() - t0) * 1000),
+        "stats": stats,
+        "entries": entries,
+    }
+
+
+def load_prefetch(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not path:
+        return None
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+    d = json.loads(p.read_text(encoding="utf-8"))
+    if not isinstance(d, dict) or d.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"Expected schema_version={SCHEMA_VERSION} in {path}")
+    return d
+
+
+def prefetched_sensor(
+    prefetch: Optional[Dict[str, Any]],
+    request_id: str,
+    sensor: str,
+    client_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Sensor payload for one row from a prefetch document.
+    Returns None when not prefetched (caller fetches as usual); raises SensorPrefetchError
+    when the prefetched item failed (caller applies its normal fallback).
+    """
+    if not prefetch:
+        return None
+    entry = (prefetch.get("entries") or {}).get(str(request_id))
+    if not isinstance(entry, dict):
+        return None
+    if client_id is not None and str(entry.get("client_id", "")) != str(client_id):
+        return None
+    item = (entry.get("sensors") or {}).get(sensor)
+    if not isinstance(item, dict):
+        return None
+    if item.get("status") != "OK":
+        raise SensorPrefetchError(f"{sensor} prefetch failed: status={item.get('http_status')} detail={item.get('detail')}")
+    payload = item.get("payload")
+    if not isinstance(payload, dict):
+        raise SensorPrefetchError(f"{sensor} prefetch payload is not an object")
+    return payload
+
+
+def _load_rows(path: str) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Bulk DS_Z sensor prefetch via POST /sensor/batch")
+    ap.add_argument("--requests-jsonl", required=True, help="Rows with request_id/client_id/seed/as_of_ts")
+    ap.add_argument("--sensor-base-url", default="http://127.0.0.1:9000")
+    ap.add_argument("--sensors", default=",".join(ALL_SENSORS), help=f"Comma list from: {','.join(ALL_SENSORS)}")
+    ap.add_argument("--chunk-size", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--timeout-ms", type=int, default=10000, help="Timeout per batch call")
+    ap.add_argument("--max-rows", type=int, default=None)
+    ap.add_argument("--out", required=True, help="Output sensor_prefetch_v0_1 JSON")
+    cassette.add_cassette_args(ap)
+    args = ap.parse_args()
+    tracing.configure("sensor_bulk")
+    cassette.configure_from_args(args)
+
+    sensors = tuple(s.strip() for s in args.sensors.split(",") if s.strip())
+    unknown = [s for s in sensors if s not in ALL_SENSORS]
+    if unknown:
+        raise ValueError(f"Unknown sensors: {unknown}")
+
+    rows = _load_rows(args.requests_jsonl)
+    if args.max_rows is not None:
+        rows = rows[: args.max_rows]
+
+    doc = bulk_fetch(
+        rows,
+        sensor_base_url=args.sensor_base_url,
+        sensors=sensors,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        timeout_ms=args.timeout_ms,
+    )
+    Path(args.out).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    summary = {k: doc[k] for k in ("schema_version", "elapsed_ms", "stats")}
+    summary.update({"rows": len(doc["entries"]), "out": args.out})
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
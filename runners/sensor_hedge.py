@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Hedged requests for the idempotent LIVE sensor GETs (/sensor/*).
+
+A call that has not answered after the sensor's observed p95 (rolling window of recent
+latencies in this process) gets a duplicate request; the first good answer wins, the other
+one is dropped (cancelled on the asyncio path, left to finish on a pool thread on the sync
+path). A call that fails before the hedge delay fails as before: hedging targets slow
+answers, not errors.
+
+Extra load is capped by a token budget: every primary request adds `budget` tokens (0.05 =
+at most ~5% more requests over time, burst of HEDGE_BURST), every hedge spends one. Until a
+sensor has min_samples latencies there is no p95: no hedge, unless initial_ms gives a delay.
+
+Per call, `stats` gets hedge_sent / hedge_won (0 or 1); ORIGINATE writes them into the
+fraud signals' sensor_trace, every hedge is counted in decision_sensor_hedge_total.
+
+Off unless configured: --sensor-hedge [--sensor-hedge-budget 0.05 ...], on the long-lived
+hosts only (decision_service, decision_async, decision_engine, originate --serve-stdio). The
+window and the budget live in the process and start empty: a one-shot runner makes at most
+two sensor calls, so it could never hedge, and the one-shot CLIs refuse the flag (ONE_SHOT_ERROR).
+The policy wraps the cassette (cassette.py): a recording holds both attempts of a hedged call.
+
+Usage:
+  python3 runners/decision_async.py ... --sensor-mode LIVE --sensor-hedge --sensor-hedge-budget 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import contextvars
+import threading
+import time
+import urllib.parse
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import metrics_registry
+
+# asyncio / concurrent.futures are imported on the hedged paths only: every runner imports
+# this module, and a run without --sensor-hedge must not pay for them.
+
+DEFAULT_BUDGET = 0.05
+DEFAULT_QUANTILE = 0.95
+DEFAULT_MIN_SAMPLES = 20
+HEDGE_BURST = 10.0  # most hedges the budget can save up for a slow spell
+WINDOW = 512        # latencies kept per sensor
+REFRESH_EVERY = 16  # observations between two quantile recomputations
+SENSOR_PATH_PREFIX = "/sensor/"
+BATCH_PATH = "/sensor/batch"
+ONE_SHOT_ERROR = (
+    "--sensor-hedge needs a long-lived process (decision_service, decision_async, decision_engine, "
+    "originate --serve-stdio): a one-shot run never warms the latency window or the hedge budget"
+)
+
+
+def hedgeable(method: str, url: str) -> Optional[str]:
+    """Sensor name of an idempotent sensor GET (None: never hedged)."""
+    path = urllib.parse.urlsplit(url).path
+    if method.upper() != "GET" or not path.startswith(SENSOR_PATH_PREFIX) or path == BATCH_PATH:
+        return None
+    return path[len(SENSOR_PATH_PREFIX):]
+
+
+class _Sensor:
+    __slots__ = ("latencies", "since_refresh", "delay_ms")
+
+    def __init__(self) -> None:
+        self.latencies: Deque[float] = collections.deque(maxlen=WINDOW)
+        self.since_refresh = 0
+        self.delay_ms: Optional[float] = None
+
+
+class HedgePolicy:
+    def __init__(
+        self,
+        *,
+        budget: float = DEFAULT_BUDGET,
+        quantile: float = DEFAULT_QUANTILE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        initial_ms: Optional[float] = None,
+        workers: int = 16,
+    ) -> None:
+        if not 0.0 <= budget <= 1.0:
+            raise ValueError("hedge budget must be in [0, 1]")
+        if not 0.0 < quantile < 1.0:
+            raise ValueError("hedge quantile must be in (0, 1)")
+        self.budget = float(budget)
+        self.quantile = float(quantile)
+        self.min_samples = max(int(min_samples), 1)
+        self.initial_ms = float(initial_ms) if initial_ms else None
+        self._lock = threading.Lock()
+        self._sensors: Dict[str, _Sensor] = {}
+        self._tokens = 0.0
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+        self._pool: Optional[Any] = None  # ThreadPoolExecutor, on the first hedged sync call
+        self._workers = max(int(workers), 2)
+
+    # --- bookkeeping -----------------------------------------------------------
+
+    def observe(self, sensor: str, latency_ms: float) -> None:
+        with self._lock:
+            s = self._sensors.setdefault(sensor, _Sensor())
+            s.latencies.append(latency_ms)
+            s.since_refresh += 1
+            if len(s.latencies) >= self.min_samples and (s.delay_ms is None or s.since_refresh >= REFRESH_EVERY):
+                ordered = sorted(s.latencies)
+                s.delay_ms = ordered[min(int(self.quantile * len(ordered)), len(ordered) - 1)]
+                s.since_refresh = 0
+
+    def _start(self, sensor: str) -> Optional[float]:
+        """Count a primary request; the hedge delay in ms (None: this call is not hedged)."""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self._tokens + self.budget, HEDGE_BURST)
+            s = self._sensors.get(sensor)
+            delay = s.delay_ms if s is not None and s.delay_ms is not None else self.initial_ms
+        return delay
+
+    def _take_token(self, sensor: str) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                ok = False
+            else:
+                self._tokens -= 1.0
+                self.hedges += 1
+                ok = True
+        if not ok:
+            metrics_registry.observe_sensor_hedge(sensor, "no_budget")
+        return ok
+
+    def _finish(self, sensor: str, won: bool, stats: Optional[Dict[str, int]]) -> None:
+        if won:
+            with self._lock:
+                self.wins += 1
+        metrics_registry.observe_sensor_hedge(sensor, "won" if won else "lost")
+        if stats is not None:
+            stats["hedge_sent"] = 1
+            stats["hedge_won"] = int(won)
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "quantile": self.quantile,
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.wins,
+                "delay_ms": {k: (round(s.delay_ms, 3) if s.delay_ms is not None else None) for k, s in self._sensors.items()},
+            }
+
+    # --- sync path ---------------------------------------------------------------
+
+    def _submit(self, sensor: str, fn: Callable[[], Any]) -> Any:
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="sensor_hedge")
+        ctx = contextvars.copy_context()  # open span stays the parent of the duplicate's span
+        t0 = time.perf_counter()
+
+        def run() -> Any:
+            out = ctx.run(fn)
+            self.observe(sensor, (time.perf_counter() - t0) * 1000.0)
+            return out
+
+        return self._pool.submit(run)
+
+    def call(self, sensor: str, fn: Callable[[], Any], stats: Optional[Dict[str, int]] = None) -> Any:
+        delay = self._start(sensor)
+        if stats is not None:
+            stats.update(hedge_sent=0, hedge_won=0)
+        if delay is None:
+            t0 = time.perf_counter()
+            out = fn()
+            self.observe(sensor, (time.perf_counter() - t0) * 1000.0)
+            return out
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        primary = self._submit(sensor, fn)
+        done, _ = wait([primary], timeout=delay / 1000.0)
+        if done or not self._take_token(sensor):
+            return primary.result()
+        hedge = self._submit(sensor, fn)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    self._finish(sensor, f is hedge, stats)
+                    return f.result()
+        self._finish(sensor, False, stats)
+        return primary.result()  # both failed: the primary's error
+
+    # --- asyncio path ------------------------------------------------------------
+
+    async def _timed(self, sensor: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        t0 = time.perf_counter()
+        out = await fn()
+        self.observe(sensor, (time.perf_counter() - t0) * 1000.0)
+        return out
+
+    async def acall(self, sensor: str, fn: Callable[[], Awaitable[Any]], stats: Optional[Dict[str, int]] = None) -> Any:
+        delay = self._start(sensor)
+        if stats is not None:
+            stats.update(hedge_sent=0, hedge_won=0)
+        if delay is None:
+            return await self._timed(sensor, fn)
+        import asyncio
+
+        primary = asyncio.ensure_future(self._timed(sensor, fn))
+        done, _ = await asyncio.wait({primary}, timeout=delay / 1000.0)
+        if done or not self._take_token(sensor):
+            return await primary
+        hedge = asyncio.ensure_future(self._timed(sensor, fn))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for f in done:
+                    if f.exception() is None:
+                        self._finish(sensor, f is hedge, stats)
+                        return f.result()
+            self._finish(sensor, False, stats)
+            return primary.result()
+        finally:
+            for f in pending:
+                f.cancel()
+
+
+_policy: Optional[HedgePolicy] = None
+
+
+def configure(
+    enabled: bool,
+    *,
+    budget: float = DEFAULT_BUDGET,
+    quantile: float = DEFAULT_QUANTILE,
+    min_samples: int = DEFAULT_MIN_SAMPLES,
+    initial_ms: Optional[float] = None,
+) -> Optional[HedgePolicy]:
+    """Hedge this process's sensor GETs (False: off)."""
+    global _policy
+    _policy = (
+        HedgePolicy(budget=budget, quantile=quantile, min_samples=min_samples, initial_ms=initial_ms) if enabled else None
+    )
+    return _policy
+
+
+def active() -> Optional[HedgePolicy]:
+    return _policy
+
+
+def call(method: str, url: str, fn: Callable[[], Any], stats: Optional[Dict[str, int]] = None) -> Any:
+    """fn() hedged under the active policy (plain fn() when off or not a sensor GET)."""
+    p = active()
+    sensor = hedgeable(method, url) if p is not None else None
+    return fn() if sensor is None else p.call(sensor, fn, stats)
+
+
+async def acall(method: str, url: str, fn: Callable[[], Awaitable[Any]], stats: Optional[Dict[str, int]] = None) -> Any:
+    p = active()
+    sensor = hedgeable(method, url) if p is not None else None
+    return await fn() if sensor is None else await p.acall(sensor, fn, stats)
+
+
+def add_hedge_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--sensor-hedge", action="store_true", help="Hedge slow LIVE sensor GETs with a duplicate request after the sensor's p95 (long-lived hosts only)")
+    ap.add_argument("--sensor-hedge-budget", type=float, default=DEFAULT_BUDGET, help="Most extra requests, as a share of sensor requests")
+    ap.add_argument("--sensor-hedge-quantile", type=float, default=DEFAULT_QUANTILE, help="Observed latency quantile after which the duplicate goes out")
+    ap.add_argument("--sensor-hedge-min-samples", type=int, default=DEFAULT_MIN_SAMPLES, help="Latencies per sensor before the quantile is trusted")
+    ap.add_argument("--sensor-hedge-initial-ms", type=float, default=None, help="Hedge delay until then (default: no hedging while warming up)")
+
+
+def configure_from_args(args: argparse.Namespace) -> Optional[HedgePolicy]:
+    return configure(
+        args.sensor_hedge,
+        budget=args.sensor_hedge_budget,
+        quantile=args.sensor_hedge_quantile,
+        min_samples=args.sensor_hedge_min_samples,
+        initial_ms=args.sensor_hedge_initial_ms,
+    )
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Precompiled threshold / operating-point index shared by the risk agents (T2/T3/T4).
+
+Each thresholds artifact is compiled once into a flat index
+  mode -> {threshold, precision, recall, f1, flag_rate, block_key}
+plus the default/inferred mode. Indexes are keyed by the sha256 of the file content
+and cached in memory (per process) and on disk (THRESHOLD_INDEX_CACHE_DIR, default
+.cache/threshold_index/ at the repo root), so a swapped artifact can never be served
+from a stale index.
+
+Kinds (the only resolution path: runner_t2/t3/t4 read their thresholds through here):
+  t2  operating_pick.json   op_a/op_b -> test block, else valid block (t2_op_block)
+  t3  thresholds alias      flat mode keys, recommended_default_mode (t3_mode/t3_threshold)
+  t4  thresholds JSON       thr_valid_* anywhere under panel_valid, a direct key wins (t4_mode/t4_threshold)
+
+CLI:
+  python3 runners/threshold_index.py dump   --kind t4 --file <thresholds.json>
+  python3 runners/threshold_index.py verify --kind t4 --file <thresholds.json>
+  python3 runners/threshold_index.py verify --kind t2 --canonical-alias block_a_gov/artifacts/t2_default_canonical.json
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+SCHEMA_VERSION = "threshold_index_v0_1"
+KINDS = ("t2", "t3", "t4")
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "threshold_index"
+
+T2_OP_KEYS = {"op_a": "op_a_best_f1_under_flag", "op_b": "op_b_max_recall_under_flag"}
+T4_PREFERRED_MODES = (
+    "thr_valid_best_f1",
+    "thr_valid_recall_ge_0_90",
+    "thr_valid_recall_ge_0_95",
+    "thr_valid_precision_ge_0_70",
+)
+METRIC_KEYS = ("precision", "recall", "f1", "flag_rate")
+
+# (kind, sha256) -> index ; (path, mtime_ns, size) -> sha256
+_MEM: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_SHA_BY_STAT: Dict[Tuple[str, int, int], str] = {}
+
+
+def _eprint(msg: str) -> None:
+    print(msg, file=sys.stderr)
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("THRESHOLD_INDEX_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+
+def _metrics(block: Any) -> Dict[str, Any]:
+    if not isinstance(block, dict):
+        return {}
+    return {k: block[k] for k in METRIC_KEYS if k in block}
+
+
+def collect_thr_candidates(obj: Any) -> Dict[str, float]:
+    """
+    Recursively collect threshold modes like 'thr_valid_*'.
+
+    Supports:
+      - numeric: thr_valid_*: 0.36
+      - dict payload: thr_valid_*: {"threshold": 0.36, ...}
+
+    Returns: {mode_key: threshold_float}
+    """
+    out: Dict[str, float] = {}
+
+    def walk(x: Any) -> None:
+        if isinstance(x, dict):
+            for k, v in x.items():
+                if isinstance(k, str) and k.startswith("thr_valid_"):
+                    # Case A: direct numeric
+                    if isinstance(v, (int, float)):
+                        out[k] = float(v)
+                    # Case B: dict containing "threshold"
+                    elif isinstance(v, dict) and isinstance(v.get("threshold"), (int, float)):
+                        out[k] = float(v["threshold"])
+                walk(v)
+        elif isinstance(x, list):
+            for v in x:
+                walk(v)
+
+    walk(obj)
+    return out
+
+
+def _collect_thr_blocks(obj: Any) -> Dict[str, Dict[str, Any]]:
+    """Metric metadata for dict-shaped thr_valid_* blocks (last occurrence wins, like the thresholds)."""
+    out: Dict[str, Dict[str, Any]] = {}
+
+    def walk(x: Any) -> None:
+        if isinstance(x, dict):
+            for k, v in x.items():
+                if isinstance(k, str) and k.startswith("thr_valid_") and isinstance(v, dict) and isinstance(v.get("threshold"), (int, float)):
+                    out[k] = _metrics(v)
+                walk(v)
+        elif isinstance(x, list):
+            for v in x:
+                walk(v)
+
+    walk(obj)
+    return out
+
+
+def _build_t2(payload: Dict[str, Any]) -> Dict[str, Any]:
+    modes: Dict[str, Any] = {}
+    for op, key in T2_OP_KEYS.items():
+        block = (payload.get("test", {}) or {}).get(key) or (payload.get("valid", {}) or {}).get(key)
+        if not block:
+            continue
+        modes[op] = {"block_key": key, "threshold": block.get("threshold"), "block": block}
+        modes[op].update(_metrics(block))
+    return {"default_mode": None, "tag": payload.get("tag"), "modes": modes}
+
+
+def _build_t3(payload: Dict[str, Any]) -> Dict[str, Any]:
+    modes: Dict[str, Any] = {}
+    for k, v in payload.items():
+        # t3_threshold accepts any top-level key; keep nulls so the "threshold is null" error survives.
+        if v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)):
+            modes[k] = {"threshold": None if v is None else float(v)}
+    rec = payload.get("recommended_default_mode")
+    return {
+        "default_mode": rec if isinstance(rec, str) and rec else None,
+        "tag": payload.get("tag"),
+        "modes": modes,
+    }
+
+
+def _build_t4(payload: Dict[str, Any]) -> Dict[str, Any]:
+    base = payload.get("panel_valid")
+    if not isinstance(base, dict):
+        base = payload
+    cand = collect_thr_candidates(base)
+    blocks = _collect_thr_blocks(base)
+
+    modes: Dict[str, Any] = {k: {"threshold": v, **blocks.get(k, {})} for k, v in cand.items()}
+    # A direct key in the panel wins over recursive candidates (any key name).
+    for k, v in base.items():
+        if isinstance(v, (int, float)):
+            modes[k] = {"threshold": float(v)}
+        elif isinstance(v, dict) and isinstance(v.get("threshold"), (int, float)):
+            modes[k] = {"threshold": float(v["threshold"]), **_metrics(v)}
+
+    inferred: Optional[str] = None
+    m = payload.get("recommended_default_mode")
+    if isinstance(m, str) and m.strip() and m.strip() in cand:
+        inferred = m.strip()
+    else:
+        inferred = next((k for k in T4_PREFERRED_MODES if k in cand), None)
+        if inferred is None and cand:
+            inferred = sorted(cand.keys())[0]
+    return {
+        "default_mode": inferred,
+        "tag": payload.get("tag"),
+        "candidate_modes": sorted(cand.keys()),
+        "modes": modes,
+    }
+
+
+_BUILDERS = {"t2": _build_t2, "t3": _build_t3, "t4": _build_t4}
+
+
+def build_index(payload: Dict[str, Any], kind: str, *, source_path: Optional[str] = None, source_sha256: Optional[str] = None) -> Dict[str, Any]:
+    if kind not in _BUILDERS:
+        raise ValueError(f"Unknown threshold index kind: {kind}")
+    if not isinstance(payload, dict):
+        raise ValueError("Thresholds payload must be a JSON object")
+    idx = {"schema_version": SCHEMA_VERSION, "kind": kind, "source_path": source_path, "source_sha256": source_sha256}
+    idx.update(_BUILDERS[kind](payload))
+    return idx
+
+
+def _file_sha256(p: Path) -> Tuple[str, bytes]:
+    raw = p.read_bytes()
+    return hashlib.sha256(raw).hexdigest(), raw
+
+
+def load_index(path: Any, kind: str, *, use_disk_cache: bool = True) -> Dict[str, Any]:
+    """
+    Index for one artifact (memory cache -> disk cache -> compile).
+    The file is hashed on first sight; within a process an unchanged (mtime, size) reuses the hash.
+    """
+    p = Path(path)
+    st = os.stat(p)
+    stat_key = (os.path.abspath(p), st.st_mtime_ns, st.st_size)
+    raw: Optional[bytes] = None
+    sha = _SHA_BY_STAT.get(stat_key)
+    if sha is None:
+        sha, raw = _file_sha256(p)
+        _SHA_BY_STAT[stat_key] = sha
+
+    idx = _MEM.get((kind, sha))
+    if idx is not None:
+        return idx
+
+    disk = cache_dir() / f"{kind}_{sha}.json"
+    if use_disk_cache and disk.exists():
+        try:
+            idx = json.loads(disk.read_text(encoding="utf-8"))
+            if idx.get("schema_version") == SCHEMA_VERSION and idx.get("source_sha256") == sha and idx.get("kind") == kind:
+                _MEM[(kind, sha)] = idx
+                return idx
+        except Exception as e:
+            _eprint(f"[THRESHOLD_INDEX] ignoring unreadable cache {disk}: {e}")
+
+    if raw is None:
+        raw = p.read_bytes()
+    idx = build_index(json.loads(raw.decode("utf-8")), kind, source_path=str(p), source_sha256=sha)
+    _MEM[(kind, sha)] = idx
+    if use_disk_cache:
+        # Best-effort: a read-only checkout just compiles per process.
+        try:
+            disk.parent.mkdir(parents=True, exist_ok=True)
+            tmp = disk.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(idx, sort_keys=True), encoding="utf-8")
+            tmp.replace(disk)
+        except Exception as e:
+            _eprint(f"[THRESHOLD_INDEX] disk cache write skipped: {e}")
+    return idx
+
+
+def t2_op_block(idx: Dict[str, Any], op_name: str) -> Dict[str, Any]:
+    """{key, block} of op_a / op_b (test block first, then valid); ValueError when missing."""
+    if op_name not in T2_OP_KEYS:
+        raise ValueError("Invalid op_name. Use op_a or op_b.")
+    entry = (idx.get("modes") or {}).get(op_name)
+    if not entry:
+        raise ValueError(f"Operating pick block not found for {T2_OP_KEYS[op_name]} (valid/test).")
+    return {"key": entry["block_key"], "block": entry["block"]}
+
+
+def t3_mode(idx: Dict[str, Any], requested_mode: Optional[str]) -> str:
+    """The requested mode, else the alias's recommended_default_mode; ValueError when neither."""
+    if requested_mode:
+        return requested_mode
+    if not idx.get("default_mode"):
+        raise ValueError("Threshold alias missing recommended_default_mode")
+    return idx["default_mode"]
+
+
+def t3_threshold(idx: Dict[str, Any], mode: str) -> float:
+    """Threshold of a top-level mode key; ValueError when missing or null."""
+    modes = idx.get("modes") or {}
+    if mode not in modes:
+        raise ValueError(f"Mode '{mode}' not found in thresholds alias.")
+    thr = modes[mode]["threshold"]
+    if thr is None:
+        raise ValueError(f"Mode '{mode}' exists but threshold is null (None).")
+    return float(thr)
+
+
+def t4_mode(idx: Dict[str, Any]) -> str:
+    """recommended_default_mode if it is a candidate, else the preferred order, else the first key; KeyError when none."""
+    if not idx.get("default_mode"):
+        raise KeyError("No thr_valid_* thresholds found (numeric or dict-with-'threshold') in thresholds JSON.")
+    return idx["default_mode"]
+
+
+def t4_threshold(idx: Dict[str, Any], mode: str) -> float:
+    """Threshold of a mode (direct panel key or recursive candidate); KeyError when missing."""
+    entry = (idx.get("modes") or {}).get(mode)
+    if entry is None:
+        raise KeyError(f"Threshold mode not found: {mode}. Available: {(idx.get('candidate_modes') or [])[:30]}")
+    return float(entry["threshold"])
+
+
+# ---------------------------------------------------------------------------
+# verify: compare the index against the per-call algorithms over the source file
+# ---------------------------------------------------------------------------
+
+def _reference_t4_thr(payload: Dict[str, Any], mode: str) -> Optional[float]:
+    base = payload.get("panel_valid")
+    if not isinstance(base, dict):
+        base = payload
+    if mode in base:
+        v = base.get(mode)
+        if isinstance(v, (int, float)):
+            return float(v)
+        if isinstance(v, dict) and isinstance(v.get("threshold"), (int, float)):
+            return float(v["threshold"])
+    cand = collect_thr_candidates(base)
+    return float(cand[mode]) if mode in cand else None
+
+
+def verify_index(idx: Dict[str, Any], payload: Dict[str, Any]) -> List[str]:
+    """Mismatches between a compiled index and the source payload (empty list = OK)."""
+    kind = idx.get("kind")
+    errors: List[str] = []
+    fresh = build_index(payload, kind, source_path=idx.get("source_path"), source_sha256=idx.get("source_sha256"))
+    if json.loads(json.dumps(fresh, sort_keys=True)) != json.loads(json.dumps(idx, sort_keys=True)):
+        errors.append("index differs from a fresh compile of the source")
+
+    if kind == "t2":
+        for op, key in T2_OP_KEYS.items():
+            block = (payload.get("test", {}) or {}).get(key) or (payload.get("valid", {}) or {}).get(key)
+            try:
+                got = t2_op_block(idx, op)
+            except ValueError:
+                got = None
+            if (got or {}).get("block") != (block or None) or (block and got["key"] != key):
+                errors.append(f"t2 {op}: index={got} source={block}")
+    elif kind == "t3":
+        rec = payload.get("recommended_default_mode")
+        if (idx.get("default_mode") or None) != (rec if isinstance(rec, str) and rec else None):
+            errors.append(f"t3 default_mode: index={idx.get('default_mode')} source={rec}")
+        for k, v in payload.items():
+            if v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)):
+                want = None if v is None else float(v)
+                got = (idx["modes"].get(k) or {}).get("threshold", "MISSING")
+                if got != want:
+                    errors.append(f"t3 {k}: index={got} source={want}")
+    elif kind == "t4":
+        base = payload.get("panel_valid")
+        if not isinstance(base, dict):
+            base = payload
+        names = set(collect_thr_candidates(base)) | {k for k in base if isinstance(k, str)}
+        for mode in sorted(names):
+            want = _reference_t4_thr(payload, mode)
+            entry = idx["modes"].get(mode)
+            got = None if entry is None else float(entry["threshold"])
+            if got != want:
+                errors.append(f"t4 {mode}: index={got} source={want}")
+    return errors
+
+
+def _resolve_file(args: argparse.Namespace) -> str:
+    if args.file:
+        return args.file
+    alias = json.loads(Path(args.canonical_alias).read_text(encoding="utf-8"))
+    if args.kind == "t2":
+        f = (alias.get("operating", {}) or {}).get("operating_pick_file")
+    else:
+        thr = alias.get("thresholds", {}) or {}
+        f = thr.get("thresholds_file") or thr.get("thresholds_alias") or thr.get("thresholds_path") or alias.get("thresholds_file")
+    if not f:
+        raise ValueError(f"No thresholds file for kind={args.kind} in {args.canonical_alias}")
+    return str(f)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Threshold / operating-point index (dump / verify)")
+    ap.add_argument("cmd", choices=["dump", "verify"])
+    ap.add_argument("--kind", choices=list(KINDS), required=True)
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--file", default=None, help="operating_pick.json (t2) or thresholds JSON (t3/t4)")
+    src.add_argument("--canonical-alias", default=None, help="Canonical alias JSON that points at the thresholds file")
+    ap.add_argument("--no-disk-cache", action="store_true")
+    ap.add_argument("--out", default=None, help="dump: write the index here instead of stdout")
+    args = ap.parse_args()
+
+    path = _resolve_file(args)
+    idx = load_index(path, args.kind, use_disk_cache=not args.no_disk_cache)
+
+    if args.cmd == "dump":
+        text = json.dumps(idx, indent=2, sort_keys=True)
+        if args.out:
+            Path(args.out).write_text(text + "\n", encoding="utf-8")
+            print(f"[OK] Wrote: {args.out}")
+        else:
+            print(text)
+        return 0
+
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    errors = verify_index(idx, payload)
+    print(json.dumps({
+        "kind": args.kind,
+        "source_path": path,
+        "source_sha256": idx.get("source_sha256"),
+        "modes": len(idx.get("modes") or {}),
+        "default_mode": idx.get("default_mode"),
+        "ok": not errors,
+        "errors": errors,
+    }, indent=2))
+    return 0 if not errors else 3
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
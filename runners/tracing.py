@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Minimal span tracing with W3C trace-context propagation and an OTLP-JSON file exporter.
+
+No OpenTelemetry SDK / collector needed: finished spans are written as
+ExportTraceServiceRequest JSON objects, one per line (the OTLP file-exporter layout), to
+--trace-out PATH (or DECISION_TRACE_OUT); "stderr" prints them there instead (stdout
+carries the JSON contracts). Any OTLP-JSON reader (otel-collector filereceiver, Jaeger
+import, ...) can load the file.
+
+Propagation:
+  - child processes: TRACEPARENT env var (run_json / Popen get tracing.child_env())
+  - HTTP hops: traceparent header (sensors, BRMS bridge, bridge -> KIE, decision service)
+
+Disabled (nothing configured) span() is a shared no-op context: no ids, no clock reads.
+
+Usage:
+  python3 runners/runner_workflow_eligibility.py ... --trace-out /tmp/spans.jsonl
+  python3 runners/tracing.py slowest --file /tmp/spans.jsonl --top 5
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+TRACE_OUT_ENV = "DECISION_TRACE_OUT"
+TRACEPARENT_ENV = "TRACEPARENT"
+TRACEPARENT_HEADER = "traceparent"
+SCOPE_NAME = "credit_decision_engine.tracing"
+
+SPAN_KINDS = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3}
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_FLUSH_EVERY = 64
+
+# (trace_id, span_id) of the innermost open span of this thread / task.
+_current: "contextvars.ContextVar[Optional[Tuple[str, str]]]" = contextvars.ContextVar("decision_trace_ctx", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    m = _TRACEPARENT_RE.match((value or "").strip().lower())
+    if m is None or m.group(1) == "0" * 32 or m.group(2) == "0" * 16:
+        return None
+    return m.group(1), m.group(2)
+
+
+def format_traceparent(trace_id: str, span_id: str) -> str:
+    return f"00-{trace_id}-{span_id}-01"
+
+
+def _attr(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        v: Dict[str, Any] = {"boolValue": value}
+    elif isinstance(value, int):
+        v = {"intValue": str(value)}
+    elif isinstance(value, float):
+        v = {"doubleValue": value}
+    else:
+        v = {"stringValue": str(value)}
+    return {"key": key, "value": v}
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "local_root", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], local_root: bool, attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.local_root = local_root
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes)
+        self.status: Optional[Dict[str, Any]] = None
+
+    @property
+    def traceparent(self) -> str:
+        return format_traceparent(self.trace_id, self.span_id)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = {"code": STATUS_ERROR, "message": f"{type(exc).__name__}: {exc}"}
+
+    def to_otlp(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attr(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": self.status or {"code": STATUS_OK},
+        }
+        if self.parent_id:
+            out["parentSpanId"] = self.parent_id
+        return out
+
+
+class _NoopSpan:
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_NOOP_CTX = contextlib.nullcontext(_NOOP_SPAN)
+
+
+class FileExporter:
+    """Buffers finished spans; one OTLP-JSON line per flush (append, one write() per line)."""
+
+    def __init__(self, service_name: str, out: str) -> None:
+        self.service_name = service_name
+        self.out = out
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            full = len(self._spans) >= _FLUSH_EVERY
+        if full or span.local_root:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if not spans:
+            return
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [_attr("service.name", self.service_name), _attr("process.pid", os.getpid())]},
+                "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": [s.to_otlp() for s in spans]}],
+            }]
+        }, separators=(",", ":")) + "\n"
+        if self.out == "stderr":
+            sys.stderr.write(line)
+            sys.stderr.flush()
+            return
+        fd = os.open(self.out, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+_exporter: Optional[FileExporter] = None
+_remote_parent: Optional[Tuple[str, str]] = None
+
+
+def configure(service_name: str, out: Optional[str] = None) -> bool:
+    """Enable tracing for this process (out, else DECISION_TRACE_OUT); children inherit it."""
+    global _exporter, _remote_parent
+    out = out or os.environ.get(TRACE_OUT_ENV)
+    if not out:
+        return False
+    os.environ[TRACE_OUT_ENV] = out
+    if _exporter is None:
+        atexit.register(flush)
+    _exporter = FileExporter(service_name, out)
+    _remote_parent = parse_traceparent(os.environ.get(TRACEPARENT_ENV))
+    return True
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def flush() -> None:
+    if _exporter is not None:
+        _exporter.flush()
+
+
+@contextlib.contextmanager
+def _span(name: str, kind: str, parent: Optional[Tuple[str, str]], attributes: Dict[str, Any]) -> Iterator[Span]:
+    local = _current.get()
+    ctx = parent or local or _remote_parent
+    trace_id, parent_id = ctx if ctx is not None else (secrets.token_hex(16), None)
+    sp = Span(name, kind, trace_id, parent_id, local_root=local is None, attributes=attributes)
+    token = _current.set((trace_id, sp.span_id))
+    try:
+        yield sp
+    except BaseException as e:
+        sp.record_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        sp.end_ns = time.time_ns()
+        if _exporter is not None:
+            _exporter.export(sp)
+
+
+def span(name: str, kind: str = "INTERNAL", traceparent: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Context manager yielding the open Span (a no-op span when tracing is off). traceparent:
+    remote parent for a server span (incoming header); otherwise the current span, else the
+    TRACEPARENT this process was started with, else a new trace.
+    """
+    if _exporter is None:
+        return _NOOP_CTX
+    return _span(name, kind, parse_traceparent(traceparent), attributes or {})
+
+
+def current_traceparent() -> Optional[str]:
+    ctx = _current.get()
+    return format_traceparent(*ctx) if ctx is not None and _exporter is not None else None
+
+
+def inject(headers: Dict[str, str]) -> Dict[str, str]:
+    """Add the traceparent header of the current span (no-op when tracing is off)."""
+    tp = current_traceparent()
+    if tp is not None:
+        headers[TRACEPARENT_HEADER] = tp
+    return headers
+
+
+def child_env() -> Optional[Dict[str, str]]:
+    """Environment for a child runner (TRACEPARENT = current span); None keeps the default env."""
+    tp = current_traceparent()
+    if tp is None:
+        return None
+    return dict(os.environ, **{TRACEPARENT_ENV: tp})
+
+
+def add_trace_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--trace-out", default=None, help=f"Append OTLP-JSON spans to this file ('stderr' to print); also ${TRACE_OUT_ENV}")
+
+
+# --- Reading span files back ------------------------------------------------------
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for rs in json.loads(line).get("resourceSpans", []):
+                service = next((a["value"].get("stringValue") for a in rs["resource"]["attributes"] if a["key"] == "service.name"), "")
+                for ss in rs.get("scopeSpans", []):
+                    for s in ss.get("spans", []):
+                        spans.append(dict(s, service=service))
+    return spans
+
+
+def _ms(s: Dict[str, Any]) -> float:
+    return (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6
+
+
+def trace_tree(spans: List[Dict[str, Any]]) -> List[str]:
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {s["spanId"] for s in spans}
+    for s in spans:
+        parent = s.get("parentSpanId")
+        children.setdefault(parent if parent in ids else None, []).append(s)
+    lines: List[str] = []
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for s in sorted(children.get(parent, []), key=lambda x: int(x["startTimeUnixNano"])):
+            err = " ERROR" if s.get("status", {}).get("code") == STATUS_ERROR else ""
+            lines.append(f"{_ms(s):10.1f} ms  {'  ' * depth}{s['name']} [{s['service']}]{err}")
+            walk(s["spanId"], depth + 1)
+
+    walk(None, 0)
+    return lines
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Inspect OTLP-JSON span files")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sl = sub.add_parser("slowest", help="Span trees of the slowest traces")
+    sl.add_argument("--file", required=True)
+    sl.add_argument("--top", type=int, default=5)
+    args = ap.parse_args()
+
+    by_trace: Dict[str, List[Dict[str, Any]]] = {}
+    for s in load_spans(args.file):
+        by_trace.setdefault(s["traceId"], []).append(s)
+
+    def duration(spans: List[Dict[str, Any]]) -> float:
+        return (max(int(s["endTimeUnixNano"]) for s in spans) - min(int(s["startTimeUnixNano"]) for s in spans)) / 1e6
+
+    ranked = sorted(by_trace.items(), key=lambda kv: -duration(kv[1]))[: args.top]
+    for trace_id, spans in ranked:
+        rid = next((a["value"].get("stringValue") for s in spans for a in s.get("attributes", []) if a["key"] == "decision.request_id"), None)
+        print(f"trace {trace_id} {duration(spans):.1f} ms request_id={rid} spans={len(spans)}")
+        for line in trace_tree(spans):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
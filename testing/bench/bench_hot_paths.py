@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the decision hot paths (v0.1).
+
+Times pure functions in-process over the pack/threshold fixtures under
+testing/bench/fixtures and reports ops/sec, p50/p99 latency and per-op
+allocations (tracemalloc peak). Output is JSON so runs can be diffed between
+commits:
+
+  python3 testing/bench/bench_hot_paths.py --out testing/bench/_results/head.json
+  python3 testing/bench/bench_hot_paths.py --compare testing/bench/_results/base.json
+
+Cases that need optional dependencies (numpy/xgboost) are reported as SKIPPED
+instead of failing the suite.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+for _p in (ROOT / "runners", ROOT):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+SCHEMA_VERSION = "bench_hot_paths_v0_1"
+
+
+class SkipBench(Exception):
+    pass
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def load_fixture(name: str) -> Dict[str, Any]:
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def percentile(values: List[float], p: float) -> float:
+    s = sorted(values)
+    if not s:
+        return 0.0
+    k = (len(s) - 1) * (p / 100.0)
+    f = int(k)
+    c = min(f + 1, len(s) - 1)
+    return s[f] + (s[c] - s[f]) * (k - f)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Cases: each setup returns (callable, units_per_call)
+# ---------------------------------------------------------------------------
+
+def _packs() -> List[Dict[str, Any]]:
+    return [
+        load_fixture("decision_pack_full_chain_approve.json"),
+        load_fixture("decision_pack_full_chain_brms_fail.json"),
+        load_fixture("decision_pack_early_cut_reject.json"),
+    ]
+
+
+def setup_policy_decider() -> Tuple[Callable[[], Any], int]:
+    from originate import policy_decider_v0_1
+
+    packs = _packs()[:2]
+    cases = [(p, p["decisions"].get("brms_flags")) for p in packs]
+
+    def run() -> None:
+        for pack, flags in cases:
+            policy_decider_v0_1(decision_pack=pack, brms_flags=flags)
+
+    return run, len(cases)
+
+
+def setup_resolve_fraud_signals_stub() -> Tuple[Callable[[], Any], int]:
+    from originate import resolve_fraud_signals
+
+    stub = str(ROOT / "tools/smoke/fixtures/fraud_signals_stub.json")
+
+    def run() -> None:
+        resolve_fraud_signals(
+            client_id="100002",
+            request_id="dev-0002-d9e9e161",
+            seed=1001,
+            mode="STUB",
+            stub_path=stub,
+            sensor_base_url="http://127.0.0.1:9000",
+            sensor_timeout_ms=1200,
+            device_high_thr=0.80,
+            tx_high_thr=0.80,
+            double_high_action="REVIEW",
+        )
+
+    return run, 1
+
+
+def setup_to_brms_flags() -> Tuple[Callable[[], Any], int]:
+    from tools.brms_bridge_kie import to_brms_flags_v0_1
+
+    dmn_eval = load_fixture("kie_dmn_eval_sample.json")
+
+    def run() -> None:
+        to_brms_flags_v0_1(dmn_eval, "dev-0002-d9e9e161", "100002")
+
+    return run, 1
+
+
+def setup_t4_collect_thr_candidates() -> Tuple[Callable[[], Any], int]:
+    from threshold_index import collect_thr_candidates
+
+    payload = load_fixture("t4_thresholds_sample.json")
+    base = payload["panel_valid"]
+
+    def run() -> None:
+        collect_thr_candidates(base)
+
+    return run, 1
+
+
+def setup_t4_build_index_resolve() -> Tuple[Callable[[], Any], int]:
+    # Per-call resolution without a cache: compile the payload, infer the mode, look it up.
+    import threshold_index
+
+    payload = load_fixture("t4_thresholds_sample.json")
+
+    def run() -> None:
+        idx = threshold_index.build_index(payload, "t4")
+        threshold_index.t4_threshold(idx, threshold_index.t4_mode(idx))
+
+    return run, 1
+
+
+def setup_t4_threshold_index() -> Tuple[Callable[[], Any], int]:
+    # Same work as t4_build_index_resolve, served by the content-hash index (memory hit).
+    import threshold_index
+
+    path = FIXTURES / "t4_thresholds_sample.json"
+    threshold_index.load_index(path, "t4", use_disk_cache=False)
+
+    def run() -> None:
+        idx = threshold_index.load_index(path, "t4", use_disk_cache=False)
+        threshold_index.t4_threshold(idx, threshold_index.t4_mode(idx))
+
+    return run, 1
+
+
+def setup_validate_required() -> Tuple[Callable[[], Any], int]:
+    from contract_validate import (
+        REQUIRED_BRMS_FLAGS_V0_1,
+        REQUIRED_FINAL_DECISION_V0_1,
+        REQUIRED_T2_V0_1,
+        REQUIRED_T3_V0_1,
+        REQUIRED_T4_V0_1,
+        validate_required,
+    )
+
+    d = load_fixture("decision_pack_full_chain_approve.json")["decisions"]
+    checks = [
+        (d["t2_default"], REQUIRED_T2_V0_1),
+        (d["t3_fraud"], REQUIRED_T3_V0_1),
+        (d["t4_payoff"], REQUIRED_T4_V0_1),
+        (d["brms_flags"], REQUIRED_BRMS_FLAGS_V0_1),
+        (d["final_decision"], REQUIRED_FINAL_DECISION_V0_1),
+    ]
+
+    def run() -> None:
+        for payload, req in checks:
+            validate_required(payload, req, where="bench")
+
+    return run, len(checks)
+
+
+def setup_build_report() -> Tuple[Callable[[], Any], int]:
+    from runner_reporter import build_report
+
+    packs = _packs()
+
+    def run() -> None:
+        for pack in packs:
+            build_report(pack, 0)
+
+    return run, len(packs)
+
+
+def _booster_and_width():
+    try:
+        import numpy as np
+        import xgboost as xgb
+    except Exception as e:
+        raise SkipBench(f"numpy/xgboost unavailable: {e}")
+
+    alias = json.loads((ROOT / "block_a_gov/artifacts/t2_default_canonical.json").read_text(encoding="utf-8"))
+    model_file = Path((alias.get("model", {}) or {}).get("model_file", ""))
+    booster = xgb.Booster()
+    if model_file.is_file():
+        booster.load_model(str(model_file))
+        cfg = json.loads(booster.save_config())
+        n = int(cfg["learner"]["learner_model_param"]["num_feature"])
+    else:
+        # Canonical model not on this machine: train a small deterministic stand-in of similar shape.
+        n = 100
+        rng = np.random.default_rng(7)
+        X = rng.normal(size=(4000, n)).astype(np.float32)
+        y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.5, size=4000) > 0).astype(np.float32)
+        booster = xgb.train({"objective": "binary:logistic", "max_depth": 6, "eta": 0.1, "nthread": 1}, xgb.DMatrix(X, label=y), num_boost_round=300)
+    return np, xgb, booster, n
+
+
+def _setup_model_score(batch: int) -> Tuple[Callable[[], Any], int]:
+    np, xgb, booster, n = _booster_and_width()
+    names = booster.feature_names or [f"f{i}" for i in range(n)]
+    X = np.random.default_rng(42).normal(size=(batch, n)).astype(np.float32)
+
+    def run() -> None:
+        booster.predict(xgb.DMatrix(X, feature_names=names))
+
+    # units = rows, so ops/sec is rows/sec for both cases (single-row vs batched).
+    return run, batch
+
+
+def _setup_feature_store_gather(batch: int) -> Tuple[Callable[[], Any], int]:
+    try:
+        import numpy as np
+        import feature_store
+    except Exception as e:
+        raise SkipBench(f"numpy unavailable: {e}")
+
+    import tempfile
+
+    n_rows, n_features = 100_000, 256
+    names = [f"f{i}" for i in range(n_features)]
+    ids = [str(100000 + i) for i in range(n_rows)]
+    path = Path(tempfile.mkdtemp(prefix="bench_fstore_")) / "features.fstore"
+    feature_store.write_store(str(path), ids, np.random.default_rng(0).random((n_rows, n_features), dtype=np.float32), names)
+    store = feature_store.FeatureStore(str(path))
+    rng = np.random.default_rng(1)
+    queries = [[ids[j] for j in rng.integers(0, n_rows, size=batch)] for _ in range(64)]
+    state = {"i": 0}
+
+    def run() -> None:
+        state["i"] = (state["i"] + 1) % len(queries)
+        store.gather(queries[state["i"]], names)
+
+    return run, batch
+
+
+CASES: Dict[str, Callable[[], Tuple[Callable[[], Any], int]]] = {
+    "policy_decider_v0_1": setup_policy_decider,
+    "resolve_fraud_signals_stub": setup_resolve_fraud_signals_stub,
+    "to_brms_flags_v0_1": setup_to_brms_flags,
+    "t4_collect_thr_candidates": setup_t4_collect_thr_candidates,
+    "t4_build_index_resolve": setup_t4_build_index_resolve,
+    "t4_threshold_index_lookup": setup_t4_threshold_index,
+    "validate_required": setup_validate_required,
+    "reporter_build_report": setup_build_report,
+    "model_score_single_row": lambda: _setup_model_score(1),
+    "model_score_batch_64": lambda: _setup_model_score(64),
+    "feature_store_gather_1": lambda: _setup_feature_store_gather(1),
+    "feature_store_gather_64": lambda: _setup_feature_store_gather(64),
+}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def measure(fn: Callable[[], Any], units: int, iterations: int, warmup: int, min_time_s: float) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    samples_ns: List[int] = []
+    t_start = time.perf_counter()
+    try:
+        while len(samples_ns) < iterations or (time.perf_counter() - t_start) < min_time_s:
+            t0 = time.perf_counter_ns()
+            fn()
+            samples_ns.append(time.perf_counter_ns() - t0)
+            if len(samples_ns) >= iterations * 20:
+                break
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # Allocation pass (separate, tracemalloc distorts timing).
+    alloc_iters = max(1, min(50, iterations // 10))
+    tracemalloc.start()
+    try:
+        peaks: List[int] = []
+        blocks: List[int] = []
+        for _ in range(alloc_iters):
+            tracemalloc.reset_peak()
+            before, _peak = tracemalloc.get_traced_memory()
+            snap0 = tracemalloc.take_snapshot()
+            fn()
+            _cur, peak = tracemalloc.get_traced_memory()
+            snap1 = tracemalloc.take_snapshot()
+            peaks.append(max(peak - before, 0))
+            blocks.append(sum(max(s.count_diff, 0) for s in snap1.compare_to(snap0, "lineno")))
+    finally:
+        tracemalloc.stop()
+
+    per_op_us = [ns / 1000.0 / units for ns in samples_ns]
+    total_s = sum(samples_ns) / 1e9
+    return {
+        "status": "OK",
+        "n_calls": len(samples_ns),
+        "units_per_call": units,
+        "ops_per_sec": (len(samples_ns) * units) / total_s if total_s > 0 else None,
+        "p50_us": percentile(per_op_us, 50),
+        "p99_us": percentile(per_op_us, 99),
+        "mean_us": sum(per_op_us) / len(per_op_us),
+        "alloc_peak_bytes_per_call": int(percentile([float(x) for x in peaks], 50)),
+        "alloc_blocks_retained_per_call": int(percentile([float(x) for x in blocks], 50)),
+    }
+
+
+def run_suite(names: List[str], iterations: int, warmup: int, min_time_s: float) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in names:
+        try:
+            fn, units = CASES[name]()
+            results[name] = measure(fn, units, iterations, warmup, min_time_s)
+        except SkipBench as e:
+            results[name] = {"status": "SKIPPED", "reason": str(e)}
+        except Exception as e:
+            results[name] = {"status": "ERROR", "reason": f"{type(e).__name__}: {e}"}
+        r = results[name]
+        if r["status"] == "OK":
+            print(f"[BENCH] {name:32s} {r['ops_per_sec']:>12.0f} ops/s  p50={r['p50_us']:.2f}us  p99={r['p99_us']:.2f}us  alloc_peak={r['alloc_peak_bytes_per_call']}B", file=sys.stderr)
+        else:
+            print(f"[BENCH] {name:32s} {r['status']}: {r['reason']}", file=sys.stderr)
+    return results
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for name, h in head.get("results", {}).items():
+        b = (base.get("results", {}) or {}).get(name)
+        if not b or b.get("status") != "OK" or h.get("status") != "OK":
+            continue
+        rows.append({
+            "case": name,
+            "ops_per_sec_base": b["ops_per_sec"],
+            "ops_per_sec_head": h["ops_per_sec"],
+            "ops_delta_pct": (h["ops_per_sec"] / b["ops_per_sec"] - 1.0) * 100.0 if b["ops_per_sec"] else None,
+            "p99_delta_pct": (h["p99_us"] / b["p99_us"] - 1.0) * 100.0 if b["p99_us"] else None,
+            "alloc_peak_delta_bytes": h["alloc_peak_bytes_per_call"] - b["alloc_peak_bytes_per_call"],
+        })
+    return rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for decision hot paths")
+    ap.add_argument("--only", default=None, help=f"Comma-separated case names (default: all). Available: {','.join(CASES)}")
+    ap.add_argument("--iterations", type=int, default=2000, help="Minimum timed calls per case")
+    ap.add_argument("--warmup", type=int, default=50)
+    ap.add_argument("--min-time-s", type=float, default=0.5, help="Minimum timed wall time per case")
+    ap.add_argument("--quick", action="store_true", help="Short run for smoke checks (200 iterations, 0.05s)")
+    ap.add_argument("--out", default=None, help="Write JSON results to this path (default: stdout)")
+    ap.add_argument("--compare", default=None, help="Baseline JSON from a previous run; prints per-case deltas")
+    args = ap.parse_args()
+
+    if args.quick:
+        args.iterations, args.warmup, args.min_time_s = 200, 10, 0.05
+
+    names = list(CASES) if not args.only else [x.strip() for x in args.only.split(",") if x.strip()]
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise SystemExit(f"Unknown benchmark case(s): {unknown}")
+
+    out = {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at": utc_now_iso(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"iterations": args.iterations, "warmup": args.warmup, "min_time_s": args.min_time_s},
+        "results": run_suite(names, args.iterations, args.warmup, args.min_time_s),
+    }
+
+    if args.compare:
+        base = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        out["compare"] = {"baseline_commit": base.get("git_commit"), "rows": compare(base, out)}
+        for r in out["compare"]["rows"]:
+            print(f"[BENCH][CMP] {r['case']:32s} ops {r['ops_delta_pct']:+.1f}%  p99 {r['p99_delta_pct']:+.1f}%  alloc {r['alloc_peak_delta_bytes']:+d}B", file=sys.stderr)
+
+    text = json.dumps(out, indent=2)
+    if args.out:
+        p = Path(args.out)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(text + "\n", encoding="utf-8")
+        print(p)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
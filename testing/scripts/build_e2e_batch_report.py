@@ -1,11 +1,69 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import random
+import sys
 from collections import Counter
 from datetime import datetime, timezone
 from pathlib import Path
 from statistics import median
 
+STAGE_KEYS = ("workflow_intake", "eligibility", "t2_default", "t3_fraud", "t4_payoff", "brms_flags", "final_decision")
+REGRESSION_EXIT_CODE = 4
+
+# Canned queries over the SQLite index (index_batch_runs.py): name -> (title, SQL).
+# {where} takes the --where / --run-id filters (AND-ed), {limit} --limit.
+_ROW_COLUMNS = (
+    "run_id, row_index, request_id, scenario_tag, eligibility_status, final_outcome, final_reason_code, "
+    "t3_decision, sensor_mode_used, fraud_sensor_mode, elapsed_ms"
+)
+CANNED_QUERIES = {
+    "runs": (
+        "Indexed runs",
+        "SELECT run_id, run_size, ok_count, error_count, wall_ms, throughput_rps, manifest_hash FROM batch_runs "
+        "WHERE run_id IN (SELECT run_id FROM batch_results WHERE {where}) ORDER BY run_id LIMIT {limit}",
+    ),
+    "find": (
+        "Rows matching the filters",
+        f"SELECT {_ROW_COLUMNS} FROM batch_results WHERE {{where}} ORDER BY run_id, row_index LIMIT {{limit}}",
+    ),
+    "strict_rule_fraud_review_fallback": (
+        "APPROVE_BLOCKED_BY_STRICT_RULE with T3 REVIEW_FRAUD in LIVE_FALLBACK sensor mode",
+        f"SELECT {_ROW_COLUMNS} FROM batch_results WHERE final_reason_code = 'APPROVE_BLOCKED_BY_STRICT_RULE' "
+        "AND t3_decision = 'REVIEW_FRAUD' AND sensor_mode_used = 'LIVE_FALLBACK' AND {where} ORDER BY run_id, row_index LIMIT {limit}",
+    ),
+    "outcomes": (
+        "Final outcome x reason code",
+        "SELECT final_outcome, final_reason_code, COUNT(*) AS n FROM batch_results WHERE status = 'OK' AND {where} "
+        "GROUP BY final_outcome, final_reason_code ORDER BY n DESC LIMIT {limit}",
+    ),
+    "reasons_by_scenario": (
+        "Reason codes per scenario_tag",
+        "SELECT scenario_tag, final_outcome, final_reason_code, COUNT(*) AS n FROM batch_results WHERE status = 'OK' AND {where} "
+        "GROUP BY scenario_tag, final_outcome, final_reason_code ORDER BY scenario_tag, n DESC LIMIT {limit}",
+    ),
+    "sensor_modes": (
+        "Eligibility / fraud-signal sensor modes",
+        "SELECT sensor_mode_used, fraud_sensor_mode, COUNT(*) AS n FROM batch_results WHERE status = 'OK' AND {where} "
+        "GROUP BY sensor_mode_used, fraud_sensor_mode ORDER BY n DESC LIMIT {limit}",
+    ),
+    "latency_by_scenario": (
+        "elapsed_ms per scenario_tag",
+        "SELECT scenario_tag, COUNT(*) AS n, ROUND(AVG(elapsed_ms), 1) AS avg_ms, MIN(elapsed_ms) AS min_ms, MAX(elapsed_ms) AS max_ms "
+        "FROM batch_results WHERE status = 'OK' AND {where} GROUP BY scenario_tag ORDER BY avg_ms DESC LIMIT {limit}",
+    ),
+    "slowest": (
+        "Slowest rows (elapsed_ms)",
+        f"SELECT {_ROW_COLUMNS}, lat_eligibility_ms, lat_t2_default_ms, lat_t3_fraud_ms, lat_t4_payoff_ms FROM batch_results "
+        "WHERE status = 'OK' AND {where} ORDER BY elapsed_ms DESC LIMIT {limit}",
+    ),
+    "errors": (
+        "Failed rows",
+        "SELECT run_id, row_index, request_id, scenario_tag, SUBSTR(error, 1, 200) AS error FROM batch_results "
+        "WHERE status != 'OK' AND {where} ORDER BY run_id, row_index LIMIT {limit}",
+    ),
+}
+
 
 def percentile(values, p):
     if not values:
@@ -41,6 +99,224 @@ def detect_latest_run(runs_root: Path):
     return candidates[-1]
 
 
+def stage_latencies_from_pack(pack: dict) -> dict:
+    """Per-stage meta_latency_ms found in a decision pack (stages that did not run are omitted)."""
+    out = {}
+    decisions = (pack or {}).get("decisions", {}) or {}
+    for k in STAGE_KEYS:
+        v = (decisions.get(k) or {}).get("meta_latency_ms") if isinstance(decisions.get(k), dict) else None
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[k] = v
+    return out
+
+
+def row_stage_latencies(row: dict) -> dict:
+    st = row.get("stage_latency_ms")
+    if isinstance(st, dict):
+        return st
+    pack_path = row.get("pack_path")
+    if pack_path and Path(pack_path).exists():
+        try:
+            return stage_latencies_from_pack(json.loads(Path(pack_path).read_text(encoding="utf-8")))
+        except Exception:
+            return {}
+    return {}
+
+
+def load_run(run_ref: Path):
+    """Accept a run directory or a results.jsonl path; returns (run_dir, summary, results)."""
+    if run_ref.is_file():
+        run_dir = run_ref.parent
+        results_path = run_ref
+    else:
+        run_dir = run_ref
+        results_path = run_dir / "results.jsonl"
+    summary_path = run_dir / "summary.json"
+    if not results_path.exists():
+        raise FileNotFoundError(f"Missing results in run: {run_ref}")
+    summary = json.loads(summary_path.read_text(encoding="utf-8")) if summary_path.exists() else {}
+    return run_dir, summary, load_jsonl(results_path)
+
+
+def wall_slices(results: list) -> list:
+    """
+    Wall-clock ms each OK row took off the run: gap between consecutive row completions
+    (wall_start_ms/wall_end_ms offsets written by the batch driver). Empty for older runs.
+    """
+    timed = sorted(
+        (r for r in results if isinstance(r.get("wall_end_ms"), (int, float)) and isinstance(r.get("wall_start_ms"), (int, float))),
+        key=lambda r: r["wall_end_ms"],
+    )
+    out = []
+    prev_end = None
+    for r in timed:
+        start = r["wall_start_ms"] if prev_end is None else prev_end
+        if r.get("status") == "OK":
+            out.append(float(r["wall_end_ms"] - start))
+        prev_end = r["wall_end_ms"]
+    return out
+
+
+def run_metrics(summary: dict, results: list) -> dict:
+    """Per-row samples used by the compare mode: total latency, per-stage latency, wall throughput."""
+    ok = [r for r in results if r.get("status") == "OK"]
+    total = [float(r["elapsed_ms"]) for r in ok if isinstance(r.get("elapsed_ms"), (int, float))]
+    stages = {}
+    for r in ok:
+        for k, v in row_stage_latencies(r).items():
+            stages.setdefault(k, []).append(float(v))
+    wall_ms = summary.get("wall_ms")
+    throughput_rps = (len(ok) / (float(wall_ms) / 1000.0)) if isinstance(wall_ms, (int, float)) and wall_ms > 0 else None
+    slices = wall_slices(results)
+    # Prefetch, reporter pass and failed rows: part of the wall, not resampled.
+    fixed_ms = max(0.0, float(wall_ms) - sum(slices)) if slices and isinstance(wall_ms, (int, float)) else 0.0
+    return {
+        "total": total,
+        "stages": stages,
+        "ok_count": len(ok),
+        "wall_ms": wall_ms,
+        "throughput_rps": throughput_rps,
+        "wall_slices": slices,
+        "wall_fixed_ms": fixed_ms,
+    }
+
+
+def _stat(values, stat, fixed_ms=0.0):
+    if stat == "mean":
+        return sum(values) / len(values)
+    if stat == "throughput":
+        # Rows per wall-clock second: the rows' wall slices plus the run's fixed overhead.
+        s = sum(values) + fixed_ms
+        return (len(values) * 1000.0 / s) if s > 0 else 0.0
+    return percentile(values, float(stat[1:]))
+
+
+def bootstrap_delta(base, head, stat, n_boot=2000, seed=0, ci=95.0, base_fixed_ms=0.0, head_fixed_ms=0.0):
+    """
+    Bootstrap CI for the relative delta (head vs base) of a statistic.
+    Each side is resampled with replacement independently; returns point and CI in percent.
+    """
+    b0 = _stat(base, stat, base_fixed_ms)
+    h0 = _stat(head, stat, head_fixed_ms)
+    rng = random.Random(seed)
+    deltas = []
+    for _ in range(int(n_boot)):
+        bs = rng.choices(base, k=len(base))
+        hs = rng.choices(head, k=len(head))
+        bv = _stat(bs, stat, base_fixed_ms)
+        if bv:
+            deltas.append((_stat(hs, stat, head_fixed_ms) / bv - 1.0) * 100.0)
+    alpha = (100.0 - ci) / 2.0
+    return {
+        "stat": stat,
+        "base": b0,
+        "head": h0,
+        "delta_pct": ((h0 / b0 - 1.0) * 100.0) if b0 else None,
+        "ci_low_pct": percentile(deltas, alpha) if deltas else None,
+        "ci_high_pct": percentile(deltas, 100.0 - alpha) if deltas else None,
+        "n_base": len(base),
+        "n_head": len(head),
+    }
+
+
+def compare_runs(base_metrics: dict, head_metrics: dict, budgets: dict, n_boot: int = 2000, seed: int = 0, min_samples: int = 5) -> dict:
+    """
+    A latency check regresses when the CI lower bound of its relative delta exceeds its budget
+    (the slowdown is beyond budget with ~95% confidence). Wall-clock throughput regresses when
+    the CI upper bound is below -budget.
+    """
+    checks = []
+
+    def add(metric, base, head, stat, budget_pct, higher_is_worse=True, base_fixed_ms=0.0, head_fixed_ms=0.0):
+        if len(base) < min_samples or len(head) < min_samples:
+            checks.append({"metric": metric, "stat": stat, "status": "INSUFFICIENT_SAMPLES", "n_base": len(base), "n_head": len(head)})
+            return
+        d = bootstrap_delta(base, head, stat, n_boot=n_boot, seed=seed, base_fixed_ms=base_fixed_ms, head_fixed_ms=head_fixed_ms)
+        d["metric"] = metric
+        d["budget_pct"] = budget_pct
+        if higher_is_worse:
+            regressed = d["ci_low_pct"] is not None and d["ci_low_pct"] > budget_pct
+        else:
+            regressed = d["ci_high_pct"] is not None and d["ci_high_pct"] < -budget_pct
+        d["status"] = "REGRESSION" if regressed else "OK"
+        checks.append(d)
+
+    add("total_latency_ms", base_metrics["total"], head_metrics["total"], "p50", budgets["p50_pct"])
+    add("total_latency_ms", base_metrics["total"], head_metrics["total"], "p90", budgets["p90_pct"])
+    add("total_latency_ms", base_metrics["total"], head_metrics["total"], "p99", budgets["p99_pct"])
+    add(
+        "wall_throughput_rps",
+        base_metrics["wall_slices"],
+        head_metrics["wall_slices"],
+        "throughput",
+        budgets["throughput_pct"],
+        higher_is_worse=False,
+        base_fixed_ms=base_metrics["wall_fixed_ms"],
+        head_fixed_ms=head_metrics["wall_fixed_ms"],
+    )
+    for k in STAGE_KEYS:
+        b = base_metrics["stages"].get(k, [])
+        h = head_metrics["stages"].get(k, [])
+        if b and h:
+            add(f"stage:{k}", b, h, "p50", budgets["stage_pct"])
+            add(f"stage:{k}", b, h, "p90", budgets["stage_p90_pct"])
+            add(f"stage:{k}", b, h, "p99", budgets["stage_p99_pct"])
+
+    wall = None
+    if base_metrics.get("throughput_rps") and head_metrics.get("throughput_rps"):
+        wall = {
+            "base_rps": base_metrics["throughput_rps"],
+            "head_rps": head_metrics["throughput_rps"],
+            "delta_pct": (head_metrics["throughput_rps"] / base_metrics["throughput_rps"] - 1.0) * 100.0,
+        }
+    return {
+        "schema_version": "e2e_batch_compare_v0_1",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "budgets": budgets,
+        "bootstrap": {"n_boot": n_boot, "seed": seed, "ci": 95.0},
+        "wall_throughput": wall,
+        "checks": checks,
+        "regressions": [c for c in checks if c.get("status") == "REGRESSION"],
+    }
+
+
+def _fmt(v, spec=".1f"):
+    return "n/a" if v is None else format(v, spec)
+
+
+def build_compare_report(base_dir: Path, head_dir: Path, cmp: dict) -> str:
+    lines = []
+    lines.append("# E2E Batch Compare Report v0.1")
+    lines.append("")
+    lines.append(f"- Generated at (UTC): {cmp['generated_at']}")
+    lines.append(f"- Base run: `{base_dir}`")
+    lines.append(f"- Head run: `{head_dir}`")
+    lines.append(f"- Bootstrap: n={cmp['bootstrap']['n_boot']} seed={cmp['bootstrap']['seed']} CI={cmp['bootstrap']['ci']:.0f}%")
+    lines.append(f"- Verdict: {'REGRESSION' if cmp['regressions'] else 'OK'} ({len(cmp['regressions'])} regression(s))")
+    lines.append("")
+    lines.append("## Checks")
+    lines.append("| metric | stat | base | head | delta % | CI low % | CI high % | budget % | status |")
+    lines.append("|---|---|---|---|---|---|---|---|---|")
+    for c in cmp["checks"]:
+        if c.get("status") == "INSUFFICIENT_SAMPLES":
+            lines.append(f"| {c['metric']} | {c['stat']} | n={c['n_base']} | n={c['n_head']} | | | | | INSUFFICIENT_SAMPLES |")
+            continue
+        lines.append(
+            f"| {c['metric']} | {c['stat']} | {_fmt(c['base'])} | {_fmt(c['head'])} | {_fmt(c['delta_pct'], '+.1f')} | "
+            f"{_fmt(c['ci_low_pct'], '+.1f')} | {_fmt(c['ci_high_pct'], '+.1f')} | {c['budget_pct']:.1f} | {c['status']} |"
+        )
+    lines.append("")
+    lines.append("## Wall-clock throughput")
+    w = cmp.get("wall_throughput")
+    if not w:
+        lines.append("- n/a (summary.json without wall_ms)")
+    else:
+        lines.append(f"- base: {w['base_rps']:.2f} req/s")
+        lines.append(f"- head: {w['head_rps']:.2f} req/s")
+        lines.append(f"- delta: {w['delta_pct']:+.1f}%")
+    return "\n".join(lines) + "\n"
+
+
 def build_report(run_dir: Path, summary: dict, results: list):
     total = int(summary.get("run_size", len(results)))
     ok_count = int(summary.get("ok_count", 0))
@@ -110,19 +386,149 @@ def build_report(run_dir: Path, summary: dict, results: list):
         lines.append(f"- p90: {p90:.1f}")
         lines.append(f"- p99: {p99:.1f}")
         lines.append(f"- median: {median(latencies):.1f}")
+    if isinstance(summary.get("wall_ms"), (int, float)) and summary["wall_ms"] > 0:
+        lines.append(f"- throughput (wall): {ok_count / (summary['wall_ms'] / 1000.0):.2f} req/s")
 
     return "\n".join(lines) + "\n"
 
 
+def run_canned_query(db, name: str, where: list, run_ids: list, limit: int):
+    """(title, column names, rows) of a canned query; where: [(column, value)] of batch_results."""
+    import index_batch_runs
+
+    title, sql = CANNED_QUERIES[name]
+    clauses, params = ["1 = 1"], []
+    for col, value in where:
+        if col not in index_batch_runs.RESULT_COLUMNS:
+            raise ValueError(f"--where column {col!r} is not a batch_results column")
+        clauses.append(f"{col} IS NULL" if value == "NULL" else f"{col} = ?")
+        if value != "NULL":
+            params.append(value)
+    if run_ids:
+        clauses.append(f"run_id IN ({', '.join('?' for _ in run_ids)})")
+        params.extend(run_ids)
+    cur = db.execute(sql.format(where=" AND ".join(clauses), limit=int(limit)), params)
+    return title, [c[0] for c in cur.description], cur.fetchall()
+
+
+def build_query_report(db_path: str, name: str, title: str, columns: list, rows: list, where: list, run_ids: list) -> str:
+    lines = []
+    lines.append(f"# E2E Batch Query: {name}")
+    lines.append("")
+    lines.append(f"- {title}")
+    lines.append(f"- Index: `{db_path}`")
+    filters = [f"{c}={v}" for c, v in where] + [f"run_id={r}" for r in run_ids]
+    lines.append(f"- Filters: {', '.join(filters) if filters else 'none'}")
+    lines.append(f"- Rows: {len(rows)}")
+    lines.append("")
+    lines.append("| " + " | ".join(columns) + " |")
+    lines.append("|" + "---|" * len(columns))
+    for r in rows:
+        lines.append("| " + " | ".join("" if v is None else str(v) for v in r) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def query_main(args, runs_root: Path) -> int:
+    import index_batch_runs
+
+    db = index_batch_runs.connect(args.index_db)
+    if not args.no_index_refresh:
+        index_batch_runs.ingest_runs(db, index_batch_runs.discover_runs(runs_root))
+    where = []
+    for w in args.where:
+        col, sep, value = w.partition("=")
+        if not sep:
+            raise ValueError(f"--where expects column=value, got {w!r}")
+        where.append((col.strip(), value))
+    title, columns, rows = run_canned_query(db, args.query, where, args.run_id, args.limit)
+    if args.format == "jsonl":
+        content = "".join(json.dumps(dict(zip(columns, r))) + "\n" for r in rows)
+    else:
+        content = build_query_report(args.index_db, args.query, title, columns, rows, where, args.run_id)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(content, encoding="utf-8")
+        print(args.out)
+    else:
+        sys.stdout.write(content)
+    return 0
+
+
 def main():
     ap = argparse.ArgumentParser(description="Build markdown report from batch E2E run artifacts")
     ap.add_argument("--run-dir", default=None, help="Path to run directory (testing/runs/eval_requests_dev_v0_1_run_*)")
     ap.add_argument("--out", default=None, help="Optional output markdown path")
+    # Compare mode (regression gate): --compare BASE [--run-dir HEAD]
+    ap.add_argument("--compare", default=None, help="Baseline run dir (or results.jsonl). Compares --run-dir (default: latest) against it")
+    ap.add_argument("--compare-json-out", default=None, help="Optional path for the machine-readable compare result")
+    ap.add_argument("--budget-p50-pct", type=float, default=10.0)
+    ap.add_argument("--budget-p90-pct", type=float, default=15.0)
+    ap.add_argument("--budget-p99-pct", type=float, default=25.0)
+    ap.add_argument("--budget-stage-pct", type=float, default=20.0, help="Budget for per-stage p50 latency")
+    ap.add_argument("--budget-stage-p90-pct", type=float, default=30.0)
+    ap.add_argument("--budget-stage-p99-pct", type=float, default=40.0)
+    ap.add_argument("--budget-throughput-pct", type=float, default=10.0, help="Max tolerated wall-clock throughput drop")
+    ap.add_argument("--bootstrap", type=int, default=2000, help="Bootstrap resamples")
+    ap.add_argument("--bootstrap-seed", type=int, default=0)
+    ap.add_argument("--min-samples", type=int, default=5, help="Skip checks with fewer OK rows than this on either side")
+    # Query mode: canned queries over the SQLite run index (index_batch_runs.py).
+    ap.add_argument("--index-db", default=None, help="SQLite run index; with --query (default testing/runs/batch_index.sqlite)")
+    ap.add_argument("--query", default=None, choices=sorted(CANNED_QUERIES), help="Canned query over the run index")
+    ap.add_argument("--where", action="append", default=[], help="Query filter column=value on batch_results (repeatable; value NULL -> IS NULL)")
+    ap.add_argument("--run-id", action="append", default=[], help="Query only these runs (run directory names, repeatable)")
+    ap.add_argument("--limit", type=int, default=200)
+    ap.add_argument("--format", choices=["md", "jsonl"], default="md", help="Query output (markdown table or JSON rows)")
+    ap.add_argument("--no-index-refresh", action="store_true", help="Query the index as is (no incremental ingestion of testing/runs)")
     args = ap.parse_args()
 
     runs_root = Path("testing/runs")
+    if args.query:
+        args.index_db = args.index_db or "testing/runs/batch_index.sqlite"
+        return query_main(args, runs_root)
     run_dir = Path(args.run_dir) if args.run_dir else detect_latest_run(runs_root)
 
+    if args.compare:
+        base_dir, base_summary, base_results = load_run(Path(args.compare))
+        head_dir, head_summary, head_results = load_run(run_dir)
+        budgets = {
+            "p50_pct": args.budget_p50_pct,
+            "p90_pct": args.budget_p90_pct,
+            "p99_pct": args.budget_p99_pct,
+            "stage_pct": args.budget_stage_pct,
+            "stage_p90_pct": args.budget_stage_p90_pct,
+            "stage_p99_pct": args.budget_stage_p99_pct,
+            "throughput_pct": args.budget_throughput_pct,
+        }
+        cmp = compare_runs(
+            run_metrics(base_summary, base_results),
+            run_metrics(head_summary, head_results),
+            budgets,
+            n_boot=args.bootstrap,
+            seed=args.bootstrap_seed,
+            min_samples=args.min_samples,
+        )
+        cmp["base_run"] = str(base_dir)
+        cmp["head_run"] = str(head_dir)
+        content = build_compare_report(base_dir, head_dir, cmp)
+        if args.out:
+            out_path = Path(args.out)
+        else:
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            out_path = Path("testing/reports") / f"e2e_batch_compare_report_{ts}.md"
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(content, encoding="utf-8")
+        if args.compare_json_out:
+            Path(args.compare_json_out).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.compare_json_out).write_text(json.dumps(cmp, indent=2) + "\n", encoding="utf-8")
+        print(out_path)
+        for c in cmp["regressions"]:
+            print(
+                f"[REGRESSION] {c['metric']} {c['stat']}: {c['delta_pct']:+.1f}% "
+                f"(CI {c['ci_low_pct']:+.1f}%..{c['ci_high_pct']:+.1f}%, budget {c['budget_pct']:.1f}%)",
+                file=sys.stderr,
+            )
+        return REGRESSION_EXIT_CODE if cmp["regressions"] else 0
+
     summary_path = run_dir / "summary.json"
     results_path = run_dir / "results.jsonl"
     if not summary_path.exists() or not results_path.exists():
@@ -142,7 +548,8 @@ def main():
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(content, encoding="utf-8")
     print(out_path)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+SQLite query index over batch run results (testing/runs/*/results.jsonl + their packs).
+
+One row per result row in `batch_results`, with the results.jsonl fields and these
+flattened pack fields:
+  - T2/T3/T4 normalized decisions and scores
+  - fraud signals action and sensor mode
+  - BRMS gates and validation mode
+  - per-stage latency
+It also carries scenario_tag, taken from the run's input requests file. Packs are read
+from pack_path (or the run's packs/ when the run directory was moved), else from the
+run's packs.archive (runners/pack_archive.py); a row whose pack is gone keeps its
+results.jsonl fields only.
+
+Ingestion is incremental: a run is re-read only when its results.jsonl changed (size or
+mtime), and then replaced as a whole.
+
+Canned queries: build_e2e_batch_report.py --index-db DB --query NAME.
+
+Usage:
+  python3 testing/scripts/index_batch_runs.py --db testing/runs/batch_index.sqlite              # every run under testing/runs
+  python3 testing/scripts/index_batch_runs.py --db /tmp/idx.sqlite --run-dir testing/runs/<run>
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_DB = "testing/runs/batch_index.sqlite"
+RUN_GLOB = "eval_requests_*_run_*"
+STAGE_KEYS = ("workflow_intake", "eligibility", "t2_default", "t3_fraud", "t4_payoff", "brms_flags", "final_decision")
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS batch_runs (
+        run_id          TEXT PRIMARY KEY,
+        run_dir         TEXT NOT NULL,
+        input_path      TEXT,
+        run_size        INTEGER,
+        ok_count        INTEGER,
+        error_count     INTEGER,
+        wall_ms         INTEGER,
+        throughput_rps  REAL,
+        manifest_hash   TEXT,
+        results_size    INTEGER NOT NULL,
+        results_mtime   REAL NOT NULL,
+        indexed_at      REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS batch_results (
+        run_id              TEXT NOT NULL,
+        row_index           INTEGER NOT NULL,
+        request_id          TEXT,
+        client_id           TEXT,
+        seed                INTEGER,
+        status              TEXT,
+        error               TEXT,
+        scenario_tag        TEXT,
+        eligibility_status  TEXT,
+        final_outcome       TEXT,
+        final_reason_code   TEXT,
+        sensor_mode_used    TEXT,
+        validation_mode     TEXT,
+        t2_decision         TEXT,
+        t3_decision         TEXT,
+        t4_decision         TEXT,
+        t2_score            REAL,
+        t3_score            REAL,
+        t4_score            REAL,
+        fraud_action        TEXT,
+        fraud_sensor_mode   TEXT,
+        brms_gate_1         TEXT,
+        brms_gate_2         TEXT,
+        brms_gate_3         TEXT,
+        elapsed_ms          INTEGER,
+        pack_latency_ms     INTEGER,
+        lat_workflow_intake_ms INTEGER,
+        lat_eligibility_ms  INTEGER,
+        lat_t2_default_ms   INTEGER,
+        lat_t3_fraud_ms     INTEGER,
+        lat_t4_payoff_ms    INTEGER,
+        lat_brms_flags_ms   INTEGER,
+        lat_final_decision_ms INTEGER,
+        pack_path           TEXT,
+        report_path         TEXT,
+        PRIMARY KEY (run_id, row_index)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_results_outcome ON batch_results (final_outcome)",
+    "CREATE INDEX IF NOT EXISTS ix_results_reason ON batch_results (final_reason_code)",
+    "CREATE INDEX IF NOT EXISTS ix_results_eligibility ON batch_results (eligibility_status)",
+    "CREATE INDEX IF NOT EXISTS ix_results_sensor_mode ON batch_results (sensor_mode_used)",
+    "CREATE INDEX IF NOT EXISTS ix_results_scenario ON batch_results (scenario_tag)",
+    "CREATE INDEX IF NOT EXISTS ix_results_elapsed ON batch_results (elapsed_ms)",
+    "CREATE INDEX IF NOT EXISTS ix_results_request ON batch_results (request_id)",
+    "CREATE INDEX IF NOT EXISTS ix_results_t3 ON batch_results (t3_decision)",
+]
+RESULT_COLUMNS = (
+    "run_id", "row_index", "request_id", "client_id", "seed", "status", "error", "scenario_tag",
+    "eligibility_status", "final_outcome", "final_reason_code", "sensor_mode_used", "validation_mode",
+    "t2_decision", "t3_decision", "t4_decision", "t2_score", "t3_score", "t4_score",
+    "fraud_action", "fraud_sensor_mode", "brms_gate_1", "brms_gate_2", "brms_gate_3",
+    "elapsed_ms", "pack_latency_ms",
+) + tuple(f"lat_{k}_ms" for k in STAGE_KEYS) + ("pack_path", "report_path")
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(db_path, timeout=5.0, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    for stmt in _SCHEMA:
+        db.execute(stmt)
+    return db
+
+
+def _obj(v: Any) -> Dict[str, Any]:
+    return v if isinstance(v, dict) else {}
+
+
+def _num(v: Any) -> Optional[float]:
+    return v if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+
+
+def _resolve(path: Optional[str]) -> Optional[Path]:
+    if not path:
+        return None
+    p = Path(path)
+    return p if p.is_absolute() else ROOT / p
+
+
+def pack_fields(pack: Dict[str, Any]) -> Dict[str, Any]:
+    """Flattened columns of one decision_pack_v0_1 (missing stages -> NULL)."""
+    d = _obj(pack.get("decisions"))
+    elig, final = _obj(d.get("eligibility")), _obj(d.get("final_decision"))
+    t2, t3, t4 = _obj(d.get("t2_default")), _obj(d.get("t3_fraud")), _obj(d.get("t4_payoff"))
+    fraud, gates = _obj(d.get("fraud_signals")), _obj(_obj(d.get("brms_flags")).get("gates"))
+    out: Dict[str, Any] = {
+        "eligibility_status": elig.get("eligibility_status"),
+        "final_outcome": final.get("final_outcome"),
+        "final_reason_code": final.get("final_reason_code"),
+        "sensor_mode_used": elig.get("meta_sensor_mode_used"),
+        "validation_mode": final.get("validation_mode"),
+        "t2_decision": t2.get("decision_default_norm"),
+        "t3_decision": t3.get("decision_fraud_norm"),
+        "t4_decision": t4.get("decision_payoff_norm"),
+        "t2_score": _num(t2.get("score_default_prob")),
+        "t3_score": _num(t3.get("score_fraud_prob")),
+        "t4_score": _num(t4.get("score_payoff_prob")),
+        "fraud_action": fraud.get("action_recommended"),
+        "fraud_sensor_mode": fraud.get("meta_sensor_mode_used"),
+        "brms_gate_1": gates.get("gate_1"),
+        "brms_gate_2": gates.get("gate_2"),
+        "brms_gate_3": gates.get("gate_3"),
+        "pack_latency_ms": _num(pack.get("meta_latency_ms")),
+    }
+    for k in STAGE_KEYS:
+        out[f"lat_{k}_ms"] = _num(_obj(d.get(k)).get("meta_latency_ms"))
+    return out
+
+
+def _scenario_tags(input_path: Optional[str]) -> Dict[str, str]:
+    p = _resolve(input_path)
+    if p is None or not p.exists():
+        return {}
+    tags = {}
+    with p.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                if row.get("scenario_tag") is not None:
+                    tags[str(row.get("request_id"))] = str(row["scenario_tag"])
+    return tags
+
+
+def _archive_reader(run_dir: Path) -> Any:
+    if not (run_dir / "packs.archive" / "archive.json").exists():
+        return None
+    sys.path.insert(0, str(ROOT / "runners"))
+    import pack_archive
+
+    return pack_archive.PackArchiveReader(str(run_dir / "packs.archive"))
+
+
+def _load_pack(row: Dict[str, Any], run_dir: Path, archive: Any) -> Optional[Dict[str, Any]]:
+    p = _resolve(row.get("pack_path"))
+    if p is not None and not p.exists():
+        p = run_dir / "packs" / p.name  # run directory moved since the batch wrote pack_path
+    if p is not None and p.exists():
+        try:
+            return json.loads(p.read_text(encoding="utf-8"))
+        except ValueError:
+            return None
+    if archive is not None and row.get("request_id") in archive.index:
+        return archive.get(row["request_id"])
+    return None
+
+
+def result_record(run_id: str, row: Dict[str, Any], pack: Optional[Dict[str, Any]], tags: Dict[str, str]) -> Dict[str, Any]:
+    rec: Dict[str, Any] = {k: None for k in RESULT_COLUMNS}
+    rec.update({
+        "run_id": run_id,
+        "row_index": row.get("row_index"),
+        "request_id": row.get("request_id"),
+        "client_id": row.get("client_id"),
+        "seed": row.get("seed"),
+        "status": row.get("status"),
+        "error": row.get("error"),
+        "scenario_tag": tags.get(str(row.get("request_id"))),
+        "eligibility_status": row.get("eligibility_status"),
+        "final_outcome": row.get("final_outcome"),
+        "final_reason_code": row.get("final_reason_code"),
+        "sensor_mode_used": row.get("sensor_mode_used"),
+        "elapsed_ms": row.get("elapsed_ms"),
+        "pack_path": row.get("pack_path"),
+        "report_path": row.get("report_path"),
+    })
+    if pack is not None:
+        # results.jsonl values win where both have one (they are what the run recorded).
+        for k, v in pack_fields(pack).items():
+            if rec.get(k) in (None, ""):
+                rec[k] = v
+    for k, v in _obj(row.get("stage_latency_ms")).items():
+        if f"lat_{k}_ms" in rec and _num(v) is not None:
+            rec[f"lat_{k}_ms"] = v
+    return rec
+
+
+def ingest_run(db: sqlite3.Connection, run_dir: Path, *, force: bool = False) -> Optional[int]:
+    """Rows indexed for this run, or None when it was already indexed and unchanged."""
+    results_path = run_dir / "results.jsonl"
+    if not results_path.exists():
+        return None
+    st = results_path.stat()
+    run_id = run_dir.name
+    known = db.execute("SELECT results_size, results_mtime FROM batch_runs WHERE run_id = ?", (run_id,)).fetchone()
+    if known is not None and not force and known[0] == st.st_size and known[1] == st.st_mtime:
+        return None
+
+    summary_path = run_dir / "summary.json"
+    summary = json.loads(summary_path.read_text(encoding="utf-8")) if summary_path.exists() else {}
+    tags = _scenario_tags(summary.get("input_path"))
+    archive = _archive_reader(run_dir)
+    records = []
+    with results_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                records.append(result_record(run_id, row, _load_pack(row, run_dir, archive) if row.get("status") == "OK" else None, tags))
+
+    placeholders = ", ".join("?" for _ in RESULT_COLUMNS)
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM batch_results WHERE run_id = ?", (run_id,))
+        db.executemany(
+            f"INSERT INTO batch_results ({', '.join(RESULT_COLUMNS)}) VALUES ({placeholders})",
+            [tuple(r[c] for c in RESULT_COLUMNS) for r in records],
+        )
+        db.execute(
+            "INSERT OR REPLACE INTO batch_runs (run_id, run_dir, input_path, run_size, ok_count, error_count, wall_ms, "
+            "throughput_rps, manifest_hash, results_size, results_mtime, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id, str(run_dir), summary.get("input_path"), summary.get("run_size"), summary.get("ok_count"),
+                summary.get("error_count"), summary.get("wall_ms"), summary.get("throughput_rps"),
+                summary.get("runtime_manifest_hash"), st.st_size, st.st_mtime, time.time(),
+            ),
+        )
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    return len(records)
+
+
+def ingest_runs(db: sqlite3.Connection, run_dirs: Iterable[Path], *, force: bool = False) -> Dict[str, Any]:
+    indexed: Dict[str, int] = {}
+    unchanged = 0
+    no_results: List[str] = []
+    for run_dir in run_dirs:
+        if not (run_dir / "results.jsonl").exists():
+            no_results.append(run_dir.name)  # run still going, or it died before writing results
+            continue
+        n = ingest_run(db, run_dir, force=force)
+        if n is None:
+            unchanged += 1
+        else:
+            indexed[run_dir.name] = n
+    return {
+        "runs_indexed": indexed,
+        "runs_unchanged": unchanged,
+        "runs_without_results": no_results,
+        "runs_total": db.execute("SELECT COUNT(*) FROM batch_runs").fetchone()[0],
+        "rows_total": db.execute("SELECT COUNT(*) FROM batch_results").fetchone()[0],
+    }
+
+
+def discover_runs(runs_root: Path) -> List[Path]:
+    return sorted(p for p in runs_root.glob(RUN_GLOB) if p.is_dir())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Index batch run results into SQLite (incremental)")
+    ap.add_argument("--db", default=DEFAULT_DB)
+    ap.add_argument("--runs-root", default="testing/runs", help="Index every run directory under here (default)")
+    ap.add_argument("--run-dir", action="append", default=[], help="Index only these run directories (repeatable)")
+    ap.add_argument("--force", action="store_true", help="Re-read runs even when unchanged")
+    args = ap.parse_args()
+
+    run_dirs = [Path(p) for p in args.run_dir] if args.run_dir else discover_runs(Path(args.runs_root))
+    db = connect(args.db)
+    out = ingest_runs(db, run_dirs, force=args.force)
+    out["db"] = args.db
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Self-contained canonical alias directory with tiny synthetic T2/T3/T4 boosters.
+
+For smokes of the in-process engine / decision service on machines without the
+/home/adien model bundles. The boosters are trained on random data (deterministic
+seed) and mean nothing; thresholds come from testing/bench/fixtures.
+
+Usage:
+  python3 testing/scripts/make_tiny_alias_dir.py --out-dir /tmp/tiny_aliases
+  -> /tmp/tiny_aliases/{*_canonical.json, models/, runtime_manifest.json}
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "runners"))
+import runtime_manifest
+
+FIX = ROOT / "testing" / "bench" / "fixtures"
+FEATURES = ["f_income_log", "f_dti", "f_tenure_months", "f_bureau_score", "f_txn_count_30d"]
+
+
+def train_tiny(path: Path, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(400, len(FEATURES))).astype(np.float32)
+    y = (X[:, 0] - X[:, 1] + 0.5 * rng.normal(size=400) > 0).astype(np.float32)
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": 3, "eta": 0.3, "verbosity": 0, "seed": seed},
+        xgb.DMatrix(X, label=y, feature_names=FEATURES),
+        num_boost_round=8,
+    )
+    booster.save_model(str(path))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Alias dir with tiny synthetic T2/T3/T4 models (smokes only)")
+    ap.add_argument("--out-dir", required=True)
+    args = ap.parse_args()
+
+    out = Path(args.out_dir).resolve()
+    models = out / "models"
+    models.mkdir(parents=True, exist_ok=True)
+    for i, name in enumerate(("t2_tiny", "t3_tiny", "t4_tiny")):
+        train_tiny(models / f"{name}.json", seed=7 + i)
+    (models / "t4_tiny_feature_list.json").write_text(json.dumps({"features": FEATURES}), encoding="utf-8")
+
+    for name in ("eligibility_canonical.json", "brms_policy_canonical.json"):
+        shutil.copy(ROOT / "block_a_gov" / "artifacts" / name, out / name)
+    aliases = {
+        "t2_default_canonical.json": {
+            "model": {"model_tag": "t2_tiny", "model_file": str(models / "t2_tiny.json")},
+            "operating": {"operating_pick_file": str(FIX / "t2_operating_pick_sample.json"), "default_operating_point": "op_a"},
+        },
+        "t3_fraud_canonical.json": {
+            "model": {"model_tag": "t3_tiny", "model_file": str(models / "t3_tiny.json")},
+            "thresholds": {"thresholds_file": str(FIX / "t3_thresholds_sample.json")},
+        },
+        "t4_payoff_canonical.json": {
+            "model": {
+                "model_tag": "t4_tiny",
+                "model_file": str(models / "t4_tiny.json"),
+                "feature_list_file": str(models / "t4_tiny_feature_list.json"),
+            },
+            "thresholds": {"thresholds_file": str(FIX / "t4_thresholds_sample.json")},
+        },
+    }
+    for name, payload in aliases.items():
+        (out / name).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    manifest = runtime_manifest.build_manifest(alias_dir=str(out))
+    runtime_manifest.write_manifest(manifest, str(out / "runtime_manifest.json"))
+    print(json.dumps({"alias_dir": str(out), "runtime_manifest": str(out / "runtime_manifest.json"), "manifest_hash": manifest["manifest_hash"]}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,28 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+PYTHON_BIN="${PYTHON_BIN:-$ROOT/.venv/bin/python3}"
+if [[ ! -x "$PYTHON_BIN" ]]; then
+  PYTHON_BIN="python3"
+fi
+
+RESULTS_DIR="testing/bench/_results"
+mkdir -p "$RESULTS_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+COMMIT="$(git rev-parse --short HEAD 2>/dev/null || echo nogit)"
+OUT_JSON="$RESULTS_DIR/bench_hot_paths_${TS}_${COMMIT}.json"
+
+ARGS=(--out "$OUT_JSON")
+if [[ -n "${BASELINE_JSON:-}" ]]; then
+  ARGS+=(--compare "$BASELINE_JSON")
+fi
+if [[ "${QUICK:-0}" == "1" ]]; then
+  ARGS+=(--quick)
+fi
+
+echo "[BENCH] python=$PYTHON_BIN commit=$COMMIT"
+"$PYTHON_BIN" testing/bench/bench_hot_paths.py "${ARGS[@]}" "$@"
+echo "[BENCH] results=$OUT_JSON"
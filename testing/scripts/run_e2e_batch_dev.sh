@@ -18,18 +18,41 @@ INPUT_JSONL="${INPUT_JSONL:-testing/requests/eval_requests_dev_v0_1.jsonl}"
 SENSOR_MODE="${SENSOR_MODE:-STUB}"             # STUB|LIVE
 SENSOR_BASE_URL="${SENSOR_BASE_URL:-http://127.0.0.1:9000}"
 SENSOR_TIMEOUT_MS="${SENSOR_TIMEOUT_MS:-1200}"
+FRAUD_SIGNALS_MODE="${FRAUD_SIGNALS_MODE:-STUB}" # STUB|LIVE (ORIGINATE wC/wB)
+SENSOR_BULK="${SENSOR_BULK:-1}"                # 1: prefetch LIVE sensors via POST /sensor/batch
+SENSOR_BULK_CHUNK="${SENSOR_BULK_CHUNK:-200}"
+SENSOR_BULK_WORKERS="${SENSOR_BULK_WORKERS:-4}"
 BRMS_MODE="${BRMS_MODE:-STUB}"                 # STUB|LIVE|NONE
 BRMS_STUB="${BRMS_STUB:-tools/smoke/fixtures/brms_all_pass.json}"
 BRMS_URL="${BRMS_URL:-http://localhost:8090/bridge/brms_flags}"
 MAX_ROWS="${MAX_ROWS:-50}"
+SPECULATIVE="${SPECULATIVE:-0}"                # 1: ORIGINATE starts in parallel with Eligibility
+PROFILE="${PROFILE:-0}"                        # 1: per-stage cProfile of sampled rows (runners/profiling.py)
+PROFILE_SAMPLE_RATE="${PROFILE_SAMPLE_RATE:-0.1}"  # share of rows profiled (by request_id hash)
+PROFILE_MEMORY="${PROFILE_MEMORY:-0}"          # 1: also tracemalloc top allocations per stage
+REPORTER_WORKERS="${REPORTER_WORKERS:-1}"      # reporter processes for the bulk report pass over packs/
+PACKS_COMPACT="${PACKS_COMPACT:-0}"            # 1: also write packs.compact.jsonl (runners/pack_compact.py, verified)
+PACKS_ARCHIVE="${PACKS_ARCHIVE:-0}"            # 1: also archive packs into packs.archive/ (runners/pack_archive.py)
+RUN_INDEX_DB="${RUN_INDEX_DB:-}"               # SQLite run index to add this run to (testing/scripts/index_batch_runs.py)
+CASSETTE="${CASSETTE:-}"                       # record / replay LIVE sensor + BRMS calls in this file (runners/cassette.py)
+CASSETTE_MODE="${CASSETTE_MODE:-replay}"       # record|replay|replay-timed
 
 mkdir -p testing/_logs testing/runs
 TS="$(date +%Y%m%d_%H%M%S)"
 RUN_DIR="testing/runs/eval_requests_dev_v0_1_run_${TS}"
 PACK_DIR="$RUN_DIR/packs"
 REPORT_DIR="$RUN_DIR/reports"
+REPORTS_JSONL="$RUN_DIR/reports.jsonl"
+PACKS_COMPACT_JSONL="$RUN_DIR/packs.compact.jsonl"
+PACKS_ARCHIVE_DIR="$RUN_DIR/packs.archive"
 RESULTS_JSONL="$RUN_DIR/results.jsonl"
 SUMMARY_JSON="$RUN_DIR/summary.json"
+SENSOR_PREFETCH_JSON=""
+RUNTIME_MANIFEST_JSON="$RUN_DIR/runtime_manifest.json"
+SPECULATION_JSONL="$RUN_DIR/speculation.jsonl"
+METRICS_DIR="$RUN_DIR/metrics"       # per-process snapshots (metrics_registry.py)
+METRICS_PROM="$RUN_DIR/metrics.prom" # merged Prometheus text
+PROFILE_DIR="$RUN_DIR/profile"       # merged pstats / collapsed stacks (raw per-process files in raw/)
 LOG_FILE="testing/_logs/run_e2e_batch_dev_${TS}.log"
 
 mkdir -p "$PACK_DIR" "$REPORT_DIR"
@@ -40,20 +63,71 @@ echo "[BATCH_DEV] root=$ROOT"
 echo "[BATCH_DEV] python=$PYTHON_BIN"
 echo "[BATCH_DEV] input=$INPUT_JSONL"
 echo "[BATCH_DEV] run_dir=$RUN_DIR"
-echo "[BATCH_DEV] sensor_mode=$SENSOR_MODE brms_mode=$BRMS_MODE max_rows=$MAX_ROWS"
+echo "[BATCH_DEV] sensor_mode=$SENSOR_MODE fraud_signals_mode=$FRAUD_SIGNALS_MODE brms_mode=$BRMS_MODE max_rows=$MAX_ROWS speculative=$SPECULATIVE"
+[[ "$PROFILE" == "1" ]] && echo "[BATCH_DEV] profile: sample_rate=$PROFILE_SAMPLE_RATE memory=$PROFILE_MEMORY -> $PROFILE_DIR"
+if [[ -n "$CASSETTE" ]]; then
+  # Exported: the sensor prefetch and every row's runners record / replay through it.
+  export DECISION_CASSETTE="$CASSETTE" DECISION_CASSETTE_MODE="$CASSETTE_MODE"
+  echo "[BATCH_DEV] cassette: mode=$CASSETTE_MODE -> $CASSETTE"
+fi
 echo "[BATCH_DEV] log=$LOG_FILE"
 
+# Runtime manifest: every canonical alias resolved + hashed once for the whole run.
+if ! "$PYTHON_BIN" runners/runtime_manifest.py build ${ALIAS_DIR:+--alias-dir "$ALIAS_DIR"} --out "$RUNTIME_MANIFEST_JSON"; then
+  echo "[BATCH_DEV][WARN] runtime manifest build failed; each row resolves its aliases"
+  RUNTIME_MANIFEST_JSON=""
+fi
+
+# Bulk sensor prefetch: one pass of POST /sensor/batch for all LIVE sensors.
+# Rows missing from the prefetch (or a failed prefetch) keep the per-row fetch + fallback.
+BULK_SENSORS=()
+[[ "$SENSOR_MODE" == "LIVE" ]] && BULK_SENSORS+=("bureau_spike_score" "market_snapshot")
+[[ "$FRAUD_SIGNALS_MODE" == "LIVE" ]] && BULK_SENSORS+=("device_behavior_score" "transaction_anomaly_score")
+if [[ "$SENSOR_BULK" == "1" && ${#BULK_SENSORS[@]} -gt 0 ]]; then
+  SENSOR_PREFETCH_JSON="$RUN_DIR/sensor_prefetch.json"
+  echo "[BATCH_DEV] sensor prefetch: ${BULK_SENSORS[*]} -> $SENSOR_PREFETCH_JSON"
+  if ! "$PYTHON_BIN" runners/sensor_bulk.py \
+      --requests-jsonl "$INPUT_JSONL" \
+      --max-rows "$MAX_ROWS" \
+      --sensor-base-url "$SENSOR_BASE_URL" \
+      --sensors "$(IFS=,; echo "${BULK_SENSORS[*]}")" \
+      --chunk-size "$SENSOR_BULK_CHUNK" \
+      --workers "$SENSOR_BULK_WORKERS" \
+      --out "$SENSOR_PREFETCH_JSON"; then
+    echo "[BATCH_DEV][WARN] sensor prefetch failed; rows fetch sensors individually"
+    SENSOR_PREFETCH_JSON=""
+  fi
+fi
+
 INPUT_JSONL="$INPUT_JSONL" \
 PYTHON_BIN="$PYTHON_BIN" \
 SENSOR_MODE="$SENSOR_MODE" \
 SENSOR_BASE_URL="$SENSOR_BASE_URL" \
 SENSOR_TIMEOUT_MS="$SENSOR_TIMEOUT_MS" \
+FRAUD_SIGNALS_MODE="$FRAUD_SIGNALS_MODE" \
+SENSOR_PREFETCH_JSON="$SENSOR_PREFETCH_JSON" \
+RUNTIME_MANIFEST_JSON="$RUNTIME_MANIFEST_JSON" \
 BRMS_MODE="$BRMS_MODE" \
 BRMS_STUB="$BRMS_STUB" \
 BRMS_URL="$BRMS_URL" \
 MAX_ROWS="$MAX_ROWS" \
+SPECULATIVE="$SPECULATIVE" \
+SPECULATION_JSONL="$SPECULATION_JSONL" \
+DECISION_METRICS_DIR="$METRICS_DIR" \
+METRICS_PROM="$METRICS_PROM" \
+PROFILE="$PROFILE" \
+PROFILE_SAMPLE_RATE="$PROFILE_SAMPLE_RATE" \
+PROFILE_MEMORY="$PROFILE_MEMORY" \
+PROFILE_DIR="$PROFILE_DIR" \
 PACK_DIR="$PACK_DIR" \
 REPORT_DIR="$REPORT_DIR" \
+REPORTS_JSONL="$REPORTS_JSONL" \
+REPORTER_WORKERS="$REPORTER_WORKERS" \
+PACKS_COMPACT="$PACKS_COMPACT" \
+PACKS_COMPACT_JSONL="$PACKS_COMPACT_JSONL" \
+PACKS_ARCHIVE="$PACKS_ARCHIVE" \
+PACKS_ARCHIVE_DIR="$PACKS_ARCHIVE_DIR" \
+RUN_INDEX_DB="$RUN_INDEX_DB" \
 RESULTS_JSONL="$RESULTS_JSONL" \
 SUMMARY_JSON="$SUMMARY_JSON" \
 "$PYTHON_BIN" - << 'PY'
@@ -61,6 +135,7 @@ import json
 import os
 import subprocess
 import time
+import zlib
 from pathlib import Path
 
 input_jsonl = Path(os.environ["INPUT_JSONL"])
@@ -68,12 +143,30 @@ python_bin = os.environ["PYTHON_BIN"]
 sensor_mode = os.environ["SENSOR_MODE"]
 sensor_base_url = os.environ["SENSOR_BASE_URL"]
 sensor_timeout_ms = str(os.environ["SENSOR_TIMEOUT_MS"])
+fraud_signals_mode = os.environ["FRAUD_SIGNALS_MODE"]
+sensor_prefetch_json = os.environ.get("SENSOR_PREFETCH_JSON", "")
+runtime_manifest_json = os.environ.get("RUNTIME_MANIFEST_JSON", "")
 brms_mode = os.environ["BRMS_MODE"].upper()
 brms_stub = os.environ["BRMS_STUB"]
 brms_url = os.environ["BRMS_URL"]
 max_rows = int(os.environ["MAX_ROWS"])
+speculative = os.environ.get("SPECULATIVE", "0") == "1"
+speculation_jsonl = Path(os.environ["SPECULATION_JSONL"])
+metrics_dir = os.environ["DECISION_METRICS_DIR"]
+metrics_prom = Path(os.environ["METRICS_PROM"])
+profile = os.environ.get("PROFILE", "0") == "1"
+profile_sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0.1"))
+profile_memory = os.environ.get("PROFILE_MEMORY", "0") == "1"
+profile_dir = Path(os.environ["PROFILE_DIR"])
 pack_dir = Path(os.environ["PACK_DIR"])
 report_dir = Path(os.environ["REPORT_DIR"])
+reports_jsonl = Path(os.environ["REPORTS_JSONL"])
+reporter_workers = int(os.environ.get("REPORTER_WORKERS", "1"))
+packs_compact = os.environ.get("PACKS_COMPACT", "0") == "1"
+packs_compact_jsonl = Path(os.environ["PACKS_COMPACT_JSONL"])
+packs_archive = os.environ.get("PACKS_ARCHIVE", "0") == "1"
+packs_archive_dir = Path(os.environ["PACKS_ARCHIVE_DIR"])
+run_index_db = os.environ.get("RUN_INDEX_DB", "")
 results_jsonl = Path(os.environ["RESULTS_JSONL"])
 summary_json = Path(os.environ["SUMMARY_JSON"])
 
@@ -106,6 +199,13 @@ fail = 0
 status_counts = {"APPROVED": 0, "REJECTED": 0, "REVIEW_REQUIRED": 0}
 outcome_counts = {"APPROVE": 0, "REVIEW": 0, "REJECT": 0}
 results = []
+stage_keys = ("workflow_intake", "eligibility", "t2_default", "t3_fraud", "t4_payoff", "brms_flags", "final_decision")
+run_t0 = time.time()
+profiled_rows = 0
+
+def sampled_for_profile(request_id: str) -> bool:
+    # Stable per request_id: a rerun profiles the same rows.
+    return (zlib.crc32(request_id.encode("utf-8")) % 10000) < profile_sample_rate * 10000
 
 for i, row in enumerate(rows, start=1):
     row_req = str(row.get("request_id", "")).strip()
@@ -145,12 +245,26 @@ for i, row in enumerate(rows, start=1):
         "--sensor-mode", sensor_mode,
         "--sensor-base-url", sensor_base_url,
         "--sensor-timeout-ms", sensor_timeout_ms,
+        "--fraud-signals-mode", fraud_signals_mode,
     ]
+    if sensor_prefetch_json:
+        wf_cmd.extend(["--sensor-prefetch-json", sensor_prefetch_json])
+    if runtime_manifest_json:
+        wf_cmd.extend(["--runtime-manifest", runtime_manifest_json])
     if row.get("declared_dti") is not None:
         wf_cmd.extend(["--declared-dti", str(row.get("declared_dti"))])
     if row.get("declared_credit_score") is not None:
         wf_cmd.extend(["--declared-credit-score", str(row.get("declared_credit_score"))])
 
+    if speculative:
+        wf_cmd.extend(["--speculative-originate", "--speculation-log", str(speculation_jsonl)])
+
+    if profile and sampled_for_profile(row_req):
+        wf_cmd.extend(["--profile", "--profile-dir", str(profile_dir / "raw")])
+        if profile_memory:
+            wf_cmd.append("--profile-memory")
+        profiled_rows += 1
+
     if brms_mode == "NONE":
         wf_cmd.append("--no-brms")
     elif brms_mode == "LIVE":
@@ -160,20 +274,11 @@ for i, row in enumerate(rows, start=1):
 
     t0 = time.time()
     try:
-        pack_out = subprocess.check_output(wf_cmd, stderr=subprocess.STDOUT, text=True)
+        # stderr kept apart: sensor fallback warnings must not end up in the pack JSON.
+        pack_out = subprocess.check_output(wf_cmd, stderr=subprocess.PIPE, text=True)
         pack_path.write_text(pack_out, encoding="utf-8")
 
-        rep_cmd = [
-            python_bin,
-            "runners/runner_reporter.py",
-            "--decision-pack-json",
-            str(pack_path),
-        ]
-        rep_out = subprocess.check_output(rep_cmd, stderr=subprocess.STDOUT, text=True)
-        report_path.write_text(rep_out, encoding="utf-8")
-
         pack = json.loads(pack_out)
-        report = json.loads(rep_out)
         decisions = pack.get("decisions", {}) or {}
         elig = decisions.get("eligibility", {}) or {}
         final_decision = decisions.get("final_decision", {}) or {}
@@ -183,6 +288,11 @@ for i, row in enumerate(rows, start=1):
         reason = str(final_decision.get("final_reason_code", ""))
         mode = str(elig.get("meta_sensor_mode_used", ""))
         elapsed_ms = int((time.time() - t0) * 1000)
+        stage_latency_ms = {
+            k: decisions[k]["meta_latency_ms"]
+            for k in stage_keys
+            if isinstance(decisions.get(k), dict) and isinstance(decisions[k].get("meta_latency_ms"), (int, float))
+        }
 
         status_counts[elig_status] = status_counts.get(elig_status, 0) + 1
         outcome_counts[outcome] = outcome_counts.get(outcome, 0) + 1
@@ -199,8 +309,9 @@ for i, row in enumerate(rows, start=1):
             "sensor_mode_used": mode,
             "pack_path": str(pack_path),
             "report_path": str(report_path),
-            "report_schema": report.get("meta_schema_version"),
+            "report_schema": None,  # set by the bulk report pass below
             "elapsed_ms": elapsed_ms,
+            "stage_latency_ms": stage_latency_ms,
             "status": "OK",
         })
     except subprocess.CalledProcessError as e:
@@ -211,13 +322,108 @@ for i, row in enumerate(rows, start=1):
             "client_id": client_id,
             "seed": int(seed),
             "status": "ERROR",
-            "error": e.output[-1200:] if e.output else str(e),
+            "error": (e.stderr or e.output or str(e))[-1200:],
         })
+    # Offsets from run start: the compare mode bootstraps wall-clock throughput from these.
+    results[-1]["wall_start_ms"] = int((t0 - run_t0) * 1000)
+    results[-1]["wall_end_ms"] = int((time.time() - run_t0) * 1000)
+
+# Reports for every pack in one reporter run (runner_reporter.py bulk mode), not one process per pack.
+reporter = None
+if ok:
+    rep = subprocess.run(
+        [python_bin, "runners/runner_reporter.py", "--packs-dir", str(pack_dir), "--out-dir", str(report_dir),
+         "--out-jsonl", str(reports_jsonl), "--workers", str(reporter_workers)],
+        capture_output=True, text=True,
+    )
+    try:
+        reporter = json.loads(rep.stdout)
+    except ValueError:
+        reporter = {"error": (rep.stderr or rep.stdout)[-1200:]}
+    rep_errors = {Path(e["source"]).name: e["error"] for e in reporter.get("errors", [])}
+    for r in results:
+        if r["status"] != "OK":
+            continue
+        if Path(r["report_path"]).exists():
+            r["report_schema"] = "reporter_output_v0_1"
+            continue
+        ok -= 1
+        fail += 1
+        status_counts[r["eligibility_status"]] -= 1
+        outcome_counts[r["final_outcome"]] -= 1
+        r["status"] = "ERROR"
+        r["error"] = "reporter: " + rep_errors.get(Path(r["pack_path"]).name, reporter.get("error", "no report written"))
+
+wall_ms = int((time.time() - run_t0) * 1000)
+sensor_prefetch_ms = None
+if sensor_prefetch_json:
+    sensor_prefetch_ms = json.loads(Path(sensor_prefetch_json).read_text(encoding="utf-8")).get("elapsed_ms")
+
+speculation = None
+if speculative and speculation_jsonl.exists():
+    spec_rows = [json.loads(l) for l in speculation_jsonl.read_text(encoding="utf-8").splitlines() if l.strip()]
+    hits = [r for r in spec_rows if r.get("hit")]
+    misses = [r for r in spec_rows if not r.get("hit")]
+    speculation = {
+        "speculation_jsonl": str(speculation_jsonl),
+        "runs": len(spec_rows),
+        "hits": len(hits),
+        "hit_rate": round(len(hits) / len(spec_rows), 4) if spec_rows else None,
+        # ORIGINATE time hidden behind Eligibility on hits / spent for nothing on early cuts
+        "overlap_ms_total": sum(r["originate_ms"] - r["wait_ms"] for r in hits),
+        "wasted_ms_total": sum(r.get("wasted_ms", 0) for r in misses),
+        "wasted_completed": sum(1 for r in misses if r.get("originate_finished")),
+    }
 
 with results_jsonl.open("w", encoding="utf-8") as f:
     for r in results:
         f.write(json.dumps(r, ensure_ascii=True) + "\n")
 
+# Per-stage profiles of the sampled rows (all processes) -> pstats + collapsed stacks.
+profile_summary = None
+if profile and (profile_dir / "raw").is_dir():
+    merged = subprocess.run(
+        [python_bin, "runners/profiling.py", "merge", "--dir", str(profile_dir / "raw"), "--out", str(profile_dir)],
+        capture_output=True, text=True,
+    )
+    if merged.returncode == 0:
+        profile_summary = {
+            "profile_dir": str(profile_dir),
+            "sample_rate": profile_sample_rate,
+            "profiled_rows": profiled_rows,
+            "stages": json.loads(merged.stdout)["stages"],
+        }
+    else:
+        print(f"[BATCH_DEV][WARN] profile merge failed: {merged.stderr.strip()}")
+
+# Compact copy of the run's packs: shared metadata once, references per row (lossless, verified).
+compact_summary = None
+if packs_compact and ok:
+    comp = subprocess.run(
+        [python_bin, "runners/pack_compact.py", "compact", "--packs-dir", str(pack_dir), "--out", str(packs_compact_jsonl), "--verify"],
+        capture_output=True, text=True,
+    )
+    if comp.returncode == 0:
+        compact_summary = json.loads(comp.stdout)
+    else:
+        print(f"[BATCH_DEV][WARN] pack compaction failed: {(comp.stderr or comp.stdout).strip()[-1200:]}")
+
+# Compressed archive of the run's packs, random access by request_id.
+archive_summary = None
+if packs_archive and ok:
+    arch = subprocess.run(
+        [python_bin, "runners/pack_archive.py", "add", "--archive", str(packs_archive_dir), "--packs-dir", str(pack_dir)],
+        capture_output=True, text=True,
+    )
+    if arch.returncode == 0:
+        archive_summary = json.loads(arch.stdout)
+    else:
+        print(f"[BATCH_DEV][WARN] pack archive failed: {(arch.stderr or arch.stdout).strip()[-1200:]}")
+
+# Every child wrote its own metrics snapshot; one merged exposition for the run.
+if Path(metrics_dir).is_dir():
+    subprocess.run([python_bin, "runners/metrics_registry.py", "merge", "--dir", metrics_dir, "--out", str(metrics_prom)], check=False)
+
 summary = {
     "schema_version": "e2e_batch_run_summary_v0_1",
     "input_path": str(input_jsonl),
@@ -227,9 +433,33 @@ summary = {
     "eligibility_status_counts": status_counts,
     "final_outcome_counts": outcome_counts,
     "results_jsonl": str(results_jsonl),
+    "sensor_prefetch_json": sensor_prefetch_json or None,
+    "sensor_prefetch_ms": sensor_prefetch_ms,
+    "runtime_manifest_json": runtime_manifest_json or None,
+    "runtime_manifest_hash": json.loads(Path(runtime_manifest_json).read_text(encoding="utf-8"))["manifest_hash"] if runtime_manifest_json else None,
+    "speculation": speculation,
+    "reports_jsonl": str(reports_jsonl) if reports_jsonl.exists() else None,
+    "reporter": reporter,
+    "packs_compact": compact_summary,
+    "packs_archive": archive_summary,
+    "metrics_prom": str(metrics_prom) if metrics_prom.exists() else None,
+    "profile": profile_summary,
+    "cassette": {"path": os.environ["DECISION_CASSETTE"], "mode": os.environ.get("DECISION_CASSETTE_MODE")} if os.environ.get("DECISION_CASSETTE") else None,
+    "wall_ms": wall_ms,
+    "throughput_rps": round(ok / (wall_ms / 1000.0), 3) if wall_ms > 0 else None,
 }
 summary_json.write_text(json.dumps(summary, indent=2), encoding="utf-8")
 
+if run_index_db:
+    indexed = subprocess.run(
+        [python_bin, "testing/scripts/index_batch_runs.py", "--db", run_index_db, "--run-dir", str(summary_json.parent)],
+        capture_output=True, text=True,
+    )
+    if indexed.returncode != 0:
+        print(f"[BATCH_DEV][WARN] run index failed: {indexed.stderr.strip()[-1200:]}")
+    else:
+        print(f"[BATCH_DEV] indexed into {run_index_db}")
+
 print(f"[BATCH_DEV] run_size={len(rows)} ok={ok} error={fail}")
 print(f"[BATCH_DEV] results={results_jsonl}")
 print(f"[BATCH_DEV] summary={summary_json}")
@@ -3,7 +3,7 @@ import json
 import sys
 import urllib.request
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 DEFAULT_KIE_URL = "http://localhost:8082/kie-server/services/rest/server/containers/loan_rules_1_0_9/dmn"
 DEFAULT_USER = "kieserver"
@@ -24,7 +24,7 @@ def _basic_auth_header(user: str, pw: str) -> str:
     return f"Basic {token}"
 
 
-def call_kie_dmn(kie_url: str, user: str, pw: str, dmn_context: Dict[str, Any]) -> Dict[str, Any]:
+def call_kie_dmn(kie_url: str, user: str, pw: str, dmn_context: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     payload = {
         "model-namespace": DMN_NAMESPACE,
         "model-name": DMN_MODEL,
@@ -35,6 +35,8 @@ def call_kie_dmn(kie_url: str, user: str, pw: str, dmn_context: Dict[str, Any])
     req = urllib.request.Request(kie_url, method="POST", data=data)
     req.add_header("Content-Type", "application/json")
     req.add_header("Authorization", _basic_auth_header(user, pw))
+    for k, v in (headers or {}).items():
+        req.add_header(k, v)  # e.g. traceparent from the bridge server
 
     with urllib.request.urlopen(req, timeout=15) as resp:
         raw = resp.read().decode("utf-8", errors="replace")
@@ -1,19 +1,41 @@
 #!/usr/bin/env python3
 # Minimal BRMS Bridge Server (HTTP) -> returns brms_flags_v0_1
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from pathlib import Path
 from typing import Any, Dict
+import sys
 import time
 
 from tools.brms_bridge_kie import call_kie_dmn, to_brms_flags_v0_1, DEFAULT_KIE_URL, DEFAULT_USER, DEFAULT_PASS
 
+_RUNNERS_DIR = Path(__file__).resolve().parents[1] / "runners"
+if str(_RUNNERS_DIR) not in sys.path:
+    sys.path.insert(0, str(_RUNNERS_DIR))
+import metrics_registry
+import tracing
+
 app = FastAPI()
+tracing.configure("brms_bridge")  # DECISION_TRACE_OUT
+
+_REQUESTS = metrics_registry.counter("brms_bridge_requests_total", "BRMS bridge requests by result", ("status",))
+_KIE_MS = metrics_registry.histogram("brms_bridge_kie_latency_ms", "KIE DMN evaluation round trip (ms)")
 
 @app.get("/health")
 def health() -> Dict[str, Any]:
     return {"ok": True}
 
+@app.get("/metrics")
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics_registry.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/bridge/brms_flags")
-def bridge_brms_flags(req_payload: Dict[str, Any]) -> Dict[str, Any]:
+def bridge_brms_flags(req_payload: Dict[str, Any], request: Request) -> Dict[str, Any]:
+    with tracing.span("POST /bridge/brms_flags", kind="SERVER", traceparent=request.headers.get(tracing.TRACEPARENT_HEADER),
+                      attributes={"decision.request_id": req_payload.get("meta_request_id")}):
+        return _bridge_brms_flags(req_payload)
+
+def _bridge_brms_flags(req_payload: Dict[str, Any]) -> Dict[str, Any]:
     # Minimal contract fields
     request_id = req_payload.get("meta_request_id") or "sample"
     client_id = req_payload.get("meta_client_id") or "unknown"
@@ -47,7 +69,9 @@ def bridge_brms_flags(req_payload: Dict[str, Any]) -> Dict[str, Any]:
 
     t0 = time.time()
     try:
-        dmn_eval = call_kie_dmn(kie_url, user, pw, dmn_context)
+        with tracing.span("POST kie dmn", kind="CLIENT", attributes={"url.full": kie_url, "dmn.decision": "Gate_3_FinalDecision"}):
+            dmn_eval = call_kie_dmn(kie_url, user, pw, dmn_context, headers=tracing.inject({}))
+        _KIE_MS.observe((time.time() - t0) * 1000.0)
         # MARKER: DMN_SNAPSHOT_V0_1
         # Persist DMN inputs/outputs for debugging (best-effort)
         try:
@@ -61,8 +85,10 @@ def bridge_brms_flags(req_payload: Dict[str, Any]) -> Dict[str, Any]:
             pass
         out = to_brms_flags_v0_1(dmn_eval, request_id, client_id)
         out["meta_latency_ms"] = int((time.time() - t0) * 1000)
+        _REQUESTS.inc(status="ok")
         return out
     except Exception as e:
+        _REQUESTS.inc(status=metrics_registry.fallback_reason(e))
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=502, detail=f"BRMS bridge failed: {e}")
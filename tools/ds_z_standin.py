@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+DS_Z sensor stand-in (local, deterministic scores, configurable latency/failures).
+
+Serves the endpoints consumed by ORIGINATE (wB/wC) and the Eligibility runner (wE/wF):
+  GET /health
+  GET /sensor/device_behavior_score       -> device_behavior_fraud_score_24h
+  GET /sensor/transaction_anomaly_score   -> transaction_anomaly_score_30d
+  GET /sensor/bureau_spike_score          -> bureau_spike_score_24h
+  GET /sensor/market_snapshot             -> market_stress_score_7d (400-on-as_of per profile)
+  POST /sensor/batch                      -> many items for one sensor (see runners/sensor_bulk.py)
+  GET /standin/stats                      -> request counters + resolved profiles
+
+Scores depend only on (endpoint, client_id, seed / as_of), so LIVE runs are reproducible.
+
+Usage:
+  python3 -m tools.ds_z_standin --port 9000 --profile realistic
+  python3 -m tools.ds_z_standin --latency lognormal:25:0.6 --error-rate 0.02 --as-of-400 out_of_range
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import urllib.parse
+from typing import Any, Dict
+
+from tools.standin_common import (
+    DEFAULT_PROFILES_FILE,
+    JsonHandler,
+    StandinState,
+    apply_draw,
+    as_of_rejected,
+    load_profile_preset,
+    parse_latency_spec,
+    serve,
+    stable_unit,
+    utc_now_iso,
+)
+
+SENSOR_ENDPOINTS = (
+    "/sensor/device_behavior_score",
+    "/sensor/transaction_anomaly_score",
+    "/sensor/bureau_spike_score",
+    "/sensor/market_snapshot",
+)
+BATCH_ENDPOINT = "/sensor/batch"
+
+
+def _q(query: Dict[str, Any], key: str, default: str = "") -> str:
+    v = query.get(key)
+    if isinstance(v, list):
+        v = v[0] if v else default
+    return default if v is None else str(v)
+
+
+def sensor_response(endpoint: str, query: Dict[str, Any], latency_ms: float) -> Dict[str, Any]:
+    """Deterministic DS_Z-shaped payload for one sensor request."""
+    client_id = _q(query, "client_id")
+    seed = _q(query, "seed", "0")
+    base = {
+        "request_id": _q(query, "request_id") or None,
+        "source": "ds_z_standin_v0_1",
+        "generated_at": utc_now_iso(),
+        "latency_ms": int(round(latency_ms)),
+    }
+    if endpoint == "/sensor/device_behavior_score":
+        # Skewed low: ~10% of clients land above the 0.80 high threshold.
+        score = stable_unit(endpoint, client_id, seed) ** 2
+        base.update({
+            "client_id": client_id,
+            "lookback_hours": int(_q(query, "lookback_hours", "24") or 24),
+            "device_behavior_fraud_score_24h": round(score, 4),
+        })
+    elif endpoint == "/sensor/transaction_anomaly_score":
+        score = stable_unit(endpoint, client_id, seed) ** 2
+        base.update({
+            "client_id": client_id,
+            "lookback_days": int(_q(query, "lookback_days", "30") or 30),
+            "transaction_anomaly_score_30d": round(score, 4),
+        })
+    elif endpoint == "/sensor/bureau_spike_score":
+        score = stable_unit(endpoint, client_id) ** 3
+        base.update({
+            "client_id": client_id,
+            "lookback_hours": int(_q(query, "lookback_hours", "24") or 24),
+            "bureau_spike_score_24h": round(score, 4),
+        })
+    elif endpoint == "/sensor/market_snapshot":
+        as_of = _q(query, "as_of") or "default_snapshot"
+        base.update({
+            "as_of": None if as_of == "default_snapshot" else as_of,
+            "market_stress_score_7d": round(0.2 + 0.7 * stable_unit(endpoint, as_of[:10]), 4),
+        })
+    return base
+
+
+def batch_response(state: StandinState, payload: Dict[str, Any], latency_ms: float) -> Dict[str, Any]:
+    """
+    One result per item, in order. Each item gets its own error/as_of outcome from the
+    sensor's profile; latency is paid once for the whole batch by the caller.
+    """
+    sensor = str(payload.get("sensor") or "").strip().rstrip("/").split("/")[-1]
+    endpoint = f"/sensor/{sensor}"
+    if endpoint not in SENSOR_ENDPOINTS:
+        raise ValueError(f"Unknown sensor: {sensor}")
+    items = payload.get("items")
+    if not isinstance(items, list):
+        raise ValueError("items must be a list")
+
+    results = []
+    for item in items:
+        query = item if isinstance(item, dict) else {}
+        state.count(endpoint, "batch_items")
+        draw = state.draw(endpoint)
+        if draw["fail"]:
+            state.count(endpoint, "errors")
+            results.append({"ok": False, "status": draw["error_status"], "detail": "standin injected failure"})
+        elif endpoint == "/sensor/market_snapshot" and as_of_rejected(state.profile(endpoint), _q(query, "as_of") or None):
+            state.count(endpoint, "as_of_400")
+            results.append({"ok": False, "status": 400, "detail": "as_of not in snapshot range"})
+        else:
+            results.append({"ok": True, "data": sensor_response(endpoint, query, latency_ms)})
+    return {"sensor": sensor, "results": results}
+
+
+def make_handler(state: StandinState) -> type:
+    class DSZStandinHandler(JsonHandler):
+        def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+            parsed = urllib.parse.urlsplit(self.path)
+            path = parsed.path.rstrip("/") or "/"
+            query = urllib.parse.parse_qs(parsed.query)
+
+            if path == "/health":
+                self.send_json(200, {"ok": True, "service": "ds_z_standin"})
+                return
+            if path == "/standin/stats":
+                self.send_json(200, state.snapshot())
+                return
+            if path not in SENSOR_ENDPOINTS:
+                self.send_json(404, {"detail": f"Unknown endpoint: {path}"})
+                return
+
+            t0 = time.time()
+            draw = state.draw(path)
+            apply_draw(draw)
+            state.count(path, "requests")
+            if self.headers.get("traceparent"):
+                state.count(path, "traced")
+
+            if draw["fail"]:
+                state.count(path, "errors")
+                self.send_json(draw["error_status"], {"detail": "standin injected failure"})
+                return
+            if path == "/sensor/market_snapshot" and as_of_rejected(state.profile(path), _q(query, "as_of") or None):
+                state.count(path, "as_of_400")
+                self.send_json(400, {"detail": "as_of not in snapshot range"})
+                return
+
+            self.send_json(200, sensor_response(path, query, (time.time() - t0) * 1000.0))
+
+        def do_POST(self) -> None:  # noqa: N802
+            path = urllib.parse.urlsplit(self.path).path.rstrip("/")
+            if path != BATCH_ENDPOINT:
+                self.send_json(404, {"detail": f"Unknown endpoint: {path}"})
+                return
+            try:
+                payload = self.read_json_body() or {}
+            except Exception:
+                self.send_json(400, {"detail": "invalid JSON body"})
+                return
+
+            t0 = time.time()
+            draw = state.draw(path)
+            apply_draw(draw)
+            state.count(path, "requests")
+            if self.headers.get("traceparent"):
+                state.count(path, "traced")
+            if draw["fail"]:
+                state.count(path, "errors")
+                self.send_json(draw["error_status"], {"detail": "standin injected failure"})
+                return
+            try:
+                out = batch_response(state, payload, (time.time() - t0) * 1000.0)
+            except ValueError as e:
+                self.send_json(400, {"detail": str(e)})
+                return
+            self.send_json(200, out)
+
+    return DSZStandinHandler
+
+
+def build_state(args: argparse.Namespace) -> StandinState:
+    preset = load_profile_preset(args.profiles_file, args.profile)
+    overrides: Dict[str, Any] = {
+        "latency": parse_latency_spec(args.latency) if args.latency else None,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+        "as_of_400": args.as_of_400,
+        "as_of_min": args.as_of_min,
+        "as_of_max": args.as_of_max,
+    }
+    return StandinState(preset, overrides, seed=args.seed)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="DS_Z sensor stand-in (local load-test double)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9000)
+    ap.add_argument("--profiles-file", default=DEFAULT_PROFILES_FILE)
+    ap.add_argument("--profile", default=None, help="Named preset from --profiles-file (e.g. fast, realistic, heavy_tail, flaky)")
+    ap.add_argument("--latency", default=None, help="Override for all endpoints: fixed:MS | lognormal:MEDIAN:SIGMA | heavy_tail:BASE:ALPHA[:CAP]")
+    ap.add_argument("--error-rate", type=float, default=None)
+    ap.add_argument("--error-status", type=int, default=None)
+    ap.add_argument("--as-of-400", choices=["never", "always", "out_of_range"], default=None)
+    ap.add_argument("--as-of-min", default=None)
+    ap.add_argument("--as-of-max", default=None)
+    ap.add_argument("--seed", type=int, default=42, help="Seed for latency/error sampling")
+    args = ap.parse_args()
+
+    state = build_state(args)
+    serve(make_handler(state), args.host, args.port, "DS_Z_STANDIN")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
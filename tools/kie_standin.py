@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+KIE Server DMN stand-in (local, configurable latency/failures).
+
+Answers the DMN evaluate call made by `tools.brms_bridge_kie.call_kie_dmn`:
+  POST /kie-server/services/rest/server/containers/<container>/dmn
+  GET  /health
+  GET  /standin/stats
+
+The response mirrors the KIE envelope consumed by `to_brms_flags_v0_1`
+(`result.dmn-evaluation-result.dmn-context` with Gate_1/2/3 + Context).
+
+Gate modes:
+  rules       deterministic toy rules over Applicant/Loan (default)
+  all_pass    every gate passes
+  gate2_fail  Gate_2_Offer returns null (no offer)
+  no_context  dmn-context is null (exercises BRMS_CONTEXT_MISSING)
+
+Usage:
+  python3 -m tools.kie_standin --port 8082 --profile realistic --gate-mode rules
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import urllib.parse
+from typing import Any, Dict, Optional
+
+from tools.standin_common import (
+    DEFAULT_PROFILES_FILE,
+    JsonHandler,
+    StandinState,
+    apply_draw,
+    load_profile_preset,
+    parse_latency_spec,
+    serve,
+)
+
+DMN_ENDPOINT = "/dmn"
+DMN_PATH_PREFIX = "/kie-server/services/rest/server/containers/"
+
+
+def _num(v: Any, default: float) -> float:
+    try:
+        return float(v)
+    except Exception:
+        return float(default)
+
+
+def _offer(applicant: Dict[str, Any], loan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    fico = _num(applicant.get("fico_credit_score"), 0)
+    dti = _num(applicant.get("dti"), 1.0)
+    amount = _num(loan.get("loan_amount"), 0)
+    if dti > 0.45 or amount > 50000:
+        return None
+    if fico >= 720:
+        return {"tier": "A", "assigned_rate": 0.069}
+    if fico >= 660:
+        return {"tier": "B", "assigned_rate": 0.099}
+    if fico >= 600:
+        return {"tier": "C", "assigned_rate": 0.149}
+    return None
+
+
+def evaluate_gates(dmn_context: Dict[str, Any], gate_mode: str) -> Dict[str, Any]:
+    applicant = dmn_context.get("Applicant", {}) or {}
+    loan = dmn_context.get("Loan", {}) or {}
+    if gate_mode == "all_pass":
+        g1, g2 = True, {"tier": "A", "assigned_rate": 0.069}
+    else:
+        g1 = _num(applicant.get("age"), 0) >= 18 and str(applicant.get("employment_status") or "").upper() != "UNEMPLOYED"
+        g2 = _offer(applicant, loan) if g1 else None
+        if gate_mode == "gate2_fail":
+            g2 = None
+    return {
+        "Gate_1_Eligibility": {"eligible": bool(g1)},
+        "Gate_2_Offer": g2,
+        "Gate_3_FinalDecision": {"approved": bool(g1 and g2)},
+    }
+
+
+def dmn_response(container: str, payload: Dict[str, Any], gate_mode: str) -> Dict[str, Any]:
+    dmn_context = dict(payload.get("dmn-context", {}) or {})
+    ctx: Optional[Dict[str, Any]] = None
+    if gate_mode != "no_context":
+        ctx = dict(dmn_context)
+        ctx.update(evaluate_gates(dmn_context, gate_mode))
+    return {
+        "type": "SUCCESS",
+        "msg": f"OK from container '{container}'",
+        "result": {
+            "dmn-evaluation-result": {
+                "model-namespace": payload.get("model-namespace"),
+                "model-name": payload.get("model-name"),
+                "decision-name": [payload.get("decision-name")],
+                "dmn-context": ctx,
+                "messages": [],
+                "decision-results": {},
+            }
+        },
+    }
+
+
+def make_handler(state: StandinState, gate_mode: str, require_auth: bool) -> type:
+    class KieStandinHandler(JsonHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            path = urllib.parse.urlsplit(self.path).path.rstrip("/")
+            if path == "/health":
+                self.send_json(200, {"ok": True, "service": "kie_standin"})
+            elif path == "/standin/stats":
+                self.send_json(200, state.snapshot())
+            else:
+                self.send_json(404, {"detail": f"Unknown endpoint: {path}"})
+
+        def do_POST(self) -> None:  # noqa: N802
+            path = urllib.parse.urlsplit(self.path).path.rstrip("/")
+            if not (path.startswith(DMN_PATH_PREFIX) and path.endswith(DMN_ENDPOINT)):
+                self.send_json(404, {"detail": f"Unknown endpoint: {path}"})
+                return
+            container = path[len(DMN_PATH_PREFIX):-len(DMN_ENDPOINT)]
+            if require_auth and not str(self.headers.get("Authorization") or "").startswith("Basic "):
+                self.send_json(401, {"detail": "missing basic auth"})
+                return
+            try:
+                payload = self.read_json_body() or {}
+            except Exception:
+                self.send_json(400, {"detail": "invalid JSON body"})
+                return
+
+            t0 = time.time()
+            draw = state.draw(DMN_ENDPOINT)
+            apply_draw(draw)
+            state.count(DMN_ENDPOINT, "requests")
+            if self.headers.get("traceparent"):
+                state.count(DMN_ENDPOINT, "traced")
+            if draw["fail"]:
+                state.count(DMN_ENDPOINT, "errors")
+                self.send_json(draw["error_status"], {"type": "FAILURE", "msg": "standin injected failure"})
+                return
+
+            out = dmn_response(container, payload, gate_mode)
+            out["result"]["dmn-evaluation-result"]["meta_latency_ms"] = int((time.time() - t0) * 1000)
+            self.send_json(200, out)
+
+    return KieStandinHandler
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="KIE DMN stand-in (local load-test double)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8082)
+    ap.add_argument("--profiles-file", default=DEFAULT_PROFILES_FILE)
+    ap.add_argument("--profile", default=None, help="Named preset from --profiles-file")
+    ap.add_argument("--latency", default=None, help="fixed:MS | lognormal:MEDIAN:SIGMA | heavy_tail:BASE:ALPHA[:CAP]")
+    ap.add_argument("--error-rate", type=float, default=None)
+    ap.add_argument("--error-status", type=int, default=None)
+    ap.add_argument("--gate-mode", choices=["rules", "all_pass", "gate2_fail", "no_context"], default="rules")
+    ap.add_argument("--require-auth", action="store_true", help="Reject requests without Basic auth (like KIE)")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    preset = load_profile_preset(args.profiles_file, args.profile)
+    overrides = {
+        "latency": parse_latency_spec(args.latency) if args.latency else None,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+    }
+    state = StandinState(preset, overrides, seed=args.seed)
+    serve(make_handler(state, args.gate_mode, args.require_auth), args.host, args.port, "KIE_STANDIN")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
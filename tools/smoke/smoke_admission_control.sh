@@ -0,0 +1,101 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+PORT="${PORT:-19023}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_admission_control_${TS}.log"
+ALIAS_DIR="$LOG_DIR/admission_aliases_${TS}"
+SVC_LOG="$LOG_DIR/admission_service_${TS}.log"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_ADMISSION] root=$ROOT"
+echo "[SMOKE_ADMISSION] python=$PY port=$PORT"
+echo "[SMOKE_ADMISSION] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+
+# One worker, one decision at a time, two queue slots: a burst must be shed.
+"$PY" runners/decision_service.py \
+  --runtime-manifest "$ALIAS_DIR/runtime_manifest.json" \
+  --port "$PORT" \
+  --workers 1 \
+  --max-concurrency 1 \
+  --admission-queue 2 \
+  --queue-budget-ms 1000 >"$SVC_LOG" 2>&1 &
+SVC_PID=$!
+trap 'kill "$SVC_PID" 2>/dev/null || true; wait "$SVC_PID" 2>/dev/null || true' EXIT
+
+"$PY" - "$PORT" <<'PY'
+import json, sys, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, "runners")
+from contract_validate import validate_required, REQUIRED_FINAL_DECISION_V0_1
+
+port = sys.argv[1]
+base = f"http://127.0.0.1:{port}"
+
+def get(path):
+    return json.loads(urllib.request.urlopen(base + path, timeout=5).read())
+
+def decide(row, budget_ms=None):
+    headers = {"Content-Type": "application/json"}
+    if budget_ms is not None:
+        headers["X-Queue-Budget-Ms"] = str(budget_ms)
+    req = urllib.request.Request(base + "/decide", data=json.dumps(row).encode("utf-8"), headers=headers)
+    t0 = time.perf_counter()
+    resp = urllib.request.urlopen(req, timeout=10)
+    return json.loads(resp.read()), resp.headers.get("X-Capacity-Shed"), (time.perf_counter() - t0) * 1000
+
+for _ in range(50):
+    try:
+        get("/health")
+        break
+    except Exception:
+        time.sleep(0.2)
+else:
+    raise SystemExit("decision service did not come up")
+
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:40]
+
+# Idle: nothing is shed.
+for r in rows[:3]:
+    assert decide(r)[1] is None
+
+# Burst far above capacity; half the requests carry a zero queue budget.
+with ThreadPoolExecutor(32) as ex:
+    results = list(ex.map(lambda ir: decide(ir[1], 0 if ir[0] % 2 else None), enumerate(rows)))
+
+shed = [(p, reason, ms) for p, reason, ms in results if reason]
+assert shed, "burst above capacity shed nothing"
+assert {reason for _, reason, _ in shed} <= {"QUEUE_FULL", "QUEUE_TIMEOUT"}
+for pack, reason, ms in shed:
+    fd = pack["decisions"]["final_decision"]
+    validate_required(fd, REQUIRED_FINAL_DECISION_V0_1, where="smoke:capacity_shed")
+    assert pack["meta_schema_version"] == "decision_pack_v0_1"
+    assert (fd["final_outcome"], fd["final_reason_code"]) == ("REVIEW", "CAPACITY_SHED_FAIL_OPEN"), fd
+    assert reason in fd["warnings"]
+served = [p for p, reason, _ in results if not reason]
+assert served and all(p["decisions"]["final_decision"]["final_reason_code"] != "CAPACITY_SHED_FAIL_OPEN" for p in served)
+
+adm = get("/admission")
+assert adm["enabled"] and adm["pool"]["queue_depth"] == 0, adm
+assert adm["pool"]["shed"] == len(shed) == sum(adm["worker"]["shed"].values()), adm
+assert 0 < adm["pool"]["shed_rate"] < 1, adm
+print(f"[OK] shed {len(shed)}/{len(rows)} ({json.dumps(adm['worker']['shed'])}); shed_rate={adm['pool']['shed_rate']}")
+PY
+
+echo "[OK] smoke_admission_control"
@@ -0,0 +1,118 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_batch_compare_${TS}.log"
+RUNS_DIR="$LOG_DIR/batch_compare_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_BATCH_COMPARE] root=$ROOT"
+echo "[SMOKE_BATCH_COMPARE] python=$PY"
+echo "[SMOKE_BATCH_COMPARE] log=$LOG_FILE"
+
+# Synthetic run dirs (results.jsonl + summary.json, as run_e2e_batch_dev.sh writes them):
+#   base       40 rows, seeded noise
+#   same       copy of base
+#   tail       30% of rows 5x slower in eligibility (p50 unchanged, p90/p99 up)
+#   slow_wall  same per-row latency, 60 ms more driver time between rows
+"$PY" - "$RUNS_DIR" <<'PY'
+import json
+import random
+import sys
+from pathlib import Path
+
+out = Path(sys.argv[1])
+
+
+def write_run(name, rows, fixed_ms=200):
+    d = out / name
+    d.mkdir(parents=True)
+    results = []
+    clock = fixed_ms
+    for i, (elig, orig, gap) in enumerate(rows, start=1):
+        elapsed = elig + orig + 5
+        results.append({
+            "row_index": i,
+            "request_id": f"REQ_{i:04d}",
+            "status": "OK",
+            "elapsed_ms": elapsed,
+            "stage_latency_ms": {"workflow_intake": 2, "eligibility": elig, "final_decision": orig},
+            "wall_start_ms": clock,
+            "wall_end_ms": clock + elapsed,
+        })
+        clock += elapsed + gap
+    (d / "results.jsonl").write_text("".join(json.dumps(r) + "\n" for r in results), encoding="utf-8")
+    wall_ms = clock + fixed_ms
+    summary = {"run_size": len(rows), "ok_count": len(rows), "wall_ms": wall_ms, "throughput_rps": round(len(rows) / (wall_ms / 1000.0), 3)}
+    (d / "summary.json").write_text(json.dumps(summary) + "\n", encoding="utf-8")
+
+
+rng = random.Random(7)
+base = [(rng.randint(40, 60), rng.randint(80, 110), rng.randint(15, 25)) for _ in range(40)]
+write_run("base", base)
+write_run("same", base)
+write_run("tail", [(e * 5 if i % 10 in (0, 3, 6) else e, o, g) for i, (e, o, g) in enumerate(base)])
+write_run("slow_wall", [(e, o, g + 60) for e, o, g in base])
+print("[OK] synthetic runs written")
+PY
+
+compare() {
+  local head="$1"
+  set +e
+  "$PY" testing/scripts/build_e2e_batch_report.py --run-dir "$RUNS_DIR/$head" --compare "$RUNS_DIR/base" \
+    --out "$RUNS_DIR/compare_${head}.md" --compare-json-out "$RUNS_DIR/compare_${head}.json" --bootstrap 500
+  local rc=$?
+  set -e
+  echo "[SMOKE_BATCH_COMPARE] $head exit=$rc"
+  return $rc
+}
+
+rc=0; compare same || rc=$?
+[[ "$rc" == "0" ]] || { echo "[FAIL] identical runs must exit 0 (got $rc)"; exit 1; }
+rc=0; compare tail || rc=$?
+[[ "$rc" == "4" ]] || { echo "[FAIL] tail regression must exit 4 (got $rc)"; exit 1; }
+rc=0; compare slow_wall || rc=$?
+[[ "$rc" == "4" ]] || { echo "[FAIL] wall-clock regression must exit 4 (got $rc)"; exit 1; }
+
+"$PY" - "$RUNS_DIR" <<'PY'
+import json
+import sys
+from pathlib import Path
+
+d = Path(sys.argv[1])
+
+
+def flagged(name):
+    cmp = json.loads((d / f"compare_{name}.json").read_text(encoding="utf-8"))
+    return {(c["metric"], c["stat"]) for c in cmp["regressions"]}, cmp
+
+
+same, cmp = flagged("same")
+assert not same, same
+wall = [c for c in cmp["checks"] if c["metric"] == "wall_throughput_rps"]
+assert wall and wall[0]["status"] == "OK" and abs(wall[0]["delta_pct"]) < 1e-9, wall
+
+tail, _ = flagged("tail")
+assert ("stage:eligibility", "p90") in tail and ("stage:eligibility", "p99") in tail, tail
+assert ("stage:eligibility", "p50") not in tail, tail
+
+slow, cmp = flagged("slow_wall")
+# Per-row latency is unchanged: only the wall-clock throughput check may fire.
+assert slow == {("wall_throughput_rps", "throughput")}, slow
+print("[OK] tail:", sorted(tail))
+print("[OK] slow_wall:", sorted(slow))
+PY
+
+echo "[OK] smoke_batch_compare"
@@ -0,0 +1,125 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+DSZ_PORT="${DSZ_PORT:-19031}"
+BRMS_PORT="${BRMS_PORT:-19032}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_cassette_${TS}.log"
+ALIAS_DIR="$LOG_DIR/cassette_aliases_${TS}"
+WORK_DIR="$LOG_DIR/cassette_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+DSZ_PID=""
+cleanup() {
+  [[ -n "$DSZ_PID" ]] && kill "$DSZ_PID" >/dev/null 2>&1 || true
+}
+trap cleanup EXIT
+
+echo "[SMOKE_CASSETTE] root=$ROOT"
+echo "[SMOKE_CASSETTE] python=$PY dsz_port=$DSZ_PORT brms_port=$BRMS_PORT"
+echo "[SMOKE_CASSETTE] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+mkdir -p "$WORK_DIR"
+
+# Sensors with 40 ms latency, some 503s and a 400 on every as_of (market_snapshot retry path).
+"$PY" -m tools.ds_z_standin --port "$DSZ_PORT" --latency fixed:40 --error-rate 0.1 --as-of-400 always \
+  >"$LOG_DIR/ds_z_standin_cassette_${TS}.log" 2>&1 &
+DSZ_PID="$!"
+
+# 1) Record the edge set against the live stand-ins (async engine: sensors + BRMS via http_json),
+#    then stop them; 2) replay (instant, timed) offline == recorded packs; 3) the sync engine
+#    (fetch_json / _fetch_sensor_json_live / fetch_brms_flags) replays the same cassette.
+"$PY" - "$ALIAS_DIR/runtime_manifest.json" "$WORK_DIR" "$DSZ_PORT" "$BRMS_PORT" "$DSZ_PID" <<'PY'
+import json, os, signal, subprocess, sys, threading, time, urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, "runners")
+import cassette, decision_async, runner_workflow_eligibility
+
+manifest, work, dsz_port, brms_port, dsz_pid = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5])
+tape = f"{work}/edge.cassette.jsonl"
+for _ in range(50):
+    try:
+        urllib.request.urlopen(f"http://127.0.0.1:{dsz_port}/health", timeout=1)
+        break
+    except Exception:
+        time.sleep(0.2)
+
+flags = json.load(open(runner_workflow_eligibility.DEFAULT_BRMS_STUB, encoding="utf-8"))
+class Bridge(BaseHTTPRequestHandler):
+    def log_message(self, *a): pass
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(0.03)
+        body = json.dumps(dict(flags, meta_request_id=req["meta_request_id"])).encode("utf-8")
+        self.send_response(200); self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body))); self.end_headers(); self.wfile.write(body)
+srv = ThreadingHTTPServer(("127.0.0.1", brms_port), Bridge)
+threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+live = ["--runtime-manifest", manifest, "--requests-jsonl", "testing/requests/eval_requests_edge_v0_1.jsonl",
+        "--sensor-mode", "LIVE", "--fraud-signals-mode", "LIVE", "--sensor-base-url", f"http://127.0.0.1:{dsz_port}",
+        "--brms-stub", "", "--brms-url", f"http://127.0.0.1:{brms_port}/bridge/brms_flags"]
+
+def run(script, out, *extra):
+    t0 = time.time()
+    proc = subprocess.run([sys.executable, f"runners/{script}", *live, "--out-jsonl", f"{work}/{out}", "--cassette", tape, *extra],
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert "[CASSETTE] miss" not in proc.stderr, proc.stderr[-2000:]
+    packs = [decision_async.strip_volatile(json.loads(l)) for l in open(f"{work}/{out}", encoding="utf-8")]
+    return packs, time.time() - t0
+
+recorded, rec_s = run("decision_async.py", "recorded.jsonl", "--cassette-mode", "record")
+srv.shutdown()
+os.kill(dsz_pid, signal.SIGTERM)
+st = cassette.cassette_stats(tape)
+eps = st["by_endpoint"]
+assert eps["POST /bridge/brms_flags"]["calls"] > 0 and eps["GET /sensor/market_snapshot"]["errors"] > 0, eps
+assert sum(e["errors"] for e in eps.values()) > eps["GET /sensor/market_snapshot"]["errors"], "no 503s recorded"
+fallback = sum(1 for p in recorded if p["decisions"]["eligibility"]["meta_sensor_mode_used"] == "LIVE_FALLBACK")
+print(f"[OK] recorded rows={len(recorded)} calls={st['entries']} recorded_ms={st['recorded_ms']} live_fallback_rows={fallback} wall_s={rec_s:.2f}")
+
+replayed, rep_s = run("decision_async.py", "replayed.jsonl")
+again, _ = run("decision_async.py", "replayed_again.jsonl")
+assert replayed == recorded and again == recorded
+print(f"[OK] offline replay == recorded (twice) wall_s={rep_s:.2f}")
+
+sync, sync_s = run("decision_engine.py", "replayed_sync.jsonl")
+assert sync == recorded
+print(f"[OK] sync engine replays the same cassette rows={len(sync)} wall_s={sync_s:.2f}")
+
+# Timed replay: the sync engine calls one at a time, so the run takes the recorded latency.
+n = 12
+ids = {p["meta_request_id"] for p in recorded[:n]}
+want_ms = sum(e["latency_ms"] for e in cassette.load_entries(tape)
+              if any(f"request_id={i}" in e["url"] for i in ids) or (e["request"] or {}).get("meta_request_id") in ids)
+timed, timed_s = run("decision_engine.py", "replayed_timed.jsonl", "--cassette-mode", "replay-timed", "--max-rows", str(n))
+assert timed == recorded[:n]
+assert timed_s * 1000.0 >= want_ms, (timed_s, want_ms)
+print(f"[OK] replay-timed rows={n} wall_s={timed_s:.2f} >= recorded_ms={want_ms:.0f}")
+
+miss = subprocess.run([sys.executable, "runners/decision_async.py", *live, "--max-rows", "1", "--cassette", f"{work}/empty.jsonl"],
+                      capture_output=True, text=True)
+assert miss.returncode != 0 and "Cassette not found" in miss.stderr, miss.stderr[-500:]
+open(f"{work}/empty.jsonl", "w").close()
+miss = subprocess.run([sys.executable, "runners/decision_async.py", *live, "--max-rows", "1", "--cassette", f"{work}/empty.jsonl"],
+                      capture_output=True, text=True)
+assert miss.returncode == 0 and "[CASSETTE] miss" in miss.stderr, miss.stderr[-500:]
+print("[OK] missing cassette refused; unrecorded call -> miss + fallback")
+PY
+
+echo "[OK] smoke_cassette"
@@ -0,0 +1,148 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+ROWS="${ROWS:-8}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_coprocess_${TS}.log"
+ALIAS_DIR="$LOG_DIR/coprocess_aliases_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_COPROCESS] root=$ROOT"
+echo "[SMOKE_COPROCESS] python=$PY rows=$ROWS"
+echo "[SMOKE_COPROCESS] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+MANIFEST="$ALIAS_DIR/runtime_manifest.json"
+
+# 1) Each runner's --serve-stdio == its one-shot CLI; a bad line answers an error record
+#    and the co-process keeps serving.
+"$PY" - "$MANIFEST" <<'PY'
+import json, subprocess, sys
+sys.path.insert(0, "runners")
+import coprocess, runtime_manifest
+from decision_engine import DecisionEngine
+from decision_async import strip_volatile
+
+manifest_path = sys.argv[1]
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8")][:3]
+
+for runner in ("runner_t2", "runner_t3", "runner_t4"):
+    cp = coprocess.Coprocess([sys.executable, f"runners/{runner}.py", "--serve-stdio", "--runtime-manifest", manifest_path])
+    for r in rows:
+        served = cp.request({"client_id": r["client_id"], "request_id": r["request_id"], "seed": r["seed"]})
+        one_shot = json.loads(subprocess.check_output(
+            [sys.executable, f"runners/{runner}.py", "--client-id", r["client_id"], "--request-id", r["request_id"],
+             "--seed", str(r["seed"]), "--runtime-manifest", manifest_path]))
+        assert strip_volatile(served) == strip_volatile(one_shot), (runner, r["request_id"])
+    try:
+        cp.request({"request_id": "no-client"})
+        raise AssertionError("error record expected")
+    except coprocess.CoprocessError as e:
+        assert "client_id" in str(e), e
+    assert cp.alive() and cp.request({"client_id": rows[0]["client_id"], "request_id": "after-error", "seed": 1})["meta_request_id"] == "after-error"
+    cp.close()
+    assert cp.proc.returncode == 0, cp.proc.returncode
+    print(f"[OK] {runner} --serve-stdio parity rows={len(rows)} error record kept serving")
+
+engine = DecisionEngine(runtime_manifest.load_manifest(manifest_path))
+cp = coprocess.Coprocess([sys.executable, "runners/runner_eligibility.py", "--serve-stdio", "--runtime-manifest", manifest_path])
+for r in rows:
+    intake = engine.intake(r, r["request_id"])
+    assert strip_volatile(cp.request({"intake": intake})) == strip_volatile(engine.eligibility(intake)), r["request_id"]
+try:
+    cp.request({"intake": {"meta_request_id": "bad-intake"}})
+    raise AssertionError("error record expected")
+except coprocess.CoprocessError:
+    pass
+assert cp.alive() and cp.request({"intake": engine.intake(rows[0], "after-error")})["meta_request_id"] == "after-error"
+cp.close()
+assert cp.proc.returncode == 0, cp.proc.returncode
+print(f"[OK] runner_eligibility --serve-stdio parity rows={len(rows)} error record kept serving")
+PY
+
+# 2) originate --serve-stdio --coprocess: packs == spawn-mode packs, T2/T3/T4 started once,
+#    a killed co-process is replaced on the next request. A one-shot --coprocess is refused.
+"$PY" - "$MANIFEST" "$ROWS" <<'PY'
+import json, os, signal, subprocess, sys, time
+sys.path.insert(0, "runners")
+from decision_async import strip_volatile
+
+manifest_path, n = sys.argv[1], int(sys.argv[2])
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8")][:n]
+common = ["--runtime-manifest", manifest_path, "--brms-stub", "tools/smoke/fixtures/brms_all_pass.json"]
+
+def children(pid):
+    out = {}
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            stat = open(f"/proc/{d}/stat").read()
+            cmd = open(f"/proc/{d}/cmdline").read().split("\0")
+        except OSError:
+            continue
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            out[int(d)] = next((c for c in cmd if c.endswith(".py")), "")
+    return out
+
+t0 = time.time()
+spawn = []
+for r in rows:
+    spawn.append(json.loads(subprocess.check_output(
+        [sys.executable, "runners/originate.py", "--client-id", r["client_id"], "--request-id", r["request_id"], "--seed", str(r["seed"])] + common)))
+spawn_ms = int((time.time() - t0) * 1000)
+
+r = rows[0]
+p = subprocess.run([sys.executable, "runners/originate.py", "--client-id", r["client_id"], "--coprocess"] + common, capture_output=True, text=True)
+assert p.returncode == 2 and "--coprocess needs --serve-stdio" in p.stderr, p.stderr
+
+proc = subprocess.Popen([sys.executable, "runners/originate.py", "--serve-stdio", "--coprocess"] + common,
+                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+def ask(r):
+    proc.stdin.write(json.dumps({"client_id": r["client_id"], "request_id": r["request_id"], "seed": r["seed"]}) + "\n")
+    proc.stdin.flush()
+    return json.loads(proc.stdout.readline())
+
+t0 = time.time()
+served = [ask(r) for r in rows]
+served_ms = int((time.time() - t0) * 1000)
+for a, b in zip(served, spawn):
+    assert strip_volatile(a) == strip_volatile(b), a["meta_request_id"]
+kids = children(proc.pid)
+assert sorted(kids.values()) == ["runners/runner_t2.py", "runners/runner_t3.py", "runners/runner_t4.py"], kids
+print(f"[OK] originate --coprocess parity rows={n} spawn_ms={spawn_ms} served_ms={served_ms} coprocesses={len(kids)}")
+
+victim = next(pid for pid, cmd in kids.items() if cmd.endswith("runner_t3.py"))
+os.kill(victim, signal.SIGKILL)
+time.sleep(0.2)
+again = ask(rows[0])
+assert strip_volatile(again) == strip_volatile(spawn[0])
+after = children(proc.pid)
+assert victim not in after and len(after) == 3, after
+print(f"[OK] killed runner_t3 co-process pid={victim} replaced")
+
+proc.stdin.write(json.dumps({"seed": 1}) + "\n")
+proc.stdin.flush()
+bad = json.loads(proc.stdout.readline())
+assert bad["meta_schema_version"] == "coprocess_error_v0_1" and bad["meta_component"] == "originate", bad
+proc.stdin.close()
+assert proc.wait(timeout=30) == 0
+assert not children(proc.pid)
+print("[OK] originate error record + clean shutdown")
+PY
+
+echo "[OK] smoke_coprocess"
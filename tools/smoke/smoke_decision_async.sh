@@ -0,0 +1,130 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+PORT="${PORT:-19028}"
+DSZ_PORT="${DSZ_PORT:-19029}"
+BRMS_PORT="${BRMS_PORT:-19030}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_decision_async_${TS}.log"
+ALIAS_DIR="$LOG_DIR/decision_async_aliases_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+PIDS=()
+cleanup() {
+  for pid in "${PIDS[@]:-}"; do
+    [[ -n "$pid" ]] && kill "$pid" >/dev/null 2>&1 || true
+  done
+}
+trap cleanup EXIT
+
+echo "[SMOKE_DECISION_ASYNC] root=$ROOT"
+echo "[SMOKE_DECISION_ASYNC] python=$PY port=$PORT dsz_port=$DSZ_PORT brms_port=$BRMS_PORT"
+echo "[SMOKE_DECISION_ASYNC] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+MANIFEST="$ALIAS_DIR/runtime_manifest.json"
+
+# 1) STUB sensors: async packs == sync packs on the dev and edge sets.
+for ds in dev edge; do
+  "$PY" runners/decision_async.py --runtime-manifest "$MANIFEST" \
+    --requests-jsonl "testing/requests/eval_requests_${ds}_v0_1.jsonl" --compare-sync >"$LOG_DIR/decision_async_${ds}_${TS}.json"
+  "$PY" - "$LOG_DIR/decision_async_${ds}_${TS}.json" <<'PY'
+import json, sys
+s = json.load(open(sys.argv[1], encoding="utf-8"))
+assert s["sync_parity"]["compared"] == s["rows"] > 0 and not s["sync_parity"]["mismatches"], s["sync_parity"]
+print(f"[OK] stub parity rows={s['rows']} async_ms={s['wall_ms']} sync_ms={s['sync_wall_ms']}")
+PY
+done
+
+# 2) LIVE sensors with 20 ms latency: same packs, sensor waits overlap.
+"$PY" -m tools.ds_z_standin --port "$DSZ_PORT" --profile fast --latency fixed:20 >"$LOG_DIR/ds_z_standin_async_${TS}.log" 2>&1 &
+PIDS+=("$!")
+"$PY" runners/decision_service.py --runtime-manifest "$MANIFEST" --port "$PORT" --workers 1 --threads 8 --async-engine \
+  --sensor-mode LIVE --sensor-base-url "http://127.0.0.1:${DSZ_PORT}" >"$LOG_DIR/decision_service_async_${TS}.log" 2>&1 &
+PIDS+=("$!")
+
+"$PY" - "$PORT" "$DSZ_PORT" "$BRMS_PORT" "$MANIFEST" <<'PY'
+import asyncio, json, subprocess, sys, threading, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+port, dsz_port, brms_port, manifest = sys.argv[1:5]
+sys.path.insert(0, "runners")
+import decision_async, decision_engine, runtime_manifest, runner_workflow_eligibility
+
+def wait(url):
+    for _ in range(50):
+        try:
+            return json.loads(urllib.request.urlopen(url, timeout=1).read())
+        except Exception:
+            time.sleep(0.2)
+    raise SystemExit(f"never healthy: {url}")
+
+wait(f"http://127.0.0.1:{dsz_port}/health")
+health = wait(f"http://127.0.0.1:{port}/health")
+assert health["async_engine"] is True, health
+
+out = subprocess.check_output([sys.executable, "runners/decision_async.py", "--runtime-manifest", manifest,
+                               "--requests-jsonl", "testing/requests/eval_requests_dev_v0_1.jsonl", "--max-rows", "30",
+                               "--sensor-mode", "LIVE", "--sensor-base-url", f"http://127.0.0.1:{dsz_port}", "--compare-sync"], text=True)
+s = json.loads(out)
+assert not s["sync_parity"]["mismatches"], s["sync_parity"]
+assert s["wall_ms"] < s["sync_wall_ms"], (s["wall_ms"], s["sync_wall_ms"])
+print(f"[OK] live parity rows={s['rows']} async_ms={s['wall_ms']} sync_ms={s['sync_wall_ms']}")
+
+# Decision service --async-engine: concurrent POST /decide == in-process sync engine.
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:16]
+def decide(row):
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/decide", data=json.dumps(row).encode("utf-8"), headers={"Content-Type": "application/json"})
+    return json.loads(urllib.request.urlopen(req, timeout=10).read())
+with ThreadPoolExecutor(8) as pool:
+    served = list(pool.map(decide, rows))
+engine = decision_engine.DecisionEngine(runtime_manifest.load_manifest(manifest), sensor_mode="LIVE", sensor_base_url=f"http://127.0.0.1:{dsz_port}")
+for row, pack in zip(rows, served):
+    assert decision_async.strip_volatile(pack) == decision_async.strip_volatile(engine.decide(row)), row["request_id"]
+assert {"t2_default" in p["decisions"] for p in served} == {True, False}, "need both full-chain and early-cut rows"
+print(f"[OK] decision_service --async-engine rows={len(served)}")
+
+# Library use + async BRMS call against a bridge double answering the stub flags.
+flags = json.load(open(runner_workflow_eligibility.DEFAULT_BRMS_STUB, encoding="utf-8"))
+posts = []
+class Bridge(BaseHTTPRequestHandler):
+    def log_message(self, *a): pass
+    def do_POST(self):
+        posts.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+        body = json.dumps(dict(flags, meta_request_id=posts[-1]["meta_request_id"])).encode("utf-8")
+        self.send_response(200); self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body))); self.end_headers(); self.wfile.write(body)
+srv = ThreadingHTTPServer(("127.0.0.1", int(brms_port)), Bridge)
+threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+live = decision_async.AsyncDecisionEngine(decision_engine.DecisionEngine(
+    runtime_manifest.load_manifest(manifest), brms_stub=None, brms_url=f"http://127.0.0.1:{brms_port}/bridge/brms_flags"))
+async def run():
+    return await asyncio.gather(*(live.decide_and_report(r) for r in rows))
+results = asyncio.run(run())
+full = [(p, r) for p, r in results if "t2_default" in p["decisions"]]
+assert len(posts) == len(full) > 0, (len(posts), len(full))
+for pack, report in full:
+    assert pack["decisions"]["brms_flags"]["meta_request_id"] == pack["meta_request_id"]
+    assert pack["decisions"]["final_decision"]["b_summary"] is not None
+    assert report["meta_schema_version"] == "reporter_output_v0_1" and report["meta_request_id"] == pack["meta_request_id"]
+srv.shutdown()
+live.close()
+print(f"[OK] async BRMS calls={len(posts)} reports={len(results)}")
+PY
+
+echo "[OK] smoke_decision_async"
@@ -0,0 +1,102 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+PORT="${PORT:-19020}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_decision_service_${TS}.log"
+ALIAS_DIR="$LOG_DIR/decision_service_aliases_${TS}"
+SVC_LOG="$LOG_DIR/decision_service_${TS}.log"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_DECISION_SERVICE] root=$ROOT"
+echo "[SMOKE_DECISION_SERVICE] python=$PY port=$PORT"
+echo "[SMOKE_DECISION_SERVICE] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+MANIFEST="$ALIAS_DIR/runtime_manifest.json"
+
+"$PY" runners/decision_service.py \
+  --runtime-manifest "$MANIFEST" \
+  --port "$PORT" \
+  --workers 2 \
+  --max-requests 3 >"$SVC_LOG" 2>&1 &
+SVC_PID=$!
+trap 'kill "$SVC_PID" 2>/dev/null || true; wait "$SVC_PID" 2>/dev/null || true' EXIT
+
+"$PY" - "$PORT" "$MANIFEST" <<'PY'
+import json, subprocess, sys, time, urllib.request
+
+port, manifest = sys.argv[1], sys.argv[2]
+base = f"http://127.0.0.1:{port}"
+
+def get(path):
+    return json.loads(urllib.request.urlopen(base + path, timeout=5).read())
+
+def decide(row):
+    req = urllib.request.Request(base + "/decide", data=json.dumps(row).encode("utf-8"), headers={"Content-Type": "application/json"})
+    return json.loads(urllib.request.urlopen(req, timeout=10).read())
+
+for _ in range(50):
+    try:
+        health = get("/health")
+        break
+    except Exception:
+        time.sleep(0.2)
+else:
+    raise SystemExit("decision service did not come up")
+assert health["preload"] is True
+
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:12]
+packs = [decide(r) for r in rows]
+assert [p["meta_request_id"] for p in packs] == [r["request_id"] for r in rows]
+assert {"t2_default" in p["decisions"] for p in packs} == {True, False}, "need both full-chain and early-cut rows"
+
+# Same pack as the subprocess orchestrator (volatile timing fields aside).
+VOLATILE = {"meta_generated_at", "meta_latency_ms", "latency_ms", "generated_at", "meta_as_of_ts"}
+def strip(o):
+    if isinstance(o, dict):
+        return {k: strip(v) for k, v in o.items() if k not in VOLATILE}
+    if isinstance(o, list):
+        return [strip(x) for x in o]
+    return o
+
+for row, pack in list(zip(rows, packs))[:4]:
+    cmd = [sys.executable, "runners/runner_workflow_eligibility.py", "--client-id", str(row["client_id"]), "--seed", str(row["seed"]),
+           "--request-id", row["request_id"], "--channel", row["channel"], "--runtime-manifest", manifest,
+           "--is-existing-customer", str(row["is_existing_customer"]).lower()]
+    for k in ("as_of_ts", "age", "employment_status", "declared_income_monthly", "declared_dti", "declared_credit_score",
+              "requested_amount", "term_months", "product_type"):
+        if row.get(k) is not None:
+            cmd += ["--" + k.replace("_", "-"), str(row[k])]
+    ref = json.loads(subprocess.check_output(cmd, text=True))
+    assert strip(ref) == strip(pack), row["request_id"]
+
+# Bad input -> 400, worker keeps serving.
+try:
+    urllib.request.urlopen(urllib.request.Request(base + "/decide", data=b"[1]"), timeout=5)
+    raise AssertionError("expected 400")
+except urllib.error.HTTPError as e:
+    assert e.code == 400
+
+mem = get("/memory")
+assert mem["status"] == "OK", mem
+assert sum(w["recycles"] for w in mem["workers"]) >= 2, mem["workers"]
+assert all(w["shared_kb"] > 0 for w in mem["workers"]), mem["workers"]
+print("[OK] packs match orchestrator; memory totals:", json.dumps(mem["totals"]))
+PY
+
+grep -q "recycled (max_requests)" "$SVC_LOG"
+echo "[OK] smoke_decision_service"
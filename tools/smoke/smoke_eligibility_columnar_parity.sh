@@ -0,0 +1,66 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+ALIAS="block_a_gov/artifacts/eligibility_canonical.json"
+
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_eligibility_columnar_parity_${TS}.log"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_ELIG_COLUMNAR] root=$ROOT"
+echo "[SMOKE_ELIG_COLUMNAR] python=$PY"
+echo "[SMOKE_ELIG_COLUMNAR] log=$LOG_FILE"
+
+for DATASET in edge dev; do
+  REQ="testing/requests/eval_requests_${DATASET}_v0_1.jsonl"
+  OUT_JSON="$LOG_DIR/eligibility_columnar_${DATASET}_${TS}.json"
+  echo "[SMOKE_ELIG_COLUMNAR] parity vs evaluate_rules over $REQ..."
+  "$PY" runners/eligibility_columnar.py --requests-jsonl "$REQ" --canonical-alias "$ALIAS" --check-parity > "$OUT_JSON"
+  "$PY" -c 'import json,sys
+s=json.load(open(sys.argv[1]))
+print("ROWS", s["rows"], "BACKEND", s["backend"], "COUNTS", s["eligibility_status_counts"])
+assert s["rows"] > 0
+assert s["parity_mismatches"] == 0, s["parity_mismatch_examples"]
+' "$OUT_JSON"
+done
+
+echo "[SMOKE_ELIG_COLUMNAR] boundary values (numeric strings, fractional ages, non-bool flags)..."
+"$PY" - "$ALIAS" <<'PY'
+import json, sys
+sys.path.insert(0, "runners")
+import eligibility_columnar as ec
+import runner_eligibility as re_
+
+alias = json.load(open(sys.argv[1]))
+p = alias.get("parameters", {})
+min_age, min_income, thr = int(p.get("MIN_AGE", 18)), float(p.get("MIN_INCOME", 1200)), float(p.get("MACRO_STRESS_REVIEW_THR", 0.85))
+intakes = []
+for age in (min_age - 1, min_age - 0.5, min_age, min_age + 0.9):
+    for inc in (min_income - 0.01, min_income, "%s" % min_income):
+        for macro in (thr, thr + 1e-9):
+            for existing, cid in ((True, ""), (False, "C1"), (None, "C1"), (None, "  ")):
+                for bureau in (True, False, None, 1):
+                    intakes.append({
+                        "applicant": {"age": age, "income_monthly": inc, "is_existing_customer": existing, "customer_id": cid},
+                        "dynamic_sensors_for_eligibility": {"dyn_bureau_employment_verified": bureau, "dyn_market_stress_score_7d": macro},
+                    })
+st, rs = ec.evaluate_rules_columnar(ec.columns_from_intakes(intakes), alias)
+for i, it in enumerate(intakes):
+    assert re_.evaluate_rules(it, alias) == (st[i], rs[i]), (it, st[i], rs[i])
+print("BOUNDARY_ROWS", len(intakes))
+PY
+
+echo "[OK] smoke_eligibility_columnar_parity"
+echo "[SMOKE_ELIG_COLUMNAR] log: $LOG_FILE"
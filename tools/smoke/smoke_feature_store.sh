@@ -0,0 +1,56 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_feature_store_${TS}.log"
+STORE="$LOG_DIR/feature_store_${TS}.fstore"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_FEATURE_STORE] root=$ROOT"
+echo "[SMOKE_FEATURE_STORE] python=$PY"
+echo "[SMOKE_FEATURE_STORE] log=$LOG_FILE"
+
+echo "[SMOKE_FEATURE_STORE] build from CSV..."
+"$PY" runners/feature_store.py build --csv tools/smoke/fixtures/feature_store_sample.csv --key-column client_id --out "$STORE"
+"$PY" runners/feature_store.py info --store "$STORE"
+
+echo "[SMOKE_FEATURE_STORE] gather 1 / N rows, model column order, hits/misses..."
+"$PY" - "$STORE" <<'PY'
+import math, sys
+sys.path.insert(0, "runners")
+import feature_store
+
+store = feature_store.open_store(sys.argv[1])
+assert store.n_rows == 4 and store.n_features == 4
+
+x, info = store.gather(["100002"], store.feature_names)
+assert info["zero_copy"] and info["hits"] == 1, info
+assert x.shape == (1, 4) and abs(float(x[0, 1]) - 0.44) < 1e-6
+
+model_order = ["f_tenure_months", "f_not_in_store", "f_income_log"]
+X, info = store.gather(["100003", "999999", "100010"], model_order)
+assert (info["hits"], info["misses"], info["missing_features"]) == (2, 1, 1), info
+assert X.shape == (3, 3) and X[0, 0] == 120 and abs(float(X[2, 2]) - 7.9) < 1e-6
+assert math.isnan(X[0, 1]) and all(math.isnan(v) for v in X[1])
+
+x, info = feature_store.store_row(sys.argv[1], "123", model_order)
+assert x is None and info["misses"] == 1
+assert feature_store.store_row(None, "100001", model_order) == (None, None)
+assert feature_store.open_store(sys.argv[1]) is store
+print("GATHER_OK", info)
+PY
+
+echo "[OK] smoke_feature_store"
+echo "[SMOKE_FEATURE_STORE] log: $LOG_FILE"
@@ -0,0 +1,136 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+PORT="${PORT:-19022}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_idempotency_${TS}.log"
+ALIAS_DIR="$LOG_DIR/idempotency_aliases_${TS}"
+SVC_LOG="$LOG_DIR/idempotency_service_${TS}.log"
+IDEM_DB="$LOG_DIR/idempotency_${TS}.sqlite"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_IDEMPOTENCY] root=$ROOT"
+echo "[SMOKE_IDEMPOTENCY] python=$PY port=$PORT"
+echo "[SMOKE_IDEMPOTENCY] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+MANIFEST="$ALIAS_DIR/runtime_manifest.json"
+
+"$PY" runners/decision_service.py \
+  --runtime-manifest "$MANIFEST" \
+  --port "$PORT" \
+  --workers 2 \
+  --idempotency-db "$IDEM_DB" >"$SVC_LOG" 2>&1 &
+SVC_PID=$!
+trap 'kill "$SVC_PID" 2>/dev/null || true; wait "$SVC_PID" 2>/dev/null || true' EXIT
+
+"$PY" - "$PORT" "$MANIFEST" "$IDEM_DB" <<'PY'
+import json, subprocess, sys, threading, time, urllib.error, urllib.request
+
+sys.path.insert(0, "runners")
+import idempotency_store
+
+port, manifest, db = sys.argv[1], sys.argv[2], sys.argv[3]
+base = f"http://127.0.0.1:{port}"
+
+def decide(row):
+    req = urllib.request.Request(base + "/decide", data=json.dumps(row).encode("utf-8"), headers={"Content-Type": "application/json"})
+    resp = urllib.request.urlopen(req, timeout=10)
+    return json.loads(resp.read()), resp.headers.get("Idempotent-Replay") == "true"
+
+for _ in range(50):
+    try:
+        urllib.request.urlopen(base + "/health", timeout=5)
+        break
+    except Exception:
+        time.sleep(0.2)
+else:
+    raise SystemExit("decision service did not come up")
+
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:6]
+first = [decide(r) for r in rows]
+assert not any(replayed for _, replayed in first)
+
+# Resends (either worker: the SQLite backend is shared) -> the stored pack, byte for byte.
+for row, (pack, _) in zip(rows, first):
+    for _ in range(2):
+        again, replayed = decide(dict(row, scenario_tag="retry"))  # fields outside the decision inputs do not count
+        assert replayed and again == pack, row["request_id"]
+
+# Same id, different inputs -> 409 IDEMPOTENCY_CONFLICT.
+try:
+    decide(dict(rows[0], requested_amount=rows[0]["requested_amount"] + 1))
+    raise AssertionError("expected 409")
+except urllib.error.HTTPError as e:
+    body = json.loads(e.read())
+    assert e.code == 409 and body["code"] == "IDEMPOTENCY_CONFLICT", body
+
+# Concurrent duplicates of a new id (both workers): one decides, the others wait for its pack.
+dup = dict(rows[2], request_id=rows[2]["request_id"] + "-concurrent")
+answers = []
+threads = [threading.Thread(target=lambda: answers.append(decide(dup))) for _ in range(6)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+assert len(answers) == 6 and sum(1 for _, replayed in answers if not replayed) == 1, [r for _, r in answers]
+assert all(pack == answers[0][0] for pack, _ in answers)
+print("[OK] concurrent duplicates: 1 decided, 5 replayed")
+
+# The CLI orchestrator reads the same store (inputs hash alike from flags).
+row = rows[1]
+cmd = [sys.executable, "runners/runner_workflow_eligibility.py", "--client-id", str(row["client_id"]), "--seed", str(row["seed"]),
+       "--request-id", row["request_id"], "--channel", row["channel"], "--runtime-manifest", manifest,
+       "--is-existing-customer", str(row["is_existing_customer"]).lower(), "--idempotency-db", db]
+for k in ("as_of_ts", "age", "employment_status", "declared_income_monthly", "declared_dti", "declared_credit_score",
+          "requested_amount", "term_months", "product_type"):
+    cmd += ["--" + k.replace("_", "-"), str(row[k])]
+assert json.loads(subprocess.check_output(cmd, text=True)) == first[1][0]
+p = subprocess.run(cmd[:-1] + [db, "--age", str(row["age"] + 1)], capture_output=True, text=True)
+assert p.returncode != 0 and "IDEMPOTENCY_CONFLICT" in p.stderr, p.stderr
+# Run configuration is part of the inputs too (BRMS source, sensor modes, manifest, feature store).
+p = subprocess.run(cmd + ["--no-brms"], capture_output=True, text=True)
+assert p.returncode != 0 and "IDEMPOTENCY_CONFLICT" in p.stderr, p.stderr
+
+# A claimed id: resends wait, then IDEMPOTENCY_PENDING; a released claim runs again.
+owner = idempotency_store.IdempotencyStore(db_path=db)
+other = idempotency_store.IdempotencyStore(db_path=db, wait_s=0.2)
+h = idempotency_store.payload_hash({"client_id": "pending-check"})
+assert owner.claim("pending-check", h) is None
+try:
+    other.claim("pending-check", h)
+    raise AssertionError("expected IdempotencyPending")
+except idempotency_store.IdempotencyPending:
+    pass
+owner.release("pending-check", h)
+assert other.claim("pending-check", h) is None
+other.put("pending-check", h, {"k": 0})
+try:
+    owner.put("pending-check", idempotency_store.payload_hash({"client_id": "other"}), {"k": 2})
+    raise AssertionError("expected IdempotencyConflict on put")
+except idempotency_store.IdempotencyConflict:
+    pass
+
+# Retention window: an expired entry is a miss, not a replay.
+store = idempotency_store.IdempotencyStore(retention_s=60, db_path=db)
+h = idempotency_store.payload_hash({"client_id": "x"})
+store.put("expiry-check", h, {"k": 1}, now=1000.0)
+assert store.get("expiry-check", h, now=1030.0) == {"k": 1}
+assert store.get("expiry-check", h, now=1100.0) is None
+print("[OK] replay + conflict + pending + retention:", json.dumps(store.stats()))
+PY
+
+echo "[OK] smoke_idempotency"
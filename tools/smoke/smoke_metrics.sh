@@ -0,0 +1,123 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+PORT="${PORT:-19024}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_metrics_${TS}.log"
+ALIAS_DIR="$LOG_DIR/metrics_aliases_${TS}"
+CLI_METRICS_DIR="$LOG_DIR/metrics_cli_${TS}"
+SVC_METRICS_DIR="$LOG_DIR/metrics_service_${TS}"
+SVC_LOG="$LOG_DIR/decision_service_metrics_${TS}.log"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_METRICS] root=$ROOT"
+echo "[SMOKE_METRICS] python=$PY port=$PORT"
+echo "[SMOKE_METRICS] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+MANIFEST="$ALIAS_DIR/runtime_manifest.json"
+
+"$PY" runners/decision_service.py \
+  --runtime-manifest "$MANIFEST" \
+  --port "$PORT" \
+  --workers 2 \
+  --max-requests 3 \
+  --metrics-dir "$SVC_METRICS_DIR" \
+  --metrics-dump-interval-s 0.2 >"$SVC_LOG" 2>&1 &
+SVC_PID=$!
+trap 'kill "$SVC_PID" 2>/dev/null || true; wait "$SVC_PID" 2>/dev/null || true' EXIT
+
+"$PY" - "$PORT" "$MANIFEST" "$CLI_METRICS_DIR" <<'PY'
+import json, os, re, subprocess, sys, time, urllib.request
+
+port, manifest, cli_dir = sys.argv[1], sys.argv[2], sys.argv[3]
+base = f"http://127.0.0.1:{port}"
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:8]
+
+def parse(text):
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, val = line.rsplit(" ", 1)
+            out[key] = float(val)
+    return out
+
+def total(samples, prefix):
+    return sum(v for k, v in samples.items() if re.match(re.escape(prefix) + r"(\{|$)", k))
+
+# 1) CLI path: every process dumps a snapshot into DECISION_METRICS_DIR, merge sums them.
+env = dict(os.environ, DECISION_METRICS_DIR=cli_dir)
+outcomes = {}
+full_chain = 0
+for row in rows:
+    cmd = [sys.executable, "runners/runner_workflow_eligibility.py", "--client-id", str(row["client_id"]), "--seed", str(row["seed"]),
+           "--request-id", row["request_id"], "--channel", row["channel"], "--runtime-manifest", manifest,
+           "--is-existing-customer", str(row["is_existing_customer"]).lower()]
+    for k in ("as_of_ts", "age", "employment_status", "declared_income_monthly", "declared_dti", "declared_credit_score",
+              "requested_amount", "term_months", "product_type"):
+        if row.get(k) is not None:
+            cmd += ["--" + k.replace("_", "-"), str(row[k])]
+    pack = json.loads(subprocess.check_output(cmd, text=True, env=env))
+    fo = pack["decisions"]["final_decision"]["final_outcome"]
+    full_chain += "t2_default" in pack["decisions"]
+    outcomes[fo] = outcomes.get(fo, 0) + 1
+
+text = subprocess.check_output([sys.executable, "runners/metrics_registry.py", "merge", "--dir", cli_dir], text=True)
+cli = parse(text)
+assert "# TYPE decision_stage_latency_ms histogram" in text
+for fo, n in outcomes.items():
+    assert cli[f'decision_final_outcome_total{{final_outcome="{fo}"}}'] == n, (fo, n)
+assert total(cli, "decision_final_reason_total") == len(rows)
+assert cli['decision_stage_latency_ms_count{stage="pack"}'] == len(rows)
+assert cli['decision_stage_latency_ms_count{stage="eligibility"}'] == len(rows)
+assert cli['decision_stage_latency_ms_bucket{stage="pack",le="+Inf"}'] == len(rows)
+assert 0 < full_chain < len(rows), "need both full-chain and early-cut rows"
+assert total(cli, "decision_brms_total") == full_chain
+assert cli['decision_stage_latency_ms_count{stage="t2_default"}'] == full_chain
+assert cli['decision_model_load_ms_count{model="t2_default"}'] == full_chain, "one T2 load per full-chain process"
+print(f"[OK] cli metrics: outcomes={outcomes} snapshots={len(os.listdir(cli_dir))}")
+
+# 2) Service: /metrics merges every worker (recycled ones included) + the parent.
+def get(path):
+    return urllib.request.urlopen(base + path, timeout=5)
+
+for _ in range(50):
+    try:
+        get("/health")
+        break
+    except Exception:
+        time.sleep(0.2)
+else:
+    raise SystemExit("decision service did not come up")
+
+for row in rows:
+    req = urllib.request.Request(base + "/decide", data=json.dumps(row).encode("utf-8"), headers={"Content-Type": "application/json"})
+    urllib.request.urlopen(req, timeout=10).read()
+time.sleep(0.6)  # recycled workers exit, live ones write their next snapshot
+
+resp = get("/metrics")
+assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4"), resp.headers["Content-Type"]
+svc = parse(resp.read().decode("utf-8"))
+assert total(svc, "decision_final_outcome_total") == len(rows), svc
+for fo, n in outcomes.items():
+    assert svc[f'decision_final_outcome_total{{final_outcome="{fo}"}}'] == n, (fo, n)
+assert svc['decision_stage_latency_ms_count{stage="pack"}'] == len(rows)
+assert svc['decision_model_load_ms_count{model="t2_default"}'] == 1, "preloaded once in the parent, not per worker"
+print("[OK] service metrics: final outcomes", {k: v for k, v in svc.items() if k.startswith("decision_final_outcome_total")})
+PY
+
+grep -q "recycled (max_requests)" "$SVC_LOG"
+echo "[OK] smoke_metrics"
@@ -0,0 +1,147 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+PORT="${PORT:-19021}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_micro_batch_${TS}.log"
+ALIAS_DIR="$LOG_DIR/micro_batch_aliases_${TS}"
+SVC_LOG="$LOG_DIR/micro_batch_service_${TS}.log"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_MICRO_BATCH] root=$ROOT"
+echo "[SMOKE_MICRO_BATCH] python=$PY port=$PORT"
+echo "[SMOKE_MICRO_BATCH] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+MANIFEST="$ALIAS_DIR/runtime_manifest.json"
+
+"$PY" runners/decision_service.py \
+  --runtime-manifest "$MANIFEST" \
+  --port "$PORT" \
+  --workers 1 \
+  --threads 8 \
+  --micro-batch-max-rows 16 \
+  --micro-batch-max-wait-ms 5 >"$SVC_LOG" 2>&1 &
+SVC_PID=$!
+trap 'kill "$SVC_PID" 2>/dev/null || true; wait "$SVC_PID" 2>/dev/null || true' EXIT
+
+"$PY" - "$PORT" "$MANIFEST" <<'PY'
+import json, sys, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, "runners")
+import decision_engine
+import runtime_manifest
+
+port, manifest = sys.argv[1], sys.argv[2]
+base = f"http://127.0.0.1:{port}"
+
+def get(path):
+    return json.loads(urllib.request.urlopen(base + path, timeout=5).read())
+
+def decide(row):
+    req = urllib.request.Request(base + "/decide", data=json.dumps(row).encode("utf-8"), headers={"Content-Type": "application/json"})
+    return json.loads(urllib.request.urlopen(req, timeout=10).read())
+
+for _ in range(50):
+    try:
+        health = get("/health")
+        break
+    except Exception:
+        time.sleep(0.2)
+else:
+    raise SystemExit("decision service did not come up")
+assert health["threads"] == 8 and health["micro_batch"] is True, health
+
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:48]
+
+# Idle: one request at a time -> batches of one, nothing waits for the timer.
+for r in rows[:4]:
+    decide(r)
+idle = get("/batcher")["batchers"]["t2_default"]
+assert idle["batch_size"]["counts"][0] == idle["batches"], idle
+
+# Under pressure: concurrent requests share predicts.
+with ThreadPoolExecutor(16) as ex:
+    packs = list(ex.map(decide, rows))
+
+# Same packs as the unbatched in-process engine (volatile timing fields aside).
+VOLATILE = {"meta_generated_at", "meta_latency_ms", "latency_ms", "generated_at", "meta_as_of_ts"}
+def strip(o):
+    if isinstance(o, dict):
+        return {k: strip(v) for k, v in o.items() if k not in VOLATILE}
+    if isinstance(o, list):
+        return [strip(x) for x in o]
+    return o
+
+engine = decision_engine.DecisionEngine(runtime_manifest.load_manifest(manifest))
+for row, pack in zip(rows, packs):
+    assert strip(engine.decide(row)) == strip(pack), row["request_id"]
+
+stats = get("/batcher")["batchers"]
+for name, b in stats.items():
+    assert b["errors"] == 0, b
+    assert b["batch_size"]["count"] == b["batches"], b
+    assert b["queue_wait_ms"]["count"] == b["batch_size"]["sum"], b
+    assert b["batches"] < b["batch_size"]["sum"], f"{name}: no request shared a batch"
+print("[OK] packs match unbatched engine; t2 batch sizes:", json.dumps(stats["t2_default"]["batch_size"]))
+PY
+
+# Per-model demand: a caller still building its row for one model holds back that model's
+# batch only; a caller busy elsewhere (another batcher) costs no wait.
+"$PY" - <<'PY'
+import sys, threading, time
+import numpy as np
+sys.path.insert(0, "runners")
+from micro_batcher import MicroBatcher
+
+a = MicroBatcher("smoke_a", lambda X: X[:, 0], max_batch=8, max_wait_ms=300)
+b = MicroBatcher("smoke_b", lambda X: X[:, 0], max_batch=8, max_wait_ms=300)
+row = lambda v: np.array([[float(v)]])
+
+busy, release = threading.Event(), threading.Event()
+def slow_a_caller():
+    with a.incoming() as predict:
+        busy.set()
+        release.wait()
+        predict(row(2))
+t = threading.Thread(target=slow_a_caller)
+t.start()
+busy.wait()
+t0 = time.perf_counter()
+with b.incoming() as predict:
+    assert predict(row(1)) == 1.0
+idle_ms = (time.perf_counter() - t0) * 1000.0
+assert idle_ms < 100, f"batcher b waited {idle_ms:.0f} ms for a row incoming on a"
+
+t0 = time.perf_counter()
+threading.Timer(0.05, release.set).start()
+with a.incoming() as predict:
+    assert predict(row(3)) == 3.0
+t.join()
+s = a.stats()
+assert s["batches"] == 1 and s["batch_size"]["sum"] == 2, s
+with a.incoming():
+    pass  # left without submitting: no longer counted
+t0 = time.perf_counter()
+with a.incoming() as predict:
+    predict(row(4))
+assert (time.perf_counter() - t0) * 1000.0 < 100
+a.close(); b.close()
+print(f"[OK] per-model demand: other model's caller cost {idle_ms:.1f} ms; incoming row joined the batch")
+PY
+
+echo "[OK] smoke_micro_batch"
@@ -0,0 +1,102 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+WRITERS="${WRITERS:-4}"
+COPIES="${COPIES:-40}"   # edge packs x COPIES, split over WRITERS processes
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_pack_archive_${TS}.log"
+ALIAS_DIR="$LOG_DIR/pack_archive_aliases_${TS}"
+WORK_DIR="$LOG_DIR/pack_archive_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_PACK_ARCHIVE] root=$ROOT"
+echo "[SMOKE_PACK_ARCHIVE] python=$PY writers=$WRITERS copies=$COPIES"
+echo "[SMOKE_PACK_ARCHIVE] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+mkdir -p "$WORK_DIR"
+"$PY" runners/decision_async.py --runtime-manifest "$ALIAS_DIR/runtime_manifest.json" \
+  --requests-jsonl testing/requests/eval_requests_edge_v0_1.jsonl --out-jsonl "$WORK_DIR/edge_packs.jsonl" >/dev/null
+
+# 1) WRITERS processes append to one archive at the same time; every pack comes back by id,
+#    each get decompresses one block; a reader opened early sees later blocks; scan/filter/CLI.
+"$PY" - "$WORK_DIR" "$WRITERS" "$COPIES" <<'PY'
+import json, multiprocessing as mp, subprocess, sys
+sys.path.insert(0, "runners")
+import pack_archive
+
+work, writers, copies = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+archive = f"{work}/edge.archive"
+base = [json.loads(l) for l in open(f"{work}/edge_packs.jsonl", encoding="utf-8")]
+packs = [dict(p, meta_request_id=f"{p['meta_request_id']}-c{c}") for c in range(copies) for p in base]
+
+def write(part):
+    with pack_archive.PackArchiveWriter(archive, block_packs=64) as w:
+        for pack in packs[part::writers]:
+            w.add(pack)
+
+procs = [mp.Process(target=write, args=(i,)) for i in range(writers)]
+for p in procs:
+    p.start()
+for p in procs:
+    p.join()
+    assert p.exitcode == 0, p.exitcode
+
+reader = pack_archive.PackArchiveReader(archive)
+st = reader.stats()
+assert st["packs"] == len(packs), st
+for pack in packs[:: max(len(packs) // 500, 1)]:
+    assert reader.get(pack["meta_request_id"]) == pack, pack["meta_request_id"]
+blocks_read = []
+orig = reader._block
+reader._block = lambda *a: blocks_read.append(a) or orig(*a)
+reader.get(packs[-1]["meta_request_id"])
+assert len(blocks_read) == 1
+assert sorted(p["meta_request_id"] for p in reader.scan()) == sorted(p["meta_request_id"] for p in packs)
+print(f"[OK] writers={writers} packs={st['packs']} blocks={st['blocks']} blocks_bytes={st['blocks_bytes']} "
+      f"raw_jsonl_bytes={sum(len(json.dumps(p)) + 1 for p in packs)}")
+
+# Reader opened before a later append finds the new ids; re-archived id: newest wins.
+with pack_archive.PackArchiveWriter(archive) as w:
+    w.add(dict(base[0], meta_request_id="late-1"))
+    w.add(dict(base[1], meta_request_id=packs[0]["meta_request_id"]))
+assert reader.get("late-1")["meta_client_id"] == base[0]["meta_client_id"]
+reader.refresh()
+assert reader.get(packs[0]["meta_request_id"])["meta_client_id"] == base[1]["meta_client_id"]
+print("[OK] late append visible to an open reader; newest copy wins")
+
+latest = {p["meta_request_id"]: p for p in packs}
+latest["late-1"], latest[packs[0]["meta_request_id"]] = base[0], base[1]
+want = sum(1 for p in latest.values() if p["decisions"]["final_decision"]["final_outcome"] == "REVIEW")
+out = subprocess.check_output([sys.executable, "runners/pack_archive.py", "scan", "--archive", archive,
+                               "--where", "decisions.final_decision.final_outcome=REVIEW"], text=True)
+assert len(out.splitlines()) == want, (len(out.splitlines()), want)
+got = json.loads(subprocess.check_output([sys.executable, "runners/pack_archive.py", "get", "--archive", archive,
+                                          "--request-id", packs[7]["meta_request_id"]], text=True))
+assert got == packs[7]
+miss = subprocess.run([sys.executable, "runners/pack_archive.py", "get", "--archive", archive, "--request-id", "nope"], capture_output=True)
+assert miss.returncode == 2, miss.returncode
+print(f"[OK] CLI scan --where REVIEW={want}, get, unknown id -> exit 2")
+
+try:
+    pack_archive.PackArchiveWriter(archive, codec="zstd")
+    raise AssertionError("codec mismatch accepted")
+except pack_archive.PackArchiveError:
+    pass
+print("[OK] codec mismatch refused")
+PY
+
+echo "[OK] smoke_pack_archive"
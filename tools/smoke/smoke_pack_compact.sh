@@ -0,0 +1,80 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_pack_compact_${TS}.log"
+ALIAS_DIR="$LOG_DIR/pack_compact_aliases_${TS}"
+WORK_DIR="$LOG_DIR/pack_compact_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_PACK_COMPACT] root=$ROOT"
+echo "[SMOKE_PACK_COMPACT] python=$PY"
+echo "[SMOKE_PACK_COMPACT] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+mkdir -p "$WORK_DIR"
+
+# 1) dev + edge packs: compact (verified), expand, same packs; shared metadata stored once.
+for ds in dev edge; do
+  "$PY" runners/decision_async.py --runtime-manifest "$ALIAS_DIR/runtime_manifest.json" \
+    --requests-jsonl "testing/requests/eval_requests_${ds}_v0_1.jsonl" --out-jsonl "$WORK_DIR/${ds}_packs.jsonl" >/dev/null
+  "$PY" runners/pack_compact.py compact --packs-jsonl "$WORK_DIR/${ds}_packs.jsonl" --out "$WORK_DIR/${ds}.compact.jsonl" --verify \
+    >"$WORK_DIR/${ds}_summary.json"
+  "$PY" runners/pack_compact.py expand --in "$WORK_DIR/${ds}.compact.jsonl" --out "$WORK_DIR/${ds}_expanded.jsonl"
+  "$PY" - "$WORK_DIR" "$ds" <<'PY'
+import json, sys
+work, ds = sys.argv[1], sys.argv[2]
+s = json.load(open(f"{work}/{ds}_summary.json", encoding="utf-8"))
+packs = [json.loads(l) for l in open(f"{work}/{ds}_packs.jsonl", encoding="utf-8")]
+back = [json.loads(l) for l in open(f"{work}/{ds}_expanded.jsonl", encoding="utf-8")]
+assert back == packs, "expand(compact(packs)) != packs"
+assert s["verify"]["mismatch_count"] == 0 and s["packs"] == len(packs), s
+assert s["profiles"] <= 4 and s["ratio"] < 0.75, s
+compact = open(f"{work}/{ds}.compact.jsonl", encoding="utf-8").read()
+assert compact.count("/models/t2_tiny.json") == 1, "model path stored more than once"
+print(f"[OK] {ds} packs={s['packs']} profiles={s['profiles']} bytes {s['bytes_in_jsonl']} -> {s['bytes_out']} (ratio {s['ratio']})")
+PY
+done
+
+# 2) Odd packs round-trip too: ids that differ from the pack's, non-string timestamps,
+#    no decisions; a row before its profile is refused.
+"$PY" - "$WORK_DIR" <<'PY'
+import copy, json, sys
+sys.path.insert(0, "runners")
+import pack_compact
+
+work = sys.argv[1]
+base = [json.loads(l) for l in open(f"{work}/dev_packs.jsonl", encoding="utf-8")]
+full = next(p for p in base if "t2_default" in p["decisions"])
+odd = copy.deepcopy(full)
+odd["decisions"]["t2_default"]["meta_client_id"] = "someone-else"
+odd["decisions"]["t3_fraud"]["meta_generated_at"] = 12345
+odd["decisions"]["t4_payoff"]["meta_generated_at"] = "not a timestamp"
+odd["decisions"]["final_decision"]["b_summary"] = {"gate_1": "FAIL"}
+cases = [odd, {"meta_schema_version": "decision_pack_v0_1", "meta_request_id": "x"}, {"decisions": None}, {"decisions": {"t2_default": None}}]
+compactor, expander = pack_compact.PackCompactor(), pack_compact.PackExpander()
+for pack in cases:
+    out = [expander.feed(r) for r in compactor.records(pack)][-1]
+    assert out == pack, pack
+try:
+    pack_compact.PackExpander().feed(pack_compact.compact_pack(full)[1])
+    raise AssertionError("row without its profile expanded")
+except pack_compact.PackCompactError:
+    pass
+print(f"[OK] odd packs round-trip cases={len(cases)}; row before profile refused")
+PY
+
+echo "[OK] smoke_pack_compact"
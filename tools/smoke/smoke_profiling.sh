@@ -0,0 +1,81 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_profiling_${TS}.log"
+ALIAS_DIR="$LOG_DIR/profiling_aliases_${TS}"
+PROF_DIR="$LOG_DIR/profiling_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_PROFILING] root=$ROOT"
+echo "[SMOKE_PROFILING] python=$PY"
+echo "[SMOKE_PROFILING] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+
+"$PY" - "$ALIAS_DIR/runtime_manifest.json" "$PROF_DIR" <<'PY'
+import glob, json, os, pstats, subprocess, sys
+
+manifest, prof_dir = sys.argv[1], sys.argv[2]
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:6]
+
+VOLATILE = {"meta_generated_at", "meta_latency_ms", "latency_ms", "generated_at", "meta_as_of_ts"}
+def strip(o):
+    if isinstance(o, dict):
+        return {k: strip(v) for k, v in o.items() if k not in VOLATILE}
+    if isinstance(o, list):
+        return [strip(x) for x in o]
+    return o
+
+raw = os.path.join(prof_dir, "raw")
+full_chain = 0
+for row in rows:
+    cmd = [sys.executable, "runners/runner_workflow_eligibility.py", "--client-id", str(row["client_id"]), "--seed", str(row["seed"]),
+           "--request-id", row["request_id"], "--channel", row["channel"], "--runtime-manifest", manifest,
+           "--is-existing-customer", str(row["is_existing_customer"]).lower()]
+    for k in ("as_of_ts", "age", "employment_status", "declared_income_monthly", "declared_dti", "declared_credit_score",
+              "requested_amount", "term_months", "product_type"):
+        if row.get(k) is not None:
+            cmd += ["--" + k.replace("_", "-"), str(row[k])]
+    plain = json.loads(subprocess.check_output(cmd, text=True))
+    profiled = json.loads(subprocess.check_output(cmd + ["--profile", "--profile-dir", raw, "--profile-memory"], text=True))
+    assert strip(plain) == strip(profiled), row["request_id"]
+    full_chain += "t2_default" in plain["decisions"]
+assert 0 < full_chain < len(rows), "need both full-chain and early-cut rows"
+
+def files(stage):
+    return glob.glob(os.path.join(raw, f"{stage}.*.pstats"))
+
+assert len(files("workflow.eligibility")) == len(rows)
+assert len(files("workflow.originate")) == full_chain
+# ORIGINATE and its T2/T3/T4 children inherit the profile dir.
+assert len(files("originate.t2_default")) == full_chain
+assert len(files("runner_t2.score")) == full_chain and len(files("runner_t4.load_agent")) == full_chain
+assert glob.glob(os.path.join(raw, "runner_t3.score.*.alloc.json"))
+
+summary = json.loads(subprocess.check_output([sys.executable, "runners/profiling.py", "merge", "--dir", raw, "--out", prof_dir], text=True))
+assert summary["files"] == len(glob.glob(os.path.join(raw, "*.pstats")))
+assert summary["stages"]["runner_t2.score"]["files"] == full_chain
+merged = pstats.Stats(os.path.join(prof_dir, "runner_t2.score.pstats"))
+assert any(fn[2] == "score" and fn[0].endswith("runner_t2.py") for fn in merged.stats), "runner_t2.score not in its stage profile"
+for line in open(os.path.join(prof_dir, "all.collapsed"), encoding="utf-8"):
+    stack, us = line.rstrip("\n").rsplit(" ", 1)
+    assert stack and int(us) >= 0 and " at 0x" not in stack, line
+assert json.load(open(os.path.join(prof_dir, "allocations.json"), encoding="utf-8"))
+print(f"[OK] packs unchanged under --profile; stages={len(summary['stages'])} files={summary['files']}")
+PY
+
+echo "[OK] smoke_profiling"
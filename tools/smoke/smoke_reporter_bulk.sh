@@ -0,0 +1,95 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+COPIES="${COPIES:-400}"   # dev packs x COPIES -> bulk input
+WORKERS="${WORKERS:-4}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_reporter_bulk_${TS}.log"
+ALIAS_DIR="$LOG_DIR/reporter_bulk_aliases_${TS}"
+WORK_DIR="$LOG_DIR/reporter_bulk_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_REPORTER_BULK] root=$ROOT"
+echo "[SMOKE_REPORTER_BULK] python=$PY copies=$COPIES workers=$WORKERS"
+echo "[SMOKE_REPORTER_BULK] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+mkdir -p "$WORK_DIR/packs"
+
+# Dev-set packs (in process), then COPIES renamed copies of each plus one broken line.
+"$PY" runners/decision_async.py --runtime-manifest "$ALIAS_DIR/runtime_manifest.json" \
+  --requests-jsonl testing/requests/eval_requests_dev_v0_1.jsonl --out-jsonl "$WORK_DIR/dev_packs.jsonl" >/dev/null
+"$PY" - "$WORK_DIR" "$COPIES" <<'PY'
+import json, sys
+work, copies = sys.argv[1], int(sys.argv[2])
+packs = [json.loads(l) for l in open(f"{work}/dev_packs.jsonl", encoding="utf-8")]
+with open(f"{work}/bulk_packs.jsonl", "w", encoding="utf-8") as f:
+    for c in range(copies):
+        for p in packs:
+            f.write(json.dumps(dict(p, meta_request_id=f"{p['meta_request_id']}-c{c}")) + "\n")
+        if c == copies // 2:
+            f.write('{"meta_request_id": "broken", "decisions": {}}\n')
+for i, p in enumerate(packs[:10], start=1):
+    open(f"{work}/packs/{i:04d}_{p['meta_request_id']}.json", "w", encoding="utf-8").write(json.dumps(p, indent=2) + "\n")
+PY
+
+# 1) --packs-dir == one reporter process per pack.
+"$PY" runners/runner_reporter.py --packs-dir "$WORK_DIR/packs" --out-dir "$WORK_DIR/reports" --out-jsonl "$WORK_DIR/dir_reports.jsonl" >"$WORK_DIR/dir_summary.json"
+"$PY" - "$WORK_DIR" <<'PY'
+import json, os, subprocess, sys
+sys.path.insert(0, "runners")
+from decision_async import strip_volatile
+work = sys.argv[1]
+s = json.load(open(f"{work}/dir_summary.json", encoding="utf-8"))
+assert s["ok_count"] == 10 and s["error_count"] == 0, s
+bulk = [json.loads(l) for l in open(f"{work}/dir_reports.jsonl", encoding="utf-8")]
+for name, rep in zip(sorted(os.listdir(f"{work}/packs")), bulk):
+    one = json.loads(subprocess.check_output([sys.executable, "runners/runner_reporter.py", "--decision-pack-json", f"{work}/packs/{name}"]))
+    assert strip_volatile(one) == strip_volatile(rep), name
+    assert strip_volatile(json.load(open(f"{work}/reports/{name}", encoding="utf-8"))) == strip_volatile(one), name
+print(f"[OK] --packs-dir parity packs={len(bulk)}")
+PY
+
+# 2) --packs-jsonl: in process and with a worker pool give the same reports, in input order;
+#    the broken pack is counted, the rest still run.
+for w in 1 "$WORKERS"; do
+  set +e
+  "$PY" runners/runner_reporter.py --packs-jsonl "$WORK_DIR/bulk_packs.jsonl" --out-jsonl "$WORK_DIR/bulk_reports_w${w}.jsonl" \
+    --workers "$w" >"$WORK_DIR/bulk_summary_w${w}.json"
+  rc=$?
+  set -e
+  [[ "$rc" == "3" ]] || { echo "[FAIL] expected exit 3 (one broken pack), got $rc"; exit 1; }
+done
+"$PY" - "$WORK_DIR" "$WORKERS" <<'PY'
+import json, sys
+sys.path.insert(0, "runners")
+from decision_async import strip_volatile
+work, workers = sys.argv[1], sys.argv[2]
+packs = [json.loads(l) for l in open(f"{work}/bulk_packs.jsonl", encoding="utf-8")]
+expected = [p["meta_request_id"] for p in packs if p["meta_request_id"] != "broken"]
+runs = {}
+for w in ("1", workers):
+    s = json.load(open(f"{work}/bulk_summary_w{w}.json", encoding="utf-8"))
+    assert s["packs"] == len(packs) and s["error_count"] == 1 and "bulk_packs.jsonl:" in s["errors"][0]["source"], s
+    reps = [json.loads(l) for l in open(f"{work}/bulk_reports_w{w}.jsonl", encoding="utf-8")]
+    assert [r["meta_request_id"] for r in reps] == expected, w
+    runs[w] = [strip_volatile(r) for r in reps]
+    print(f"[OK] --packs-jsonl workers={w} packs={s['packs']} wall_ms={s['wall_ms']} throughput_pps={s['throughput_pps']}")
+assert runs["1"] == runs[workers]
+print("[OK] worker pool output == in-process output")
+PY
+
+echo "[OK] smoke_reporter_bulk"
@@ -0,0 +1,124 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+MAX_ROWS="${MAX_ROWS:-12}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_run_index_${TS}.log"
+ALIAS_DIR="$LOG_DIR/run_index_aliases_${TS}"
+RUNS_ROOT="$LOG_DIR/run_index_${TS}"
+DB="$RUNS_ROOT/batch_index.sqlite"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_RUN_INDEX] root=$ROOT"
+echo "[SMOKE_RUN_INDEX] python=$PY max_rows=$MAX_ROWS"
+echo "[SMOKE_RUN_INDEX] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+
+# Two batch runs: a STUB one, and a LIVE one against a dead sensor (every row LIVE_FALLBACK,
+# packs archived). The driver indexes each run into RUN_INDEX_DB as it finishes.
+PYTHON_BIN="$PY" ALIAS_DIR="$ALIAS_DIR" MAX_ROWS="$MAX_ROWS" RUN_INDEX_DB="$DB" \
+  bash testing/scripts/run_e2e_batch_dev.sh
+sleep 1  # run dirs are named by the second
+PYTHON_BIN="$PY" ALIAS_DIR="$ALIAS_DIR" MAX_ROWS="$MAX_ROWS" RUN_INDEX_DB="$DB" PACKS_ARCHIVE=1 \
+  SENSOR_MODE=LIVE FRAUD_SIGNALS_MODE=LIVE SENSOR_BASE_URL=http://127.0.0.1:1 SENSOR_TIMEOUT_MS=100 \
+  bash testing/scripts/run_e2e_batch_dev.sh
+
+"$PY" - "$DB" "$RUNS_ROOT" <<'PY'
+import json, os, shutil, sqlite3, subprocess, sys
+from pathlib import Path
+
+db_path, runs_root = sys.argv[1], Path(sys.argv[2])
+runs = sorted(Path("testing/runs").glob("eval_requests_*_run_*"))[-2:]
+stub_dir, live_dir = [runs_root / r.name for r in runs]
+for r in runs:
+    shutil.move(str(r), str(runs_root / r.name))  # keep testing/runs as it was
+
+def index(*args):
+    out = subprocess.check_output([sys.executable, "testing/scripts/index_batch_runs.py", "--db", db_path, *args], text=True)
+    return json.loads(out)
+
+def query(name, *args):
+    out = subprocess.check_output([sys.executable, "testing/scripts/build_e2e_batch_report.py", "--index-db", db_path,
+                                   "--query", name, "--format", "jsonl", "--no-index-refresh", *args], text=True)
+    return [json.loads(l) for l in out.splitlines() if l.strip()]
+
+def results(run_dir):
+    return [json.loads(l) for l in open(run_dir / "results.jsonl", encoding="utf-8") if l.strip()]
+
+# The runs were moved, so the driver's rows point at old pack paths: re-index from the new place.
+s = index("--runs-root", str(runs_root), "--force")
+assert sorted(s["runs_indexed"]) == sorted([stub_dir.name, live_dir.name]), s
+db = sqlite3.connect(db_path)
+for d in (stub_dir, live_dir):
+    res = results(d)
+    n, with_pack = db.execute("SELECT COUNT(*), COUNT(t2_decision) FROM batch_results WHERE run_id = ?", (d.name,)).fetchone()
+    assert n == len(res), (d.name, n, len(res))
+    assert with_pack == sum(1 for r in res if r.get("status") == "OK" and r.get("eligibility_status") == "APPROVED"), (d.name, with_pack)
+    assert db.execute("SELECT COUNT(*) FROM batch_results WHERE run_id = ? AND scenario_tag IS NULL", (d.name,)).fetchone()[0] == 0
+print(f"[OK] indexed runs={len(s['runs_indexed'])} rows={sum(s['runs_indexed'].values())}; scenario_tag on every row")
+
+# Unchanged runs are skipped; a rewritten results.jsonl re-indexes that run only.
+s = index("--runs-root", str(runs_root))
+assert s["runs_indexed"] == {} and s["runs_unchanged"] == 2, s
+os.utime(stub_dir / "results.jsonl")
+s = index("--runs-root", str(runs_root))
+assert list(s["runs_indexed"]) == [stub_dir.name] and s["runs_unchanged"] == 1, s
+print("[OK] incremental: unchanged runs skipped, touched run re-indexed")
+
+# LIVE run: packs/ gone, fields still come from packs.archive.
+before = db.execute("SELECT COUNT(t3_decision), COUNT(fraud_sensor_mode) FROM batch_results WHERE run_id = ?", (live_dir.name,)).fetchone()
+shutil.rmtree(live_dir / "packs")
+index("--run-dir", str(live_dir), "--force")
+after = db.execute("SELECT COUNT(t3_decision), COUNT(fraud_sensor_mode) FROM batch_results WHERE run_id = ?", (live_dir.name,)).fetchone()
+assert before == after and before[0] > 0, (before, after)
+print(f"[OK] packs.archive fallback rows_with_t3={after[0]}")
+
+# Canned queries agree with a scan of results.jsonl + packs.
+sys.path.insert(0, "runners")
+import pack_archive
+reader = pack_archive.PackArchiveReader(str(live_dir / "packs.archive"))
+want = 0
+for r in results(live_dir):
+    pack = reader.get(r["request_id"]) if r.get("status") == "OK" else None
+    t3 = ((pack or {}).get("decisions") or {}).get("t3_fraud") or {}
+    if (r.get("final_reason_code") == "APPROVE_BLOCKED_BY_STRICT_RULE" and r.get("sensor_mode_used") == "LIVE_FALLBACK"
+            and t3.get("decision_normalized") == "REVIEW_FRAUD"):
+        want += 1
+got = query("strict_rule_fraud_review_fallback")
+assert len(got) == want, (len(got), want)
+for d in (stub_dir, live_dir):
+    outcomes = {}
+    for o in query("outcomes", "--run-id", d.name):
+        outcomes[o["final_outcome"]] = outcomes.get(o["final_outcome"], 0) + o["n"]
+    want_outcomes = {}
+    for r in results(d):
+        want_outcomes[r["final_outcome"]] = want_outcomes.get(r["final_outcome"], 0) + 1
+    assert outcomes == want_outcomes, (d.name, outcomes, want_outcomes)
+modes = {o["sensor_mode_used"] for o in query("sensor_modes", "--run-id", live_dir.name)}
+assert modes == {"LIVE_FALLBACK"}, modes
+rid = results(stub_dir)[0]["request_id"]
+found = query("find", "--where", f"request_id={rid}")
+assert sorted(f["run_id"] for f in found) == sorted([stub_dir.name, live_dir.name]), found  # same requests, both runs
+print(f"[OK] canned queries: strict_rule_fraud_review_fallback={want} outcomes sensor_modes find")
+
+bad = subprocess.run([sys.executable, "testing/scripts/build_e2e_batch_report.py", "--index-db", db_path, "--query", "find",
+                      "--where", "nope=1", "--no-index-refresh"], capture_output=True, text=True)
+assert bad.returncode != 0, bad.returncode
+print("[OK] unknown --where column refused")
+PY
+
+echo "[OK] smoke_run_index"
@@ -0,0 +1,104 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+ALIAS_SRC="block_a_gov/artifacts"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_runtime_manifest_${TS}.log"
+WORK_DIR="$LOG_DIR/runtime_manifest_${TS}"
+MANIFEST="$WORK_DIR/runtime_manifest.json"
+PACK_OUT="$WORK_DIR/pack_early_cut.json"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_RUNTIME_MANIFEST] root=$ROOT"
+echo "[SMOKE_RUNTIME_MANIFEST] python=$PY"
+echo "[SMOKE_RUNTIME_MANIFEST] log=$LOG_FILE"
+
+mkdir -p "$WORK_DIR/aliases"
+cp "$ALIAS_SRC"/*.json "$WORK_DIR/aliases/"
+
+echo "[SMOKE_RUNTIME_MANIFEST] build + verify..."
+"$PY" runners/runtime_manifest.py build --alias-dir "$WORK_DIR/aliases" --out "$MANIFEST"
+"$PY" runners/runtime_manifest.py verify --manifest "$MANIFEST"
+
+echo "[SMOKE_RUNTIME_MANIFEST] early-cut pack from the serialized manifest..."
+"$PY" runners/runner_workflow_eligibility.py \
+  --client-id 100 \
+  --request-id smoke-runtime-manifest-001 \
+  --age 16 \
+  --runtime-manifest "$MANIFEST" \
+  --out "$PACK_OUT" >/dev/null
+
+"$PY" - "$MANIFEST" "$PACK_OUT" "$WORK_DIR/aliases" <<'PY'
+import json, subprocess, sys
+from pathlib import Path
+sys.path.insert(0, "runners")
+import runtime_manifest as rm
+
+manifest_path, pack_path, alias_dir = sys.argv[1], Path(sys.argv[2]), Path(sys.argv[3])
+m = rm.load_manifest(manifest_path)
+assert set(m["aliases"]) == {"workflow", "eligibility", "t2_default", "t3_fraud", "t4_payoff", "brms_policy"}
+assert all(e["status"] == "OK" for e in m["aliases"].values()), m["aliases"]
+# workflow + eligibility share one alias file -> one read, one entry.
+assert m["aliases"]["workflow"] == m["aliases"]["eligibility"]
+assert m["models"]["t2_default"]["default_operating_point"] == "op_a"
+assert m["models"]["t3_fraud"]["thresholds_file"].endswith("fraud_t3_ieee_bcd_best_thresholds.json")
+assert m["models"]["t4_payoff"]["feature_list_file"].endswith("t4_payoff_xgb_v1_guarded_feature_list.json")
+snap = m["brms_policy_snapshot"]
+assert snap["status"] == "OK" and snap["policy_id"] == "P1" and snap["policy_version"] == "1.0", snap
+
+pack = json.loads(pack_path.read_text(encoding="utf-8"))
+assert pack["meta_runtime_manifest_hash"] == m["manifest_hash"]
+assert pack["meta_brms_policy_snapshot"] == snap
+assert pack["decisions"]["eligibility"]["eligibility_status"] == "REJECTED"
+
+# Same content -> same hash (built_at excluded).
+assert rm.build_manifest(alias_dir=str(alias_dir))["manifest_hash"] == m["manifest_hash"]
+
+# Tampered manifest is refused.
+bad = dict(m, brms_policy_snapshot=dict(snap, policy_id="P9"))
+bad_path = alias_dir.parent / "runtime_manifest_tampered.json"
+bad_path.write_text(json.dumps(bad), encoding="utf-8")
+try:
+    rm.load_manifest(str(bad_path))
+except ValueError:
+    pass
+else:
+    raise AssertionError("tampered manifest accepted")
+
+# Alias edit -> verify reports drift (exit 3) naming the file.
+pol = alias_dir / "brms_policy_canonical.json"
+d = json.loads(pol.read_text(encoding="utf-8"))
+d["policy_version"] = "1.1"
+pol.write_text(json.dumps(d), encoding="utf-8")
+p = subprocess.run([sys.executable, "runners/runtime_manifest.py", "verify", "--manifest", manifest_path], capture_output=True, text=True)
+assert p.returncode == 3, p.returncode
+assert str(pol) in json.loads(p.stdout)["drifted_files"]
+
+# Missing brms alias -> MISSING_ALIAS snapshot with the P1/1.0 defaults.
+pol.unlink()
+miss = rm.build_manifest(alias_dir=str(alias_dir))
+assert miss["aliases"]["brms_policy"]["status"] == "MISSING"
+assert miss["brms_policy_snapshot"]["status"] == "MISSING_ALIAS" and miss["brms_policy_snapshot"]["policy_id"] == "P1"
+try:
+    rm.alias_payload(miss, "brms_policy")
+except FileNotFoundError:
+    pass
+else:
+    raise AssertionError("missing alias payload returned")
+
+print("[OK] runtime manifest: hash, pack meta, tamper + drift checks")
+PY
+
+echo "[OK] smoke_runtime_manifest"
@@ -0,0 +1,140 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+DSZ_PORT="${DSZ_PORT:-19010}"
+STANDIN_PROFILE="${STANDIN_PROFILE:-fast}"
+ALIAS="block_a_gov/artifacts/eligibility_canonical.json"
+REQ="testing/requests/eval_requests_dev_v0_1.jsonl"
+
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_sensor_bulk_live_${TS}.log"
+PREFETCH_JSON="$LOG_DIR/sensor_prefetch_${TS}.json"
+PREFETCH_FLAKY_JSON="$LOG_DIR/sensor_prefetch_flaky_${TS}.json"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+PIDS=()
+cleanup() {
+  for pid in "${PIDS[@]:-}"; do
+    [[ -n "$pid" ]] && kill "$pid" >/dev/null 2>&1 || true
+  done
+}
+trap cleanup EXIT
+
+wait_health() {
+  local url="$1"
+  for _ in $(seq 1 40); do
+    if "$PY" -c 'import sys,urllib.request; urllib.request.urlopen(sys.argv[1], timeout=1)' "$url" >/dev/null 2>&1; then
+      return 0
+    fi
+    sleep 0.1
+  done
+  echo "[ERR] health never OK: $url"
+  return 1
+}
+
+echo "[SMOKE_SENSOR_BULK] root=$ROOT"
+echo "[SMOKE_SENSOR_BULK] python=$PY profile=$STANDIN_PROFILE dsz_port=$DSZ_PORT"
+echo "[SMOKE_SENSOR_BULK] log=$LOG_FILE"
+
+"$PY" -m tools.ds_z_standin --port "$DSZ_PORT" --profile "$STANDIN_PROFILE" --as-of-400 always >"$LOG_DIR/ds_z_standin_bulk_${TS}.log" 2>&1 &
+PIDS+=("$!")
+wait_health "http://127.0.0.1:${DSZ_PORT}/health"
+
+echo "[SMOKE_SENSOR_BULK] bulk prefetch (chunk=7, workers=3, as_of=400 -> retry batch)..."
+"$PY" runners/sensor_bulk.py --requests-jsonl "$REQ" --sensor-base-url "http://127.0.0.1:${DSZ_PORT}" \
+  --chunk-size 7 --workers 3 --out "$PREFETCH_JSON"
+
+echo "[SMOKE_SENSOR_BULK] prefetched vs per-row LIVE (same values, no per-row GETs)..."
+"$PY" - "$REQ" "$ALIAS" "$PREFETCH_JSON" "http://127.0.0.1:${DSZ_PORT}" <<'PY'
+import json, sys, urllib.request
+sys.path.insert(0, "runners")
+import eligibility_columnar, originate, runner_eligibility, sensor_bulk
+
+req_path, alias_path, prefetch_path, base = sys.argv[1:5]
+alias = json.load(open(alias_path))
+prefetch = sensor_bulk.load_prefetch(prefetch_path)
+rows = [json.loads(l) for l in open(req_path) if l.strip()]
+
+for s, st in prefetch["stats"].items():
+    assert st["ok"] == len(rows) and st["error"] == 0 and st["missing"] == 0, (s, st)
+assert prefetch["stats"]["market_snapshot"]["as_of_retry"] == len(rows)
+
+def stats():
+    return json.load(urllib.request.urlopen(base + "/standin/stats"))
+
+def get_count(s, ep):
+    return ((s.get("counters") or {}).get(ep) or {}).get("requests", 0)
+
+before = stats()
+prefetched = []
+for row in rows:
+    intake = eligibility_columnar.intake_from_request_row(alias, row)
+    prefetched.append(runner_eligibility.resolve_dynamic_sensors(intake, alias, "LIVE", base, 1200, sensor_prefetch=prefetch))
+after = stats()
+for ep in ("/sensor/bureau_spike_score", "/sensor/market_snapshot"):
+    assert get_count(after, ep) == get_count(before, ep), ("prefetched rows must not GET", ep)
+
+for row, got in zip(rows, prefetched):
+    intake = eligibility_columnar.intake_from_request_row(alias, row)
+    assert runner_eligibility.resolve_dynamic_sensors(intake, alias, "LIVE", base, 1200) == got, row["request_id"]
+
+# ORIGINATE wC/wB from prefetch: scores match the per-row payloads, trace says BATCH.
+row = rows[0]
+fs = originate.resolve_fraud_signals(
+    client_id=str(row["client_id"]), request_id=row["request_id"], seed=int(row["seed"]), mode="LIVE",
+    stub_path="tools/smoke/fixtures/fraud_signals_stub.json", sensor_base_url=base, sensor_timeout_ms=1200,
+    device_high_thr=0.8, tx_high_thr=0.8, double_high_action="REVIEW", sensor_prefetch=prefetch,
+)
+q = f"client_id={row['client_id']}&lookback_hours=24&request_id={row['request_id']}&seed={row['seed']}"
+single = json.load(urllib.request.urlopen(base + "/sensor/device_behavior_score?" + q))
+assert fs["meta_sensor_mode_used"] == "LIVE", fs["meta_sensor_mode_used"]
+assert fs["dyn_device_behavior_fraud_score_24h"] == single["device_behavior_fraud_score_24h"]
+assert fs["sensor_trace"]["device_behavior"]["fetch"] == "BATCH"
+assert fs["sensor_trace"]["transaction_anomaly"]["fetch"] == "BATCH"
+print("PREFETCH_PARITY_ROWS", len(rows))
+PY
+
+echo "[SMOKE_SENSOR_BULK] failed items fall back per row; lost chunks fetch per row..."
+"$PY" -m tools.ds_z_standin --port "$((DSZ_PORT + 1))" --profile "$STANDIN_PROFILE" --error-rate 0.3 --seed 7 >"$LOG_DIR/ds_z_standin_bulk_flaky_${TS}.log" 2>&1 &
+PIDS+=("$!")
+wait_health "http://127.0.0.1:$((DSZ_PORT + 1))/health"
+"$PY" runners/sensor_bulk.py --requests-jsonl "$REQ" --sensor-base-url "http://127.0.0.1:$((DSZ_PORT + 1))" \
+  --sensors bureau_spike_score,market_snapshot --chunk-size 5 --out "$PREFETCH_FLAKY_JSON" 2>/dev/null
+"$PY" - "$REQ" "$ALIAS" "$PREFETCH_FLAKY_JSON" <<'PY'
+import json, sys
+sys.path.insert(0, "runners")
+import eligibility_columnar, runner_eligibility, sensor_bulk
+
+req_path, alias_path, prefetch_path = sys.argv[1:4]
+alias = json.load(open(alias_path))
+prefetch = sensor_bulk.load_prefetch(prefetch_path)
+rows = [json.loads(l) for l in open(req_path) if l.strip()]
+# Nothing listens on port 9 (discard): rows that are not prefetched must fall back, never raise.
+dead = "http://127.0.0.1:9"
+modes = {}
+for row in rows:
+    intake = eligibility_columnar.intake_from_request_row(alias, row)
+    ds, mode = runner_eligibility.resolve_dynamic_sensors(intake, alias, "LIVE", dead, 200, sensor_prefetch=prefetch)
+    entry = prefetch["entries"][row["request_id"]]["sensors"]
+    complete = all((entry.get(s) or {}).get("status") == "OK" for s in ("bureau_spike_score", "market_snapshot"))
+    assert mode == ("LIVE" if complete else "LIVE_FALLBACK"), (row["request_id"], mode, entry)
+    modes[mode] = modes.get(mode, 0) + 1
+print("FLAKY_MODES", modes, "STATS", prefetch["stats"])
+assert modes.get("LIVE_FALLBACK", 0) > 0
+PY
+
+echo "[OK] smoke_sensor_bulk_live"
+echo "[SMOKE_SENSOR_BULK] artifacts: $PREFETCH_JSON $PREFETCH_FLAKY_JSON"
+echo "[SMOKE_SENSOR_BULK] log: $LOG_FILE"
@@ -0,0 +1,137 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+DSZ_PORT="${DSZ_PORT:-19033}"
+LATENCY="${LATENCY:-heavy_tail:8:1.1:1000}"   # most answers ~10 ms, a Pareto tail up to 1 s (under the 1.2 s timeout)
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_sensor_hedge_${TS}.log"
+ALIAS_DIR="$LOG_DIR/sensor_hedge_aliases_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+DSZ_PID=""
+cleanup() {
+  [[ -n "$DSZ_PID" ]] && kill "$DSZ_PID" >/dev/null 2>&1 || true
+}
+trap cleanup EXIT
+
+echo "[SMOKE_SENSOR_HEDGE] root=$ROOT"
+echo "[SMOKE_SENSOR_HEDGE] python=$PY dsz_port=$DSZ_PORT latency=$LATENCY"
+echo "[SMOKE_SENSOR_HEDGE] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+"$PY" -m tools.ds_z_standin --port "$DSZ_PORT" --latency "$LATENCY" >"$LOG_DIR/ds_z_standin_hedge_${TS}.log" 2>&1 &
+DSZ_PID="$!"
+
+# 1) Async engine, dev + edge rows, hedging off then on: same packs, lower decision p99,
+#    hedges within the 5% budget, counts in the fraud sensor_trace. 2) Sync hedge path.
+"$PY" - "$ALIAS_DIR/runtime_manifest.json" "$DSZ_PORT" <<'PY'
+import asyncio, json, sys, time, urllib.request
+sys.path.insert(0, "runners")
+import decision_async, decision_engine, runner_eligibility, runtime_manifest, sensor_hedge
+
+manifest, port = sys.argv[1], sys.argv[2]
+base = f"http://127.0.0.1:{port}"
+for _ in range(50):
+    try:
+        urllib.request.urlopen(f"{base}/health", timeout=1)
+        break
+    except Exception:
+        time.sleep(0.2)
+rows = [json.loads(l) for ds in ("dev", "edge") for l in open(f"testing/requests/eval_requests_{ds}_v0_1.jsonl", encoding="utf-8") if l.strip()]
+
+def run():
+    engine = decision_async.AsyncDecisionEngine(decision_engine.DecisionEngine(
+        runtime_manifest.load_manifest(manifest), sensor_mode="LIVE", fraud_signals_mode="LIVE", sensor_base_url=base))
+    async def go():
+        sem = asyncio.Semaphore(4)
+        async def one(row):
+            async with sem:
+                t0 = time.perf_counter()
+                pack = await engine.decide(row)
+                return pack, (time.perf_counter() - t0) * 1000.0
+        return await asyncio.gather(*(one(r) for r in rows))
+    out = asyncio.run(go())
+    engine.close()
+    return out
+
+def p99(ms):
+    ms = sorted(ms)
+    return ms[int(0.99 * (len(ms) - 1))]
+
+plain = run()
+policy = sensor_hedge.configure(True, budget=0.05)
+hedged = run()
+d = policy.describe()
+def same(pack):  # sensor_trace.as_of_ts is the stand-in's clock
+    out = decision_async.strip_volatile(pack)
+    for tr in (out["decisions"].get("fraud_signals") or {}).get("sensor_trace", {}).values():
+        tr.pop("as_of_ts", None)
+    return out
+assert [same(p) for p, _ in hedged] == [same(p) for p, _ in plain]
+modes = {p["decisions"]["eligibility"]["meta_sensor_mode_used"] for p, _ in hedged}
+assert modes == {"LIVE"}, modes
+assert 0 < d["hedges"] <= 0.05 * d["requests"] + 1, d
+assert 0 < d["hedge_wins"] <= d["hedges"], d
+traces = [p["decisions"]["fraud_signals"]["sensor_trace"] for p, _ in hedged if "fraud_signals" in p["decisions"]]
+entries = [t[k] for t in traces for k in ("device_behavior", "transaction_anomaly")]
+assert all("hedge_sent" in e and "hedge_won" in e for e in entries), entries[:2]
+assert not any("hedge_sent" in t[k] for p, _ in plain if "fraud_signals" in p["decisions"] for t in [p["decisions"]["fraud_signals"]["sensor_trace"]] for k in t)
+sent, won = sum(e["hedge_sent"] for e in entries), sum(e["hedge_won"] for e in entries)
+assert sent <= d["hedges"] and won <= sent, (sent, won, d)
+p_plain, p_hedged = p99([ms for _, ms in plain]), p99([ms for _, ms in hedged])
+print(f"[OK] rows={len(rows)} sensor_requests={d['requests']} hedges={d['hedges']} ({100.0 * d['hedges'] / d['requests']:.1f}%) "
+      f"wins={d['hedge_wins']} trace_sent={sent} trace_won={won} delay_ms={d['delay_ms']}")
+print(f"[OK] decision p99 plain={p_plain:.0f} ms hedged={p_hedged:.0f} ms")
+assert p_hedged < p_plain, (p_hedged, p_plain)
+
+# Sync path (runner_eligibility.fetch_json on a pool thread): a hedge once the window is warm.
+pol = sensor_hedge.HedgePolicy(budget=1.0, min_samples=5)
+calls = []
+def slow_first():
+    calls.append(time.perf_counter())
+    time.sleep(0.5 if len(calls) == 1 else 0.0)
+    return {"ok": len(calls)}
+for _ in range(5):
+    pol.observe("bureau_spike_score", 10.0)
+stats = {}
+t0 = time.perf_counter()
+got = pol.call("bureau_spike_score", slow_first, stats)
+assert got == {"ok": 2} and stats == {"hedge_sent": 1, "hedge_won": 1} and time.perf_counter() - t0 < 0.3, (got, stats)
+def fail():
+    raise ValueError("bad payload")
+try:
+    pol.call("bureau_spike_score", fail, {})
+    raise AssertionError("error swallowed")
+except ValueError:
+    pass
+url = runner_eligibility._market_url(base, "hedge-smoke", None)
+assert "market_stress_score_7d" in sensor_hedge.call("GET", url, lambda: runner_eligibility.fetch_json(url, 2.0))
+assert sensor_hedge.hedgeable("POST", f"{base}/sensor/batch") is None and sensor_hedge.hedgeable("GET", f"{base}/sensor/batch") is None
+print("[OK] sync hedge wins over a slow primary; errors are not hedged; batch POST never hedged")
+PY
+
+# One-shot CLIs refuse the flag: their window and budget would never warm up.
+for runner in runners/originate.py runners/runner_workflow_eligibility.py; do
+  set +e
+  "$PY" "$runner" --client-id 100001 --sensor-hedge >"$LOG_DIR/hedge_refused_${TS}.out" 2>&1
+  rc=$?
+  set -e
+  [[ "$rc" == "2" ]] && grep -q "needs a long-lived process" "$LOG_DIR/hedge_refused_${TS}.out" \
+    || { echo "[FAIL] $runner accepted a one-shot --sensor-hedge (exit $rc)"; exit 1; }
+done
+echo "[OK] one-shot --sensor-hedge refused"
+
+echo "[OK] smoke_sensor_hedge"
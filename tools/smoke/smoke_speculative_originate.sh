@@ -0,0 +1,66 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_speculative_originate_${TS}.log"
+ALIAS_DIR="$LOG_DIR/speculative_aliases_${TS}"
+SPEC_LOG="$LOG_DIR/speculation_${TS}.jsonl"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_SPECULATIVE] root=$ROOT"
+echo "[SMOKE_SPECULATIVE] python=$PY"
+echo "[SMOKE_SPECULATIVE] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+
+"$PY" - "$ALIAS_DIR/runtime_manifest.json" "$SPEC_LOG" <<'PY'
+import json, subprocess, sys
+
+manifest, spec_log = sys.argv[1], sys.argv[2]
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:8]
+
+VOLATILE = {"meta_generated_at", "meta_latency_ms", "latency_ms", "generated_at", "meta_as_of_ts"}
+def strip(o):
+    if isinstance(o, dict):
+        return {k: strip(v) for k, v in o.items() if k not in VOLATILE}
+    if isinstance(o, list):
+        return [strip(x) for x in o]
+    return o
+
+for row in rows:
+    cmd = [sys.executable, "runners/runner_workflow_eligibility.py", "--client-id", str(row["client_id"]), "--seed", str(row["seed"]),
+           "--request-id", row["request_id"], "--channel", row["channel"], "--runtime-manifest", manifest,
+           "--is-existing-customer", str(row["is_existing_customer"]).lower()]
+    for k in ("as_of_ts", "age", "employment_status", "declared_income_monthly", "declared_dti", "declared_credit_score",
+              "requested_amount", "term_months", "product_type"):
+        if row.get(k) is not None:
+            cmd += ["--" + k.replace("_", "-"), str(row[k])]
+    sequential = json.loads(subprocess.check_output(cmd, text=True))
+    speculative = json.loads(subprocess.check_output(cmd + ["--speculative-originate", "--speculation-log", spec_log], text=True))
+    assert strip(sequential) == strip(speculative), row["request_id"]
+
+records = [json.loads(l) for l in open(spec_log, encoding="utf-8") if l.strip()]
+assert len(records) == len(rows)
+hits = [r for r in records if r["hit"]]
+assert hits and len(hits) < len(records), "need both hits and early cuts"
+for r in records:
+    early_cut = r["eligibility_status"] in ("REJECTED", "REVIEW_REQUIRED")
+    assert r["hit"] is not early_cut, r
+    assert ("wasted_ms" in r) is early_cut, r
+print(f"[OK] packs identical; hit_rate={len(hits)}/{len(records)} wasted_ms={sum(r.get('wasted_ms', 0) for r in records)}")
+PY
+
+echo "[OK] smoke_speculative_originate"
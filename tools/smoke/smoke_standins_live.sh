@@ -0,0 +1,100 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+DSZ_PORT="${DSZ_PORT:-19000}"
+KIE_PORT="${KIE_PORT:-18082}"
+STANDIN_PROFILE="${STANDIN_PROFILE:-fast}"
+ALIAS="block_a_gov/artifacts/eligibility_canonical.json"
+
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_standins_live_${TS}.log"
+INTAKE_JSON="$LOG_DIR/standins_intake_${TS}.json"
+ELIG_JSON="$LOG_DIR/standins_eligibility_${TS}.json"
+ELIG_400_JSON="$LOG_DIR/standins_eligibility_as_of_400_${TS}.json"
+BRMS_REQ_JSON="$LOG_DIR/standins_brms_req_${TS}.json"
+BRMS_JSON="$LOG_DIR/standins_brms_flags_${TS}.json"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+PIDS=()
+cleanup() {
+  for pid in "${PIDS[@]:-}"; do
+    [[ -n "$pid" ]] && kill "$pid" >/dev/null 2>&1 || true
+  done
+}
+trap cleanup EXIT
+
+wait_health() {
+  local url="$1"
+  for _ in $(seq 1 40); do
+    if "$PY" -c 'import sys,urllib.request; urllib.request.urlopen(sys.argv[1], timeout=1)' "$url" >/dev/null 2>&1; then
+      return 0
+    fi
+    sleep 0.1
+  done
+  echo "[ERR] health never OK: $url"
+  return 1
+}
+
+echo "[SMOKE_STANDINS_LIVE] root=$ROOT"
+echo "[SMOKE_STANDINS_LIVE] python=$PY profile=$STANDIN_PROFILE dsz_port=$DSZ_PORT kie_port=$KIE_PORT"
+echo "[SMOKE_STANDINS_LIVE] log=$LOG_FILE"
+
+"$PY" -m tools.ds_z_standin --port "$DSZ_PORT" --profile "$STANDIN_PROFILE" >"$LOG_DIR/ds_z_standin_${TS}.log" 2>&1 &
+PIDS+=("$!")
+"$PY" -m tools.kie_standin --port "$KIE_PORT" --profile "$STANDIN_PROFILE" --gate-mode all_pass --require-auth >"$LOG_DIR/kie_standin_${TS}.log" 2>&1 &
+PIDS+=("$!")
+wait_health "http://127.0.0.1:${DSZ_PORT}/health"
+wait_health "http://127.0.0.1:${KIE_PORT}/health"
+
+echo "[SMOKE_STANDINS_LIVE] eligibility LIVE against DS_Z stand-in..."
+"$PY" runners/runner_workflow.py --client-id 100001 --seed 42 --request-id standin-smoke-001 \
+  --as-of-ts 2026-02-18T16:00:00Z --canonical-alias "$ALIAS" > "$INTAKE_JSON"
+"$PY" runners/runner_eligibility.py --intake-json "$INTAKE_JSON" --canonical-alias "$ALIAS" \
+  --sensor-mode LIVE --sensor-base-url "http://127.0.0.1:${DSZ_PORT}" > "$ELIG_JSON"
+
+echo "[SMOKE_STANDINS_LIVE] eligibility LIVE with as_of=400 (expect retry without as_of, no fallback)..."
+"$PY" -m tools.ds_z_standin --port "$((DSZ_PORT + 1))" --profile "$STANDIN_PROFILE" --as-of-400 always >"$LOG_DIR/ds_z_standin_as_of_400_${TS}.log" 2>&1 &
+PIDS+=("$!")
+wait_health "http://127.0.0.1:$((DSZ_PORT + 1))/health"
+"$PY" runners/runner_eligibility.py --intake-json "$INTAKE_JSON" --canonical-alias "$ALIAS" \
+  --sensor-mode LIVE --sensor-base-url "http://127.0.0.1:$((DSZ_PORT + 1))" > "$ELIG_400_JSON"
+
+echo "[SMOKE_STANDINS_LIVE] KIE DMN stand-in -> to_brms_flags_v0_1..."
+cat > "$BRMS_REQ_JSON" <<JSON
+{
+  "meta_request_id": "standin-smoke-001",
+  "meta_client_id": "100001",
+  "applicant": {"age": 30, "fico_credit_score": 700, "dti": 0.2, "employment_status": "EMPLOYED"},
+  "loan": {"loan_amount": 10000, "loan_term_months": 36},
+  "context": {"policy_id": "P1", "policy_version": "1.0", "validation_mode": "TEST"},
+  "brms": {"kie_url": "http://127.0.0.1:${KIE_PORT}/kie-server/services/rest/server/containers/loan_rules_1_0_9/dmn"}
+}
+JSON
+"$PY" tools/brms_bridge_kie.py "$BRMS_REQ_JSON" > "$BRMS_JSON"
+
+"$PY" -c 'import json,sys
+e=json.load(open(sys.argv[1])); e400=json.load(open(sys.argv[2])); b=json.load(open(sys.argv[3]))
+print("ELIG_MODE", e.get("meta_sensor_mode_used"), e.get("eligibility_status"))
+print("ELIG_400_MODE", e400.get("meta_sensor_mode_used"))
+print("BRMS_GATES", b.get("gates"))
+assert e.get("meta_sensor_mode_used") == "LIVE"
+assert e400.get("meta_sensor_mode_used") == "LIVE"
+assert b.get("gates") == {"gate_1": "PASS", "gate_2": "PASS", "gate_3": "PASS"}
+assert b.get("meta_policy_id") == "P1"
+' "$ELIG_JSON" "$ELIG_400_JSON" "$BRMS_JSON"
+
+echo "[OK] smoke_standins_live"
+echo "[SMOKE_STANDINS_LIVE] artifacts: $ELIG_JSON $ELIG_400_JSON $BRMS_JSON"
+echo "[SMOKE_STANDINS_LIVE] log: $LOG_FILE"
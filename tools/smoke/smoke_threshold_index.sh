@@ -0,0 +1,80 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+FIX="testing/bench/fixtures"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_threshold_index_${TS}.log"
+export THRESHOLD_INDEX_CACHE_DIR="$LOG_DIR/threshold_index_cache_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_THR_INDEX] root=$ROOT"
+echo "[SMOKE_THR_INDEX] python=$PY cache=$THRESHOLD_INDEX_CACHE_DIR"
+echo "[SMOKE_THR_INDEX] log=$LOG_FILE"
+
+echo "[SMOKE_THR_INDEX] verify fixtures against the per-call algorithms..."
+"$PY" runners/threshold_index.py verify --kind t2 --file "$FIX/t2_operating_pick_sample.json"
+"$PY" runners/threshold_index.py verify --kind t3 --file "$FIX/t3_thresholds_sample.json"
+"$PY" runners/threshold_index.py verify --kind t4 --file "$FIX/t4_thresholds_sample.json"
+
+echo "[SMOKE_THR_INDEX] content-hash cache, errors, flat T4 payloads..."
+"$PY" - "$FIX" "$LOG_DIR/thr_index_tmp_${TS}.json" <<'PY'
+import json, sys
+from pathlib import Path
+sys.path.insert(0, "runners")
+import threshold_index as ti
+
+fix, tmp = Path(sys.argv[1]), Path(sys.argv[2])
+payload = json.loads((fix / "t4_thresholds_sample.json").read_text(encoding="utf-8"))
+
+tmp.write_text(json.dumps(payload), encoding="utf-8")
+a = ti.load_index(tmp, "t4")
+assert ti.load_index(tmp, "t4") is a
+assert (ti.cache_dir() / f"t4_{a['source_sha256']}.json").exists()
+assert ti.t4_mode(a) == "thr_valid_best_f1" and ti.t4_threshold(a, "thr_valid_best_f1") == 0.36
+
+# Same path, new content -> new hash -> new index (never a stale threshold).
+payload["panel_valid"]["thr_valid_best_f1"]["threshold"] = 0.5
+tmp.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+b = ti.load_index(tmp, "t4")
+assert b["source_sha256"] != a["source_sha256"] and ti.t4_threshold(b, "thr_valid_best_f1") == 0.5
+
+# Flat payload (no panel_valid), nested duplicate: the direct key wins.
+flat = {"thr_valid_recall_ge_0_90": 0.2, "extra": {"thr_valid_recall_ge_0_90": 0.9, "thr_valid_x": {"threshold": 0.3}}}
+idx = ti.build_index(flat, "t4")
+assert ti.t4_mode(idx) == "thr_valid_recall_ge_0_90"
+assert ti.t4_threshold(idx, "thr_valid_recall_ge_0_90") == 0.2 and ti.t4_threshold(idx, "thr_valid_x") == 0.3
+assert ti.verify_index(idx, flat) == []
+
+for fn, args, exc in (
+    (ti.t4_mode, (ti.build_index({"a": 1}, "t4"),), KeyError),
+    (ti.t4_threshold, (idx, "thr_valid_nope"), KeyError),
+    (ti.t3_threshold, (ti.build_index({"m": None}, "t3"), "m"), ValueError),
+    (ti.t3_mode, (ti.build_index({}, "t3"), None), ValueError),
+    (ti.t2_op_block, (ti.build_index({"valid": {}}, "t2"), "op_a"), ValueError),
+):
+    try:
+        fn(*args)
+        raise AssertionError(f"{fn.__name__} should raise")
+    except exc:
+        pass
+
+# A tampered disk entry is caught by verify.
+bad = dict(a, modes=dict(a["modes"], thr_valid_best_f1={"threshold": 0.99}))
+assert ti.verify_index(bad, json.loads((fix / "t4_thresholds_sample.json").read_text(encoding="utf-8")))
+print("THR_INDEX_OK")
+PY
+
+echo "[OK] smoke_threshold_index"
+echo "[SMOKE_THR_INDEX] log: $LOG_FILE"
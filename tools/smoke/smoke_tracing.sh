@@ -0,0 +1,156 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the run).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+PORT="${PORT:-19025}"
+DSZ_PORT="${DSZ_PORT:-19026}"
+KIE_PORT="${KIE_PORT:-19027}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_tracing_${TS}.log"
+ALIAS_DIR="$LOG_DIR/tracing_aliases_${TS}"
+CLI_SPANS="$LOG_DIR/spans_cli_${TS}.jsonl"
+SVC_SPANS="$LOG_DIR/spans_service_${TS}.jsonl"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+PIDS=()
+cleanup() {
+  for pid in "${PIDS[@]:-}"; do
+    [[ -n "$pid" ]] && kill "$pid" >/dev/null 2>&1 || true
+  done
+}
+trap cleanup EXIT
+
+echo "[SMOKE_TRACING] root=$ROOT"
+echo "[SMOKE_TRACING] python=$PY port=$PORT dsz_port=$DSZ_PORT kie_port=$KIE_PORT"
+echo "[SMOKE_TRACING] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+MANIFEST="$ALIAS_DIR/runtime_manifest.json"
+
+"$PY" -m tools.ds_z_standin --port "$DSZ_PORT" --profile fast >"$LOG_DIR/ds_z_standin_tracing_${TS}.log" 2>&1 &
+PIDS+=("$!")
+"$PY" -m tools.kie_standin --port "$KIE_PORT" --profile fast --gate-mode all_pass >"$LOG_DIR/kie_standin_tracing_${TS}.log" 2>&1 &
+PIDS+=("$!")
+"$PY" runners/decision_service.py --runtime-manifest "$MANIFEST" --port "$PORT" --workers 1 --threads 2 \
+  --trace-out "$SVC_SPANS" >"$LOG_DIR/decision_service_tracing_${TS}.log" 2>&1 &
+PIDS+=("$!")
+
+"$PY" - "$PORT" "$DSZ_PORT" "$KIE_PORT" "$MANIFEST" "$CLI_SPANS" "$SVC_SPANS" <<'PY'
+import json, subprocess, sys, time, urllib.request
+
+port, dsz_port, kie_port, manifest, cli_spans, svc_spans = sys.argv[1:7]
+sys.path.insert(0, "runners")
+import tracing
+
+def wait(url):
+    for _ in range(50):
+        try:
+            return urllib.request.urlopen(url, timeout=1).read()
+        except Exception:
+            time.sleep(0.2)
+    raise SystemExit(f"never healthy: {url}")
+
+for u in (f"http://127.0.0.1:{dsz_port}/health", f"http://127.0.0.1:{kie_port}/health", f"http://127.0.0.1:{port}/health"):
+    wait(u)
+
+VOLATILE = {"meta_generated_at", "meta_latency_ms", "latency_ms", "generated_at", "meta_as_of_ts"}
+def strip(o):
+    if isinstance(o, dict):
+        return {k: strip(v) for k, v in o.items() if k not in VOLATILE}
+    if isinstance(o, list):
+        return [strip(x) for x in o]
+    return o
+
+def by_trace(path):
+    traces = {}
+    for s in tracing.load_spans(path):
+        traces.setdefault(s["traceId"], []).append(s)
+    return traces
+
+def attr(s, key):
+    return next((a["value"].get("stringValue") for a in s.get("attributes", []) if a["key"] == key), None)
+
+def assert_connected(spans):
+    ids = {s["spanId"] for s in spans}
+    roots = [s for s in spans if s.get("parentSpanId") not in ids]
+    assert len(roots) == 1, [(s["name"], s["service"]) for s in roots]
+    return roots[0]
+
+# 1) CLI chain: workflow -> eligibility (LIVE sensors) -> ORIGINATE child -> T2/T3/T4 children.
+rows = [json.loads(l) for l in open("testing/requests/eval_requests_dev_v0_1.jsonl", encoding="utf-8") if l.strip()][:6]
+full_chain = set()
+for row in rows:
+    cmd = [sys.executable, "runners/runner_workflow_eligibility.py", "--client-id", str(row["client_id"]), "--seed", str(row["seed"]),
+           "--request-id", row["request_id"], "--channel", row["channel"], "--runtime-manifest", manifest,
+           "--is-existing-customer", str(row["is_existing_customer"]).lower(),
+           "--sensor-mode", "LIVE", "--sensor-base-url", f"http://127.0.0.1:{dsz_port}"]
+    for k in ("as_of_ts", "age", "employment_status", "declared_income_monthly", "declared_dti", "declared_credit_score",
+              "requested_amount", "term_months", "product_type"):
+        if row.get(k) is not None:
+            cmd += ["--" + k.replace("_", "-"), str(row[k])]
+    plain = json.loads(subprocess.check_output(cmd, text=True))
+    traced = json.loads(subprocess.check_output(cmd + ["--trace-out", cli_spans], text=True))
+    assert strip(plain) == strip(traced), row["request_id"]
+    if "t2_default" in traced["decisions"]:
+        full_chain.add(row["request_id"])
+assert 0 < len(full_chain) < len(rows), "need both full-chain and early-cut rows"
+
+traces = by_trace(cli_spans)
+assert len(traces) == len(rows), len(traces)
+for spans in traces.values():
+    root = assert_connected(spans)
+    rid = attr(root, "decision.request_id")
+    assert root["name"] == "workflow_eligibility" and root["service"] == "workflow", root
+    services = {s["service"] for s in spans}
+    sensor_calls = [s for s in spans if s["kind"] == 3 and s["name"].startswith("GET /sensor/")]
+    assert sensor_calls, "LIVE sensor calls are CLIENT spans"
+    if rid in full_chain:
+        assert {"originate", "runner_t2", "runner_t3", "runner_t4"} <= services, services
+    else:
+        assert services == {"workflow"}, services
+
+stats = json.loads(urllib.request.urlopen(f"http://127.0.0.1:{dsz_port}/standin/stats", timeout=5).read())
+for endpoint, c in stats["counters"].items():
+    assert c.get("traced", 0) == c["requests"] / 2, (endpoint, c)  # traced runs only
+print(f"[OK] cli traces={len(traces)} spans={sum(len(v) for v in traces.values())} sensor counters={stats['counters']}")
+
+# 2) Bridge -> KIE hop carries traceparent.
+sys.path.insert(0, ".")
+from tools.brms_bridge_kie import call_kie_dmn
+tracing.configure("smoke", cli_spans)
+with tracing.span("bridge"):
+    call_kie_dmn(f"http://127.0.0.1:{kie_port}/kie-server/services/rest/server/containers/c1/dmn", "u", "p", {}, headers=tracing.inject({}))
+kie = json.loads(urllib.request.urlopen(f"http://127.0.0.1:{kie_port}/standin/stats", timeout=5).read())
+assert list(kie["counters"].values())[0].get("traced") == 1, kie
+
+# 3) Decision service continues the caller's trace (traceparent header).
+parent = "00-" + "ab" * 16 + "-" + "cd" * 8 + "-01"
+for row in rows[:4]:
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/decide", data=json.dumps(row).encode("utf-8"),
+                                 headers={"Content-Type": "application/json", "traceparent": parent})
+    urllib.request.urlopen(req, timeout=10).read()
+spans = by_trace(svc_spans)["ab" * 16]
+servers = [s for s in spans if s["kind"] == 2]
+assert len(servers) == 4 and all(s["parentSpanId"] == "cd" * 8 for s in servers), servers
+names = {s["name"] for s in spans}
+assert {"POST /decide", "decide", "intake", "eligibility", "originate", "t2_default", "assemble_pack", "policy_decider"} <= names, names
+print(f"[OK] service spans joined caller trace: {len(spans)} spans")
+
+out = subprocess.check_output([sys.executable, "runners/tracing.py", "slowest", "--file", cli_spans, "--top", "1"], text=True)
+assert out.startswith("trace ") and "workflow_eligibility" in out, out
+print(out.rstrip())
+PY
+
+echo "[OK] smoke_tracing"
@@ -0,0 +1,92 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+cd "$ROOT"
+
+# Needs numpy + xgboost (tiny synthetic boosters are trained for the APPROVED case).
+PY="${PY:-python3}"
+VENV_PY="$ROOT/.venv/bin/python3"
+if [[ "$PY" == "python3" && -x "$VENV_PY" ]]; then
+  PY="$VENV_PY"
+fi
+
+# Early-cut budget (ms) for the in-process path, from intake to the finished pack.
+EARLY_CUT_BUDGET_MS="${EARLY_CUT_BUDGET_MS:-5}"
+LOG_DIR="tools/smoke/_logs"
+mkdir -p "$LOG_DIR"
+TS="$(date +%Y%m%d_%H%M%S)"
+LOG_FILE="$LOG_DIR/smoke_workflow_eligibility_isolation_${TS}.log"
+ALIAS_DIR="$LOG_DIR/isolation_aliases_${TS}"
+WORK_DIR="$LOG_DIR/isolation_${TS}"
+
+exec > >(tee -a "$LOG_FILE") 2>&1
+
+echo "[SMOKE_WORKFLOW_ELIGIBILITY_ISOLATION] root=$ROOT"
+echo "[SMOKE_WORKFLOW_ELIGIBILITY_ISOLATION] python=$PY early_cut_budget_ms=$EARLY_CUT_BUDGET_MS"
+echo "[SMOKE_WORKFLOW_ELIGIBILITY_ISOLATION] log=$LOG_FILE"
+
+"$PY" testing/scripts/make_tiny_alias_dir.py --out-dir "$ALIAS_DIR"
+mkdir -p "$WORK_DIR"
+
+# Same three cases as smoke_workflow_eligibility_stub.sh, patched from the shipped
+# block_a_gov/artifacts/eligibility_canonical.json; models come from the tiny alias dir.
+"$PY" - "$WORK_DIR" <<'PY'
+import json, sys
+work = sys.argv[1]
+base = json.load(open("block_a_gov/artifacts/eligibility_canonical.json", encoding="utf-8"))
+cases = {
+    "a_reject": {"MIN_INCOME": 100000, "MACRO_STRESS_REVIEW_THR": 0.99},
+    "b_review": {"MIN_INCOME": 1, "MACRO_STRESS_REVIEW_THR": 0.0},
+    "c_approved": {"MIN_INCOME": 1, "MACRO_STRESS_REVIEW_THR": 1.0},
+}
+for name, params in cases.items():
+    d = json.loads(json.dumps(base))
+    d["parameters"].update(params)
+    json.dump(d, open(f"{work}/eligibility_{name}.json", "w", encoding="utf-8"), indent=2)
+PY
+
+for case in a_reject b_review c_approved; do
+  alias="$WORK_DIR/eligibility_${case}.json"
+  "$PY" runners/runtime_manifest.py build --alias-dir "$ALIAS_DIR" \
+    --workflow-alias "$alias" --eligibility-alias "$alias" --out "$WORK_DIR/manifest_${case}.json" > /dev/null
+  for mode in inproc isolated; do
+    extra=()
+    [[ "$mode" == "isolated" ]] && extra=(--isolate-subprocess)
+    "$PY" runners/runner_workflow_eligibility.py \
+      --client-id 100001 --seed 42 --request-id "REQ_ISOLATION_${case}" --as-of-ts 2025-01-15T00:00:00+00:00 \
+      --workflow-canonical-alias "$alias" --eligibility-canonical-alias "$alias" \
+      --runtime-manifest "$WORK_DIR/manifest_${case}.json" \
+      --brms-stub tools/smoke/fixtures/brms_all_pass.json \
+      "${extra[@]}" > "$WORK_DIR/pack_${case}_${mode}.json"
+  done
+  echo "[SMOKE_WORKFLOW_ELIGIBILITY_ISOLATION] case=$case done"
+done
+
+"$PY" - "$WORK_DIR" "$EARLY_CUT_BUDGET_MS" <<'PY'
+import json, sys
+sys.path.insert(0, "runners")
+from decision_async import strip_volatile
+
+work, budget_ms = sys.argv[1], float(sys.argv[2])
+expect = {"a_reject": ("REJECTED", "REJECT"), "b_review": ("REVIEW_REQUIRED", "REVIEW"), "c_approved": ("APPROVED", None)}
+for case, (elig, outcome) in expect.items():
+    inproc = json.load(open(f"{work}/pack_{case}_inproc.json", encoding="utf-8"))
+    isolated = json.load(open(f"{work}/pack_{case}_isolated.json", encoding="utf-8"))
+    d = inproc["decisions"]
+    assert d["eligibility"]["eligibility_status"] == elig, (case, d["eligibility"]["eligibility_status"])
+    if outcome is not None:
+        assert d["final_decision"]["final_outcome"] == outcome and "t2_default" not in d, case
+    else:
+        assert "t2_default" in d, case
+    # Intake by reference vs intake over stdin to child interpreters: same pack.
+    assert strip_volatile(inproc) == strip_volatile(isolated), case
+    if outcome is not None:
+        ms = inproc["meta_latency_ms"]
+        assert ms <= budget_ms, f"{case}: in-process early cut took {ms} ms (budget {budget_ms} ms)"
+        print(f"[OK] {case} parity, early cut in-process={ms} ms isolated={isolated['meta_latency_ms']} ms")
+    else:
+        print(f"[OK] {case} parity")
+PY
+
+echo "[OK] smoke_workflow_eligibility_isolation"
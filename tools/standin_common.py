@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for local stand-in servers (DS_Z sensors, KIE DMN).
+
+Stand-ins replace external services for load tests and LIVE-lane rehearsals on
+one machine. Each endpoint gets a behaviour profile:
+
+  {
+    "latency": {"dist": "fixed", "ms": 5}
+             | {"dist": "lognormal", "median_ms": 20, "sigma": 0.6}
+             | {"dist": "heavy_tail", "base_ms": 10, "alpha": 1.5, "cap_ms": 5000},
+    "error_rate": 0.02,          # fraction of requests answered with error_status
+    "error_status": 503,
+    "as_of_400": "never" | "always" | "out_of_range",
+    "as_of_min": "2026-01-01T00:00:00Z",
+    "as_of_max": "2026-12-31T23:59:59Z"
+  }
+
+Profiles are resolved as: preset "default" < preset "endpoints"[path] < CLI overrides.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_PROFILES_FILE = "tools/smoke/fixtures/standin_profiles.json"
+
+_BASE_PROFILE: Dict[str, Any] = {
+    "latency": {"dist": "fixed", "ms": 0},
+    "error_rate": 0.0,
+    "error_status": 503,
+    "as_of_400": "never",
+}
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def parse_latency_spec(spec: str) -> Dict[str, Any]:
+    """
+    Compact CLI form:
+      fixed:<ms>
+      lognormal:<median_ms>:<sigma>
+      heavy_tail:<base_ms>:<alpha>[:<cap_ms>]
+    """
+    parts = [p.strip() for p in str(spec).split(":") if p.strip()]
+    if not parts:
+        raise ValueError("Empty latency spec")
+    dist = parts[0].lower()
+    nums = [float(x) for x in parts[1:]]
+    if dist == "fixed" and len(nums) == 1:
+        return {"dist": "fixed", "ms": nums[0]}
+    if dist == "lognormal" and len(nums) == 2:
+        return {"dist": "lognormal", "median_ms": nums[0], "sigma": nums[1]}
+    if dist == "heavy_tail" and len(nums) in (2, 3):
+        out = {"dist": "heavy_tail", "base_ms": nums[0], "alpha": nums[1]}
+        if len(nums) == 3:
+            out["cap_ms"] = nums[2]
+        return out
+    raise ValueError(f"Invalid latency spec: {spec} (use fixed:MS | lognormal:MEDIAN:SIGMA | heavy_tail:BASE:ALPHA[:CAP])")
+
+
+def load_profile_preset(path: Optional[str], name: Optional[str]) -> Dict[str, Any]:
+    if not name:
+        return {}
+    p = Path(path or DEFAULT_PROFILES_FILE)
+    if not p.exists():
+        raise FileNotFoundError(f"Stand-in profiles file not found: {p}")
+    d = json.loads(p.read_text(encoding="utf-8"))
+    presets = d.get("profiles", {}) or {}
+    if name not in presets:
+        raise KeyError(f"Unknown stand-in profile '{name}'. Available: {sorted(presets)}")
+    preset = presets[name]
+    if not isinstance(preset, dict):
+        raise ValueError(f"Stand-in profile '{name}' must be an object")
+    return preset
+
+
+def resolve_endpoint_profile(preset: Dict[str, Any], endpoint: str, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    out = json.loads(json.dumps(_BASE_PROFILE))
+    out.update(preset.get("default", {}) or {})
+    out.update((preset.get("endpoints", {}) or {}).get(endpoint, {}) or {})
+    out.update({k: v for k, v in overrides.items() if v is not None})
+    return out
+
+
+def sample_latency_ms(latency: Dict[str, Any], rng: random.Random) -> float:
+    dist = str(latency.get("dist", "fixed")).lower()
+    if dist == "fixed":
+        return max(float(latency.get("ms", 0.0)), 0.0)
+    if dist == "lognormal":
+        median = max(float(latency.get("median_ms", 10.0)), 0.001)
+        sigma = max(float(latency.get("sigma", 0.5)), 0.0)
+        return rng.lognormvariate(math.log(median), sigma)
+    if dist == "heavy_tail":
+        # Pareto tail above base_ms; alpha <= 2 gives infinite variance (realistic p99.9 spikes).
+        base = max(float(latency.get("base_ms", 10.0)), 0.0)
+        alpha = max(float(latency.get("alpha", 1.5)), 0.1)
+        cap = float(latency.get("cap_ms", 10000.0))
+        return min(base * rng.paretovariate(alpha), cap)
+    raise ValueError(f"Unknown latency dist: {dist}")
+
+
+def stable_unit(*parts: Any) -> float:
+    """Deterministic value in [0, 1) derived from the given parts (same inputs -> same score)."""
+    h = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).digest()
+    return int.from_bytes(h[:8], "big") / float(1 << 64)
+
+
+def _parse_ts(s: str) -> Optional[datetime]:
+    try:
+        v = datetime.fromisoformat(str(s).strip().replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if v.tzinfo is None:
+        v = v.replace(tzinfo=timezone.utc)
+    return v
+
+
+def as_of_rejected(profile: Dict[str, Any], as_of: Optional[str]) -> bool:
+    """True when the profile says this `as_of` must be answered with HTTP 400."""
+    if not as_of:
+        return False
+    mode = str(profile.get("as_of_400", "never")).lower()
+    if mode == "always":
+        return True
+    if mode != "out_of_range":
+        return False
+    ts = _parse_ts(as_of)
+    if ts is None:
+        return True
+    lo = _parse_ts(profile.get("as_of_min", "")) if profile.get("as_of_min") else None
+    hi = _parse_ts(profile.get("as_of_max", "")) if profile.get("as_of_max") else None
+    return (lo is not None and ts < lo) or (hi is not None and ts > hi)
+
+
+class StandinState:
+    """Per-server behaviour (profiles + shared RNG) and request counters."""
+
+    def __init__(self, preset: Dict[str, Any], overrides: Dict[str, Any], seed: int) -> None:
+        self.preset = preset
+        self.overrides = overrides
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def profile(self, endpoint: str) -> Dict[str, Any]:
+        p = self._profiles.get(endpoint)
+        if p is None:
+            p = resolve_endpoint_profile(self.preset, endpoint, self.overrides)
+            self._profiles[endpoint] = p
+        return p
+
+    def draw(self, endpoint: str) -> Dict[str, Any]:
+        """Sample latency and error outcome for one request (thread-safe)."""
+        p = self.profile(endpoint)
+        with self._lock:
+            latency_ms = sample_latency_ms(p.get("latency", {}) or {}, self.rng)
+            fail = self.rng.random() < float(p.get("error_rate", 0.0))
+        return {"latency_ms": latency_ms, "fail": fail, "error_status": int(p.get("error_status", 503))}
+
+    def count(self, endpoint: str, key: str) -> None:
+        with self._lock:
+            c = self.counters.setdefault(endpoint, {})
+            c[key] = c.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": json.loads(json.dumps(self.counters)),
+                "profiles": json.loads(json.dumps(self._profiles)),
+            }
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    """Minimal JSON request handler; subclasses implement route(method, path, query, body)."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "BlockAStandin/0.1"
+    quiet = True
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+    def send_json(self, status: int, obj: Any) -> None:
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json_body(self) -> Any:
+        n = int(self.headers.get("Content-Length") or 0)
+        if n <= 0:
+            return None
+        return json.loads(self.rfile.read(n).decode("utf-8"))
+
+
+class _StandinServer(ThreadingHTTPServer):
+    # socketserver's default listen backlog (5) drops the SYNs of concurrent (asyncio)
+    # clients; the retransmit then shows up as a ~1 s latency spike or a timeout.
+    request_queue_size = 128
+
+
+def serve(handler_cls: type, host: str, port: int, banner: str) -> None:
+    httpd = _StandinServer((host, port), handler_cls)
+    httpd.daemon_threads = True
+    print(f"[{banner}] listening on http://{host}:{port}", flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def apply_draw(draw: Dict[str, Any]) -> None:
+    if draw["latency_ms"] > 0:
+        time.sleep(draw["latency_ms"] / 1000.0)